@@ -0,0 +1,448 @@
+"""
+Çoklu hesap yürütme: veri + indikatör + sinyal mum başına bir kez hesaplanır
+(TradingBot), sonra her hesabın yürütücüsüne eşzamanlı dağıtılır.
+
+    ACCOUNTS = [
+        {'name': 'main'},                                           # .env anahtarı (veri oturumu)
+        {'name': 'sub1', 'api_key_env': 'SUB1_API_KEY', 'api_secret_env': 'SUB1_API_SECRET',
+         'risk_scale': 0.5, 'symbol_settings': {'BTCUSDT': {'risk': 2.5}}},
+    ]
+
+Her AccountExecutor'ın kendi oturumu (pybit HTTP: hesap başına bağlantı havuzu),
+rate limiter'ı, PositionManager'ı, kaldıraç durumu, denetçisi ve pozisyon günlüğü
+(ACCOUNT_JOURNAL_DIR/<ad>.jsonl) vardır. Hesabın tüm özel çağrıları (emir, iptal,
+pozisyon, kaldıraç, denetçi) RateLimitedSession ile hesabın limiter'ından geçer.
+Hesaplar birbirini beklemez: akış modunda her hesap sembolleri kendi thread'inde
+sırayla işler, OCO kontrolleri hesabın kendi havuzunda koşar. `account.<ad>` metriği: sinyalin hazır olmasından o hesabın
+sembol için işini bitirmesine kadar geçen süre (sembol etiketli).
+
+api_key_env verilmeyen hesap (en fazla bir tane) .env oturumunu kullanır; emir
+bütçesi yine de kline limit'inden ayrıdır. Bütçe: `rate_limit` ya da
+ACCOUNT_RATE_LIMIT_PER_SEC (sharding açıksa işçiler arası ortak).
+"""
+import os
+import json
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config import (
+    ACCOUNTS, ACCOUNT_JOURNAL_DIR, ACCOUNT_RATE_LIMIT_PER_SEC, LEVERAGE, LEVERAGE_STATE_FILE, OCO_WORKERS,
+    STARTUP_WORKERS, SUPERVISOR_INTERVAL, SYMBOL_SETTINGS,
+)
+from exchange import BybitFuturesAPI, RateLimitedSession, RateLimiter
+from metrics import METRICS
+from position_manager import PositionManager
+from sharding import SharedRateLimiter
+from startup import LeverageState
+from supervisor import Supervisor
+
+logger = logging.getLogger(__name__)
+
+# Günlükte karşılaştırılan pozisyon alanları (değişirse 'update' olayı)
+JOURNAL_FIELDS = ('direction', 'quantity', 'entry_price', 'take_profit1', 'take_profit2', 'stop_loss')
+
+
+def _account_path(path: Optional[str], name: str) -> Optional[str]:
+    """'.cache/leverage.json' → '.cache/leverage.sub1.json' (hesap başına ayrı durum dosyası)."""
+    if not path:
+        return None
+    root, ext = os.path.splitext(path)
+    return f"{root}.{name}{ext}"
+
+
+class PositionJournal:
+    """Hesabın pozisyon olayları (JSONL): son kayıttan bu yana açılan, kapanan, güncellenen pozisyonlar."""
+
+    def __init__(self, path: Optional[str], account: str):
+        self.path    = path
+        self.account = account
+        self._last: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _state(position: Dict) -> Dict:
+        state = {field: position.get(field) for field in JOURNAL_FIELDS}
+        state['tp1_triggered'] = (position.get('oco_pair') or {}).get('tp1_triggered', False)
+        return state
+
+    def record(self, positions: Dict[str, Dict]) -> int:
+        """Farkları yazar; yazılan olay sayısını döndürür."""
+        current = {symbol: self._state(position) for symbol, position in positions.items()}
+        now     = time.time()
+        events  = []
+        for symbol, state in current.items():
+            before = self._last.get(symbol)
+            if before != state:
+                events.append({'time': now, 'account': self.account, 'symbol': symbol,
+                               'event': 'open' if before is None else 'update', **state})
+        for symbol in self._last.keys() - current.keys():
+            events.append({'time': now, 'account': self.account, 'symbol': symbol, 'event': 'close'})
+        self._last = current
+        if events and self.path:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(event, default=str) + '\n' for event in events))
+            except OSError as e:
+                logger.warning("%s pozisyon günlüğü yazılamadı: %s", self.account, e)
+        return len(events)
+
+
+class AccountExecutor:
+    def __init__(
+        self,
+        name:                str,
+        api:                 BybitFuturesAPI,
+        symbol_settings:     Optional[Dict[str, Dict]] = None,
+        risk_scale:          float = 1.0,
+        leverage_state_file: Optional[str] = LEVERAGE_STATE_FILE,
+        journal_dir:         Optional[str] = ACCOUNT_JOURNAL_DIR,
+        supervise:           bool = SUPERVISOR_INTERVAL > 0,
+        rate_limiter:        Optional[RateLimiter] = None,
+    ):
+        self.name             = name
+        self.api              = api
+        # Hesabın özel uç nokta bütçesi; kline istekleri (api.rate_limiter) bunu tüketmez
+        self.rate_limiter     = rate_limiter or RateLimiter(ACCOUNT_RATE_LIMIT_PER_SEC)
+        self.session          = RateLimitedSession(api.session, self.rate_limiter)
+        # Hesabın risk ayarları: SYMBOL_SETTINGS üzerine sembol bazında birleştirilir
+        settings = {symbol: dict(values) for symbol, values in SYMBOL_SETTINGS.items()}
+        for symbol, values in (symbol_settings or {}).items():
+            settings.setdefault(symbol, {}).update(values)
+        self.position_manager = PositionManager(self.session, symbol_settings=settings, risk_scale=risk_scale)
+        self.leverage_state   = LeverageState(leverage_state_file)
+        self.supervisor       = Supervisor(self.position_manager) if supervise else None
+        self.journal          = PositionJournal(
+            os.path.join(journal_dir, f"{name}.jsonl") if journal_dir else None, name
+        )
+        # Akış modu: hesabın sembol adımları sırayla (sembol başına sıra toplu turla aynı)
+        self._worker          = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'account-{name}')
+        self._oco_pool: Optional[ThreadPoolExecutor] = None
+        self._oco: Dict[str, Future] = {}
+        self._steps: List[Future] = []
+
+    # ─── Hesap Kurulumu ───────────────────────────────────────────────────────
+
+    def initialize(self, symbols: List[str]) -> None:
+        """
+        Her sembol için kaldıraç ayarlar. Durum dosyasındaki doğrulanmış değer
+        LEVERAGE ile aynıysa sembol atlanır; kalanlar eşzamanlı ayarlanır.
+        (Kaldıraç exchange'de elle değiştirildiyse durum dosyası silinmelidir.)
+        """
+        pending = [symbol for symbol in symbols if not self.leverage_state.matches(symbol, LEVERAGE)]
+        if not pending:
+            logger.info("%s: kaldıraç durumu güncel — %d sembol atlandı", self.name, len(symbols))
+            return
+        with ThreadPoolExecutor(max_workers=min(STARTUP_WORKERS, len(pending))) as executor:
+            list(executor.map(self._set_leverage, pending))
+        self.leverage_state.save()
+
+    def _set_leverage(self, symbol: str) -> None:
+        try:
+            response = self.session.set_leverage(
+                category="linear",
+                symbol=symbol,
+                buyLeverage=str(LEVERAGE),
+                sellLeverage=str(LEVERAGE),
+            )
+            if response['retCode'] != 0:
+                logger.warning("%s: %s kaldıraç ayarlama uyarısı: %s", self.name, symbol, response['retMsg'])
+                return
+            logger.info("%s: %s kaldıraç ayarlandı: %sx", self.name, symbol, LEVERAGE)
+        except Exception as e:
+            if "leverage not modified" not in str(e):
+                logger.warning("%s: %s kaldıraç ayarlama uyarısı: %s", self.name, symbol, e)
+                return
+            logger.debug("%s: %s kaldıraç zaten %sx", self.name, symbol, LEVERAGE)
+        self.leverage_state.confirm(symbol, LEVERAGE)
+
+    # ─── Mevcut Pozisyonları Yükleme ──────────────────────────────────────────
+
+    def load_existing_positions(self, symbols: Optional[List[str]] = None) -> None:
+        """Bot restart sonrası exchange'deki açık pozisyonları hafızaya yükler (`symbols`: sadece bunlar)."""
+        try:
+            positions = self.session.get_positions(category='linear', settleCoin='USDT')
+            if positions['retCode'] != 0:
+                logger.error("%s: pozisyonlar alınamadı: %s", self.name, positions['retMsg'])
+                return
+
+            open_positions = [
+                pos for pos in positions['result']['list']
+                if float(pos.get('size', 0)) != 0 and (symbols is None or pos['symbol'] in symbols)
+            ]
+            # Tüm açık emirler tek (sayfalı) sorguyla; alınamazsa sembol başına sorguya düşülür
+            orders = self._open_orders_by_symbol() if open_positions else {}
+
+            for pos in open_positions:
+                symbol    = pos['symbol']
+                direction = 'LONG' if pos['side'] == 'Buy' else 'SHORT'
+                quantity  = float(pos['size'])
+
+                symbol_orders = orders.get(symbol, []) if orders is not None else None
+                oco_pair = self._find_tp_sl_orders(symbol, direction, quantity, symbol_orders)
+
+                position_data = {
+                    'symbol':        symbol,
+                    'direction':     direction,
+                    'entry_price':   float(pos['avgPrice']),
+                    'quantity':      quantity,
+                    'take_profit1':  None,  # emir fiyatları oco_pair içinden takip ediliyor
+                    'take_profit2':  None,
+                    'stop_loss':     None,
+                    'current_pct_atr': None,
+                    'order_id':      None,
+                }
+
+                if oco_pair:
+                    position_data['oco_pair'] = oco_pair
+                    logger.info("%s: %s pozisyon yüklendi (%s) | TP1 tetiklendi: %s",
+                                self.name, symbol, direction, oco_pair.get('tp1_triggered', False))
+                else:
+                    logger.warning("%s: %s pozisyon yüklendi ama TP/SL emirleri bulunamadı", self.name, symbol)
+
+                self.position_manager.active_positions[symbol] = position_data
+
+        except Exception as e:
+            logger.error("%s: mevcut pozisyonlar yüklenirken hata: %s", self.name, e)
+
+    def _open_orders_by_symbol(self) -> Optional[Dict[str, List[Dict]]]:
+        """Tüm USDT açık emirleri, sembole göre gruplu. Hata olursa None."""
+        grouped: Dict[str, List[Dict]] = {}
+        cursor = None
+        while True:
+            params = {'category': 'linear', 'settleCoin': 'USDT', 'limit': 50}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.session.get_open_orders(**params)
+            if response['retCode'] != 0:
+                logger.warning("%s: açık emirler toplu alınamadı: %s", self.name, response['retMsg'])
+                return None
+            for order in response['result']['list']:
+                grouped.setdefault(order['symbol'], []).append(order)
+            cursor = response['result'].get('nextPageCursor')
+            if not cursor:
+                return grouped
+
+    def _find_tp_sl_orders(
+        self, symbol: str, direction: str, quantity: float, orders: Optional[List[Dict]] = None
+    ) -> Optional[Dict]:
+        """
+        Bot restart sonrası mevcut TP/SL emirlerini bulur.
+        Yapı: TP1, TP2, SL1, SL2 (her biri yarı miktar)
+        TP1 zaten tetiklendiyse: TP2 + SL2 (tam miktar = kalan yarı)
+        `orders`: sembolün açık emirleri (toplu snapshot'tan); None ise sorgulanır.
+        """
+        try:
+            if orders is None:
+                response = self.session.get_open_orders(
+                    category='linear',
+                    symbol=symbol,
+                )
+
+                if response['retCode'] != 0:
+                    return None
+                orders = response['result']['list']
+
+            expected_side = "Sell" if direction == "LONG" else "Buy"
+            half_qty      = round(quantity / 2, 8)
+            tolerance     = half_qty * 0.05  # %5 tolerans
+
+            tp_ids = []
+            sl_ids = []
+
+            for order in orders:
+                if order['side'] != expected_side:
+                    continue
+
+                order_qty = float(order['qty'])
+
+                # Yarı miktar eşleşmesi
+                if abs(order_qty - half_qty) > tolerance:
+                    continue
+
+                if order['orderType'] == 'Limit' and order.get('reduceOnly'):
+                    tp_ids.append(order['orderId'])
+                elif order['orderType'] == 'Market' and order.get('triggerPrice'):
+                    sl_ids.append(order['orderId'])
+
+            # TP fiyatlarına göre sırala → TP1 daha yakın, TP2 daha uzak
+            if len(tp_ids) == 2:
+                tp_orders = []
+                for tid in tp_ids:
+                    for o in orders:
+                        if o['orderId'] == tid:
+                            tp_orders.append((float(o['price']), tid))
+                tp_orders.sort(key=lambda x: x[0])
+
+                if direction == "LONG":
+                    tp1_id = tp_orders[0][1]  # daha düşük fiyat
+                    tp2_id = tp_orders[1][1]  # daha yüksek fiyat
+                else:
+                    tp1_id = tp_orders[1][1]  # daha yüksek fiyat
+                    tp2_id = tp_orders[0][1]  # daha düşük fiyat
+            else:
+                tp1_id = tp_ids[0] if len(tp_ids) > 0 else None
+                tp2_id = tp_ids[1] if len(tp_ids) > 1 else None
+
+            sl1_id = sl_ids[0] if len(sl_ids) > 0 else None
+            sl2_id = sl_ids[1] if len(sl_ids) > 1 else None
+
+            # Normal durum: 4 emir de mevcut
+            if tp1_id and tp2_id and sl1_id and sl2_id:
+                logger.info("%s: %s TP1/TP2/SL1/SL2 emirleri bulundu", self.name, symbol)
+                return {
+                    'symbol':        symbol,
+                    'tp1_order_id':  tp1_id,
+                    'tp2_order_id':  tp2_id,
+                    'sl1_order_id':  sl1_id,
+                    'sl2_order_id':  sl2_id,
+                    'tp1_triggered': False,
+                    'active':        True,
+                }
+
+            # TP1 zaten tetiklenmişse: sadece TP2 + SL2 kaldı
+            if tp2_id and sl2_id and not tp1_id and not sl1_id:
+                logger.info("%s: %s TP1 zaten tetiklenmiş — TP2/SL2 bulundu", self.name, symbol)
+                return {
+                    'symbol':        symbol,
+                    'tp1_order_id':  None,
+                    'tp2_order_id':  tp2_id,
+                    'sl1_order_id':  None,
+                    'sl2_order_id':  sl2_id,
+                    'tp1_triggered': True,
+                    'active':        True,
+                }
+
+            logger.warning("%s: %s emirler eksik — TP1: %s | TP2: %s | SL1: %s | SL2: %s",
+                           self.name, symbol, tp1_id, tp2_id, sl1_id, sl2_id)
+            return None
+
+        except Exception as e:
+            logger.error("%s: %s TP/SL emirleri aranırken hata: %s", self.name, symbol, e)
+            return None
+
+    # ─── Toplu Tur ────────────────────────────────────────────────────────────
+
+    def execute(self, signals: Dict[str, Optional[str]], snapshot, ready: float) -> None:
+        """Toplu tur: pozisyon yönetimi (OCO + TP/SL) → yeni emirler. `ready`: sinyallerin hazır olduğu an."""
+        self.position_manager.manage_positions(signals, snapshot)
+        for symbol, signal in signals.items():
+            self._execute_trade(symbol, signal, snapshot.get(symbol), ready)
+        self.journal.record(self.position_manager.active_positions)
+
+    def _execute_trade(self, symbol: str, signal: Optional[str], data: Optional[Dict], ready: float) -> None:
+        if not signal or not data:
+            return
+        self.position_manager.open_position(
+            symbol=symbol,
+            direction=signal,
+            entry_price=data['close'],
+            atr_value=data['z'],
+            pct_atr=data['pct_z'],
+        )
+        METRICS.observe(f"account.{self.name}", time.perf_counter() - ready, symbol)
+
+    # ─── Akış Modu ────────────────────────────────────────────────────────────
+
+    def begin_cycle(self) -> None:
+        """OCO kontrollerini hesabın kendi havuzunda başlatır (kline beklemesiyle örtüşür)."""
+        manager = self.position_manager
+        self._oco_pool = ThreadPoolExecutor(max_workers=OCO_WORKERS, thread_name_prefix=f'oco-{self.name}')
+        self._oco = {symbol: self._oco_pool.submit(manager.check_oco, symbol, pair)
+                     for symbol, pair in manager.pending_oco_pairs().items()}
+        self._steps = []
+
+    def submit(self, symbol: str, signal: Optional[str], data: Optional[Dict], ready: float) -> None:
+        """Sembolün adımını hesabın thread'ine bırakır; çağıran (kline döngüsü) beklemez."""
+        self._steps.append(self._worker.submit(self._step, symbol, signal, data, ready))
+
+    def _step(self, symbol: str, signal: Optional[str], data: Optional[Dict], ready: float) -> None:
+        manager = self.position_manager
+        if symbol in self._oco:
+            manager.apply_oco_result(symbol, self._oco.pop(symbol).result())
+        manager.manage_position(symbol, signal, data)
+        self._execute_trade(symbol, signal, data, ready)
+
+    def end_cycle(self) -> None:
+        """Hesabın bu turdaki adımlarını bekler; sembol listesi dışındaki pozisyonların OCO sonuçlarını uygular."""
+        for future in self._steps:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error("%s: sembol adımı hatası: %s", self.name, e, exc_info=True)
+        # Sembol listesi dışındaki pozisyonlar (restart sonrası exchange'den yüklenenler)
+        for symbol, future in self._oco.items():
+            self.position_manager.apply_oco_result(symbol, future.result())
+        self._oco, self._steps = {}, []
+        if self._oco_pool is not None:
+            self._oco_pool.shutdown()
+            self._oco_pool = None
+        self.journal.record(self.position_manager.active_positions)
+
+    def close(self) -> None:
+        if self.supervisor is not None:
+            self.supervisor.stop()
+        self._worker.shutdown()
+
+
+def build_accounts(
+    api:                 BybitFuturesAPI,
+    specs:               Optional[List[Dict]] = None,
+    testnet:             bool = False,
+    shard_dir:           Optional[str] = None,
+    leverage_state_file: Optional[str] = LEVERAGE_STATE_FILE,
+    journal_dir:         Optional[str] = ACCOUNT_JOURNAL_DIR,
+    supervise:           bool = SUPERVISOR_INTERVAL > 0,
+) -> List[AccountExecutor]:
+    """
+    ACCOUNTS tanımlarından yürütücüler. Boşsa tek hesap: `api` (.env anahtarı).
+    api_key_env verilmeyen hesap `api`'nin oturumunu kullanır; böyle iki hesap aynı
+    exchange hesabında çift işlem açacağından reddedilir. Ayrı anahtarlı hesapların
+    durum dosyası (kaldıraç) adıyla ayrılır; sharding açıksa emir bütçesi işçiler
+    arası ortaktır.
+    """
+    specs = specs if specs is not None else ACCOUNTS
+
+    def limiter(name: str, rate: float):
+        if shard_dir:
+            return SharedRateLimiter(os.path.join(shard_dir, f"ratelimit.{name}"), rate)
+        return RateLimiter(rate)
+
+    if not specs:
+        return [AccountExecutor('main', api, leverage_state_file=leverage_state_file, journal_dir=journal_dir,
+                                supervise=supervise, rate_limiter=limiter('main', ACCOUNT_RATE_LIMIT_PER_SEC))]
+
+    names = [spec['name'] for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"ACCOUNTS hesap adları benzersiz olmalı: {names}")
+    keyless = [spec['name'] for spec in specs if not spec.get('api_key_env')]
+    if len(keyless) > 1:
+        raise ValueError(f"ACCOUNTS'ta en fazla bir hesap .env anahtarını kullanabilir (api_key_env yok): {keyless}")
+
+    accounts = []
+    for spec in specs:
+        name = spec['name']
+        rate = limiter(name, spec.get('rate_limit', ACCOUNT_RATE_LIMIT_PER_SEC))
+        if spec.get('api_key_env'):
+            key, secret = os.getenv(spec['api_key_env']), os.getenv(spec.get('api_secret_env', ''))
+            if not key or not secret:
+                raise ValueError(f"{name} hesabının API anahtarı bulunamadı ({spec['api_key_env']} / "
+                                 f"{spec.get('api_secret_env')})")
+            # Bu oturum kline çekmez; api.rate_limiter da hesabın bütçesidir
+            account_api = BybitFuturesAPI(testnet=testnet, api_key=key, api_secret=secret, rate_limiter=rate)
+            state_file  = _account_path(leverage_state_file, name)
+        else:
+            account_api, state_file = api, leverage_state_file
+        accounts.append(AccountExecutor(
+            name, account_api,
+            symbol_settings=spec.get('symbol_settings'),
+            risk_scale=spec.get('risk_scale', 1.0),
+            leverage_state_file=state_file,
+            journal_dir=journal_dir,
+            supervise=supervise,
+            rate_limiter=rate,
+        ))
+    return accounts
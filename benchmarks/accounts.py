@@ -0,0 +1,113 @@
+"""
+Çoklu hesap: veri + sinyal bir kez, N hesaba eşzamanlı dağıtım. Her hesap kendi
+MockBybitSession'ına (ayrı ağ gecikmesi, ayrı rate limit) karşı emir açar; hesap
+başına mum kapanışı → korunmuş pozisyon gecikmesi ölçülür. Hesap eklemek ilk
+hesabı yavaşlatmamalı (acc0 satırları).
+
+    python -m benchmarks.accounts
+    python -m benchmarks.accounts --symbols 20 --accounts 1 2 4 8 --cycle batch
+
+acc0 .env hesabı gibi veri oturumunu (kline) paylaşır; diğerlerinin oturumu ayrıdır.
+Hesap i'nin risk_scale'i 1/(i+1): açılan miktarlar hesap başına ölçeklenir.
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+
+import config
+import main
+from accounts import AccountExecutor
+from benchmarks.common import print_table
+from benchmarks.e2e import BenchBot, bench_symbols, forced_signals
+from exchange import BybitFuturesAPI, RateLimiter
+from mock_exchange import MockBybitSession
+
+
+def run(n_symbols: int, n_accounts: int, latency: float, client_rate: float, fill_wait: float,
+        fill_poll: float, repeats: int, cycle: str, journal_dir: str) -> Dict[str, Dict]:
+    symbols  = bench_symbols(n_symbols)
+    sessions = [MockBybitSession(latency=latency, symbols=symbols) for _ in range(n_accounts)]
+    # Başlangıç (1000 bar × n) ölçülmez: hızlı limiter ile yüklenir, sonra istemci limiti uygulanır
+    apis     = [BybitFuturesAPI(session=session, rate_limiter=RateLimiter(1e6)) for session in sessions]
+    accounts = [AccountExecutor(f"acc{i}", api, risk_scale=1 / (i + 1), leverage_state_file=None,
+                                journal_dir=journal_dir, supervise=False)
+                for i, api in enumerate(apis)]
+    for account in accounts:
+        account.position_manager.fill_wait = fill_wait
+        account.position_manager.fill_poll = fill_poll
+    bot = BenchBot(api=apis[0], symbols=symbols, metrics_port=0, accounts=accounts)
+    bot.pipelined = bot.pipelined and cycle == 'pipeline'
+    for api, account in zip(apis, accounts):
+        api.rate_limiter = RateLimiter(client_rate)
+        account.session.rate_limiter = account.rate_limiter = RateLimiter(client_rate)
+    bot.forced = forced_signals(symbols, 'none')
+    bot.run_cycle()  # ısınma: cache ve çekirdekler
+
+    latencies: Dict[str, List[float]] = {account.name: [] for account in accounts}
+    quantities: Dict[str, float] = {}
+    cycles = []
+    for _ in range(repeats):
+        for session, account in zip(sessions, accounts):
+            session.reset_account()
+            account.position_manager.active_positions.clear()
+        bot.forced = forced_signals(symbols, 'all')
+        start = time.perf_counter()
+        bot.run_cycle()
+        cycles.append(time.perf_counter() - start)
+        for session, account in zip(sessions, accounts):
+            latencies[account.name] += [at - start for at in session.protected_at.values()]
+            quantities[account.name] = sum(float(p['quantity']) for p in account.position_manager.active_positions.values())
+    for account in accounts:
+        account.close()
+
+    return {
+        name: {
+            'accounts':  n_accounts,
+            'account':   name,
+            'protected': len(values),
+            'expected':  n_symbols * repeats,
+            'p50':       float(np.percentile(values, 50)) if values else None,
+            'p99':       float(np.percentile(values, 99)) if values else None,
+            'cycle':     float(np.median(cycles)),
+            'quantity':  quantities.get(name, 0.0),
+        }
+        for name, values in latencies.items()
+    }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Çoklu hesap dağıtımı: hesap başına korunmuş pozisyon gecikmesi")
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--accounts', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--latency', type=float, default=0.005, help="istek başına yapay ağ gecikmesi (s)")
+    parser.add_argument('--client-rate', type=float, default=config.API_RATE_LIMIT_PER_SEC)
+    parser.add_argument('--fill-wait', type=float, default=config.ORDER_FILL_WAIT)
+    parser.add_argument('--fill-poll', type=float, default=config.ORDER_FILL_POLL)
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--cycle', default='pipeline', choices=('pipeline', 'batch'))
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(args.log_level)
+    workdir = tempfile.mkdtemp(prefix='accounts-')
+    main.SNAPSHOT_LOG = os.path.join(workdir, 'snapshots.jsonl')
+    main.CACHE_STORE_DIR = None
+    main.LEVERAGE_STATE_FILE = None
+
+    rows = []
+    for n in args.accounts:
+        results = run(args.symbols, n, args.latency, args.client_rate, args.fill_wait, args.fill_poll,
+                      args.repeats, args.cycle, os.path.join(workdir, f"journal-{n}"))
+        rows += [[r['accounts'], r['account'], f"{r['protected']}/{r['expected']}", r['p50'], r['p99'],
+                  r['cycle'], r['quantity']] for r in results.values()]
+    print_table(rows, ['accounts', 'account', 'protected', 'p50_s', 'p99_s', 'cycle_s', 'total_qty'])
+    print(f"Pozisyon günlükleri: {workdir}")
+
+
+if __name__ == "__main__":
+    main_cli()
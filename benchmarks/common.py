@@ -0,0 +1,39 @@
+"""Benchmark'lar için ortak yardımcılar: sentetik OHLCV ve zamanlama."""
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ohlcv(n: int, seed: int = 0, price: float = 100.0, freq: str = '15min') -> pd.DataFrame:
+    """Deterministik rastgele yürüyüş OHLCV (ağ ve depo gerektirmez)."""
+    rng   = np.random.default_rng(seed)
+    index = pd.date_range('2020-01-01', periods=n, freq=freq, tz='UTC')
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high  = np.maximum(close * (1 + np.abs(rng.normal(0, 0.002, n))), open_)
+    low   = np.minimum(close * (1 - np.abs(rng.normal(0, 0.002, n))), open_)
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': 1.0}, index=index)
+
+
+def best_of(fn: Callable, repeat: int = 5) -> float:
+    """`repeat` çalıştırmanın en kısa süresi (saniye)."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def print_table(rows, columns) -> None:
+    print(pd.DataFrame(rows, columns=columns).to_string(index=False))
+
+
+def frame_bytes(df: pd.DataFrame, columns) -> int:
+    return int(df[list(columns)].memory_usage(deep=True, index=False).sum())
+
+
+def describe_dtypes(df: pd.DataFrame, columns) -> Dict[str, str]:
+    return {col: str(df[col].dtype) for col in columns}
@@ -0,0 +1,219 @@
+"""
+Uçtan uca gecikme: mum kapanışından pozisyonun dolup TP1/TP2/SL1/SL2 ile tamamen
+korunmasına kadar geçen süre. TradingBot, ağ gecikmesi ve rate limit davranışı
+ayarlanabilen yerel MockBybitSession'a karşı koşar.
+
+    python -m benchmarks.e2e                                  # 5/50/500 sembol × none/some/all
+    python -m benchmarks.e2e --symbols 5 50 --latency 0.02 --rate-limit 50
+    python -m benchmarks.e2e --save-baseline                  # benchmarks/baselines/e2e.json
+    python -m benchmarks.e2e --check                          # p99 gerilemesinde çıkış kodu 1
+    python -m benchmarks.e2e --symbols 50 --cycle batch       # akış modu yerine toplu tur
+
+Gecikme = MockBybitSession.protected_at[symbol] - tur başlangıcı (mum kapanışında
+uyanma anı). Sinyaller senaryoya göre zorlanır (sinyal hesabı yine çalışır), böylece
+0 / bazı / tüm semboller aynı mumda emir açar.
+"""
+import os
+import json
+import time
+import logging
+import argparse
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import config
+import main
+from benchmarks.common import print_table
+from exchange import BybitFuturesAPI, RateLimiter
+from mock_exchange import MockBybitSession
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'e2e.json')
+SIGNAL_MODES = ('none', 'some', 'all')
+SOME_EVERY = 10  # 'some': her 10 sembolden biri (en az bir)
+
+
+def bench_symbols(n: int) -> List[str]:
+    """
+    config.SYMBOLS + sentetik semboller; sentetiklere BTCUSDT ayarları kopyalanır.
+    Mock fiyatlar 1-1000 aralığında olduğundan miktar hassasiyeti en az 3 haneye
+    çekilir (aksi halde pozisyon büyüklüğü 0'a yuvarlanır ve emir reddedilir).
+    """
+    symbols = list(config.SYMBOLS[:n])
+    template = 'BTCUSDT'
+    for i in range(n - len(symbols)):
+        symbol = f"SYN{i:03d}USDT"
+        for table in (config.Z_RANGES, config.atr_ranges, config.ROUND_NUMBERS,
+                      config.TP_ROUND_NUMBERS, config.SYMBOL_SETTINGS):
+            table.setdefault(symbol, table[template])
+        symbols.append(symbol)
+    for symbol in symbols:
+        config.ROUND_NUMBERS[symbol] = max(config.ROUND_NUMBERS[symbol], 3)
+    return symbols
+
+
+def forced_signals(symbols: List[str], mode: str) -> Dict[str, Optional[str]]:
+    if mode == 'none':
+        chosen = []
+    elif mode == 'some':
+        chosen = symbols[::SOME_EVERY]
+    else:
+        chosen = symbols
+    signals = {symbol: None for symbol in symbols}
+    for i, symbol in enumerate(chosen):
+        signals[symbol] = 'LONG' if i % 2 == 0 else 'SHORT'
+    return signals
+
+
+class BenchBot(main.TradingBot):
+    """Sinyalleri hesaplar ama senaryonun zorladığı sinyalleri döndürür."""
+
+    forced: Dict[str, Optional[str]] = {}
+
+    def _generate_signals(self, snapshot):
+        super()._generate_signals(snapshot)
+        return dict(self.forced)
+
+    def _signal_for(self, snapshot, symbol):
+        super()._signal_for(snapshot, symbol)
+        return self.forced.get(symbol)
+
+
+def run_scenarios(
+    symbol_counts: List[int],
+    modes:         List[str],
+    latency:       float,
+    rate_limit:    Optional[float],
+    client_rate:   float,
+    fill_delay:    float,
+    fill_wait:     float,
+    fill_poll:     float,
+    repeats:       int,
+    cycle:         str = 'pipeline',
+) -> Dict[str, Dict]:
+    results = {}
+    for n in symbol_counts:
+        symbols = bench_symbols(n)
+        session = MockBybitSession(latency=latency, rate_limit=rate_limit, fill_delay=fill_delay,
+                                   symbols=symbols)
+        # Başlangıç (1000 bar × n) ölçülmez: hızlı limiter ile yüklenir, sonra istemci limiti uygulanır
+        api = BybitFuturesAPI(session=session, rate_limiter=RateLimiter(1e6))
+        bot = BenchBot(api=api, symbols=symbols, metrics_port=0)
+        bot.position_manager.fill_wait = fill_wait
+        bot.position_manager.fill_poll = fill_poll
+        bot.pipelined = bot.pipelined and cycle == 'pipeline'
+        api.rate_limiter = RateLimiter(client_rate)
+        account = bot.accounts[0]
+        account.session.rate_limiter = account.rate_limiter = RateLimiter(client_rate)
+        bot.forced = forced_signals(symbols, 'none')
+        bot.run_cycle()  # ısınma: cache ve çekirdekler
+
+        for mode in modes:
+            latencies, cycles = [], []
+            calls_before = dict(session.calls)
+            for _ in range(repeats):
+                session.reset_account()
+                bot.position_manager.active_positions.clear()
+                bot.forced = forced_signals(symbols, mode)
+                start = time.perf_counter()
+                bot.run_cycle()
+                cycles.append(time.perf_counter() - start)
+                expected = [s for s, signal in bot.forced.items() if signal]
+                latencies += [session.protected_at[s] - start for s in expected if s in session.protected_at]
+            calls = {k: v - calls_before.get(k, 0) for k, v in session.calls.items() if v - calls_before.get(k, 0)}
+            signalled = sum(1 for signal in bot.forced.values() if signal) * repeats
+            results[f"{n}x_{mode}"] = {
+                'symbols':   n,
+                'mode':      mode,
+                'signalled': signalled,
+                'protected': len(latencies),
+                'p50':       float(np.percentile(latencies, 50)) if latencies else None,
+                'p99':       float(np.percentile(latencies, 99)) if latencies else None,
+                'cycle':     float(np.median(cycles)),
+                'calls':     {k: v // repeats for k, v in sorted(calls.items())},
+            }
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Optional[Dict], tolerance: float) -> List[str]:
+    """Baseline'a göre p99 (sinyal yoksa tur süresi) gerileyen senaryolar."""
+    regressions = []
+    if not baseline:
+        return regressions
+    for name, result in results.items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        metric = 'p99' if result['p99'] is not None and base.get('p99') is not None else 'cycle'
+        if result[metric] > base[metric] * (1 + tolerance):
+            regressions.append(f"{name}: {metric} {base[metric]:.3f}s → {result[metric]:.3f}s")
+    return regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Mum kapanışı → korunmuş pozisyon uçtan uca benchmark")
+    parser.add_argument('--symbols', type=int, nargs='+', default=[5, 50, 500])
+    parser.add_argument('--signals', nargs='+', default=list(SIGNAL_MODES), choices=SIGNAL_MODES)
+    parser.add_argument('--latency', type=float, default=0.005, help="istek başına yapay ağ gecikmesi (s)")
+    parser.add_argument('--rate-limit', type=float, default=None, help="borsa tarafı istek/s limiti (aşımda 10006)")
+    parser.add_argument('--client-rate', type=float, default=config.API_RATE_LIMIT_PER_SEC)
+    parser.add_argument('--fill-delay', type=float, default=0.0, help="market emrinin pozisyona yansıma süresi (s)")
+    parser.add_argument('--fill-wait', type=float, default=config.ORDER_FILL_WAIT)
+    parser.add_argument('--fill-poll', type=float, default=config.ORDER_FILL_POLL)
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--cycle', default='pipeline', choices=('pipeline', 'batch'))
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true', help="baseline'a göre gerileme varsa çıkış kodu 1")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(args.log_level)
+    workdir = tempfile.mkdtemp(prefix='e2e-')
+    main.SNAPSHOT_LOG = os.path.join(workdir, 'snapshots.jsonl')
+    main.ACCOUNT_JOURNAL_DIR = os.path.join(workdir, 'accounts')
+    # Gerçek kline deposu ve kaldıraç durumu mock veriyle karışmasın
+    main.CACHE_STORE_DIR = None
+    main.LEVERAGE_STATE_FILE = None
+    settings = {k: getattr(args, k) for k in ('latency', 'rate_limit', 'client_rate', 'fill_delay',
+                                              'fill_wait', 'fill_poll', 'repeats', 'cycle')}
+
+    results = run_scenarios(args.symbols, args.signals, **settings)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('settings') != settings:
+            print("Baseline farklı ayarlarla kaydedilmiş — karşılaştırma atlandı")
+            baseline = None
+
+    rows = []
+    for name, r in results.items():
+        base = (baseline or {}).get('scenarios', {}).get(name, {})
+        rows.append([name, r['signalled'], r['protected'], r['p50'], r['p99'], base.get('p99'),
+                     r['cycle'], sum(r['calls'].values())])
+    print_table(rows, ['scenario', 'signalled', 'protected', 'p50_s', 'p99_s', 'base_p99_s', 'cycle_s', 'api_calls'])
+    for name, r in results.items():
+        print(f"{name}: {r['calls']}")
+
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"GERİLEME {line}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'settings': settings, 'scenarios': results}, f, indent=2)
+        print(f"Baseline kaydedildi: {args.baseline}")
+
+    unprotected = [name for name, r in results.items() if r['protected'] != r['signalled']]
+    if unprotected:
+        print(f"KORUNMAYAN POZİSYONLAR: {unprotected}")
+    raise SystemExit(1 if (args.check and regressions) or unprotected else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
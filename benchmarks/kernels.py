@@ -0,0 +1,63 @@
+"""
+Çekirdek backend karşılaştırması: numba (derlenmiş) vs numpy (pandas/Python).
+
+    python -m benchmarks.kernels
+    python -m benchmarks.kernels --sizes 1000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+import kernels
+from benchmarks.common import synthetic_ohlcv, best_of, print_table
+
+
+def run(sizes=(1_000, 100_000, 1_000_000), repeat: int = 3):
+    if kernels.numba is None:
+        print("numba kurulu değil — sadece numpy backend'i ölçülüyor")
+    backends = [b for b in kernels.BACKENDS if b == 'numpy' or kernels.numba is not None]
+
+    start = time.perf_counter()
+    for backend in backends:
+        kernels.warmup(backend)
+    print(f"warmup (derleme ya da disk cache yükleme): {time.perf_counter() - start:.2f}s")
+
+    rows = []
+    for n in sizes:
+        df = synthetic_ohlcv(n, seed=n)
+        close = df['close'].to_numpy()
+        true_range = (df['high'] - df['low']).to_numpy()
+        atrs = kernels.ewm_mean(true_range, 1 / 14) * 3
+        reps = repeat if n <= 100_000 else 1
+
+        cases = {
+            'ewm_mean':       lambda b: kernels.ewm_mean(true_range, 1 / 14, backend=b),
+            'sma_seeded_ema': lambda b: kernels.sma_seeded_ema(true_range, 14, backend=b),
+            'zigzag':         lambda b: kernels.zigzag(close, atrs, 2, backend=b),
+        }
+        for name, fn in cases.items():
+            results = {b: fn(b) for b in backends}
+            reference = results['numpy']
+            identical = all(
+                all(np.array_equal(x, y, equal_nan=True) for x, y in zip(
+                    r if isinstance(r, tuple) else (r,), reference if isinstance(reference, tuple) else (reference,)))
+                for r in results.values()
+            )
+            timings = {b: best_of(lambda: fn(b), reps) * 1e3 for b in backends}
+            numba_ms = timings.get('numba', float('nan'))
+            rows.append([name, n, identical, timings['numpy'], numba_ms, timings['numpy'] / numba_ms])
+    print_table(rows, ['kernel', 'bars', 'identical', 'numpy_ms', 'numba_ms', 'speedup'])
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Çekirdek backend karşılaştırması")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+    return run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
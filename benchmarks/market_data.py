@@ -0,0 +1,107 @@
+"""
+Ortak piyasa verisi yayını: yayından abonelerin uyanıp snapshot'ı okumasına kadar
+geçen süre, ayrı süreçlerdeki N abone için. Exchange yok: yayıncı sentetik barlar
+ve snapshot yazar (abonelerin exchange çağrısı yapısal olarak sıfırdır).
+
+    python -m benchmarks.market_data
+    python -m benchmarks.market_data --symbols 500 --subscribers 1 4 16 --rounds 50
+"""
+import time
+import argparse
+import tempfile
+import multiprocessing as mp
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.common import print_table, synthetic_ohlcv
+from market_data import MarketDataPublisher, MarketDataSubscriber
+from snapshot import SignalSnapshot
+
+FIELDS = ['close', 'z', 'pct_z']
+
+
+def _subscriber(name: str, socket_dir: str, rounds: int, ready, out) -> None:
+    sub = MarketDataSubscriber(name=name, socket_dir=socket_dir, timeout=10)
+    ready.wait()
+    wake, read_snapshot, read_frame = [], [], []
+    last = sub.published_ns
+    for _ in range(rounds):
+        if not sub.wait(last + 1):
+            break
+        woke = time.time_ns()
+        start = time.perf_counter()
+        sub.snapshot()
+        read_snapshot.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        sub.frame(sub.symbols[0])
+        read_frame.append(time.perf_counter() - start)
+        last = sub.published_ns
+        wake.append((woke - last) / 1e9)
+    sub.close()
+    out.put((wake, read_snapshot, read_frame))
+
+
+def run(n_symbols: int, n_subscribers: int, rounds: int, bars: int) -> Dict:
+    symbols = [f"SYN{i:03d}USDT" for i in range(n_symbols)]
+    frames  = {symbol: synthetic_ohlcv(bars, seed=i) for i, symbol in enumerate(symbols)}
+    snapshot = SignalSnapshot.empty(symbols, FIELDS)
+    snapshot.fields['close'][:] = [df['close'].iloc[-1] for df in frames.values()]
+    snapshot.valid[:] = True
+
+    name, socket_dir = f"md-bench-{time.time_ns()}", tempfile.mkdtemp(prefix='md-')
+    publisher = MarketDataPublisher(symbols, FIELDS, name=name, socket_dir=socket_dir, max_bars=bars)
+    ctx   = mp.get_context('spawn')
+    ready = ctx.Barrier(n_subscribers + 1)
+    out   = ctx.Queue()
+    procs = [ctx.Process(target=_subscriber, args=(name, socket_dir, rounds, ready, out)) for _ in range(n_subscribers)]
+    publish_times: List[float] = []
+    try:
+        for proc in procs:
+            proc.start()
+        ready.wait()
+        time.sleep(0.2)  # aboneler bekleme durumuna geçsin
+        for _ in range(rounds):
+            start = time.perf_counter()
+            publisher.publish(frames, snapshot)
+            publish_times.append(time.perf_counter() - start)
+            time.sleep(0.02)
+        results = [out.get(timeout=30) for _ in procs]
+    finally:
+        for proc in procs:
+            proc.join(timeout=5)
+        publisher.close()
+
+    wake = np.concatenate([r[0] for r in results])
+    return {
+        'symbols':     n_symbols,
+        'subscribers': n_subscribers,
+        'received':    len(wake),
+        'expected':    rounds * n_subscribers,
+        'publish_ms':  float(np.median(publish_times)) * 1e3,
+        'wake_p50_ms': float(np.percentile(wake, 50)) * 1e3,
+        'wake_p99_ms': float(np.percentile(wake, 99)) * 1e3,
+        'snapshot_ms': float(np.median(np.concatenate([r[1] for r in results]))) * 1e3,
+        'frame_ms':    float(np.median(np.concatenate([r[2] for r in results]))) * 1e3,
+    }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Ortak piyasa verisi yayın → abone gecikmesi")
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--rounds', type=int, default=30)
+    parser.add_argument('--bars', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for n in args.subscribers:
+        r = run(args.symbols, n, args.rounds, args.bars)
+        rows.append([r['symbols'], r['subscribers'], f"{r['received']}/{r['expected']}", r['publish_ms'],
+                     r['wake_p50_ms'], r['wake_p99_ms'], r['snapshot_ms'], r['frame_ms']])
+    print_table(rows, ['symbols', 'subscribers', 'received', 'publish_ms', 'wake_p50_ms', 'wake_p99_ms',
+                       'snapshot_ms', 'frame_ms'])
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,147 @@
+"""
+Zigzag pivot sütunları: eski liste/None yolu vs olay tablosu + tipli sütunlar.
+
+    python -m benchmarks.pivot_columns
+    python -m benchmarks.pivot_columns --sizes 1000 1000000 --repeat 3
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import synthetic_ohlcv, best_of, print_table, frame_bytes
+from indicators import calculate_atr, calculate_z, atr_zigzag_two_columns, zigzag_events
+
+PIVOT_COLUMNS = [
+    'high_pivot_2x', 'low_pivot_2x', 'high_pivot_atr_2x', 'low_pivot_atr_2x',
+    'high_pivot_confirmed_2x', 'low_pivot_confirmed_2x', 'pivot_bars_ago_2x',
+    'high_pivot_filled_2x', 'low_pivot_filled_2x', 'high_pivot_atr_filled_2x', 'low_pivot_atr_filled_2x',
+    'high_pivot_confirmed_filled_2x', 'low_pivot_confirmed_filled_2x', 'pivot_bars_ago_filled_2x',
+]
+
+
+def legacy_atr_zigzag(df, atr_col="z", close_col="close", atr_mult=2, suffix="_2x"):
+    """Eski uygulama (karşılaştırma için): Python listeleri None ile doldurulup sütunlara atanır."""
+    closes = df[close_col].values
+    atrs = df[atr_col].values
+    n = len(df)
+    high_pivot, low_pivot = [None] * n, [None] * n
+    high_pivot_atr, low_pivot_atr = [None] * n, [None] * n
+    high_pivot_confirmed, low_pivot_confirmed = [0] * n, [0] * n
+    pivot_bars_ago = [None] * n
+
+    last_pivot, last_pivot_idx, direction = closes[0], 0, None
+    for i in range(1, n):
+        price = closes[i]
+        atr = atrs[i] * atr_mult
+        if direction is None:
+            if price >= last_pivot + atr:
+                direction = "up"
+                last_pivot = closes[last_pivot_idx]
+                high_pivot[last_pivot_idx] = last_pivot
+                high_pivot_atr[last_pivot_idx] = atrs[last_pivot_idx]
+            elif price <= last_pivot - atr:
+                direction = "down"
+                last_pivot = closes[last_pivot_idx]
+                low_pivot[last_pivot_idx] = last_pivot
+                low_pivot_atr[last_pivot_idx] = atrs[last_pivot_idx]
+        elif direction == "up":
+            if price <= (last_pivot - atr):
+                high_pivot[last_pivot_idx] = last_pivot
+                high_pivot_atr[last_pivot_idx] = atrs[last_pivot_idx]
+                high_pivot_confirmed[i] = 1
+                pivot_bars_ago[i] = i - last_pivot_idx
+                direction, last_pivot, last_pivot_idx = "down", price, i
+            elif price > last_pivot:
+                last_pivot, last_pivot_idx = price, i
+        elif direction == "down":
+            if price >= (last_pivot + atr):
+                low_pivot[last_pivot_idx] = last_pivot
+                low_pivot_atr[last_pivot_idx] = atrs[last_pivot_idx]
+                low_pivot_confirmed[i] = 1
+                pivot_bars_ago[i] = i - last_pivot_idx
+                direction, last_pivot, last_pivot_idx = "up", price, i
+            elif price < last_pivot:
+                last_pivot, last_pivot_idx = price, i
+
+    df[f"high_pivot{suffix}"] = high_pivot
+    df[f"low_pivot{suffix}"] = low_pivot
+    df[f"high_pivot_atr{suffix}"] = high_pivot_atr
+    df[f"low_pivot_atr{suffix}"] = low_pivot_atr
+    df[f"high_pivot_confirmed{suffix}"] = high_pivot_confirmed
+    df[f"low_pivot_confirmed{suffix}"] = low_pivot_confirmed
+    df[f"pivot_bars_ago{suffix}"] = pivot_bars_ago
+    df[f"high_pivot_filled{suffix}"] = df[f"high_pivot{suffix}"].ffill()
+    df[f"low_pivot_filled{suffix}"] = df[f"low_pivot{suffix}"].ffill()
+    df[f"high_pivot_atr_filled{suffix}"] = df[f"high_pivot_atr{suffix}"].ffill()
+    df[f"low_pivot_atr_filled{suffix}"] = df[f"low_pivot_atr{suffix}"].ffill()
+    for side in ('high', 'low'):
+        temp = df[f"{side}_pivot_confirmed{suffix}"].replace(0, np.nan).ffill()
+        df[f"{side}_pivot_confirmed_filled{suffix}"] = temp.fillna(0).astype(int)
+
+    filled, last_value, last_index = [], None, None
+    for i, value in enumerate(pivot_bars_ago):
+        if value is not None:
+            last_value, last_index = value, i
+            filled.append(value)
+        elif last_value is not None:
+            filled.append(last_value + (i - last_index))
+        else:
+            filled.append(None)
+    df[f"pivot_bars_ago_filled{suffix}"] = filled
+    return df
+
+
+def _downstream(df):
+    """Sonraki adımların tipik işlemleri: ffill, karşılaştırma, notna."""
+    high = df['high_pivot_2x'].ffill()
+    low = df['low_pivot_2x'].ffill()
+    return int(((high > high.shift(1)) & low.notna()).sum() + df['pivot_bars_ago_2x'].notna().sum())
+
+
+def _base_frame(n: int, symbol: str = 'BTCUSDT') -> pd.DataFrame:
+    df = synthetic_ohlcv(n, seed=n)
+    df['atr'] = calculate_atr(df)
+    df['z'] = calculate_z(df, symbol=symbol)
+    return df
+
+
+def run(sizes=(1_000, 1_000_000), repeat: int = 3):
+    rows = []
+    for n in sizes:
+        base = _base_frame(n)
+        reps = repeat if n <= 100_000 else 1
+
+        legacy = legacy_atr_zigzag(base.copy())
+        typed = atr_zigzag_two_columns(base.copy(), atr_col="z", atr_mult=2, suffix="_2x")
+        events = zigzag_events(base['close'].to_numpy(), base['z'].to_numpy(), 2)
+
+        same = all(np.array_equal(pd.to_numeric(legacy[c]).to_numpy(dtype=float),
+                                  typed[c].to_numpy(dtype=float), equal_nan=True) for c in PIVOT_COLUMNS)
+        object_cols = sum(legacy[c].dtype == object for c in PIVOT_COLUMNS)
+
+        rows.append([
+            n, len(events), same, object_cols,
+            best_of(lambda: legacy_atr_zigzag(base.copy()), reps) * 1e3,
+            best_of(lambda: atr_zigzag_two_columns(base.copy(), atr_col="z", atr_mult=2, suffix="_2x"), reps) * 1e3,
+            best_of(lambda: _downstream(legacy), reps) * 1e3,
+            best_of(lambda: _downstream(typed), reps) * 1e3,
+            frame_bytes(legacy, PIVOT_COLUMNS) / 2**20,
+            frame_bytes(typed, PIVOT_COLUMNS) / 2**20,
+            events.memory_usage(deep=True, index=False).sum() / 2**20,
+        ])
+    print_table(rows, ['bars', 'pivots', 'identical', 'legacy_object_cols', 'legacy_ms', 'typed_ms',
+                       'legacy_ops_ms', 'typed_ops_ms', 'legacy_MB', 'typed_MB', 'events_MB'])
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pivot sütunları: eski liste yolu vs tipli sütunlar")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+    return run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+indicator_update.py eski kütüphanesi vs research_indicators vektörel portu:
+çıktı regresyon kontrolü + hız karşılaştırması.
+
+    python -m benchmarks.research_indicators
+    python -m benchmarks.research_indicators --bars 100000
+"""
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import synthetic_ohlcv, print_table
+from config import atr_ranges
+from indicators import calculate_atr, atr_zigzag_two_columns
+import research_indicators as ri
+
+SYMBOL = 'BTCUSDT'
+MIN_SPEEDUP = 50
+
+
+# ─── Eski Uygulama (indicator_update.py'nin kendisi, kopya değil) ─────────────
+
+LEGACY_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'indicator_update.py')
+
+
+def load_legacy_pipeline(path: str = LEGACY_SOURCE):
+    """
+    indicator_update.py bir script gövdesi parçası (girintili, `df` / `symbol` serbest
+    değişken): kaynak olduğu gibi `legacy_pipeline(df, symbol)` fonksiyonuna sarılır.
+    Böylece Bollinger, DC kırılımı ve temizleme dahil her adım eski kodun kendisidir.
+    """
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    body = [line if not line.strip() or line.startswith('    ') else '    ' + line for line in lines]
+    source = '\n'.join(['def legacy_pipeline(df, symbol):', *body, '    return df', ''])
+    namespace = {'np': np, 'pd': pd, 'atr_ranges': atr_ranges, 'atr_zigzag_two_columns': atr_zigzag_two_columns}
+    exec(compile(source, path, 'exec'), namespace)
+    return namespace['legacy_pipeline']
+
+
+# ─── Girdi ────────────────────────────────────────────────────────────────────
+
+def research_inputs(n: int) -> pd.DataFrame:
+    """RESEARCH_INPUT_COLUMNS için basit sentetik girdiler (sadece benchmark fikstürü)."""
+    df = synthetic_ohlcv(n, seed=7, price=30000.0)
+    close = df['close']
+    df['atr'] = calculate_atr(df)
+    df['pct_atr'] = df['atr'] / close * 100
+    for window in (13, 20, 50, 200, 800):
+        df[f'sma_{window}'] = close.rolling(window).mean()
+    df['trend_13_50'] = np.where(df['sma_13'] > df['sma_50'], 'uptrend', 'downtrend')
+    df['trend_50_200'] = np.where(df['sma_50'] > df['sma_200'], 'uptrend', 'downtrend')
+    for window in (20, 50):
+        upper, lower = df['high'].rolling(window).max(), df['low'].rolling(window).min()
+        df[f'dc_upper_{window}'], df[f'dc_lower_{window}'] = upper, lower
+        df[f'dc_position_ratio_{window}'] = (close - lower) / (upper - lower) * 100
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+    df['rsi'] = 100 - 100 / (1 + gain / loss)
+    df['nw'] = close.rolling(50).mean()
+    df['nw_upper'] = df['nw'] + 2 * df['atr']
+    df['nw_lower'] = df['nw'] - 2 * df['atr']
+    df = atr_zigzag_two_columns(df, atr_col="atr", close_col="close")
+    return atr_zigzag_two_columns(df, atr_col="atr", close_col="close", atr_mult=2, suffix="_2x")
+
+
+def compare(legacy: pd.DataFrame, ported: pd.DataFrame) -> list:
+    """Ortak sütunlarda farklı olanları döndürür (NaN yalnızca NaN'a eşittir; doldurma yok)."""
+    mismatched = []
+    for col in legacy.columns.intersection(ported.columns):
+        a, b = legacy[col], ported[col]
+        if a.dtype.kind == 'f' or b.dtype.kind == 'f':
+            same = np.array_equal(a.to_numpy(dtype=float), b.to_numpy(dtype=float), equal_nan=True)
+        else:
+            same = a.astype(object).where(a.notna(), None).tolist() == b.astype(object).where(b.notna(), None).tolist()
+        if not same:
+            mismatched.append(col)
+    return mismatched
+
+
+def run(bars: int = 100_000):
+    base = research_inputs(bars)
+
+    legacy_pipeline = load_legacy_pipeline()
+    start = time.perf_counter()
+    legacy = legacy_pipeline(base.copy(), SYMBOL)
+    legacy_s = time.perf_counter() - start
+
+    ri.calculate_research_indicators(base.iloc[:1000].copy(), SYMBOL)  # çekirdek warmup
+    start = time.perf_counter()
+    ported = ri.calculate_research_indicators(base.copy(), SYMBOL)
+    ported_s = time.perf_counter() - start
+
+    mismatched = compare(legacy, ported)
+    speedup = legacy_s / ported_s
+    print_table([[bars, legacy_s, ported_s, speedup, len(mismatched) == 0,
+                  int(ported['dc_order'].notna().sum()), int(ported['bb_3_touch_long_clean'].sum())]],
+                ['bars', 'legacy_s', 'vectorized_s', 'speedup', 'identical', 'dc_orders', 'bb3_long'])
+    if mismatched:
+        print(f"FARKLI SÜTUNLAR: {mismatched}")
+    if speedup < MIN_SPEEDUP:
+        print(f"UYARI: hızlanma {speedup:.0f}x < {MIN_SPEEDUP}x")
+    return {'legacy_s': legacy_s, 'vectorized_s': ported_s, 'speedup': speedup, 'mismatched': mismatched}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eski indikatör kütüphanesi vs vektörel port")
+    parser.add_argument('--bars', type=int, default=100_000)
+    args = parser.parse_args(argv)
+    result = run(args.bars)
+    raise SystemExit(1 if result['mismatched'] else 0)
+
+
+if __name__ == "__main__":
+    main()
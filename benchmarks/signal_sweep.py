@@ -0,0 +1,84 @@
+"""
+Sinyal varyant taraması: elle yazılmış pandas shift/rolling zinciri vs derlenmiş program.
+
+    python -m benchmarks.signal_sweep
+    python -m benchmarks.signal_sweep --bars 100000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of, print_table
+from benchmarks.research_indicators import research_inputs
+from research_indicators import calculate_bollinger_bands
+from signal_compiler import compile_signals
+from signals import bb_touch_specs, dc_breakout_specs, clean_signals
+
+TOUCH_COUNTS = (1, 2, 3, 4, 5, 6)
+CLEAN_WINDOWS = (0, 5, 10, 20)
+DC_LEVELS = (('dc_upper_20', 'dc_lower_20'), ('dc_upper_50', 'dc_lower_50'))
+
+
+def variant_specs():
+    specs = []
+    for k in TOUCH_COUNTS:
+        for w in CLEAN_WINDOWS:
+            specs += bb_touch_specs(k, trend_filter=True, clean=w or None, suffix=f'_bb{k}_c{w}')
+    for upper, lower in DC_LEVELS:
+        for w in CLEAN_WINDOWS:
+            specs += dc_breakout_specs(upper, lower, trend_filter=True, clean=w or None, suffix=f'_{upper}_c{w}')
+    return specs
+
+
+def hand_written(df):
+    """Her varyant ayrı ayrı, signals.py'nin eski elle yazılmış kalıbıyla."""
+    out = {}
+    uptrend = df['trend_50_200'] == 'uptrend'
+    for k in TOUCH_COUNTS:
+        for w in CLEAN_WINDOWS:
+            touch_upper = df['high'] >= df['bb_upper']
+            touch_lower = df['low'] <= df['bb_lower']
+            long_ = (sum([touch_upper.shift(i + 1) for i in range(k)]) >= k) & uptrend
+            short = (sum([touch_lower.shift(i + 1) for i in range(k)]) >= k) & ~uptrend
+            out[f'signal_long_bb{k}_c{w}'] = clean_signals(long_, w) if w else long_
+            out[f'signal_short_bb{k}_c{w}'] = clean_signals(short, w) if w else short
+    for upper, lower in DC_LEVELS:
+        for w in CLEAN_WINDOWS:
+            long_ = (df['high'] > df[upper].shift(1)) & uptrend
+            short = (df['low'] < df[lower].shift(1)) & ~uptrend
+            out[f'signal_long_{upper}_c{w}'] = clean_signals(long_, w) if w else long_
+            out[f'signal_short_{upper}_c{w}'] = clean_signals(short, w) if w else short
+    return out
+
+
+def run(bars: int = 100_000, repeat: int = 3):
+    df = research_inputs(bars)
+    df[['bb_middle', 'bb_upper', 'bb_lower']] = calculate_bollinger_bands(df)
+
+    specs = variant_specs()
+    program = compile_signals(specs)
+    compiled = program.evaluate(df)
+    manual = hand_written(df)
+    mismatched = [name for name in manual if not np.array_equal(manual[name].to_numpy(dtype=bool), compiled[name])]
+
+    manual_s = best_of(lambda: hand_written(df), repeat)
+    compiled_s = best_of(lambda: program.evaluate(df), repeat)
+    print_table([[bars, len(specs), program.n_nodes, manual_s * 1e3, compiled_s * 1e3, manual_s / compiled_s,
+                  not mismatched]],
+                ['bars', 'signals', 'unique_nodes', 'hand_written_ms', 'compiled_ms', 'speedup', 'identical'])
+    if mismatched:
+        print(f"FARKLI SİNYALLER: {mismatched}")
+    return {'speedup': manual_s / compiled_s, 'mismatched': mismatched}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sinyal varyant taraması benchmark'ı")
+    parser.add_argument('--bars', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+    return run(args.bars, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
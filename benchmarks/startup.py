@@ -0,0 +1,106 @@
+"""
+Başlangıç süresi: TradingBot.__init__ (kaldıraç, enstrüman bilgisi, cache, pozisyon
+kurtarma, çekirdek derleme) MockBybitSession'a karşı, üç senaryoda:
+
+    serial_cold     işler sırayla, disk cache ve kaldıraç durumu yok
+    parallel_cold   işler paralel, disk cache ve kaldıraç durumu yok
+    parallel_warm   işler paralel, cache diskten ısınır, kaldıraç durumu güncel
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --symbols 50 --positions 5 --latency 0.05
+
+Hesap, her senaryoda aynı mock oturumunda `--positions` açık ve TP/SL'li pozisyonla
+başlar (restart sonrası kurtarma yolu). İstemci rate limit'i gerçek ayardır.
+"""
+import os
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from typing import Dict, List
+
+import config
+import main
+from benchmarks.common import print_table
+from benchmarks.e2e import bench_symbols
+from exchange import BybitFuturesAPI, RateLimiter
+from mock_exchange import MockBybitSession
+
+SCENARIOS = ('serial_cold', 'parallel_cold', 'parallel_warm')
+TASKS = ('leverage', 'instruments', 'cache', 'recovery', 'kernels')
+
+
+def seed_positions(session: MockBybitSession, symbols: List[str], qty: float = 2.0) -> None:
+    """Her sembolde LONG pozisyon + TP1/TP2 (limit) ve SL1/SL2 (stop) bacakları."""
+    for symbol in symbols:
+        price = session._last_price(symbol)
+        session.place_order(symbol=symbol, side='Buy', orderType='Market', qty=str(qty))
+        for mult in (1.01, 1.02):
+            session.place_order(symbol=symbol, side='Sell', orderType='Limit', qty=str(qty / 2),
+                                price=f"{price * mult:.4f}", reduceOnly=True)
+        for _ in range(2):
+            session.place_order(symbol=symbol, side='Sell', orderType='Market', qty=str(qty / 2),
+                                triggerPrice=f"{price * 0.98:.4f}", reduceOnly=True)
+
+
+def run_scenarios(n: int, positions: int, latency: float, client_rate: float) -> Dict[str, Dict]:
+    symbols = bench_symbols(n)
+    session = MockBybitSession(latency=latency, symbols=symbols)
+    seed_positions(session, symbols[:positions])
+    workdir = tempfile.mkdtemp(prefix='startup-')
+    results = {}
+    try:
+        for name in SCENARIOS:
+            warm = name.endswith('warm')
+            if not warm:  # soğuk: disk cache ve kaldıraç durumu yok, exchange'de kaldıraç ayarsız
+                shutil.rmtree(os.path.join(workdir, 'klines'), ignore_errors=True)
+                if os.path.exists(os.path.join(workdir, 'leverage.json')):
+                    os.remove(os.path.join(workdir, 'leverage.json'))
+                session.leverage.clear()
+            main.STARTUP_PARALLEL = name.startswith('parallel')
+            main.CACHE_STORE_DIR = os.path.join(workdir, 'klines')
+            main.LEVERAGE_STATE_FILE = os.path.join(workdir, 'leverage.json')
+
+            calls_before = dict(session.calls)
+            api = BybitFuturesAPI(session=session, rate_limiter=RateLimiter(client_rate))
+            start = time.perf_counter()
+            bot = main.TradingBot(api=api, symbols=symbols, metrics_port=0)
+            elapsed = time.perf_counter() - start
+            calls = {k: v - calls_before.get(k, 0) for k, v in session.calls.items() if v - calls_before.get(k, 0)}
+            # Sonraki (sıcak) senaryo için kapanmış barları diske yaz
+            bot.api.persist_cache(bot.store, bot.interval)
+
+            results[name] = {
+                'total':     elapsed,
+                'tasks':     {task: bot.startup_report.get(task) for task in TASKS},
+                'recovered': len(bot.position_manager.active_positions),
+                'calls':     dict(sorted(calls.items())),
+            }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="TradingBot başlangıç süresi benchmark'ı")
+    parser.add_argument('--symbols', type=int, default=len(config.SYMBOLS))
+    parser.add_argument('--positions', type=int, default=3, help="restart öncesi açık pozisyon sayısı")
+    parser.add_argument('--latency', type=float, default=0.05, help="istek başına yapay ağ gecikmesi (s)")
+    parser.add_argument('--client-rate', type=float, default=config.API_RATE_LIMIT_PER_SEC)
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(args.log_level)
+    main.SNAPSHOT_LOG = None
+    results = run_scenarios(args.symbols, args.positions, args.latency, args.client_rate)
+
+    rows = [[name, r['total'], *(r['tasks'][task] for task in TASKS), r['recovered'], sum(r['calls'].values())]
+            for name, r in results.items()]
+    print_table(rows, ['scenario', 'total_s', *(f"{task}_s" for task in TASKS), 'recovered', 'api_calls'])
+    for name, r in results.items():
+        print(f"{name}: {r['calls']}")
+
+
+if __name__ == "__main__":
+    main_cli()
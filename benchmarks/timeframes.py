@@ -0,0 +1,105 @@
+"""
+Artımlı üst zaman dilimleri (timeframes.py) vs her mumda resample + tam yeniden hesap:
+parite kontrolü (her üst bar kapanışında son satır aynı mı) + mum başına maliyet.
+
+    python -m benchmarks.timeframes
+    python -m benchmarks.timeframes --bars 8000 --intervals 60 240
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import synthetic_ohlcv, print_table
+from config import HTF_ZIGZAG_ATR_MULT
+from exchange import INTERVAL_MS
+from indicators import calculate_atr, atr_zigzag_two_columns, add_structure
+from timeframes import TimeframeView
+
+BASE_INTERVAL = '15'
+WINDOW = 1000  # canlı cache boyu
+
+
+def resample(base: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Tamamlanmış bucket'lar için pandas resample (referans)."""
+    rule = pd.Timedelta(milliseconds=INTERVAL_MS[interval])
+    per_bucket = INTERVAL_MS[interval] // INTERVAL_MS[BASE_INTERVAL]
+    grouped = base.resample(rule, label='left', closed='left')
+    bars = grouped.agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    return bars[grouped['close'].count() == per_bucket]
+
+
+def batch_indicators(bars: pd.DataFrame, atr_mult: float = HTF_ZIGZAG_ATR_MULT) -> pd.DataFrame:
+    suffix = f"_{atr_mult:g}x"
+    df = bars.copy()
+    df['atr'] = calculate_atr(df)
+    df['pct_atr'] = df['atr'] / df['close'] * 100
+    df = atr_zigzag_two_columns(df, atr_col='atr', atr_mult=atr_mult, suffix=suffix)
+    return add_structure(df, suffix=suffix)
+
+
+def check_parity(base: pd.DataFrame, interval: str) -> list:
+    """Her üst bar kapanışında artımlı son satır == o ana kadarki barlarla batch hesabın son satırı."""
+    view = TimeframeView(interval, BASE_INTERVAL, max_bars=len(base))
+    base_ms = INTERVAL_MS[BASE_INTERVAL]
+    times = base.index.as_unit('ms').asi8
+    reference = resample(base, interval)
+    mismatched = set()
+    for k in range(len(base)):
+        if view.update(base.iloc[max(0, k - 3):k + 1], now_ms=int(times[k]) + base_ms) == 0:
+            continue
+        row = view.last_row()
+        expected = batch_indicators(reference.iloc[:view.indicators.n]).iloc[-1]
+        for key, value in row.items():
+            if key == 'time':
+                continue
+            if not np.array_equal(np.float64(value), np.float64(expected[key]), equal_nan=True):
+                mismatched.add(key)
+    return sorted(mismatched)
+
+
+def run(bars: int = 6000, intervals=('60', '240')):
+    base = synthetic_ohlcv(bars, freq='15min')
+    base_ms = INTERVAL_MS[BASE_INTERVAL]
+    times = base.index.as_unit('ms').asi8
+    live = range(WINDOW, bars)
+
+    views = [TimeframeView(interval, BASE_INTERVAL) for interval in intervals]
+    for view in views:
+        view.update(base.iloc[:WINDOW], now_ms=int(times[WINDOW - 1]) + base_ms)
+    start = time.perf_counter()
+    for k in live:
+        window = base.iloc[k - WINDOW + 1:k + 1]
+        for view in views:
+            view.update(window, now_ms=int(times[k]) + base_ms)
+    incremental_s = (time.perf_counter() - start) / len(live)
+
+    start = time.perf_counter()
+    for k in live[:200]:
+        window = base.iloc[k - WINDOW + 1:k + 1]
+        for interval in intervals:
+            batch_indicators(resample(window, interval)).iloc[-1]
+    recompute_s = (time.perf_counter() - start) / min(200, len(live))
+
+    mismatched = {interval: check_parity(base, interval) for interval in intervals}
+    print_table([[bars, ','.join(intervals), recompute_s * 1e3, incremental_s * 1e3, recompute_s / incremental_s,
+                  all(not m for m in mismatched.values())]],
+                ['bars', 'intervals', 'recompute_ms', 'incremental_ms', 'speedup', 'identical'])
+    for interval, columns in mismatched.items():
+        if columns:
+            print(f"FARKLI SÜTUNLAR ({interval}): {columns}")
+    return {'recompute_s': recompute_s, 'incremental_s': incremental_s, 'mismatched': mismatched}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Artımlı üst zaman dilimleri vs resample + yeniden hesap")
+    parser.add_argument('--bars', type=int, default=6000)
+    parser.add_argument('--intervals', nargs='+', default=['60', '240'])
+    args = parser.parse_args(argv)
+    result = run(args.bars, tuple(args.intervals))
+    raise SystemExit(1 if any(result['mismatched'].values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
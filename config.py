@@ -79,3 +79,104 @@ SL = 3
 
 # Trading Mode
 POSITION_MODE = "Hedge"  # default : OneWay (Hedge mode long/short)
+
+# Backtest / Indikatör Sonuç Cache'i (disk, LRU)
+RESULT_CACHE_DIR = ".cache/results"
+RESULT_CACHE_MAX_MB = 2048
+
+# API Rate Limit (istek/saniye, aynı API anahtarı için)
+API_RATE_LIMIT_PER_SEC = 10
+
+# Geçmiş Veri Deposu (Parquet, sembol/interval/ay bölümlü)
+DATA_STORE_DIR = "data/klines"
+
+# İndikatör Modu: "frame" (sembol sembol) | "panel" (tüm semboller tek seferde, time × symbol)
+#                 | "graph" (sadece stratejilerin istediği sütunlar, tembel)
+INDICATOR_MODE = "frame"
+
+# İndikatör İşçi Süreçleri (0: kapalı, ana süreçte hesaplanır)
+INDICATOR_WORKERS = 0
+
+# Kırılım Teyidi: önceki N kapanışın hepsi pivot seviyesinin gerisinde olmalı
+BREAKOUT_LOOKBACK = 5
+
+# Özyinelemeli çekirdekler: "auto" (numba kuruluysa numba) | "numba" | "numpy"
+KERNEL_BACKEND = "auto"
+KERNEL_CACHE_DIR = ".cache/numba"
+
+# Üst Zaman Dilimleri: taban INTERVAL cache'inden artımlı türetilir (ek API çağrısı yok)
+HTF_INTERVALS = []  # örn. ["60", "240"]
+HTF_MAX_BARS = 1000
+HTF_ZIGZAG_ATR_MULT = 2
+HTF_CONFIRM = False  # True: pivot kırılım girişleri tüm HTF_INTERVALS yapısıyla teyit edilir
+
+# Tur başına sinyal snapshot'ı (denetim, JSONL; None: kapalı)
+SNAPSHOT_LOG = "logs/snapshots.jsonl"
+
+# Metrikler: Prometheus text endpoint'i (0: kapalı; port doluysa endpoint'siz devam) ve dönen JSON
+# dosyası (None: kapalı). Sharding açıkken JSON, SNAPSHOT_LOG ve LOG_FILE adları işçi kimliğini alır
+METRICS_PORT = 9108
+METRICS_JSON = "logs/metrics.json"
+METRICS_RECENT_CYCLES = 96  # JSON'da tutulan son tur sayısı (15m'de 1 gün)
+
+# Market emri sonrası pozisyon doğrulama: ilk bekleme ve sorgu aralığı (saniye)
+ORDER_FILL_WAIT = 1.0
+ORDER_FILL_POLL = 0.5
+
+# İsteğe bağlı profilleme: SIGUSR1 ya da kontrol dosyası ("[tur] [cprofile|sample|both]")
+PROFILE_DIR = "logs/profiles"
+PROFILE_REQUEST_FILE = "logs/profile.request"
+PROFILE_CYCLES = 3
+PROFILE_SAMPLE_INTERVAL = 0.005  # örnekleyici aralığı (saniye)
+PROFILE_TOP = 40  # rapor başına satır (fonksiyon / bellek farkı)
+
+# Loglama: kuyruk tabanlı, dosyaya JSON satırları (boyuta göre döner), konsola metin
+LOG_FILE = "trading_bot.log"
+LOG_LEVEL = "INFO"
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_QUEUE_SIZE = 10000  # doluysa WARNING altı kayıtlar düşürülür ve sayılır (emir yolu diske beklemez)
+LOG_QUEUE_RESERVE = 1000  # kuyruğun üstünde sadece WARNING ve üstüne ayrılan yer
+
+# Akış modu: her sembol kline yanıtı gelir gelmez indikatör → sinyal → emir
+# (False: tüm semboller beklenir; işçi havuzu ve panel modu her zaman toplu)
+PIPELINE_CYCLE = True
+OCO_WORKERS = 4  # tur başında kline beklemesiyle paralel OCO kontrolü
+
+# Mumlar arası denetçi: TP/SL dolumları, sahipsiz emirler, pozisyon kayması (0: kapalı)
+SUPERVISOR_INTERVAL = 20  # saniye
+SUPERVISOR_MAX_CALLS = 8  # tur başına API çağrı bütçesi
+SUPERVISOR_QUIET_SECONDS = 5  # mum kapanışından önce çalışmaz
+SUPERVISOR_CANCEL_ORPHANS = True
+
+# Başlangıç: kaldıraç / enstrüman bilgisi / cache / pozisyon kurtarma / çekirdek derleme paralel
+STARTUP_PARALLEL = True  # False: sırayla (karşılaştırma için)
+STARTUP_WORKERS = 8  # eşzamanlı kaldıraç isteği
+LEVERAGE_STATE_FILE = ".cache/leverage.json"  # doğrulanmış kaldıraçlar (None: her başlangıçta hepsi)
+CACHE_STORE_DIR = DATA_STORE_DIR  # cache diskten ısıtılır, kapanan barlar buraya yazılır (None: kapalı)
+CACHE_PERSIST_EVERY = 4  # tur; durdurulurken de yazılır
+
+# Sharding: semboller tutarlı hash ile birden çok bot sürecine dağıtılır (sharding.py)
+SHARD_DIR = None  # tüm işçilerin ortak dizini, örn. "/srv/bot/shards" (None: kapalı, tek süreç)
+SHARD_WORKER_ID = None  # None: <hostname>-<pid>
+SHARD_LEASE_TTL = 30  # saniye; ölü işçinin sembolleri en geç bu kadar sonra devralınır
+SHARD_RENEW_INTERVAL = 10  # saniye; lease süresinin yarısından kısa olmalı
+SHARD_VNODES = 160  # işçi başına sanal düğüm (az olursa dağılım dengesizleşir)
+
+# Ortak piyasa verisi (market_data.py): tek daemon cache + indikatörleri yürütür, botlar abone olur
+MARKET_DATA_SUBSCRIBE = False  # True: TradingBot veriyi daemon'dan okur (kline çağrısı yok)
+MARKET_DATA_SHM = "tradingbot-md"  # shared memory segment adı
+MARKET_DATA_SOCKET_DIR = "/tmp/tradingbot-md"  # abone bildirim soketleri
+MARKET_DATA_MAX_BARS = 1000  # sembol başına yayınlanan kapanmış bar
+MARKET_DATA_TIMEOUT = 30  # abone: mum yayınını bekleme süresi (saniye)
+
+# Çoklu hesap (accounts.py): veri + sinyal mum başına bir kez, emirler her hesaba eşzamanlı
+# Boş: tek hesap (.env). api_key_env'siz hesap .env anahtarını kullanır (en fazla bir tane); risk_scale
+# tüm riskleri ölçekler, symbol_settings SYMBOL_SETTINGS üzerine sembol bazında yazılır;
+# rate_limit: hesabın emir / pozisyon istekleri için istek/s (varsayılan ACCOUNT_RATE_LIMIT_PER_SEC)
+ACCOUNTS = []
+# örn. [{'name': 'main'},
+#       {'name': 'sub1', 'api_key_env': 'SUB1_API_KEY', 'api_secret_env': 'SUB1_API_SECRET',
+#        'risk_scale': 0.5, 'symbol_settings': {'BTCUSDT': {'risk': 2.5}}}]
+ACCOUNT_JOURNAL_DIR = "logs/accounts"  # hesap başına pozisyon günlüğü (<ad>.jsonl; None: kapalı)
+ACCOUNT_RATE_LIMIT_PER_SEC = 20  # hesap başına emir / iptal / pozisyon istekleri (kline limitinden ayrı)
@@ -0,0 +1,80 @@
+import os
+import logging
+from typing import List, Optional
+
+import pandas as pd
+
+from config import DATA_STORE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class ParquetStore:
+    """
+    Sembol / interval / ay bazında bölümlenmiş OHLCV deposu.
+    Yapı: <root>/symbol=BTCUSDT/interval=15/2024-01.parquet (index: UTC time)
+    Aynı bar tekrar yazılırsa son yazılan geçerli olur.
+    """
+
+    def __init__(self, root: str = DATA_STORE_DIR):
+        self.root = root
+
+    def _dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, f"symbol={symbol}", f"interval={interval}")
+
+    def _path(self, symbol: str, interval: str, month: str) -> str:
+        return os.path.join(self._dir(symbol, interval), f"{month}.parquet")
+
+    def partitions(self, symbol: str, interval: str) -> List[str]:
+        directory = self._dir(symbol, interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len('.parquet')] for name in os.listdir(directory) if name.endswith('.parquet'))
+
+    # ─── Yazma ────────────────────────────────────────────────────────────────
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """Barları aylık parçalara birleştirir; yazılan bar sayısını döndürür."""
+        if df is None or df.empty:
+            return 0
+
+        os.makedirs(self._dir(symbol, interval), exist_ok=True)
+        months = df.index.strftime('%Y-%m')
+        for month, chunk in df.groupby(months):
+            path = self._path(symbol, interval, month)
+            if os.path.exists(path):
+                chunk = pd.concat([pd.read_parquet(path), chunk])
+                chunk = chunk[~chunk.index.duplicated(keep='last')]
+            chunk = chunk.sort_index()
+            tmp = f"{path}.{os.getpid()}.tmp"
+            chunk.to_parquet(tmp)
+            os.replace(tmp, path)  # yarım dosya bırakma
+        return len(df)
+
+    # ─── Okuma ────────────────────────────────────────────────────────────────
+
+    def read(
+        self,
+        symbol:   str,
+        interval: str,
+        start:    Optional[pd.Timestamp] = None,
+        end:      Optional[pd.Timestamp] = None,
+    ) -> Optional[pd.DataFrame]:
+        """[start, end) aralığındaki barları okur; sadece ilgili aylık dosyalar açılır."""
+        start = pd.Timestamp(start, tz='UTC') if start is not None and pd.Timestamp(start).tz is None else start
+        end   = pd.Timestamp(end, tz='UTC') if end is not None and pd.Timestamp(end).tz is None else end
+
+        months = self.partitions(symbol, interval)
+        if start is not None:
+            months = [m for m in months if m >= start.strftime('%Y-%m')]
+        if end is not None:
+            months = [m for m in months if m <= end.strftime('%Y-%m')]
+        if not months:
+            return None
+
+        df = pd.concat([pd.read_parquet(self._path(symbol, interval, m)) for m in months])
+        if start is not None:
+            df = df[df.index >= start]
+        if end is not None:
+            df = df[df.index < end]
+        return df
@@ -0,0 +1,208 @@
+"""
+Toplu geçmiş kline indirici.
+
+Örnek:
+    python downloader.py --symbols BTCUSDT ETHUSDT --start 2023-01-01 --end 2024-01-01
+    python downloader.py --symbols BTCUSDT --start 2024-01-01 --mock   # yerel mock API
+
+Yarıda kesilen indirme aynı komutla tekrar çalıştırılınca checkpoint'ten devam eder.
+"""
+import os
+import json
+import time
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_STORE_DIR
+from data_store import ParquetStore
+from exchange import BybitFuturesAPI, BYBIT_MAX_LIMIT, INTERVAL_MS, klines_to_frame
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = os.path.join(DATA_STORE_DIR, '_checkpoints')
+
+
+def plan_windows(start_ms: int, end_ms: int, interval: str, page: int = BYBIT_MAX_LIMIT) -> List[Tuple[int, int]]:
+    """[start, end) aralığını her biri `page` bar olan (start_ms, end_ms) pencerelerine böler (uçlar dahil)."""
+    step  = INTERVAL_MS[interval]
+    first = -(-start_ms // step) * step
+    last  = ((end_ms - 1) // step) * step
+    return [(s, min(s + (page - 1) * step, last)) for s in range(first, last + 1, page * step)]
+
+
+def find_gaps(index: pd.DatetimeIndex, interval: str) -> List[Tuple[pd.Timestamp, pd.Timestamp, int]]:
+    """Ardışık barlar arasındaki boşlukları bulur: (önceki bar, sonraki bar, eksik bar sayısı)."""
+    if len(index) < 2:
+        return []
+    step  = INTERVAL_MS[interval] * 1_000_000  # ns
+    diffs = np.diff(index.as_unit('ns').asi8)
+    holes = np.flatnonzero(diffs != step)
+    return [(index[i], index[i + 1], int(diffs[i] // step) - 1) for i in holes]
+
+
+class KlineDownloader:
+    """
+    Sembol/tarih aralığını sayfa pencerelerine böler, pencereleri rate limiter
+    altında paralel çeker ve ParquetStore'a yazar. Tamamlanan pencereler
+    checkpoint dosyasına işlenir; yeniden çalıştırmada atlanır.
+    """
+
+    def __init__(
+        self,
+        api:            BybitFuturesAPI,
+        store:          ParquetStore,
+        checkpoint_dir: str = CHECKPOINT_DIR,
+        workers:        int = 8,
+        flush_every:    int = 50,
+        max_retries:    int = 5,
+    ):
+        self.api            = api
+        self.store          = store
+        self.checkpoint_dir = checkpoint_dir
+        self.workers        = workers
+        self.flush_every    = flush_every
+        self.max_retries    = max_retries
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    # ─── Checkpoint ───────────────────────────────────────────────────────────
+
+    def _checkpoint_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.checkpoint_dir, f"{symbol}_{interval}.json")
+
+    def _load_checkpoint(self, symbol: str, interval: str) -> set:
+        path = self._checkpoint_path(symbol, interval)
+        if not os.path.exists(path):
+            return set()
+        with open(path) as f:
+            return set(json.load(f).get('done', []))
+
+    def _save_checkpoint(self, symbol: str, interval: str, done: set) -> None:
+        path = self._checkpoint_path(symbol, interval)
+        tmp  = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'symbol': symbol, 'interval': interval, 'done': sorted(done)}, f)
+        os.replace(tmp, path)
+
+    # ─── Çekme ────────────────────────────────────────────────────────────────
+
+    def _fetch_window(self, symbol: str, interval: str, window: Tuple[int, int]) -> pd.DataFrame:
+        start_ms, end_ms = window
+        for attempt in range(self.max_retries):
+            response = self.api.get_kline(
+                symbol=symbol, interval=interval, start=start_ms, end=end_ms, limit=BYBIT_MAX_LIMIT,
+            )
+            if response['retCode'] == 0:
+                return klines_to_frame(response['result']['list'])
+            logger.warning("%s pencere %d hata (%s), tekrar deneniyor (%d/%d)",
+                           symbol, start_ms, response['retMsg'], attempt + 1, self.max_retries)
+            time.sleep(min(2 ** attempt * 0.2, 5.0))
+        raise RuntimeError(f"{symbol} pencere {start_ms} çekilemedi")
+
+    def download(self, symbol: str, start: pd.Timestamp, end: pd.Timestamp, interval: str = '15') -> Dict:
+        """Bir sembol için [start, end) aralığını indirir; özet rapor döndürür."""
+        start_ms = int(pd.Timestamp(start).timestamp() * 1000)
+        end_ms   = int(pd.Timestamp(end).timestamp() * 1000)
+        windows  = plan_windows(start_ms, end_ms, interval)
+        done     = self._load_checkpoint(symbol, interval)
+        pending  = [w for w in windows if w[0] not in done]
+
+        logger.info("%s indirme | Pencere: %d | Tamamlanmış: %d | Kalan: %d",
+                    symbol, len(windows), len(windows) - len(pending), len(pending))
+
+        started = time.perf_counter()
+        bars    = 0
+        buffer: List[pd.DataFrame] = []
+        buffered: List[int] = []
+
+        def _flush():
+            nonlocal bars
+            if not buffered:
+                return
+            frames = [df for df in buffer if not df.empty]
+            if frames:
+                bars += self.store.write(symbol, interval, pd.concat(frames).sort_index())
+            done.update(buffered)
+            self._save_checkpoint(symbol, interval, done)
+            buffer.clear()
+            buffered.clear()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._fetch_window, symbol, interval, w): w for w in pending}
+            try:
+                for fut in as_completed(futures):
+                    buffer.append(fut.result())
+                    buffered.append(futures[fut][0])
+                    if len(buffered) >= self.flush_every:
+                        _flush()
+            finally:
+                # Hata / kesinti olsa da tamamlanan pencereler kaybolmasın
+                for fut in futures:
+                    fut.cancel()
+                _flush()
+
+        elapsed = time.perf_counter() - started
+        stored  = self.store.read(symbol, interval, start, end)
+        gaps    = find_gaps(stored.index, interval) if stored is not None else []
+
+        report = {
+            'symbol':       symbol,
+            'interval':     interval,
+            'windows':      len(windows),
+            'fetched':      len(pending),
+            'bars':         bars,
+            'stored_bars':  0 if stored is None else len(stored),
+            'seconds':      round(elapsed, 3),
+            'bars_per_sec': round(bars / elapsed, 1) if elapsed > 0 else 0.0,
+            'gaps':         gaps,
+        }
+        logger.info("%s tamamlandı | %d bar | %.2fs | %.0f bar/s | Boşluk: %d",
+                    symbol, bars, elapsed, report['bars_per_sec'], len(gaps))
+        for prev, nxt, missing in gaps[:10]:
+            logger.warning("%s boşluk: %s → %s (%d bar eksik)", symbol, prev, nxt, missing)
+        return report
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict]:
+    parser = argparse.ArgumentParser(description="Bybit linear geçmiş kline indirici")
+    parser.add_argument('--symbols', nargs='+', required=True)
+    parser.add_argument('--start', required=True, help="UTC başlangıç (ör. 2023-01-01)")
+    parser.add_argument('--end', default=None, help="UTC bitiş, hariç (varsayılan: şimdi)")
+    parser.add_argument('--interval', default='15')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--store', default=DATA_STORE_DIR)
+    parser.add_argument('--checkpoint-dir', default=None)
+    parser.add_argument('--mock', action='store_true', help="Yerel mock API kullan (ağ yok)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    session = None
+    if args.mock:
+        from mock_exchange import MockBybitSession
+        session = MockBybitSession()
+
+    api        = BybitFuturesAPI(session=session)
+    store      = ParquetStore(args.store)
+    downloader = KlineDownloader(api, store, args.checkpoint_dir or os.path.join(args.store, '_checkpoints'),
+                                 workers=args.workers)
+
+    start = pd.Timestamp(args.start, tz='UTC')
+    # Varsayılan bitiş: oluşmakta olan (kapanmamış) mumun açılışı
+    end   = pd.Timestamp(args.end, tz='UTC') if args.end else \
+        pd.Timestamp.now(tz='UTC').floor(pd.Timedelta(milliseconds=INTERVAL_MS[args.interval]))
+
+    reports = [downloader.download(sym, start, end, args.interval) for sym in args.symbols]
+    total_bars = sum(r['bars'] for r in reports)
+    total_secs = sum(r['seconds'] for r in reports)
+    logger.info("Toplam: %d bar | %.2fs | %.0f bar/s", total_bars, total_secs,
+                total_bars / total_secs if total_secs else 0.0)
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,57 @@
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Sequence, Tuple
+
+import numpy as np
+
+from config import HTF_CONFIRM, HTF_INTERVALS, HTF_ZIGZAG_ATR_MULT
+from indicators import STRUCTURE_HH, STRUCTURE_LL
 
 LONG_PAIRS_2X = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT','XRPUSDT','DOGEUSDT']
 SHORT_PAIRS_2X = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT','XRPUSDT','DOGEUSDT']
 
+# Bu modülün okuduğu indikatör sütunları (indicator_graph sadece bunları hesaplar)
+REQUIRED_COLUMNS = ['pivot_go_breakout_2x', 'pivot_go_breakdown_2x']
+
+HTF_SUFFIX = f"_{HTF_ZIGZAG_ATR_MULT:g}x"
+# HTF_CONFIRM açıksa okunan üst zaman dilimi sütunları (timeframes.TimeframeCache üretir)
+HTF_COLUMNS = [f"htf{interval}_{side}_structure{HTF_SUFFIX}"
+               for interval in HTF_INTERVALS for side in ('high', 'low')] if HTF_CONFIRM else []
+
+
+def htf_confirms(row: Dict[str, Any], direction: str) -> bool:
+    """
+    Üst zaman dilimi teyidi (HTF_CONFIRM): LONG için her üst dilimde son high pivot HH,
+    SHORT için son low pivot LL olmalı. Üst dilim verisi henüz yoksa giriş teyit edilmez.
+    """
+    if not HTF_CONFIRM:
+        return True
+    side, code = ('high', STRUCTURE_HH) if direction == 'LONG' else ('low', STRUCTURE_LL)
+    return all(row.get(f"htf{interval}_{side}_structure{HTF_SUFFIX}") == code for interval in HTF_INTERVALS)
+
+
 def check_long_entry(row: Dict[str, Any], symbol: str) -> bool:
     if symbol in LONG_PAIRS_2X:
-        return row['pivot_go_breakout_2x'] == True
+        return row['pivot_go_breakout_2x'] == True and htf_confirms(row, 'LONG')
     return False
 
 def check_short_entry(row: Dict[str, Any], symbol: str) -> bool:
     atr_steps_col = 'pivot_go_breakdown_2x' if symbol in SHORT_PAIRS_2X else 'pivot_go_breakout_2x'
-    return row[atr_steps_col] == True
+    return row[atr_steps_col] == True and htf_confirms(row, 'SHORT')
+
 
+def entry_masks(symbols: Sequence[str], columns, htf_confirm: bool = HTF_CONFIRM) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    check_long_entry / check_short_entry'nin vektörel karşılığı: önce LONG, sonra SHORT.
+    `columns` sütun adı → dizi eşlemesi (dict, panel.Panel); son eksen semboller —
+    (sembol,) snapshot ya da (time × symbol) panel.
+    """
+    symbols   = np.asarray(symbols)
+    breakout  = np.asarray(columns['pivot_go_breakout_2x']) == True
+    breakdown = np.asarray(columns['pivot_go_breakdown_2x']) == True
 
+    go_long  = breakout & np.isin(symbols, LONG_PAIRS_2X)
+    go_short = np.where(np.isin(symbols, SHORT_PAIRS_2X), breakdown, breakout)
+    if htf_confirm:
+        for interval in HTF_INTERVALS:
+            go_long  = go_long & (np.asarray(columns[f"htf{interval}_high_structure{HTF_SUFFIX}"]) == STRUCTURE_HH)
+            go_short = go_short & (np.asarray(columns[f"htf{interval}_low_structure{HTF_SUFFIX}"]) == STRUCTURE_LL)
+    return go_long, ~go_long & go_short
@@ -1,29 +1,128 @@
 import os
+import time
+import threading
 import pandas as pd
-from pybit.unified_trading import HTTP
 from dotenv import load_dotenv
-from typing import List, Optional, Dict
-from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Optional, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+from config import API_RATE_LIMIT_PER_SEC
+from metrics import METRICS, InstrumentedSession
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 load_dotenv()
 
 BYBIT_MAX_LIMIT = 200  # Bybit get_kline hard limit
+CACHE_BARS = 1000      # sembol başına cache'te tutulan bar
+
+KLINE_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume', 'turnover']
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+INTERVAL_MS = {
+    '1': 60_000, '3': 180_000, '5': 300_000, '15': 900_000, '30': 1_800_000,
+    '60': 3_600_000, '120': 7_200_000, '240': 14_400_000, '360': 21_600_000,
+    '720': 43_200_000, 'D': 86_400_000, 'W': 604_800_000,
+}
+
+
+def klines_to_frame(klines: List[List[str]], convert_to_float: bool = True) -> pd.DataFrame:
+    """Bybit kline listesini (yeniden eskiye) eskiden yeniye sıralı OHLCV DataFrame'ine çevirir."""
+    df = pd.DataFrame(klines, columns=KLINE_COLUMNS)
+    df = df[['time'] + OHLCV_COLUMNS].copy()
+    df['time'] = pd.to_datetime(df['time'].astype('int64'), unit='ms', utc=True)
+    if convert_to_float:
+        df[OHLCV_COLUMNS] = df[OHLCV_COLUMNS].astype(float)
+    df.set_index('time', inplace=True)
+    return df.iloc[::-1]  # Bybit ters sıra gönderir, eskiden yeniye çevir
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket. `acquire` token yoksa gereken süre kadar bekler.
+    Aynı API anahtarını paylaşan tüm istekler aynı limiter'dan geçmelidir.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate     = float(rate)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens  = self.capacity
+        self._updated = time.monotonic()
+        self._lock    = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Token alır; bekleme süresini (saniye) döndürür."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens  = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimitedSession:
+    """
+    Oturum sarmalayıcısı: her metot çağrısı önce `rate_limiter`'dan token alır.
+    Hesabın emir / iptal / pozisyon / kaldıraç çağrıları (accounts.py) bu yoldan geçer.
+    """
+
+    def __init__(self, session: Any, rate_limiter: Any):
+        self._session     = session
+        self.rate_limiter = rate_limiter
+        self._wrapped: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._session, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+        wrapper = self._wrapped.get(name)
+        if wrapper is None:
+            def wrapper(*args, **kwargs):
+                self.rate_limiter.acquire()
+                return attr(*args, **kwargs)
+
+            self._wrapped[name] = wrapper
+        return wrapper
 
 
 class BybitFuturesAPI:
-    def __init__(self, testnet: bool = False):
-        self.session = HTTP(
-            api_key=os.getenv('BYBIT_API_KEY'),
-            api_secret=os.getenv('BYBIT_API_SECRET'),
-            testnet=testnet,
-        )
+    def __init__(
+        self,
+        testnet:      bool = False,
+        session:      Optional[Any] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        timeframes:   Optional[Any] = None,
+        api_key:      Optional[str] = None,
+        api_secret:   Optional[str] = None,
+    ):
+        # session dışarıdan verilebilir (test / mock exchange); tüm çağrılar endpoint bazında sayılır
+        # api_key / api_secret: alt hesaplar (accounts.py); None: .env'deki BYBIT_API_KEY / BYBIT_API_SECRET
+        if session is None:
+            from pybit.unified_trading import HTTP  # ağır import: sadece gerçek oturumda
+            session = HTTP(
+                api_key=api_key or os.getenv('BYBIT_API_KEY'),
+                api_secret=api_secret or os.getenv('BYBIT_API_SECRET'),
+                testnet=testnet,
+            )
+        self.session = InstrumentedSession(session)
+        self.rate_limiter = rate_limiter or RateLimiter(API_RATE_LIMIT_PER_SEC)
         # Cache: {symbol: DataFrame (1000 bar, index=UTC datetime)}
         self._cache: Dict[str, pd.DataFrame] = {}
+        self._persisted: Dict[str, pd.Timestamp] = {}  # sembol → depoya yazılan son bar
+        # Üst zaman dilimleri (timeframes.TimeframeCache): cache güncellendikçe artımlı beslenir
+        self.timeframes = timeframes
         logger.info("Bybit Futures API bağlantısı başarılı (Testnet: %s)", testnet)
 
+    def get_kline(self, **params) -> Dict:
+        """Rate limiter'dan geçerek ham get_kline isteği atar."""
+        self.rate_limiter.acquire()
+        return self.session.get_kline(category="linear", **params)
+
     # ─── Tekli OHLCV ──────────────────────────────────────────────────────────
 
     def get_ohlcv(
@@ -38,27 +137,17 @@ class BybitFuturesAPI:
         Index: UTC datetime, sütunlar: open high low close volume
         """
         try:
-            response = self.session.get_kline(
-                category="linear",
-                symbol=symbol,
-                interval=interval,
-                limit=limit,
-            )
+            with METRICS.time('kline_fetch', symbol):
+                response = self.get_kline(
+                    symbol=symbol,
+                    interval=interval,
+                    limit=limit,
+                )
             if response['retCode'] != 0:
                 raise Exception(response['retMsg'])
 
-            klines = response['result']['list']
-            df = pd.DataFrame(klines, columns=[
-                'time', 'open', 'high', 'low', 'close', 'volume', 'turnover'
-            ])
-            df = df[['time', 'open', 'high', 'low', 'close', 'volume']].copy()
-            df['time'] = pd.to_datetime(df['time'].astype(int), unit='ms', utc=True)
-            if convert_to_float:
-                df[['open', 'high', 'low', 'close', 'volume']] = \
-                    df[['open', 'high', 'low', 'close', 'volume']].astype(float)
-            df.set_index('time', inplace=True)
-            df = df.iloc[::-1]  # Bybit ters sıra gönderir, eskiden yeniye çevir
-            return df
+            with METRICS.time('kline_parse', symbol):
+                return klines_to_frame(response['result']['list'], convert_to_float)
 
         except Exception as e:
             logger.error("Veri çekme hatası (%s): %s", symbol, e)
@@ -85,13 +174,13 @@ class BybitFuturesAPI:
                 # Bybit'te end parametresi ms cinsinden
                 end_ms = int(oldest_time.timestamp() * 1000) - 1
 
-                response = self.session.get_kline(
-                    category="linear",
-                    symbol=symbol,
-                    interval=interval,
-                    limit=BYBIT_MAX_LIMIT,
-                    end=end_ms,
-                )
+                with METRICS.time('kline_fetch', symbol):
+                    response = self.get_kline(
+                        symbol=symbol,
+                        interval=interval,
+                        limit=BYBIT_MAX_LIMIT,
+                        end=end_ms,
+                    )
                 if response['retCode'] != 0:
                     break
 
@@ -99,16 +188,8 @@ class BybitFuturesAPI:
                 if not klines:
                     break
 
-                chunk = pd.DataFrame(klines, columns=[
-                    'time', 'open', 'high', 'low', 'close', 'volume', 'turnover'
-                ])
-                chunk = chunk[['time', 'open', 'high', 'low', 'close', 'volume']].copy()
-                chunk['time'] = pd.to_datetime(chunk['time'].astype(int), unit='ms', utc=True)
-                chunk[['open', 'high', 'low', 'close', 'volume']] = \
-                    chunk[['open', 'high', 'low', 'close', 'volume']].astype(float)
-                chunk.set_index('time', inplace=True)
-                chunk = chunk.iloc[::-1]
-                all_dfs.append(chunk)
+                with METRICS.time('kline_parse', symbol):
+                    all_dfs.append(klines_to_frame(klines))
 
             # Birleştir, sırala, tekrarları at
             combined = pd.concat(all_dfs)
@@ -126,22 +207,91 @@ class BybitFuturesAPI:
 
     # ─── Cache Başlatma ───────────────────────────────────────────────────────
 
-    def initialize_cache(self, symbols: List[str], interval: str = '15') -> None:
+    def initialize_cache(self, symbols: List[str], interval: str = '15', store: Optional[Any] = None) -> None:
         """
         Bot başlarken her sembol için 1000 bar çekip cache'e yükler.
-        Paralel çalışır.
+        Paralel çalışır. `store` (data_store.ParquetStore) verilirse önce diskten ısıtılır.
         """
+        if not symbols:
+            return
         logger.info("Cache başlatılıyor: %s", symbols)
         with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
-            futures = {sym: executor.submit(self.fetch_1000_bars, sym, interval) for sym in symbols}
+            futures = {sym: executor.submit(self._load_bars, sym, interval, store) for sym in symbols}
             for sym, fut in futures.items():
                 df = fut.result()
                 if df is not None:
                     self._cache[sym] = df
+                    self._update_timeframes(sym, df, interval)
                     logger.info("%s cache hazır (%d bar)", sym, len(df))
                 else:
                     logger.error("%s cache başlatılamadı", sym)
 
+    def _load_bars(self, symbol: str, interval: str, store: Optional[Any]) -> Optional[pd.DataFrame]:
+        if store is not None:
+            df = self.warm_from_store(symbol, interval, store)
+            if df is not None:
+                return df
+        return self.fetch_1000_bars(symbol, interval)
+
+    def warm_from_store(self, symbol: str, interval: str, store: Any) -> Optional[pd.DataFrame]:
+        """
+        Diskteki son barlar + tek istekle (≤200 bar) boşluk doldurma; 5 istek yerine 1.
+        Depoda 1000 bar yoksa ya da boşluk tek isteğe sığmıyorsa None (tam çekime düşülür).
+        """
+        step = pd.Timedelta(milliseconds=INTERVAL_MS[interval])
+        now  = pd.Timestamp.now(tz='UTC')
+        try:
+            stored = store.read(symbol, interval, start=now - step * (CACHE_BARS + 1))
+        except Exception as e:
+            logger.warning("%s disk cache okunamadı: %s", symbol, e)
+            return None
+        if stored is None or len(stored) == 0:
+            return None
+
+        gap = int((now - stored.index[-1]) / step) + 1
+        if gap >= BYBIT_MAX_LIMIT:
+            return None
+        fresh = self.get_ohlcv(symbol, interval, limit=gap + 1)  # +1: son kayıtlı barla örtüşme
+        if fresh is None or fresh.empty or fresh.index[0] > stored.index[-1]:
+            return None
+
+        combined = pd.concat([stored, fresh])
+        combined = combined[~combined.index.duplicated(keep='last')].sort_index().iloc[-CACHE_BARS:]
+        if len(combined) < CACHE_BARS:
+            return None
+        logger.info("%s disk cache'ten ısıtıldı (%d bar, %d yeni)", symbol, len(combined), len(fresh))
+        return combined
+
+    def persist_cache(self, store: Any, interval: str = '15') -> int:
+        """Cache'teki kapanmış barları depoya ekler (son yazımdan sonrakiler). Yazılan bar sayısını döndürür."""
+        step    = pd.Timedelta(milliseconds=INTERVAL_MS[interval])
+        cutoff  = pd.Timestamp.now(tz='UTC') - step  # kapanmamış mum depoya yazılmaz
+        written = 0
+        for symbol, df in list(self._cache.items()):
+            closed = df[df.index <= cutoff]
+            last = self._persisted.get(symbol)
+            if last is not None:
+                closed = closed[closed.index > last]
+            if closed.empty:
+                continue
+            try:
+                written += store.write(symbol, interval, closed)
+                self._persisted[symbol] = closed.index[-1]
+            except Exception as e:
+                logger.warning("%s cache diske yazılamadı: %s", symbol, e)
+        return written
+
+    def drop_cache(self, symbols: List[str]) -> None:
+        """
+        Artık takip edilmeyen sembollerin cache'ini siler. Bayat cache'e sonradan son 3
+        bar eklenirse arada boşluk kalırdı; sembol geri gelirse 1000 bar yeniden çekilir.
+        """
+        for symbol in symbols:
+            self._cache.pop(symbol, None)
+            self._persisted.pop(symbol, None)
+            if self.timeframes:
+                self.timeframes.drop(symbol)
+
     # ─── Cache Güncelleme ─────────────────────────────────────────────────────
 
     def update_cache(self, symbol: str, interval: str = '15', fetch_last: int = 3) -> Optional[pd.DataFrame]:
@@ -160,6 +310,7 @@ class BybitFuturesAPI:
                 df = self.fetch_1000_bars(symbol, interval)
                 if df is not None:
                     self._cache[symbol] = df
+                    self._update_timeframes(symbol, df, interval)
                 return self._cache.get(symbol)
 
             # Yeni barları cache'e ekle
@@ -170,12 +321,22 @@ class BybitFuturesAPI:
             # 1000 bar sınırını koru
             combined = combined.iloc[-1000:]
             self._cache[symbol] = combined
+            self._update_timeframes(symbol, combined, interval)
             return combined
 
         except Exception as e:
             logger.error("%s cache güncelleme hatası: %s", symbol, e)
             return self._cache.get(symbol)
 
+    def _update_timeframes(self, symbol: str, df: pd.DataFrame, interval: str) -> None:
+        """Yeni kapanmış barları üst zaman dilimi görünümlerine aktarır (API çağrısı yok)."""
+        if not self.timeframes:
+            return
+        try:
+            self.timeframes.update(symbol, df, interval)
+        except Exception as e:
+            logger.error("%s üst zaman dilimi güncelleme hatası: %s", symbol, e)
+
     # ─── Ana Veri Çekme (Cache'li) ────────────────────────────────────────────
 
     def get_multiple_ohlcv(
@@ -195,3 +356,21 @@ class BybitFuturesAPI:
         with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
             futures = {sym: executor.submit(self.update_cache, sym, interval) for sym in symbols}
             return {sym: fut.result() for sym, fut in futures.items()}
+
+    def iter_ohlcv(
+        self,
+        symbols:  List[str],
+        interval: str = '15',
+    ) -> Iterator[Tuple[str, Optional[pd.DataFrame]]]:
+        """
+        get_multiple_ohlcv'nin akış hali: her sembolün cache'i güncellendiği anda
+        (symbol, DataFrame) verir — yanıt sırasıyla, yavaş bir sembol diğerlerini bekletmez.
+        """
+        missing = [s for s in symbols if s not in self._cache]
+        if missing:
+            self.initialize_cache(missing, interval)
+
+        with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+            futures = {executor.submit(self.update_cache, sym, interval): sym for sym in symbols}
+            for fut in as_completed(futures):
+                yield futures[fut], fut.result()
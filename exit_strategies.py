@@ -1,13 +1,15 @@
-from pybit.unified_trading import HTTP
-from typing import Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 import logging
 from config import TP_ROUND_NUMBERS, TP1, TP2, SL
 
+if TYPE_CHECKING:
+    from pybit.unified_trading import HTTP  # sadece tip ipucu
+
 logger = logging.getLogger(__name__)
 
 
 class ExitStrategy:
-    def __init__(self, bybit_client: HTTP):
+    def __init__(self, bybit_client: 'HTTP'):
         self.client = bybit_client
         self.logger = logging.getLogger(__name__)
 
@@ -77,8 +79,10 @@ class ExitStrategy:
                 tp2_id = tp2_order['result']['orderId']
                 sl2_id = sl2_order['result']['orderId']
 
-                logger.info(f"{symbol} [half_only] TP2: {tp2_price} (ID: {tp2_id})")
-                logger.info(f"{symbol} [half_only] SL2: {sl_price}  (ID: {sl2_id})")
+                logger.info(
+                    "%s [half_only] TP2: %s (ID: %s) | SL2: %s (ID: %s)", symbol, tp2_price, tp2_id, sl_price, sl2_id,
+                    extra={'symbol': symbol, 'stage': 'bracket_place', 'order_ids': {'tp2': tp2_id, 'sl2': sl2_id}},
+                )
 
                 oco_pair = {
                     'symbol':        symbol,
@@ -106,10 +110,12 @@ class ExitStrategy:
                 sl1_id = sl1_order['result']['orderId']
                 sl2_id = sl2_order['result']['orderId']
 
-                logger.info(f"{symbol} TP1: {tp1_price} yarı miktar (ID: {tp1_id})")
-                logger.info(f"{symbol} TP2: {tp2_price} yarı miktar (ID: {tp2_id})")
-                logger.info(f"{symbol} SL1: {sl_price}  yarı miktar (ID: {sl1_id})")
-                logger.info(f"{symbol} SL2: {sl_price}  yarı miktar (ID: {sl2_id})")
+                logger.info(
+                    "%s TP1: %s | TP2: %s | SL1/SL2: %s — yarı miktar (%s) bacaklar gönderildi",
+                    symbol, tp1_price, tp2_price, sl_price, half_str,
+                    extra={'symbol': symbol, 'stage': 'bracket_place',
+                           'order_ids': {'tp1': tp1_id, 'tp2': tp2_id, 'sl1': sl1_id, 'sl2': sl2_id}},
+                )
 
                 oco_pair = {
                     'symbol':        symbol,
@@ -124,9 +130,8 @@ class ExitStrategy:
             return {'oco_pair': oco_pair, 'success': True}
 
         except Exception as e:
-            self.logger.error(f"{symbol} set_limit_tp_sl hatası: {e}")
-            import traceback
-            traceback.print_exc()
+            self.logger.error("%s set_limit_tp_sl hatası: %s", symbol, e, exc_info=True,
+                              extra={'symbol': symbol, 'stage': 'bracket_place'})
             return {'success': False, 'error': str(e)}
 
     def _place_limit(self, symbol: str, side: str, qty: str, price: float) -> Dict:
@@ -165,9 +170,11 @@ class ExitStrategy:
 
     # ─── OCO Kontrolü ─────────────────────────────────────────────────────────
 
-    def check_and_cancel_oco(self, oco_pair: Dict) -> Dict:
+    def check_and_cancel_oco(self, oco_pair: Dict, open_orders: Optional[Dict[str, str]] = None) -> Dict:
         """
         TP1/TP2/SL1/SL2 tetiklenme kontrolü.
+        open_orders: toplu açık emir snapshot'ı {orderId: orderStatus}; verilirse durumlar
+        önce buradan okunur, sadece snapshot'ta olmayan emirler için geçmiş sorgulanır.
 
         Senaryolar:
           TP2 tetiklendi          → SL2 iptal, tamamen kapandı
@@ -187,15 +194,15 @@ class ExitStrategy:
             tp1_triggered = oco_pair.get('tp1_triggered', False)
 
             # Her zaman TP2 ve SL2'yi kontrol et
-            tp2_status = self.get_order_status(symbol, tp2_id) if tp2_id else 'NotFound'
-            sl2_status = self.get_order_status(symbol, sl2_id) if sl2_id else 'NotFound'
+            tp2_status = self.get_order_status(symbol, tp2_id, open_orders) if tp2_id else 'NotFound'
+            sl2_status = self.get_order_status(symbol, sl2_id, open_orders) if sl2_id else 'NotFound'
 
             # TP2 tetiklendi → pozisyon tamamen kapandı
             if tp2_status == 'Filled':
                 if sl2_id:
                     self.cancel_order(symbol, sl2_id)
                 oco_pair['active'] = False
-                logger.info(f"{symbol} TP2 tetiklendi — pozisyon tamamen kapandı")
+                logger.info("%s TP2 tetiklendi — pozisyon tamamen kapandı", symbol)
                 return {'triggered': 'TP2'}
 
             # SL2 tetiklendi → pozisyon tamamen kapandı
@@ -205,20 +212,20 @@ class ExitStrategy:
                 if not tp1_triggered and tp1_id:
                     self.cancel_order(symbol, tp1_id)
                 oco_pair['active'] = False
-                logger.info(f"{symbol} SL2 tetiklendi — pozisyon tamamen kapandı")
+                logger.info("%s SL2 tetiklendi — pozisyon tamamen kapandı", symbol)
                 return {'triggered': 'SL2'}
 
             # TP1 henüz tetiklenmediyse kontrol et
             if not tp1_triggered:
-                tp1_status = self.get_order_status(symbol, tp1_id) if tp1_id else 'NotFound'
-                sl1_status = self.get_order_status(symbol, sl1_id) if sl1_id else 'NotFound'
+                tp1_status = self.get_order_status(symbol, tp1_id, open_orders) if tp1_id else 'NotFound'
+                sl1_status = self.get_order_status(symbol, sl1_id, open_orders) if sl1_id else 'NotFound'
 
                 # TP1 tetiklendi → SL1 iptal, yarı kapandı, devam
                 if tp1_status == 'Filled':
                     if sl1_id:
                         self.cancel_order(symbol, sl1_id)
                     oco_pair['tp1_triggered'] = True
-                    logger.info(f"{symbol} TP1 tetiklendi — SL1 iptal, TP2/SL2 devam ediyor")
+                    logger.info("%s TP1 tetiklendi — SL1 iptal, TP2/SL2 devam ediyor", symbol)
                     return {'triggered': 'TP1', 'partial': True}
 
                 # SL1 tetiklendi → her şeyi iptal et, tamamen kapandı
@@ -230,28 +237,32 @@ class ExitStrategy:
                     if sl2_id:
                         self.cancel_order(symbol, sl2_id)
                     oco_pair['active'] = False
-                    logger.info(f"{symbol} SL1 tetiklendi — pozisyon tamamen kapandı")
+                    logger.info("%s SL1 tetiklendi — pozisyon tamamen kapandı", symbol)
                     return {'triggered': 'SL1'}
 
             return {'status': 'active'}
 
         except Exception as e:
-            self.logger.error(f"{symbol} OCO kontrol hatası: {e}")
+            self.logger.error("%s OCO kontrol hatası: %s", symbol, e)
             return {'error': str(e)}
 
     # ─── Emir Sorgulama & İptal ───────────────────────────────────────────────
 
-    def get_order_status(self, symbol: str, order_id: str) -> str:
-        """Emir durumunu sorgular. Önce açık emirlere, sonra geçmişe bakar."""
+    def get_order_status(self, symbol: str, order_id: str, open_orders: Optional[Dict[str, str]] = None) -> str:
+        """Emir durumunu sorgular. Önce açık emirlere (verildiyse snapshot'a), sonra geçmişe bakar."""
         try:
-            result = self.client.get_open_orders(
-                category="linear",
-                symbol=symbol,
-                orderId=order_id,
-            )
-            orders = result['result']['list']
-            if orders:
-                return orders[0]['orderStatus']
+            if open_orders is not None:
+                if order_id in open_orders:
+                    return open_orders[order_id]
+            else:
+                result = self.client.get_open_orders(
+                    category="linear",
+                    symbol=symbol,
+                    orderId=order_id,
+                )
+                orders = result['result']['list']
+                if orders:
+                    return orders[0]['orderStatus']
 
             # Açık emirlerde yoksa geçmişe bak
             history = self.client.get_order_history(
@@ -265,7 +276,7 @@ class ExitStrategy:
             return 'NotFound'
 
         except Exception as e:
-            self.logger.error(f"Emir durum sorgu hatası ({symbol} / {order_id}): {e}")
+            self.logger.error("Emir durum sorgu hatası (%s / %s): %s", symbol, order_id, e)
             return 'Error'
 
     def cancel_order(self, symbol: str, order_id: Optional[str]) -> None:
@@ -278,6 +289,6 @@ class ExitStrategy:
                 symbol=symbol,
                 orderId=order_id,
             )
-            logger.info(f"Emir iptal edildi: {symbol} / {order_id}")
+            logger.info("Emir iptal edildi: %s / %s", symbol, order_id)
         except Exception as e:
-            logger.warning(f"İptal hatası (zaten kapanmış olabilir): {symbol} / {order_id} — {e}")
+            logger.warning("İptal hatası (zaten kapanmış olabilir): %s / %s — %s", symbol, order_id, e)
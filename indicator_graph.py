@@ -0,0 +1,217 @@
+"""
+Bağımlılık tabanlı, tembel indikatör grafiği.
+
+Her indikatör girdilerini, parametrelerini ve ürettiği sütunları beyan eder.
+Stratejiler ihtiyaç duydukları sütunları bildirir; motor sadece gereken alt
+grafiği hesaplar ve ortak düğümleri (atr, z, zigzag) bir kez hesaplayıp paylaşır.
+
+    engine = IndicatorEngine(df, 'BTCUSDT')
+    row = engine.last_row(REQUIRED_COLUMNS + ['close', 'z', 'pct_z'])
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from config import BREAKOUT_LOOKBACK
+from indicators import (
+    calculate_atr, calculate_z, zigzag_events, pivot_columns, fill_pivot_bars_ago,
+    add_structure, add_breakout_signals,
+)
+
+BASE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class IndicatorNode:
+    """Grafikteki bir hesaplama adımı: girdiler → çıktı sütunları."""
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str], outputs: Sequence[str], params: Dict):
+        self.name    = name
+        self.func    = func
+        self.inputs  = list(inputs)
+        self.outputs = list(outputs)
+        self.params  = dict(params)
+        self.key     = (name, tuple(sorted(self.params.items())))
+
+    def __repr__(self) -> str:
+        return f"IndicatorNode({self.name}, params={self.params})"
+
+
+# Sütun adı → onu üreten düğüm
+REGISTRY: Dict[str, IndicatorNode] = {}
+
+
+def register(name: str, inputs: Sequence[str], outputs: Sequence[str], registry: Optional[Dict] = None, **params):
+    """Dekoratör: fonksiyonu `outputs` sütunlarının üreticisi olarak kaydeder."""
+    target = REGISTRY if registry is None else registry
+
+    def wrap(func: Callable) -> Callable:
+        node = IndicatorNode(name, func, inputs, outputs, params)
+        for column in node.outputs:
+            target[column] = node
+        return func
+    return wrap
+
+
+# ─── Motor ────────────────────────────────────────────────────────────────────
+
+class IndicatorEngine:
+    """
+    Tek bir (df, symbol) için tembel değerlendirici.
+    Her düğüm (isim + parametreler) en fazla bir kez hesaplanır; aynı motoru
+    kullanan tüm stratejiler ve parametre setleri sonuçları paylaşır.
+    """
+
+    def __init__(self, df: pd.DataFrame, symbol: str, registry: Optional[Dict[str, IndicatorNode]] = None):
+        self.df       = df
+        self.symbol   = symbol
+        self.registry = REGISTRY if registry is None else registry
+        self._memo: Dict[tuple, Dict] = {}
+        self.computed: List[str] = []  # hesaplanan düğümler (sırasıyla)
+
+    def plan(self, columns: Iterable[str]) -> List[IndicatorNode]:
+        """İstenen sütunlar için gereken düğümleri bağımlılık sırasıyla döndürür."""
+        order, seen = [], set()
+
+        def visit(column: str, stack: tuple) -> None:
+            if column in BASE_COLUMNS or column in self.df.columns and column not in self.registry:
+                return
+            node = self.registry.get(column)
+            if node is None:
+                raise KeyError(f"'{column}' sütununu üreten indikatör kayıtlı değil")
+            if node.key in seen:
+                return
+            if node.key in stack:
+                raise ValueError(f"Döngüsel bağımlılık: {node.name}")
+            for dep in node.inputs:
+                visit(dep, stack + (node.key,))
+            seen.add(node.key)
+            order.append(node)
+
+        for column in columns:
+            visit(column, ())
+        return order
+
+    def get(self, column: str):
+        if column in BASE_COLUMNS or (column in self.df.columns and column not in self.registry):
+            return self.df[column]
+        node = self.registry[column]
+        if node.key not in self._memo:
+            for dep in self.plan([column]):
+                if dep.key not in self._memo:
+                    inputs = {name: self.get(name) for name in dep.inputs}
+                    self._memo[dep.key] = dep.func(inputs, self.df.index, self.symbol, **dep.params)
+                    self.computed.append(dep.name)
+        return self._memo[node.key][column]
+
+    def evaluate(self, columns: Sequence[str]) -> pd.DataFrame:
+        """Sadece istenen sütunları hesaplayıp DataFrame olarak döndürür."""
+        return pd.DataFrame({column: self.get(column) for column in columns}, index=self.df.index)
+
+    def last_row(self, columns: Sequence[str]) -> Dict:
+        """Canlı döngü için: istenen sütunların son bar değerleri."""
+        return {column: self.get(column).iloc[-1] for column in columns}
+
+
+def required_columns(*strategies) -> List[str]:
+    """Stratejilerin (REQUIRED_COLUMNS beyan eden modül/nesne ya da liste) sütun birleşimi."""
+    columns: List[str] = []
+    for strategy in strategies:
+        declared = strategy if isinstance(strategy, (list, tuple)) else getattr(strategy, 'REQUIRED_COLUMNS')
+        for column in declared:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+# ─── Temel İndikatörler ───────────────────────────────────────────────────────
+
+@register('atr', inputs=['high', 'low', 'close'], outputs=['atr'], window=14)
+def _atr(inputs, index, symbol, window):
+    return {'atr': calculate_atr(pd.DataFrame(inputs, index=index), window=window)}
+
+
+@register('pct_atr', inputs=['atr', 'close'], outputs=['pct_atr'])
+def _pct_atr(inputs, index, symbol):
+    return {'pct_atr': (inputs['atr'] / inputs['close']) * 100}
+
+
+@register('z', inputs=['close', 'atr'], outputs=['z'])
+def _z(inputs, index, symbol):
+    return {'z': calculate_z(pd.DataFrame(inputs, index=index), symbol=symbol)}
+
+
+@register('pct_z', inputs=['z', 'close'], outputs=['pct_z'])
+def _pct_z(inputs, index, symbol):
+    return {'pct_z': (inputs['z'] / inputs['close']) * 100}
+
+
+# ─── Pivot Ailesi (zigzag çarpanı başına) ─────────────────────────────────────
+
+def register_pivot_family(
+    suffix:   str,
+    atr_mult: float,
+    atr_col:  str = 'z',
+    lookback: int = BREAKOUT_LOOKBACK,
+    registry: Optional[Dict] = None,
+) -> None:
+    """
+    Bir zigzag çarpanı için pivot, yapı ve kırılım düğümlerini kaydeder.
+    Farklı çarpanlar (ör. _2x, _3x) atr/z düğümlerini paylaşır.
+    """
+    raw = ['high_pivot', 'low_pivot', 'high_pivot_atr', 'low_pivot_atr',
+           'high_pivot_confirmed', 'low_pivot_confirmed', 'pivot_bars_ago']
+    events = f"pivot_events{suffix}"
+
+    @register(f"zigzag{suffix}", inputs=['close', atr_col], outputs=[f"{name}{suffix}" for name in raw] + [events],
+              registry=registry, atr_mult=atr_mult)
+    def _zigzag(inputs, index, symbol, atr_mult):
+        table = zigzag_events(inputs['close'].to_numpy(), inputs[atr_col].to_numpy(), atr_mult)
+        out = {f"{name}{suffix}": pd.Series(values, index=index)
+               for name, values in pivot_columns(table, len(index)).items()}
+        out[events] = table  # seyrek pivot tablosu (sütun değil)
+        return out
+
+    @register(f"pivot_filled{suffix}", inputs=[f"high_pivot{suffix}", f"low_pivot{suffix}"],
+              outputs=[f"high_pivot_filled{suffix}", f"low_pivot_filled{suffix}"], registry=registry)
+    def _filled(inputs, index, symbol):
+        return {f"high_pivot_filled{suffix}": inputs[f"high_pivot{suffix}"].ffill(),
+                f"low_pivot_filled{suffix}": inputs[f"low_pivot{suffix}"].ffill()}
+
+    @register(f"pivot_atr_filled{suffix}", inputs=[f"high_pivot_atr{suffix}", f"low_pivot_atr{suffix}"],
+              outputs=[f"high_pivot_atr_filled{suffix}", f"low_pivot_atr_filled{suffix}"], registry=registry)
+    def _atr_filled(inputs, index, symbol):
+        return {f"high_pivot_atr_filled{suffix}": inputs[f"high_pivot_atr{suffix}"].ffill(),
+                f"low_pivot_atr_filled{suffix}": inputs[f"low_pivot_atr{suffix}"].ffill()}
+
+    @register(f"pivot_confirmed_filled{suffix}",
+              inputs=[f"high_pivot_confirmed{suffix}", f"low_pivot_confirmed{suffix}"],
+              outputs=[f"high_pivot_confirmed_filled{suffix}", f"low_pivot_confirmed_filled{suffix}"],
+              registry=registry)
+    def _confirmed_filled(inputs, index, symbol):
+        return {f"{side}_pivot_confirmed_filled{suffix}": inputs[f"{side}_pivot_confirmed{suffix}"].cummax()
+                for side in ('high', 'low')}
+
+    @register(f"pivot_bars_ago_filled{suffix}", inputs=[f"pivot_bars_ago{suffix}"],
+              outputs=[f"pivot_bars_ago_filled{suffix}"], registry=registry)
+    def _bars_ago_filled(inputs, index, symbol):
+        return {f"pivot_bars_ago_filled{suffix}":
+                pd.Series(fill_pivot_bars_ago(inputs[f"pivot_bars_ago{suffix}"].to_numpy()), index=index)}
+
+    @register(f"structure{suffix}", inputs=[f"high_pivot_filled{suffix}", f"low_pivot_filled{suffix}"],
+              outputs=[f"high_structure{suffix}", f"low_structure{suffix}"], registry=registry)
+    def _structure(inputs, index, symbol):
+        df = add_structure(pd.DataFrame(inputs, index=index), suffix=suffix)
+        return {col: df[col] for col in (f"high_structure{suffix}", f"low_structure{suffix}")}
+
+    @register(f"breakout{suffix}",
+              inputs=['close', 'z', 'pct_atr', f"high_pivot_filled{suffix}", f"low_pivot_filled{suffix}",
+                      f"high_pivot_confirmed{suffix}", f"low_pivot_confirmed{suffix}",
+                      f"high_structure{suffix}", f"low_structure{suffix}"],
+              outputs=[f"pivot_go_breakout{suffix}", f"pivot_go_breakdown{suffix}"], registry=registry,
+              lookback=lookback)
+    def _breakout(inputs, index, symbol, lookback):
+        df = add_breakout_signals(pd.DataFrame(inputs, index=index), symbol, suffix=suffix, lookback=lookback)
+        return {col: df[col] for col in (f"pivot_go_breakout{suffix}", f"pivot_go_breakdown{suffix}")}
+
+
+register_pivot_family('_2x', atr_mult=2)
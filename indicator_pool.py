@@ -0,0 +1,242 @@
+import time
+import logging
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def _attach(name: str, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _worker_loop(tasks, results, shm_names, n_sym: int, max_bars: int, symbols: List[str], mode: str,
+                 worker: int = 0, fields: Optional[List[str]] = None) -> None:
+    """
+    Süreç içinde sürekli çalışır: shared memory'ye bir kez bağlanır, her mumda
+    kendi sembol dilimini hesaplar ve sadece son satırın `fields` alanlarını
+    (None: tüm sütunlar) geri yollar.
+    Mesajlar işçinin kendi pipe'ına (results) gider; görevin son mesajı (cycle, worker, out):
+    ana süreç işçinin bloğu bıraktığını buradan bilir.
+    """
+    from indicators import calculate_indicators, calculate_indicators_panel, panel_last_rows
+    from panel import align_frames
+
+    shm_ohlcv, ohlcv = _attach(shm_names[0], (n_sym, max_bars, len(OHLCV_FIELDS)), np.float64)
+    shm_times, times = _attach(shm_names[1], (n_sym, max_bars), np.int64)
+    shm_lens, lengths = _attach(shm_names[2], (n_sym,), np.int64)
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            cycle, indices = task
+
+            frames = {}
+            for j in indices:
+                n = int(lengths[j])
+                if n == 0:
+                    continue
+                index = pd.DatetimeIndex(times[j, :n].copy()).tz_localize('UTC')
+                frames[symbols[j]] = pd.DataFrame(ohlcv[j, :n].copy(), index=index, columns=OHLCV_FIELDS)
+
+            out = {symbols[j]: None for j in indices}
+            try:
+                if mode == 'panel' and frames:
+                    panel = calculate_indicators_panel(align_frames(frames, OHLCV_FIELDS))
+                    out.update(panel_last_rows(panel, columns=fields))
+                else:
+                    for symbol, df in frames.items():
+                        try:
+                            df = calculate_indicators(df, symbol)
+                            names = fields if fields is not None else df.columns
+                            out[symbol] = {name: df[name].to_numpy()[-1] for name in names}
+                            out[symbol]['bar_time'] = int(df.index[-1].value)
+                        except Exception as e:
+                            out[symbol] = None
+                            results.send((cycle, worker, {'__error__': f"{symbol}: {e}"}))
+            except Exception as e:
+                results.send((cycle, worker, {'__error__': str(e)}))
+            results.send((cycle, worker, out))
+    finally:
+        results.close()
+        for shm in (shm_ohlcv, shm_times, shm_lens):
+            shm.close()
+
+
+class IndicatorPool:
+    """
+    Sembolleri süreçlere bölen kalıcı indikatör havuzu.
+
+    OHLCV pickle edilmez: ana süreç her mumda barları (sembol × bar × alan)
+    shared memory bloğuna kopyalar, işçiler aynı bloğu okur. İşçiler mumlar
+    arasında açık kalır (import ve bağlantı maliyeti bir kez ödenir).
+
+    Zaman aşımına uğrayan işçi bloğu hâlâ okuyor olabilir: sonraki mumda blok
+    yazılmadan önce geç cevaplar toplanır, hâlâ cevap vermeyen işçi durdurulup
+    yeniden başlatılır (yarım yazılmış barları okuyamaz). Her işçinin cevap pipe'ı
+    ayrıdır: durdurulan işçi diğerlerinin kanalını bozamaz.
+    """
+
+    def __init__(
+        self,
+        symbols:  List[str],
+        workers:  int,
+        max_bars: int = 1000,
+        mode:     str = 'frame',
+        timeout:  float = 30.0,
+        fields:   Optional[Sequence[str]] = None,
+    ):
+        self.symbols  = list(symbols)
+        self.fields   = list(fields) if fields is not None else None
+        self.max_bars = max_bars
+        self.mode     = mode
+        self.timeout  = timeout
+        self._cycle   = 0
+        self._ctx     = mp.get_context('spawn')
+
+        n_sym = len(self.symbols)
+        self._shm = [
+            shared_memory.SharedMemory(create=True, size=max(1, n_sym * max_bars * len(OHLCV_FIELDS) * 8)),
+            shared_memory.SharedMemory(create=True, size=max(1, n_sym * max_bars * 8)),
+            shared_memory.SharedMemory(create=True, size=max(1, n_sym * 8)),
+        ]
+        self._ohlcv   = np.ndarray((n_sym, max_bars, len(OHLCV_FIELDS)), dtype=np.float64, buffer=self._shm[0].buf)
+        self._times   = np.ndarray((n_sym, max_bars), dtype=np.int64, buffer=self._shm[1].buf)
+        self._lengths = np.ndarray((n_sym,), dtype=np.int64, buffer=self._shm[2].buf)
+        self._lengths[:] = 0
+
+        # Sabit parçalama: her sembol hep aynı işçide
+        workers       = max(1, min(workers, n_sym))
+        self._shards  = [list(range(w, n_sym, workers)) for w in range(workers)]
+        self._tasks   = []
+        self._conns   = []  # işçi başına cevap pipe'ı (okuma ucu)
+        self._procs   = []
+        self._busy: Dict[int, int] = {}  # işçi → cevabı beklenen tur (bloğu okuyor olabilir)
+        for w in range(workers):
+            self._start_worker(w)
+        logger.info("İndikatör havuzu başlatıldı | İşçi: %d | Sembol: %d | Mod: %s", workers, n_sym, mode)
+
+    def _start_worker(self, w: int) -> None:
+        tasks = self._ctx.Queue()
+        conn, results = self._ctx.Pipe(duplex=False)
+        proc  = self._ctx.Process(
+            target=_worker_loop,
+            args=(tasks, results, [s.name for s in self._shm], len(self.symbols),
+                  self.max_bars, self.symbols, self.mode, w, self.fields),
+            daemon=True,
+            name=f"indicator-worker-{w}",
+        )
+        proc.start()
+        results.close()  # yazma ucu işçide; işçi ölünce okuma EOFError verir
+        if w < len(self._procs):
+            self._conns[w].close()
+            self._tasks[w], self._conns[w], self._procs[w] = tasks, conn, proc
+        else:
+            self._tasks.append(tasks)
+            self._conns.append(conn)
+            self._procs.append(proc)
+
+    def _receive(self, w: int, results: Dict[str, Optional[Dict]], cycle: int) -> None:
+        """İşçinin pipe'ındaki bir mesajı işler; görevin son mesajıysa işçi artık bloğu okumuyor."""
+        try:
+            got_cycle, _, out = self._conns[w].recv()
+        except (EOFError, OSError):
+            logger.error("%s cevap vermeden kapandı", self._procs[w].name)
+            self._busy.pop(w, None)
+            return
+        if '__error__' in out:
+            if got_cycle == cycle:
+                logger.error("İndikatör işçisi hatası: %s", out['__error__'])
+            return
+        if self._busy.get(w) == got_cycle:
+            del self._busy[w]
+        if got_cycle == cycle:
+            results.update(out)
+
+    # ─── Hesaplama ────────────────────────────────────────────────────────────
+
+    def _settle(self, grace: float = 0.1) -> None:
+        """Önceki turların geç cevaplarını atar; hâlâ meşgul işçileri yeniden başlatır (blok yazılmadan önce)."""
+        deadline = time.monotonic() + grace
+        while self._busy:
+            ready = wait([self._conns[w] for w in self._busy], timeout=max(0.0, deadline - time.monotonic()))
+            if not ready:
+                break
+            for w in [w for w in list(self._busy) if self._conns[w] in ready]:
+                self._receive(w, {}, cycle=-1)
+        for w in list(self._busy):
+            proc = self._procs[w]
+            logger.warning("%s önceki turdan hâlâ meşgul — blok yazılmadan önce yeniden başlatılıyor", proc.name)
+            proc.terminate()
+            proc.join(timeout=5)
+            self._start_worker(w)
+            del self._busy[w]
+
+    def compute(self, frames: Dict[str, Optional[pd.DataFrame]]) -> Dict[str, Optional[Dict]]:
+        """Barları shared memory'ye yazar, işçileri tetikler, son satır dict'lerini toplar."""
+        self._settle()
+        self._cycle += 1
+        cycle = self._cycle
+
+        for j, symbol in enumerate(self.symbols):
+            df = frames.get(symbol)
+            if df is None or df.empty:
+                self._lengths[j] = 0
+                continue
+            df = df.iloc[-self.max_bars:]
+            n  = len(df)
+            self._ohlcv[j, :n] = df[OHLCV_FIELDS].to_numpy(dtype=np.float64)
+            self._times[j, :n] = df.index.as_unit('ns').asi8
+            self._lengths[j]   = n
+
+        for w, proc in enumerate(self._procs):
+            if not proc.is_alive():
+                logger.warning("%s durmuş, yeniden başlatılıyor", proc.name)
+                self._start_worker(w)
+            self._tasks[w].put((cycle, self._shards[w]))
+            self._busy[w] = cycle
+
+        results: Dict[str, Optional[Dict]] = {symbol: None for symbol in self.symbols}
+        deadline = time.monotonic() + self.timeout
+        while True:
+            pending = [w for w, busy in self._busy.items() if busy == cycle]
+            if not pending:
+                break
+            ready = wait([self._conns[w] for w in pending], timeout=max(0.0, deadline - time.monotonic()))
+            if not ready:
+                logger.error("İndikatör havuzu zaman aşımı (%d işçi cevap vermedi)", len(pending))
+                break
+            for w in pending:
+                if self._conns[w] in ready:
+                    self._receive(w, results, cycle)
+        return results
+
+    def close(self) -> None:
+        for tasks in self._tasks:
+            tasks.put(None)
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns:
+            conn.close()
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
+        logger.info("İndikatör havuzu kapatıldı")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
-from config import atr_ranges,Z_INDICATOR_PARAMS, Z_RANGES
+from config import atr_ranges,Z_INDICATOR_PARAMS, Z_RANGES, BREAKOUT_LOOKBACK
+import kernels
 import warnings
 warnings.filterwarnings('ignore', category=FutureWarning)
 
@@ -14,112 +15,94 @@ def calculate_atr(price_data, window=14):
     tr2 = abs(high - previous_close)
     tr3 = abs(low - previous_close)
     true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    atr = true_range.ewm(alpha=1/window, adjust=False).mean()
-    return atr
-
-def atr_zigzag_two_columns(df, atr_col="atr", close_col="close", atr_mult=1, suffix=""): 
-    closes = df[close_col].values
-    atrs = df[atr_col].values
-
-    high_pivot = [None] * len(df)
-    low_pivot = [None] * len(df)
-    high_pivot_atr = [None] * len(df)
-    low_pivot_atr = [None] * len(df)
-    high_pivot_confirmed = [0] * len(df)
-    low_pivot_confirmed = [0] * len(df)
-    pivot_bars_ago = [None] * len(df)
-
-    last_pivot = closes[0]
-    last_atr = atrs[0]
-    last_pivot_idx = 0
-    direction = None
-
-    for i in range(1, len(df)):
-        price = closes[i]
-        atr = atrs[i] * atr_mult
+    atr = kernels.ewm_mean(true_range.to_numpy(), 1/window)
+    return pd.Series(atr, index=price_data.index)
+
+# --- Zigzag ---
+# Pivotlar seyrek bir olay tablosunda tutulur (satır başına bir pivot); DataFrame'e
+# yazılan yoğun sütunlar bu tablodan NaN'li float64 / int32 olarak türetilir.
+PIVOT_HIGH, PIVOT_LOW = 1, -1
+PIVOT_EVENT_DTYPES = {'index': np.int64, 'confirmed_at': np.int64, 'price': np.float64,
+                      'atr': np.float64, 'type': np.int8}
+
+
+def zigzag_events(closes, atrs, atr_mult=1):
+    """
+    Zigzag durum makinesi (kernels.zigzag). Döndürür: pivot olay tablosu
+    (index: pivot barı, confirmed_at: onay barı ya da -1, price, atr, type: PIVOT_HIGH/PIVOT_LOW).
+    """
+    arrays = kernels.zigzag(closes, atrs, atr_mult)
+    return pd.DataFrame({col: values.astype(dtype, copy=False)
+                         for (col, dtype), values in zip(PIVOT_EVENT_DTYPES.items(), arrays)})
+
+
+def pivot_columns(events, n):
+    """
+    Olay tablosundan yoğun ham sütunlar: pivot fiyat/atr float64 (NaN: pivot yok),
+    onay bayrakları int32 (0/1), pivot_bars_ago float64 (onay barında pivot yaşı).
+    Aynı bara iki kez yazılan pivotta son olay geçerlidir.
+    """
+    out = {
+        'high_pivot': np.full(n, np.nan), 'low_pivot': np.full(n, np.nan),
+        'high_pivot_atr': np.full(n, np.nan), 'low_pivot_atr': np.full(n, np.nan),
+        'high_pivot_confirmed': np.zeros(n, dtype=np.int32), 'low_pivot_confirmed': np.zeros(n, dtype=np.int32),
+        'pivot_bars_ago': np.full(n, np.nan),
+    }
+    index = events['index'].to_numpy()
+    confirmed_at = events['confirmed_at'].to_numpy()
+    for side, pivot_type in (('high', PIVOT_HIGH), ('low', PIVOT_LOW)):
+        mask = events['type'].to_numpy() == pivot_type
+        out[f'{side}_pivot'][index[mask]] = events['price'].to_numpy()[mask]
+        out[f'{side}_pivot_atr'][index[mask]] = events['atr'].to_numpy()[mask]
+        confirmed = mask & (confirmed_at >= 0)
+        out[f'{side}_pivot_confirmed'][confirmed_at[confirmed]] = 1
+    confirmed = confirmed_at >= 0
+    out['pivot_bars_ago'][confirmed_at[confirmed]] = confirmed_at[confirmed] - index[confirmed]
+    return out
+
+
+def _ffill_index(valid):
+    """Her hücre için (eksen 0'da) son geçerli satırın index'i (yoksa -1). 1-D ve 2-D."""
+    rows = np.arange(valid.shape[0]).reshape((-1,) + (1,) * (valid.ndim - 1))
+    return np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+
 
-        if direction is None:
-            if price >= last_pivot + atr:
-                direction = "up"
-                last_pivot = closes[last_pivot_idx]
-                high_pivot[last_pivot_idx] = last_pivot
-                high_pivot_atr[last_pivot_idx] = atrs[last_pivot_idx]
-            elif price <= last_pivot - atr:
-                direction = "down"
-                last_pivot = closes[last_pivot_idx]
-                low_pivot[last_pivot_idx] = last_pivot
-                low_pivot_atr[last_pivot_idx] = atrs[last_pivot_idx]
-
-        elif direction == "up":
-            if price <= (last_pivot - atr):
-                high_pivot[last_pivot_idx] = last_pivot
-                high_pivot_atr[last_pivot_idx] = atrs[last_pivot_idx]
-                high_pivot_confirmed[i] = 1
-                pivot_bars_ago[i] = i - last_pivot_idx
-
-                direction = "down"
-                last_pivot = price
-                last_pivot_idx = i
-            elif price > last_pivot:
-                last_pivot = price
-                last_pivot_idx = i
-
-        elif direction == "down":
-            if price >= (last_pivot + atr):
-                low_pivot[last_pivot_idx] = last_pivot
-                low_pivot_atr[last_pivot_idx] = atrs[last_pivot_idx]
-                low_pivot_confirmed[i] = 1
-                pivot_bars_ago[i] = i - last_pivot_idx
-
-                direction = "up"
-                last_pivot = price
-                last_pivot_idx = i
-            elif price < last_pivot:
-                last_pivot = price
-                last_pivot_idx = i
+def ffill_array(values):
+    """Float dizide eksen 0 boyunca ileri doldurma (Series.ffill ile aynı, object yolu yok)."""
+    last = _ffill_index(~np.isnan(values))
+    out = np.take_along_axis(values, np.maximum(last, 0), axis=0)
+    out[last < 0] = np.nan
+    return out
+
+
+def fill_pivot_bars_ago(pivot_bars_ago):
+    """Son pivottan bu yana geçen bar sayısını ileri taşır (ilk pivottan önce NaN)."""
+    pivot_bars_ago = np.asarray(pivot_bars_ago, dtype=np.float64)
+    last = _ffill_index(~np.isnan(pivot_bars_ago))
+    rows = np.arange(pivot_bars_ago.shape[0]).reshape(last.shape[:1] + (1,) * (last.ndim - 1))
+    filled = np.take_along_axis(pivot_bars_ago, np.maximum(last, 0), axis=0) + (rows - last)
+    filled[last < 0] = np.nan
+    return filled
+
+
+def atr_zigzag_two_columns(df, atr_col="atr", close_col="close", atr_mult=1, suffix=""):
+    events = zigzag_events(df[close_col].to_numpy(), df[atr_col].to_numpy(), atr_mult)
+    raw = pivot_columns(events, len(df))
 
     # Sütun isimlerine suffix ekle
-    df[f"high_pivot{suffix}"] = high_pivot
-    df[f"low_pivot{suffix}"] = low_pivot
-    df[f"high_pivot_atr{suffix}"] = high_pivot_atr
-    df[f"low_pivot_atr{suffix}"] = low_pivot_atr
-    df[f"high_pivot_confirmed{suffix}"] = high_pivot_confirmed
-    df[f"low_pivot_confirmed{suffix}"] = low_pivot_confirmed
-    df[f"pivot_bars_ago{suffix}"] = pivot_bars_ago
+    for name, values in raw.items():
+        df[f"{name}{suffix}"] = values
 
     # Forward fill işlemleri - suffix eklenmiş isimlerle
-    df[f"high_pivot_filled{suffix}"] = df[f"high_pivot{suffix}"].ffill()
-    df[f"low_pivot_filled{suffix}"] = df[f"low_pivot{suffix}"].ffill()
-    df[f"high_pivot_atr_filled{suffix}"] = df[f"high_pivot_atr{suffix}"].ffill()
-    df[f"low_pivot_atr_filled{suffix}"] = df[f"low_pivot_atr{suffix}"].ffill()
-
-    # High pivot confirmed - suffix ile
-    high_temp = df[f"high_pivot_confirmed{suffix}"].replace(0, np.nan)
-    high_temp = high_temp.ffill()
-    df[f"high_pivot_confirmed_filled{suffix}"] = high_temp.fillna(0).astype(int)
-    
-    # Low pivot confirmed - suffix ile
-    low_temp = df[f"low_pivot_confirmed{suffix}"].replace(0, np.nan)
-    low_temp = low_temp.ffill()
-    df[f"low_pivot_confirmed_filled{suffix}"] = low_temp.fillna(0).astype(int)
+    for name in ('high_pivot', 'low_pivot', 'high_pivot_atr', 'low_pivot_atr'):
+        df[f"{name}_filled{suffix}"] = ffill_array(raw[name])
+
+    # Onay bayrağı bir kez 1 olduktan sonra 1 kalır
+    df[f"high_pivot_confirmed_filled{suffix}"] = np.maximum.accumulate(raw['high_pivot_confirmed'])
+    df[f"low_pivot_confirmed_filled{suffix}"] = np.maximum.accumulate(raw['low_pivot_confirmed'])
 
     # Pivot bars ago filled
-    pivot_bars_filled = []
-    last_valid_value = None
-    last_valid_index = None
-
-    for i, value in enumerate(pivot_bars_ago):
-        if value is not None:
-            last_valid_value = value
-            last_valid_index = i
-            pivot_bars_filled.append(value)
-        elif last_valid_value is not None:
-            new_value = last_valid_value + (i - last_valid_index)
-            pivot_bars_filled.append(new_value)
-        else:
-            pivot_bars_filled.append(None)
-
-    df[f"pivot_bars_ago_filled{suffix}"] = pivot_bars_filled
+    df[f"pivot_bars_ago_filled{suffix}"] = fill_pivot_bars_ago(raw['pivot_bars_ago'])
 
     return df
 
@@ -141,6 +124,79 @@ def calculate_z(df, symbol):
     
     return z
 
+# --- Structure ---
+# Yapı durumu int8 kod olarak tutulur; etiket sadece gösterim için.
+STRUCTURE_LABELS = {1: 'HH', 2: 'LH', 3: 'HL', 4: 'LL'}
+STRUCTURE_HH, STRUCTURE_LH, STRUCTURE_HL, STRUCTURE_LL = 1, 2, 3, 4
+
+
+def structure_labels(codes):
+    """int8 yapı kodlarını 'HH'/'LH'/'HL'/'LL' etiketlerine çevirir (log/rapor için)."""
+    return pd.Series(codes).map(STRUCTURE_LABELS)
+
+
+def _structure_codes(filled, up_code, down_code, default):
+    """Dolu pivot seviyesi yükselince up_code, düşünce down_code; aradaki barlar son kodu taşır."""
+    prev = np.concatenate([np.full_like(filled[:1], np.nan), filled[:-1]])
+    event = np.where(filled < prev, down_code, np.where(filled > prev, up_code, 0)).astype(np.int8)
+    last = _ffill_index(event != 0)
+    codes = np.take_along_axis(event, np.maximum(last, 0), axis=0)
+    codes[last < 0] = default
+    return codes
+
+
+def _lookback_extremes(close, lookback):
+    """Her bar için önceki `lookback` kapanışın max/min'i (bar dahil değil); eksik geçmişte NaN."""
+    prev_max = np.full_like(close, np.nan)
+    prev_min = np.full_like(close, np.nan)
+    if close.shape[0] > lookback:
+        windows = np.lib.stride_tricks.sliding_window_view(close[:-1], lookback, axis=0)
+        prev_max[lookback:] = windows.max(axis=-1)
+        prev_min[lookback:] = windows.min(axis=-1)
+    return prev_max, prev_min
+
+
+def add_structure(df, suffix='_2x'):
+    """Pivot seviyelerinden yapı kodları: high → HH/LH, low → HL/LL (int8, STRUCTURE_LABELS)."""
+    high_filled = df[f'high_pivot_filled{suffix}'].to_numpy(dtype=np.float64)
+    low_filled = df[f'low_pivot_filled{suffix}'].to_numpy(dtype=np.float64)
+
+    df[f'high_structure{suffix}'] = _structure_codes(high_filled, STRUCTURE_HH, STRUCTURE_LH, STRUCTURE_HH)
+    df[f'low_structure{suffix}'] = _structure_codes(low_filled, STRUCTURE_HL, STRUCTURE_LL, STRUCTURE_LL)
+    return df
+
+# --- Breakout Signals ---
+def add_breakout_signals(df, symbol, suffix='_2x', lookback=BREAKOUT_LOOKBACK):
+    """
+    Kırılım: yapı uygun, kapanış pivot seviyesini 0.1·z geçmiş ve pct_atr aralıkta;
+    ya pivot bu barda onaylanmış ya da önceki `lookback` kapanışın hepsi seviyenin gerisinde.
+    """
+    low_atr, high_atr = atr_ranges[symbol]
+    close = df['close'].to_numpy(dtype=np.float64)
+    z = df['z'].to_numpy(dtype=np.float64)
+    pct_atr = df['pct_atr'].to_numpy(dtype=np.float64)
+    high_filled = df[f'high_pivot_filled{suffix}'].to_numpy(dtype=np.float64)
+    low_filled = df[f'low_pivot_filled{suffix}'].to_numpy(dtype=np.float64)
+    high_structure = df[f'high_structure{suffix}'].to_numpy()
+    low_structure = df[f'low_structure{suffix}'].to_numpy()
+
+    long_break = high_filled + 0.1 * z
+    short_break = low_filled - 0.1 * z
+    in_range = (low_atr < pct_atr) & (pct_atr < high_atr)
+
+    long_base = (low_structure == STRUCTURE_HL) & (high_structure != STRUCTURE_HH) & \
+        ~np.isnan(high_filled) & (close > long_break) & in_range
+    short_base = (high_structure == STRUCTURE_LH) & (low_structure != STRUCTURE_LL) & \
+        ~np.isnan(low_filled) & (close < short_break) & in_range
+
+    prev_max, prev_min = _lookback_extremes(close, lookback)
+    low_confirmed = df[f'low_pivot_confirmed{suffix}'].to_numpy() != 0
+    high_confirmed = df[f'high_pivot_confirmed{suffix}'].to_numpy() != 0
+
+    df[f'pivot_go_breakout{suffix}'] = long_base & (low_confirmed | (prev_max < long_break))
+    df[f'pivot_go_breakdown{suffix}'] = short_base & (high_confirmed | (prev_min > short_break))
+    return df
+
 # --- Calculations ---
 def calculate_indicators(df, symbol):
     df['atr'] = calculate_atr(df)
@@ -153,71 +209,181 @@ def calculate_indicators(df, symbol):
     df = atr_zigzag_two_columns(df, atr_col="z", close_col="close", atr_mult=2, suffix='_2x')
     #df = atr_zigzag_two_columns(df, atr_col="z", close_col="close", atr_mult=3, suffix='_3x')
 
-    df.loc[df['high_pivot_filled_2x'] < df['high_pivot_filled_2x'].shift(1), 'high_structure_2x'] = 'LH'
-    df.loc[df['high_pivot_filled_2x'] > df['high_pivot_filled_2x'].shift(1), 'high_structure_2x'] = 'HH'
-    df.loc[df['low_pivot_filled_2x'] < df['low_pivot_filled_2x'].shift(1), 'low_structure_2x'] = 'LL'
-    df.loc[df['low_pivot_filled_2x'] > df['low_pivot_filled_2x'].shift(1), 'low_structure_2x'] = 'HL'
-    
-    df['high_structure_2x'] = df['high_structure_2x'].ffill().fillna('HH')
-    df['low_structure_2x'] = df['low_structure_2x'].ffill().fillna('LL')
-    
-    df['pivot_go_breakout_2x'] = False
-    df['pivot_go_breakdown_2x'] = False
-
-    long_break_condition = (df['high_pivot_filled_2x'] + 0.1*df['z'])
-    short_break_condition = (df['low_pivot_filled_2x'] - 0.1*df['z']) 
-    
-    df.loc[(df['low_pivot_confirmed_2x']) & 
-           (df['low_structure_2x']=='HL') & 
-           (df['high_structure_2x']!='HH') & 
-           (df['high_pivot_filled_2x'].notna()) &  
-           (df['close'] > long_break_condition) & 
-           (atr_ranges[symbol][0] < df['pct_atr']) & 
-           (df['pct_atr'] < atr_ranges[symbol][1]), 'pivot_go_breakout_2x'] = True
-    
-    df.loc[(df['high_pivot_confirmed_2x']) & 
-           (df['high_structure_2x']=='LH') & 
-           (df['low_structure_2x']!='LL') & 
-           (df['low_pivot_filled_2x'].notna()) &  
-           (df['close'] < short_break_condition) & 
-           (atr_ranges[symbol][0] < df['pct_atr']) & 
-           (df['pct_atr'] < atr_ranges[symbol][1]), 'pivot_go_breakdown_2x'] = True
-    
-    low_atr = atr_ranges[symbol][0]
-    high_atr = atr_ranges[symbol][1]
-    
-    # NaN Control long conditions
-    long_shift_condition = pd.Series(True, index=df.index)
-    for i in range(1, 6):
-        long_shift_condition &= (df['close'].shift(i) < long_break_condition)
-    
-    short_shift_condition = pd.Series(True, index=df.index)
-    for i in range(1, 6):
-        short_shift_condition &= (df['close'].shift(i) > short_break_condition)
-    
-    second_long_condition = (
-        (df['low_structure_2x'] == 'HL') & 
-        long_shift_condition & 
-        (df['high_structure_2x'] != 'HH') & 
-        (df['high_pivot_filled_2x'].notna()) & 
-        (df['close'] > long_break_condition) & 
-        (low_atr < df['pct_atr']) & 
-        (df['pct_atr'] < high_atr) & 
-        (df['pivot_go_breakout_2x'] == False)
-    )   
-    
-    second_short_condition = (
-        (df['low_structure_2x'] != 'LL') & 
-        short_shift_condition & 
-        (df['high_structure_2x'] == 'LH') & 
-        (df['low_pivot_filled_2x'].notna()) & 
-        (df['close'] < short_break_condition) & 
-        (low_atr < df['pct_atr']) & 
-        (df['pct_atr'] < high_atr) & 
-        (df['pivot_go_breakdown_2x'] == False)
-    )
-    
-    df.loc[second_long_condition,'pivot_go_breakout_2x'] = True
-    df.loc[second_short_condition,'pivot_go_breakdown_2x'] = True
+    df = add_structure(df, suffix='_2x')
+    df = add_breakout_signals(df, symbol, suffix='_2x')
     
     return df
+
+
+# --- Panel (time × symbol) ---
+# Tüm semboller 2-D dizilerde aynı anda hesaplanır; sembol bazlı eşikler
+# (atr_ranges, Z_RANGES) sütunlara yayınlanır. Zaman döngüsü tek, sembol
+# sayısı sadece vektör genişliğini büyütür.
+
+def _ewm_panel(values, alpha):
+    """pandas ewm(alpha, adjust=False).mean() ile aynı özyineleme, sütun bazında; NaN'de durum korunur."""
+    out = kernels.ewm_mean(values, alpha, ignore_na=True)
+    out[np.isnan(values)] = np.nan
+    return out
+
+
+def atr_zigzag_panel(closes, atrs, atr_mult=1):
+    """atr_zigzag_two_columns'un (time × symbol) sürümü. Ham pivot dizilerini döndürür."""
+    n_bars, n_sym = closes.shape
+    cols = np.arange(n_sym)
+
+    high_pivot = np.full((n_bars, n_sym), np.nan)
+    low_pivot = np.full((n_bars, n_sym), np.nan)
+    high_pivot_atr = np.full((n_bars, n_sym), np.nan)
+    low_pivot_atr = np.full((n_bars, n_sym), np.nan)
+    high_confirmed = np.zeros((n_bars, n_sym), dtype=np.int32)
+    low_confirmed = np.zeros((n_bars, n_sym), dtype=np.int32)
+    bars_ago = np.full((n_bars, n_sym), np.nan)
+
+    valid = ~np.isnan(closes)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), n_bars)
+    start = np.minimum(first, n_bars - 1)
+
+    last_pivot = closes[start, cols].copy()
+    last_idx = start.copy()
+    direction = np.zeros(n_sym, dtype=np.int8)  # 0: yok, 1: up, -1: down
+
+    for i in range(1, n_bars):
+        active = (i > first) & valid[i]
+        if not active.any():
+            continue
+        price = closes[i]
+        atr = atrs[i] * atr_mult
+        d0 = direction.copy()
+
+        none = active & (d0 == 0)
+        start_up = none & (price >= last_pivot + atr)
+        start_down = none & ~start_up & (price <= last_pivot - atr)
+        if start_up.any():
+            j = cols[start_up]
+            high_pivot[last_idx[j], j] = last_pivot[j]
+            high_pivot_atr[last_idx[j], j] = atrs[last_idx[j], j]
+            direction[j] = 1
+        if start_down.any():
+            j = cols[start_down]
+            low_pivot[last_idx[j], j] = last_pivot[j]
+            low_pivot_atr[last_idx[j], j] = atrs[last_idx[j], j]
+            direction[j] = -1
+
+        up = active & (d0 == 1)
+        turn_down = up & (price <= last_pivot - atr)
+        higher = up & ~turn_down & (price > last_pivot)
+        down = active & (d0 == -1)
+        turn_up = down & (price >= last_pivot + atr)
+        lower = down & ~turn_up & (price < last_pivot)
+
+        if turn_down.any():
+            j = cols[turn_down]
+            high_pivot[last_idx[j], j] = last_pivot[j]
+            high_pivot_atr[last_idx[j], j] = atrs[last_idx[j], j]
+            high_confirmed[i, j] = 1
+            bars_ago[i, j] = i - last_idx[j]
+            direction[j] = -1
+        if turn_up.any():
+            j = cols[turn_up]
+            low_pivot[last_idx[j], j] = last_pivot[j]
+            low_pivot_atr[last_idx[j], j] = atrs[last_idx[j], j]
+            low_confirmed[i, j] = 1
+            bars_ago[i, j] = i - last_idx[j]
+            direction[j] = 1
+
+        moved = turn_down | higher | turn_up | lower
+        last_pivot = np.where(moved, price, last_pivot)
+        last_idx = np.where(moved, i, last_idx)
+
+    return high_pivot, low_pivot, high_pivot_atr, low_pivot_atr, high_confirmed, low_confirmed, bars_ago
+
+
+def calculate_indicators_panel(panel, lookback=BREAKOUT_LOOKBACK):
+    """
+    calculate_indicators'ın tüm semboller için tek seferde hesaplanan sürümü.
+    `panel`: panel.Panel (en az high, low, close). Sonuç sütunları panel'e eklenir.
+    Yapı sütunları int8 kodlardır (STRUCTURE_LABELS).
+    """
+    symbols = panel.symbols
+    missing = [s for s in symbols if s not in Z_RANGES or s not in atr_ranges]
+    if missing:
+        raise ValueError(f"Z_RANGES / atr_ranges'de {missing} için değer tanımlanmamış!")
+
+    high, low, close = panel['high'], panel['low'], panel['close']
+    pct_min = panel.per_symbol({s: Z_RANGES[s][0] for s in symbols})
+    pct_max = panel.per_symbol({s: Z_RANGES[s][1] for s in symbols})
+    low_atr = panel.per_symbol({s: atr_ranges[s][0] for s in symbols})
+    high_atr = panel.per_symbol({s: atr_ranges[s][1] for s in symbols})
+
+    # ATR (Wilder EWM) — calculate_atr ile aynı
+    prev_close = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+    ranges = np.stack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    all_nan = np.isnan(ranges).all(axis=0)
+    true_range = np.where(all_nan, np.nan, np.nanmax(np.where(np.isnan(ranges), -np.inf, ranges), axis=0))
+    atr = _ewm_panel(true_range, 1 / Z_INDICATOR_PARAMS['atr_period'])
+
+    z = np.minimum(np.maximum(close * pct_min / 100, Z_INDICATOR_PARAMS['atr_multiplier'] * atr), close * pct_max / 100)
+    pct_atr = atr / close * 100
+    pct_z = z / close * 100
+
+    hp, lp, hpa, lpa, hc, lc, ago = atr_zigzag_panel(close, z, atr_mult=2)
+    hp_filled = ffill_array(hp)
+    lp_filled = ffill_array(lp)
+
+    ago_filled = fill_pivot_bars_ago(ago)
+
+    high_structure = _structure_codes(hp_filled, STRUCTURE_HH, STRUCTURE_LH, STRUCTURE_HH)
+    low_structure = _structure_codes(lp_filled, STRUCTURE_HL, STRUCTURE_LL, STRUCTURE_LL)
+
+    long_break = hp_filled + 0.1 * z
+    short_break = lp_filled - 0.1 * z
+    in_range = (low_atr < pct_atr) & (pct_atr < high_atr)
+
+    long_base = (low_structure == STRUCTURE_HL) & (high_structure != STRUCTURE_HH) & \
+        ~np.isnan(hp_filled) & (close > long_break) & in_range
+    short_base = (high_structure == STRUCTURE_LH) & (low_structure != STRUCTURE_LL) & \
+        ~np.isnan(lp_filled) & (close < short_break) & in_range
+
+    breakout = (lc == 1) & long_base
+    breakdown = (hc == 1) & short_base
+
+    # Son `lookback` kapanışın hepsi kırılım seviyesinin altında/üstünde mi
+    prev_max, prev_min = _lookback_extremes(close, lookback)
+
+    breakout |= long_base & (prev_max < long_break)
+    breakdown |= short_base & (prev_min > short_break)
+
+    outputs = {
+        'atr': atr, 'pct_atr': pct_atr, 'z': z, 'pct_z': pct_z,
+        'high_pivot_2x': hp, 'low_pivot_2x': lp,
+        'high_pivot_atr_2x': hpa, 'low_pivot_atr_2x': lpa,
+        'high_pivot_confirmed_2x': hc, 'low_pivot_confirmed_2x': lc,
+        'pivot_bars_ago_2x': ago,
+        'high_pivot_filled_2x': hp_filled, 'low_pivot_filled_2x': lp_filled,
+        'high_pivot_atr_filled_2x': ffill_array(hpa), 'low_pivot_atr_filled_2x': ffill_array(lpa),
+        'high_pivot_confirmed_filled_2x': np.maximum.accumulate(hc, axis=0),
+        'low_pivot_confirmed_filled_2x': np.maximum.accumulate(lc, axis=0),
+        'pivot_bars_ago_filled_2x': ago_filled,
+        'high_structure_2x': high_structure, 'low_structure_2x': low_structure,
+        'pivot_go_breakout_2x': breakout & ~np.isnan(close),
+        'pivot_go_breakdown_2x': breakdown & ~np.isnan(close),
+    }
+    panel.arrays.update(outputs)
+    return panel
+
+
+def panel_last_rows(panel, columns=None):
+    """Her sembolün son geçerli barını dict olarak döndürür (canlı döngü için; 'bar_time': ns)."""
+    columns = list(columns) if columns is not None else list(panel.arrays)
+    valid = ~np.isnan(panel['close'])
+    rows = {}
+    for j, symbol in enumerate(panel.symbols):
+        hits = np.flatnonzero(valid[:, j])
+        if hits.size == 0:
+            rows[symbol] = None
+            continue
+        t = hits[-1]
+        rows[symbol] = {col: panel[col][t, j].item() for col in columns}
+        rows[symbol]['bar_time'] = int(panel.index[t].value)
+    return rows
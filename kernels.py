@@ -0,0 +1,243 @@
+"""
+Tam vektörleştirilemeyen özyinelemeli çekirdekler: EWM (Wilder ATR), SMA tohumlu
+EMA (ADX) ve zigzag durum makinesi.
+
+Numba kuruluysa çekirdekler njit(cache=True) ile derlenir; derleme çıktısı
+KERNEL_CACHE_DIR'e yazılır ve sonraki açılışlarda yeniden derlenmez. Numba yoksa
+(ya da KERNEL_BACKEND = "numpy") aynı sonuçları veren pandas/NumPy/Python yolları
+kullanılır. Her iki mod da bit düzeyinde aynı sonucu üretir.
+"""
+import os
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import KERNEL_BACKEND, KERNEL_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+os.environ.setdefault('NUMBA_CACHE_DIR', KERNEL_CACHE_DIR)
+
+try:
+    import numba
+except ImportError:  # opsiyonel bağımlılık
+    numba = None
+
+BACKENDS = ('numba', 'numpy')
+
+
+def _resolve_backend(name: str) -> str:
+    if name == 'auto':
+        return 'numba' if numba is not None else 'numpy'
+    if name not in BACKENDS:
+        raise ValueError(f"Bilinmeyen çekirdek backend'i: {name} (auto | numba | numpy)")
+    if name == 'numba' and numba is None:
+        logger.warning("KERNEL_BACKEND=numba ama numba kurulu değil — numpy kullanılıyor")
+        return 'numpy'
+    return name
+
+
+BACKEND = _resolve_backend(KERNEL_BACKEND)
+
+
+# ─── Çekirdek Gövdeleri (numba ile derlenebilir, saf Python olarak da çalışır) ─
+
+def _ewm_kernel(values, alpha, ignore_na, out):
+    """pandas ewm(alpha, adjust=False, ignore_na).mean() özyinelemesi (min_periods=0)."""
+    old_wt_factor = 1.0 - alpha
+    new_wt = alpha
+    weighted = values[0]
+    old_wt = 1.0
+    out[0] = weighted
+    for i in range(1, values.shape[0]):
+        cur = values[i]
+        is_obs = cur == cur
+        if weighted == weighted:
+            if is_obs or not ignore_na:
+                old_wt *= old_wt_factor
+                if is_obs:
+                    if weighted != cur:
+                        weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+                    old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted
+
+
+def _sma_seeded_ema_kernel(values, period, seed, out):
+    """`seed` (ilk `period` değerin ortalaması) ile tohumlanan EMA; öncesi NaN."""
+    n = len(values)
+    for i in range(n):
+        out[i] = np.nan
+    if n < period:
+        return
+    prev = seed
+    out[period - 1] = prev
+    alpha = 2.0 / (period + 1)
+    for i in range(period, n):
+        prev = (values[i] * alpha) + (prev * (1 - alpha))
+        out[i] = prev
+
+
+def _zigzag_kernel(closes, atrs, atr_mult, index, confirmed_at, price_out, atr_out, kind):
+    """Zigzag durum makinesi; pivot olaylarını çıktı dizilerine yazar, olay sayısını döndürür."""
+    n = len(closes)
+    count = 0
+    if n == 0:
+        return count
+    last_pivot = closes[0]
+    last_pivot_idx = 0
+    direction = 0  # 0: yok, 1: up, -1: down
+
+    for i in range(1, n):
+        price = closes[i]
+        atr = atrs[i] * atr_mult
+
+        if direction == 0:
+            if price >= last_pivot + atr:
+                direction = 1
+                last_pivot = closes[last_pivot_idx]
+                index[count], confirmed_at[count], price_out[count] = last_pivot_idx, -1, last_pivot
+                atr_out[count], kind[count] = atrs[last_pivot_idx], 1
+                count += 1
+            elif price <= last_pivot - atr:
+                direction = -1
+                last_pivot = closes[last_pivot_idx]
+                index[count], confirmed_at[count], price_out[count] = last_pivot_idx, -1, last_pivot
+                atr_out[count], kind[count] = atrs[last_pivot_idx], -1
+                count += 1
+
+        elif direction == 1:
+            if price <= (last_pivot - atr):
+                index[count], confirmed_at[count], price_out[count] = last_pivot_idx, i, last_pivot
+                atr_out[count], kind[count] = atrs[last_pivot_idx], 1
+                count += 1
+                direction = -1
+                last_pivot = price
+                last_pivot_idx = i
+            elif price > last_pivot:
+                last_pivot = price
+                last_pivot_idx = i
+
+        else:
+            if price >= (last_pivot + atr):
+                index[count], confirmed_at[count], price_out[count] = last_pivot_idx, i, last_pivot
+                atr_out[count], kind[count] = atrs[last_pivot_idx], -1
+                count += 1
+                direction = 1
+                last_pivot = price
+                last_pivot_idx = i
+            elif price < last_pivot:
+                last_pivot = price
+                last_pivot_idx = i
+    return count
+
+
+_PY_KERNELS: Dict[str, Callable] = {
+    'ewm':            _ewm_kernel,
+    'sma_seeded_ema': _sma_seeded_ema_kernel,
+    'zigzag':         _zigzag_kernel,
+}
+_JIT_KERNELS: Dict[str, Callable] = {}
+
+
+def get_kernel(name: str, backend: Optional[str] = None) -> Callable:
+    """Çekirdeği döndürür; numba modunda ilk istekte derler (diskte cache varsa yükler)."""
+    if (backend or BACKEND) == 'numba' and numba is not None:
+        if name not in _JIT_KERNELS:
+            _JIT_KERNELS[name] = numba.njit(cache=True, nogil=True)(_PY_KERNELS[name])
+        return _JIT_KERNELS[name]
+    return _PY_KERNELS[name]
+
+
+# ─── Genel API ────────────────────────────────────────────────────────────────
+
+def pandas_alpha(alpha: float) -> float:
+    """pandas alpha'yı com üzerinden yeniden hesaplar; bit düzeyinde aynı sonuç için bu değer kullanılır."""
+    return 1.0 / (1.0 + (1.0 - alpha) / alpha)
+
+
+def ewm_step(weighted: float, value: float, alpha: float) -> float:
+    """
+    ewm_mean'in tek bar adımı (adjust=False): yeni değer geldikçe artımlı güncelleme.
+    `alpha` pandas_alpha ile dönüştürülmüş olmalı; NaN değer önceki ortalamayı korur.
+    """
+    if weighted != weighted:
+        return value
+    if value != value or weighted == value:
+        return weighted
+    old_wt = 1.0 - alpha
+    return (old_wt * weighted + alpha * value) / (old_wt + alpha)
+
+
+def ewm_mean(values, alpha: float, ignore_na: bool = False, backend: Optional[str] = None) -> np.ndarray:
+    """
+    pandas `ewm(alpha=alpha, adjust=False, ignore_na=ignore_na).mean()` ile aynı sonuç.
+    1-D ya da 2-D (eksen 0 = zaman, sütun başına bağımsız).
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if (backend or BACKEND) == 'numba' and numba is not None:
+        alpha = pandas_alpha(alpha)
+        kernel = get_kernel('ewm', 'numba')
+        out = np.empty_like(values)
+        if values.shape[0] == 0:
+            return out
+        if values.ndim == 1:
+            kernel(values, alpha, ignore_na, out)
+        else:
+            columns = np.ascontiguousarray(values.T)
+            result = np.empty_like(columns)
+            for j in range(columns.shape[0]):
+                kernel(columns[j], alpha, ignore_na, result[j])
+            out[:] = result.T
+        return out
+    frame = pd.Series(values) if values.ndim == 1 else pd.DataFrame(values)
+    return frame.ewm(alpha=alpha, adjust=False, ignore_na=ignore_na).mean().to_numpy(copy=True)
+
+
+def sma_seeded_ema(values, period: int, backend: Optional[str] = None) -> np.ndarray:
+    """İlk `period` barın ortalamasıyla başlayan EMA (alpha = 2 / (period + 1))."""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    # Tohum pandas Series.mean ile aynı toplama sırasıyla (NaN'ler atlanır)
+    head = values[:period]
+    count = int(np.count_nonzero(~np.isnan(head)))
+    seed = float(np.nansum(head) / count) if count else np.nan
+    if (backend or BACKEND) == 'numba' and numba is not None:
+        out = np.empty_like(values)
+        get_kernel('sma_seeded_ema', 'numba')(values, int(period), seed, out)
+        return out
+    out = [np.nan] * len(values)
+    _sma_seeded_ema_kernel(values.tolist(), int(period), seed, out)
+    return np.asarray(out, dtype=np.float64)
+
+
+def zigzag(closes, atrs, atr_mult: float = 1, backend: Optional[str] = None) -> Tuple[np.ndarray, ...]:
+    """Zigzag pivot olayları: (index, confirmed_at, price, atr, type) dizileri."""
+    closes = np.ascontiguousarray(closes, dtype=np.float64)
+    atrs = np.ascontiguousarray(atrs, dtype=np.float64)
+    n = closes.shape[0]
+    if (backend or BACKEND) == 'numba' and numba is not None:
+        index, confirmed_at = np.empty(n, dtype=np.int64), np.empty(n, dtype=np.int64)
+        price, atr, kind = np.empty(n), np.empty(n), np.empty(n, dtype=np.int8)
+        count = get_kernel('zigzag', 'numba')(closes, atrs, float(atr_mult), index, confirmed_at, price, atr, kind)
+        return index[:count], confirmed_at[:count], price[:count], atr[:count], kind[:count]
+
+    # Python listeleri NumPy skaler indekslemesinden belirgin şekilde hızlı
+    index, confirmed_at, price, atr, kind = ([0] * n for _ in range(5))
+    count = _zigzag_kernel(closes.tolist(), atrs.tolist(), atr_mult, index, confirmed_at, price, atr, kind)
+    return (np.asarray(index[:count], dtype=np.int64), np.asarray(confirmed_at[:count], dtype=np.int64),
+            np.asarray(price[:count], dtype=np.float64), np.asarray(atr[:count], dtype=np.float64),
+            np.asarray(kind[:count], dtype=np.int8))
+
+
+def warmup(backend: Optional[str] = None) -> str:
+    """Çekirdekleri küçük girdilerle bir kez çalıştırır (numba'da derleme/cache yükleme). Backend'i döndürür."""
+    backend = backend or BACKEND
+    sample = np.linspace(1.0, 2.0, 32)
+    ewm_mean(sample, 0.1, backend=backend)
+    ewm_mean(sample.reshape(16, 2), 0.1, ignore_na=True, backend=backend)
+    sma_seeded_ema(sample, 5, backend=backend)
+    zigzag(sample, np.full(32, 0.01), 2, backend=backend)
+    return backend
@@ -0,0 +1,140 @@
+"""
+Bloklamayan log hattı: çağıran thread kaydı sadece sınırlı bir kuyruğa bırakır;
+biçimlendirme (mesaj birleştirme, JSON) ve disk yazımı arka plan thread'inde
+(QueueListener) yapılır. Kuyruk doluysa WARNING altı kayıt düşürülür ve sayılır;
+WARNING ve üstü için kuyrukta ayrıca LOG_QUEUE_RESERVE yer ayrılır (hatalar bir
+DEBUG/INFO patlamasında kaybolmaz). Emir gönderimi hiçbir zaman disk I/O'yu beklemez.
+
+    handler = setup_logging()                       # main.py, bir kez
+    logger.info("%s emir gönderildi", symbol,
+                extra={'symbol': symbol, 'stage': 'order_place', 'order_id': oid, 'latency': 0.12})
+
+Dosyaya satır başına bir JSON olay yazılır (ts, level, logger, msg + extra alanları),
+konsola klasik metin biçimi. Dosya LOG_MAX_BYTES'ta döner (LOG_BACKUP_COUNT yedek).
+Mesajlar %-stili argümanlarla verilmelidir; f-string seviye kapalıyken de biçimlenir.
+"""
+import json
+import queue
+import atexit
+import logging
+import datetime
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from config import LOG_FILE, LOG_LEVEL, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_QUEUE_SIZE, LOG_QUEUE_RESERVE
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord'un kendi alanları; geri kalanlar `extra` ile gelen yapısal alanlardır
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Kayıt başına tek satır JSON; `extra` alanları üst seviyeye eklenir."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            'ts':     datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'level':  record.levelname,
+            'logger': record.name,
+            'msg':    record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                event[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            event['exc'] = record.exc_text
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Sınırlı kuyruğa put_nowait ile bırakır. WARNING altı kayıtlar kuyrukta `limit`
+    kayıt varken düşürülür; WARNING ve üstü kuyruğun kalan kapasitesini (maxsize - limit)
+    de kullanır ve sadece o da doluysa düşer. Düşürülenler sayılır.
+    Mesaj çağıran thread'de biçimlenmez (args arka planda birleştirilir); sadece
+    istisna metni, traceback nesneleri thread'ler arası taşınmasın diye burada üretilir.
+    """
+
+    def __init__(self, queue_: queue.Queue, limit: Optional[int] = None):
+        super().__init__(queue_)
+        # limit verilmezse tüm kapasite herkese açık (ayrılmış yer yok)
+        self.limit    = limit if limit is not None else queue_.maxsize
+        self.dropped  = 0
+        self.dropped_warnings = 0
+        self.listener: Optional[QueueListener] = None
+        self._lock    = threading.Lock()
+        self._exc_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        important = record.levelno >= logging.WARNING
+        try:
+            if not important and self.limit and self.queue.qsize() >= self.limit:
+                raise queue.Full
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                if important:
+                    self.dropped_warnings += 1
+
+    def take_dropped(self) -> int:
+        """Son çağrıdan beri düşürülen kayıt sayısı (WARNING ve üstü dahil, bkz. dropped_warnings)."""
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+    def take_dropped_warnings(self) -> int:
+        """Son çağrıdan beri düşürülen WARNING ve üstü kayıt sayısı (ayrılmış yer de dolduysa)."""
+        with self._lock:
+            dropped, self.dropped_warnings = self.dropped_warnings, 0
+        return dropped
+
+    def close(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()  # kuyruktaki kayıtları yazıp thread'i durdurur
+            self.listener = None
+        super().close()
+
+
+def setup_logging(
+    log_file:     Optional[str] = LOG_FILE,
+    level:        str = LOG_LEVEL,
+    max_bytes:    int = LOG_MAX_BYTES,
+    backup_count: int = LOG_BACKUP_COUNT,
+    queue_size:   int = LOG_QUEUE_SIZE,
+    reserve:      int = LOG_QUEUE_RESERVE,
+    console:      bool = True,
+) -> BoundedQueueHandler:
+    """Kök logger'ı kuyruk handler'ına bağlar; dosya (JSON, dönen) ve konsol arka planda yazılır."""
+    handlers = []
+    if log_file:
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(stream_handler)
+
+    handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size + reserve if queue_size > 0 else 0), limit=queue_size)
+    handler.listener = QueueListener(handler.queue, *handlers, respect_handler_level=True)
+    handler.listener.start()
+
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+        old.close()
+    root.addHandler(handler)
+    root.setLevel(level)
+    atexit.register(handler.close)
+    return handler
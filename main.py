@@ -1,197 +1,195 @@
+import os
 import time
 import logging
+import threading
 import datetime
-from typing import Dict, Optional
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
-from config import SYMBOLS, INTERVAL, LEVERAGE
+from config import (
+    SYMBOLS, INTERVAL, INDICATOR_MODE, INDICATOR_WORKERS, HTF_INTERVALS, SNAPSHOT_LOG, METRICS_PORT, METRICS_JSON,
+    PIPELINE_CYCLE, SUPERVISOR_INTERVAL, ROUND_NUMBERS, STARTUP_PARALLEL, CACHE_STORE_DIR, CACHE_PERSIST_EVERY,
+    LEVERAGE_STATE_FILE, SHARD_DIR, API_RATE_LIMIT_PER_SEC, MARKET_DATA_SUBSCRIBE, ACCOUNT_JOURNAL_DIR, LOG_FILE,
+)
+import kernels
+from accounts import AccountExecutor, build_accounts
+from data_store import ParquetStore
 from exchange import BybitFuturesAPI
-from indicators import calculate_indicators
-from entry_strategies import check_long_entry, check_short_entry
+from indicator_graph import IndicatorEngine, required_columns
+from indicator_pool import IndicatorPool
+from metrics import METRICS, start_http_server
+from profiling import Profiler
+from sharding import SharedRateLimiter, ShardWorker, worker_path
+from indicators import calculate_indicators, calculate_indicators_panel
+from log_pipeline import setup_logging
+from market_data import MarketDataSubscriber, candle_open_ns
+from panel import align_frames
+import entry_strategies
 from position_manager import PositionManager
+from snapshot import SignalSnapshot
+from startup import run_startup
+from timeframes import TimeframeCache
 
 # ─── Logging ──────────────────────────────────────────────────────────────────
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('trading_bot.log'),
-        logging.StreamHandler()
-    ]
-)
+# Kuyruk tabanlı: dosya (JSON, dönen) ve konsol yazımı arka plan thread'inde
+# Sharding açıksa süreç başına dosyalar işçi kimliğiyle ayrılır (sharding.worker_path)
+LOG_HANDLER = setup_logging(worker_path(LOG_FILE))
 logger = logging.getLogger(__name__)
 
+# Emir açarken kullanılan sütunlar + strateji sütunları (graph modu)
+EXECUTION_COLUMNS = ['close', 'z', 'pct_z']
+GRAPH_COLUMNS     = required_columns(entry_strategies, EXECUTION_COLUMNS)
+# Tur snapshot'ındaki alanlar: indikatör sütunları + HTF teyidi açıksa üst zaman dilimi yapıları
+SNAPSHOT_FIELDS   = GRAPH_COLUMNS + entry_strategies.HTF_COLUMNS
+
 
 class TradingBot:
-    def __init__(self, testnet: bool = False):
-        self.api              = BybitFuturesAPI(testnet=testnet)
-        self.position_manager = PositionManager(self.api.session)
-        self.symbols          = SYMBOLS
+    def __init__(
+        self,
+        testnet:      bool = False,
+        api:          Optional[BybitFuturesAPI] = None,
+        symbols:      Optional[List[str]] = None,
+        metrics_port: int = METRICS_PORT,
+        trading:      bool = True,
+        market_data:  Optional[MarketDataSubscriber] = None,
+        accounts:     Optional[List[AccountExecutor]] = None,
+    ):
+        # trading=False: sadece veri + indikatör (market_data.py daemon'u; kaldıraç / kurtarma / emir yok)
+        self.trading          = trading
+        # Veri ortak daemon'dan okunursa kline çağrısı ve indikatör hesabı yapılmaz
+        self.market_data      = market_data if market_data is not None else (
+            MarketDataSubscriber() if MARKET_DATA_SUBSCRIBE and trading else None
+        )
+        # Sharding açıksa aynı API anahtarındaki işçiler tek rate limit bütçesini paylaşır
+        self.shard            = ShardWorker(SHARD_DIR) if SHARD_DIR else None
+        # api / symbols dışarıdan verilebilir (mock exchange, benchmark)
+        self.api              = api if api is not None else BybitFuturesAPI(
+            testnet=testnet, timeframes=TimeframeCache(HTF_INTERVALS),
+            rate_limiter=SharedRateLimiter(os.path.join(SHARD_DIR, 'ratelimit'), API_RATE_LIMIT_PER_SEC)
+            if SHARD_DIR else None,
+        )
+        self.timeframes       = self.api.timeframes
+        # Emir yürüten hesaplar (accounts.py): veri + sinyal bir kez, her hesaba eşzamanlı dağıtılır
+        self.accounts         = (accounts if accounts is not None else build_accounts(
+            self.api, testnet=testnet, shard_dir=SHARD_DIR, leverage_state_file=LEVERAGE_STATE_FILE,
+            journal_dir=ACCOUNT_JOURNAL_DIR, supervise=SUPERVISOR_INTERVAL > 0,
+        )) if trading else []
+        for account in self.accounts:
+            account.position_manager.ownership = self.shard
+        # universe: tüm işçilerin sembolleri; symbols: bu işçinin işlediği (sharding kapalıyken aynı)
+        self.universe         = list(symbols) if symbols is not None else SYMBOLS
+        self.symbols          = self.shard.rebalance(self.universe) if self.shard else list(self.universe)
+        if self.shard is not None:
+            self.shard.start()  # lease yenileme başlangıç boyunca da sürmeli
         self.interval         = INTERVAL
-        self._initialize_account()
-        self.api.initialize_cache(self.symbols, self.interval)
-        self._load_existing_positions()
-
-    # ─── Hesap Kurulumu ───────────────────────────────────────────────────────
-
-    def _initialize_account(self) -> None:
-        """Her sembol için kaldıraç ayarlar."""
-        for symbol in self.symbols:
-            try:
-                self.api.session.set_leverage(
-                    category="linear",
-                    symbol=symbol,
-                    buyLeverage=str(LEVERAGE),
-                    sellLeverage=str(LEVERAGE),
-                )
-                logger.info(f"{symbol} kaldıraç ayarlandı: {LEVERAGE}x")
-            except Exception as e:
-                if "leverage not modified" in str(e):
-                    logger.debug(f"{symbol} kaldıraç zaten {LEVERAGE}x")
-                else:
-                    logger.warning(f"{symbol} kaldıraç ayarlama uyarısı: {e}")
-
-    # ─── Mevcut Pozisyonları Yükleme ──────────────────────────────────────────
-
-    def _load_existing_positions(self) -> None:
-        """Bot restart sonrası exchange'deki açık pozisyonları hafızaya yükler."""
+        if self.market_data is not None:
+            unpublished = sorted(set(self.symbols) - set(self.market_data.symbols))
+            if unpublished:
+                logger.warning("Daemon bu sembolleri yayınlamıyor (sinyal üretilmez): %s", unpublished)
+        # İşçiler sadece snapshot'ın indikatör alanlarını yollar (HTF alanları sonradan birleştirilir)
+        self.indicator_pool   = IndicatorPool(
+            self.universe, INDICATOR_WORKERS, mode=INDICATOR_MODE, fields=GRAPH_COLUMNS
+        ) if INDICATOR_WORKERS > 0 and self.market_data is None else None
+        self.metrics_server   = self._start_metrics_server(metrics_port) if metrics_port else None
+        self.profiler         = Profiler()
+        # Akış modu sembol başına hesap gerektirir; işçi havuzu ve panel modu toplu çalışır
+        self.pipelined        = (PIPELINE_CYCLE and self.indicator_pool is None and INDICATOR_MODE != "panel"
+                                 and self.market_data is None)
+        self.store            = ParquetStore(CACHE_STORE_DIR) if CACHE_STORE_DIR else None
+        self.instruments: Dict[str, Dict] = {}
+        self._persist_thread: Optional[threading.Thread] = None
+        # Kaldıraç / enstrüman / cache / kurtarma / çekirdek derleme birbirinden bağımsız: paralel
+        tasks = {}
+        if trading:
+            tasks.update(leverage=self._initialize_account, instruments=self._load_instruments,
+                         recovery=self._load_existing_positions)
+        if self.market_data is None:
+            tasks.update(cache=lambda: self.api.initialize_cache(self.symbols, self.interval, store=self.store),
+                         kernels=kernels.warmup)
+        self.startup_report   = run_startup(tasks, parallel=STARTUP_PARALLEL)
+
+    @staticmethod
+    def _start_metrics_server(port: int):
+        """Port doluysa (aynı makinede ikinci işçi) endpoint'siz devam eder; metrikler JSON dosyasına yazılır."""
         try:
-            positions = self.api.session.get_positions(category='linear', settleCoin='USDT')
-            if positions['retCode'] != 0:
-                logger.error(f"Pozisyonlar alınamadı: {positions['retMsg']}")
-                return
+            return start_http_server(port)
+        except OSError as e:
+            logger.warning("Metrik endpoint'i açılamadı (port %d): %s — sadece %s yazılacak",
+                           port, e, worker_path(METRICS_JSON))
+            return None
 
-            for pos in positions['result']['list']:
-                if float(pos.get('size', 0)) == 0:
-                    continue
+    @property
+    def position_manager(self) -> Optional[PositionManager]:
+        """İlk hesabın PositionManager'ı (tek hesaplı kullanım ve benchmark'lar için)."""
+        return self.accounts[0].position_manager if self.accounts else None
 
-                symbol    = pos['symbol']
-                direction = 'LONG' if pos['side'] == 'Buy' else 'SHORT'
-                quantity  = float(pos['size'])
-
-                oco_pair = self._find_tp_sl_orders(symbol, direction, quantity)
-
-                position_data = {
-                    'symbol':        symbol,
-                    'direction':     direction,
-                    'entry_price':   float(pos['avgPrice']),
-                    'quantity':      quantity,
-                    'take_profit1':  None,  # emir fiyatları oco_pair içinden takip ediliyor
-                    'take_profit2':  None,
-                    'stop_loss':     None,
-                    'current_pct_atr': None,
-                    'order_id':      None,
-                }
+    # ─── Hesap Kurulumu ───────────────────────────────────────────────────────
 
-                if oco_pair:
-                    position_data['oco_pair'] = oco_pair
-                    tp1_done = oco_pair.get('tp1_triggered', False)
-                    logger.info(
-                        f"{symbol} pozisyon yüklendi ({direction}) | "
-                        f"TP1 tetiklendi: {tp1_done}"
-                    )
-                else:
-                    logger.warning(f"{symbol} pozisyon yüklendi ama TP/SL emirleri bulunamadı")
+    def _for_accounts(self, task, *args) -> None:
+        """`task(account, *args)` her hesap için eşzamanlı (tek hesapta doğrudan)."""
+        if len(self.accounts) == 1:
+            task(self.accounts[0], *args)
+            return
+        with ThreadPoolExecutor(max_workers=len(self.accounts), thread_name_prefix='accounts') as executor:
+            for future in [executor.submit(task, account, *args) for account in self.accounts]:
+                future.result()
 
-                self.position_manager.active_positions[symbol] = position_data
+    def _initialize_account(self, symbols: Optional[List[str]] = None) -> None:
+        """Tüm hesaplarda kaldıraç (hesap başına doğrulanmış durum dosyasıyla, AccountExecutor.initialize)."""
+        symbols = symbols if symbols is not None else self.symbols
+        self._for_accounts(AccountExecutor.initialize, symbols)
 
-        except Exception as e:
-            logger.error(f"Mevcut pozisyonlar yüklenirken hata: {e}")
+    # ─── Enstrüman Bilgisi ────────────────────────────────────────────────────
 
-    def _find_tp_sl_orders(self, symbol: str, direction: str, quantity: float) -> Optional[Dict]:
+    def _load_instruments(self) -> None:
         """
-        Bot restart sonrası mevcut TP/SL emirlerini bulur.
-        Yapı: TP1, TP2, SL1, SL2 (her biri yarı miktar)
-        TP1 zaten tetiklendiyse: TP2 + SL2 (tam miktar = kalan yarı)
+        Lot / fiyat adımları (tek sayfalı sorgu, tüm linear semboller). ROUND_NUMBERS
+        hassasiyeti qtyStep'ten inceyse uyarır — exchange bu emirleri reddeder.
         """
-        try:
-            orders = self.api.session.get_open_orders(
-                category='linear',
-                symbol=symbol,
-            )
-
-            if orders['retCode'] != 0:
-                return None
-
-            expected_side = "Sell" if direction == "LONG" else "Buy"
-            half_qty      = round(quantity / 2, 8)
-            tolerance     = half_qty * 0.05  # %5 tolerans
-
-            tp_ids = []
-            sl_ids = []
-
-            for order in orders['result']['list']:
-                if order['side'] != expected_side:
-                    continue
-
-                order_qty = float(order['qty'])
-
-                # Yarı miktar eşleşmesi
-                if abs(order_qty - half_qty) > tolerance:
+        wanted = set(self.universe)  # sharding: sonradan devralınabilecek semboller de
+        cursor = None
+        while True:
+            params = {'category': 'linear', 'limit': 1000}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.api.session.get_instruments_info(**params)
+            if response['retCode'] != 0:
+                logger.warning("Enstrüman bilgisi alınamadı: %s", response['retMsg'])
+                return
+            for item in response['result']['list']:
+                if item['symbol'] not in wanted:
                     continue
-
-                if order['orderType'] == 'Limit' and order.get('reduceOnly'):
-                    tp_ids.append(order['orderId'])
-                elif order['orderType'] == 'Market' and order.get('triggerPrice'):
-                    sl_ids.append(order['orderId'])
-
-            # TP fiyatlarına göre sırala → TP1 daha yakın, TP2 daha uzak
-            if len(tp_ids) == 2:
-                tp_orders = []
-                for tid in tp_ids:
-                    for o in orders['result']['list']:
-                        if o['orderId'] == tid:
-                            tp_orders.append((float(o['price']), tid))
-                tp_orders.sort(key=lambda x: x[0])
-
-                if direction == "LONG":
-                    tp1_id = tp_orders[0][1]  # daha düşük fiyat
-                    tp2_id = tp_orders[1][1]  # daha yüksek fiyat
-                else:
-                    tp1_id = tp_orders[1][1]  # daha yüksek fiyat
-                    tp2_id = tp_orders[0][1]  # daha düşük fiyat
-            else:
-                tp1_id = tp_ids[0] if len(tp_ids) > 0 else None
-                tp2_id = tp_ids[1] if len(tp_ids) > 1 else None
-
-            sl1_id = sl_ids[0] if len(sl_ids) > 0 else None
-            sl2_id = sl_ids[1] if len(sl_ids) > 1 else None
-
-            # Normal durum: 4 emir de mevcut
-            if tp1_id and tp2_id and sl1_id and sl2_id:
-                logger.info(f"{symbol} TP1/TP2/SL1/SL2 emirleri bulundu")
-                return {
-                    'symbol':        symbol,
-                    'tp1_order_id':  tp1_id,
-                    'tp2_order_id':  tp2_id,
-                    'sl1_order_id':  sl1_id,
-                    'sl2_order_id':  sl2_id,
-                    'tp1_triggered': False,
-                    'active':        True,
+                lot = item.get('lotSizeFilter', {})
+                self.instruments[item['symbol']] = {
+                    'qty_step':  float(lot.get('qtyStep', 0)),
+                    'min_qty':   float(lot.get('minOrderQty', 0)),
+                    'tick_size': float(item.get('priceFilter', {}).get('tickSize', 0)),
                 }
+            cursor = response['result'].get('nextPageCursor')
+            if not cursor:
+                break
 
-            # TP1 zaten tetiklenmişse: sadece TP2 + SL2 kaldı
-            if tp2_id and sl2_id and not tp1_id and not sl1_id:
-                logger.info(f"{symbol} TP1 zaten tetiklenmiş — TP2/SL2 bulundu")
-                return {
-                    'symbol':        symbol,
-                    'tp1_order_id':  None,
-                    'tp2_order_id':  tp2_id,
-                    'sl1_order_id':  None,
-                    'sl2_order_id':  sl2_id,
-                    'tp1_triggered': True,
-                    'active':        True,
-                }
+        for symbol, info in self.instruments.items():
+            decimals = ROUND_NUMBERS.get(symbol)
+            if decimals is not None and info['qty_step'] and 10 ** -decimals < info['qty_step'] * (1 - 1e-9):
+                logger.warning("%s miktar hassasiyeti (%d hane) qtyStep'ten (%s) ince — emirler reddedilebilir",
+                               symbol, decimals, info['qty_step'])
+        missing = wanted - set(self.instruments)
+        if missing:
+            logger.warning("Enstrüman bilgisi bulunamadı: %s", sorted(missing))
 
-            logger.warning(
-                f"{symbol} emirler eksik — "
-                f"TP1: {tp1_id} | TP2: {tp2_id} | SL1: {sl1_id} | SL2: {sl2_id}"
-            )
-            return None
+    # ─── Mevcut Pozisyonları Yükleme ──────────────────────────────────────────
 
-        except Exception as e:
-            logger.error(f"{symbol} TP/SL emirleri aranırken hata: {e}")
-            return None
+    def _load_existing_positions(self, symbols: Optional[List[str]] = None) -> None:
+        """
+        Bot restart sonrası exchange'deki açık pozisyonları her hesapta hafızaya yükler.
+        Sharding açıksa sadece bu işçinin sembolleri (`symbols`: sadece bunlar).
+        """
+        if symbols is None and self.shard is not None:
+            symbols = self.symbols
+        self._for_accounts(AccountExecutor.load_existing_positions, symbols)
 
     # ─── Hafta Sonu Kontrolü ──────────────────────────────────────────────────
 
@@ -247,10 +245,12 @@ class TradingBot:
                 f"Hedef: {target_time.strftime('%H:%M:%S')} | Süre: {wait_seconds:.1f}s"
             )
 
+            wake_target = time.time() + (wait_seconds if wait_seconds > 0 else 1)
             if wait_seconds > 0:
                 time.sleep(wait_seconds)
             else:
                 time.sleep(1)
+            METRICS.observe('wake_jitter', max(0.0, time.time() - wake_target))
 
             logger.info("Yeni mum başladı — veriler çekiliyor")
 
@@ -260,72 +260,276 @@ class TradingBot:
 
     # ─── Veri & Sinyal ────────────────────────────────────────────────────────
 
-    def _get_market_data_batch(self) -> Dict[str, Optional[Dict]]:
+    def _get_market_data_batch(self) -> SignalSnapshot:
         """Tüm semboller için OHLCV + indikatör hesaplar. Kapanmamış mumu atar."""
-        all_data = self.api.get_multiple_ohlcv(self.symbols, self.interval)
-        now      = pd.Timestamp.utcnow()
-        results  = {}
+        if self.market_data is not None:
+            return self._subscribed_snapshot()
+        return self._snapshot_from(*self._fetch_market_data())
+
+    def _fetch_market_data(self) -> Tuple[Dict[str, Optional[pd.DataFrame]], pd.Timestamp]:
+        """Cache güncellemesi: (sembol → DataFrame, şimdiki zaman)."""
+        return self.api.get_multiple_ohlcv(self.symbols, self.interval), pd.Timestamp.utcnow()
+
+    def _snapshot_from(self, all_data: Dict, now: pd.Timestamp) -> SignalSnapshot:
+        snapshot = self._compute_indicators(all_data, now)
 
+        # Üst zaman dilimi değerleri (htf60_*, htf240_*) cache güncellemesinde hazırlandı
+        if self.timeframes:
+            for symbol in snapshot:
+                snapshot.merge(symbol, self.timeframes.last_row(symbol))
+        return snapshot
+
+    def _subscribed_snapshot(self) -> SignalSnapshot:
+        """
+        Daemon'un bu mum için yayınını bekler (exchange çağrısı yok). Yayın gelmezse ya da
+        sembolün barı bu mumun barı değilse o sembol geçersizdir: eski veriyle işlem açılmaz.
+        """
+        candle_open = candle_open_ns(self.interval)
+        with METRICS.time('market_data_wait'):
+            fresh = self.market_data.wait(candle_open)
+        if not fresh:
+            logger.error("Piyasa verisi yayını gelmedi (son bar: %s) — bu mumda işlem yok",
+                         pd.Timestamp(self.market_data.bar_time, tz='UTC'))
+            return SignalSnapshot.empty(self.symbols, SNAPSHOT_FIELDS)
+        snapshot = self.market_data.snapshot(self.symbols)
+        # Bu mumun yayınındaki son bar mumun açılış zamanıdır (_closed_frames: index < now)
+        stale = snapshot.valid & (snapshot.times != candle_open)
+        if stale.any():
+            logger.warning("Güncel olmayan bar — işlem yok: %s", [s for s, old in zip(snapshot.symbols, stale) if old])
+            snapshot.valid[stale] = False
+        return snapshot
+
+    def _compute_indicators(self, all_data: Dict, now: pd.Timestamp) -> SignalSnapshot:
+        """INDICATOR_MODE / işçi havuzuna göre sembol başına son satır (sadece SNAPSHOT_FIELDS)."""
+        if self.indicator_pool is not None:
+            rows = {symbol: None for symbol in all_data}
+            with METRICS.time('indicators'):
+                results = self.indicator_pool.compute(self._closed_frames(all_data, now))
+            # Havuz tüm evreni döndürür (sharding); sadece bu turun sembolleri
+            rows.update({symbol: row for symbol, row in results.items() if symbol in rows})
+            return SignalSnapshot.from_rows(rows, SNAPSHOT_FIELDS)
+
+        if INDICATOR_MODE == "panel":
+            with METRICS.time('indicators'):
+                return self._get_market_data_panel(all_data, now)
+
+        snapshot = SignalSnapshot.empty(list(all_data), SNAPSHOT_FIELDS)
+
+        for j, (symbol, df) in enumerate(all_data.items()):
+            row = self._indicator_row(symbol, df, now)
+            if row is not None:
+                snapshot.update_row(j, row)
+
+        return snapshot
+
+    def _indicator_row(self, symbol: str, df: Optional[pd.DataFrame], now: pd.Timestamp) -> Optional[Dict]:
+        """Frame / graph modu: tek sembolün son kapanmış barı için snapshot alanları (veri yoksa None)."""
+        if df is None or df.empty:
+            return None
+        try:
+            df = df[df.index < now]  # kapanmamış mumu at
+            if df.empty:
+                logger.warning("%s filtre sonrası veri kalmadı", symbol, extra={'symbol': symbol})
+                return None
+            with METRICS.time('indicators', symbol):
+                if INDICATOR_MODE == "graph":
+                    row = IndicatorEngine(df, symbol).last_row(GRAPH_COLUMNS)
+                else:
+                    df  = calculate_indicators(df, symbol)
+                    row = {name: df[name].to_numpy()[-1] for name in GRAPH_COLUMNS}
+            row['bar_time'] = df.index[-1].value
+            return row
+        except Exception as e:
+            logger.error("%s indikatör hatası: %s", symbol, e, extra={'symbol': symbol})
+            return None
+
+    def _closed_frames(self, all_data: Dict, now: pd.Timestamp) -> Dict[str, pd.DataFrame]:
+        """Kapanmamış mumu atar; boş kalan sembolleri çıkarır."""
+        frames = {}
         for symbol, df in all_data.items():
-            if df is not None and not df.empty:
-                try:
-                    df = df[df.index < now]  # kapanmamış mumu at
-                    if df.empty:
-                        logger.warning(f"{symbol} filtre sonrası veri kalmadı")
-                        results[symbol] = None
-                        continue
-                    df = calculate_indicators(df, symbol)
-                    results[symbol] = df.iloc[-1].to_dict()
-                except Exception as e:
-                    logger.error(f"{symbol} indikatör hatası: {e}")
-                    results[symbol] = None
-            else:
-                results[symbol] = None
-
-        return results
-
-    def _generate_signals(self, all_data: Dict[str, Optional[Dict]]) -> Dict[str, Optional[str]]:
-        """Toplu veriden sinyal oluşturur."""
-        signals = {}
-        for symbol, data in all_data.items():
-            if not data:
-                signals[symbol] = None
-            elif check_long_entry(data, symbol):
-                signals[symbol] = 'LONG'
-                logger.info(f"{symbol} LONG sinyali")
-            elif check_short_entry(data, symbol):
-                signals[symbol] = 'SHORT'
-                logger.info(f"{symbol} SHORT sinyali")
-            else:
-                signals[symbol] = None
-        return signals
+            if df is None or df.empty:
+                continue
+            df = df[df.index < now]  # kapanmamış mumu at
+            if df.empty:
+                logger.warning("%s filtre sonrası veri kalmadı", symbol, extra={'symbol': symbol})
+                continue
+            frames[symbol] = df
+        return frames
 
-    # ─── Emir Yürütme ─────────────────────────────────────────────────────────
+    def _get_market_data_panel(self, all_data: Dict, now: pd.Timestamp) -> SignalSnapshot:
+        """
+        Panel modu: sembollerin indikatörleri (time × symbol) dizilerde tek seferde.
+        Sadece bar index'i birebir aynı semboller aynı panele girer: eksik barın NaN
+        satırı ATR'nin prev_close'unu, pencereleri ve yapıyı kaydırmasın. Bir panel
+        hata verirse o paneldeki semboller tek tek frame yoluyla hesaplanır.
+        """
+        frames   = self._closed_frames(all_data, now)
+        snapshot = SignalSnapshot.empty(list(all_data), SNAPSHOT_FIELDS)
 
-    def _execute_trades(
-        self,
-        signals:  Dict[str, Optional[str]],
-        all_data: Dict[str, Optional[Dict]],
-    ) -> None:
-        """Sinyallere göre pozisyon açar. PositionManager tüm senaryoları yönetir."""
+        groups: Dict[bytes, List[str]] = {}
+        for symbol, df in frames.items():
+            groups.setdefault(df.index.as_unit('ns').asi8.tobytes(), []).append(symbol)
+        if len(groups) > 1:
+            logger.debug("Panel: %d farklı bar index'i — ayrı panellerde hesaplanıyor", len(groups))
+
+        for symbols in groups.values():
+            try:
+                panel = calculate_indicators_panel(
+                    align_frames({s: frames[s] for s in symbols}, ['open', 'high', 'low', 'close', 'volume'])
+                )
+                snapshot.absorb(SignalSnapshot.from_panel(panel, SNAPSHOT_FIELDS))
+            except Exception as e:
+                logger.error("Panel indikatör hatası (%s): %s — sembol başına hesaplanıyor", symbols, e)
+                for symbol in symbols:
+                    row = self._indicator_row(symbol, frames[symbol], now)
+                    if row is not None:
+                        snapshot.update_row(snapshot.symbols.index(symbol), row)
+        return snapshot
+
+    def _generate_signals(self, snapshot: SignalSnapshot) -> Dict[str, Optional[str]]:
+        """Giriş kurallarını tüm semboller için vektörel değerlendirir (denetim kaydı emirlerden sonra)."""
+        with METRICS.time('signal'):
+            signals = snapshot.signals()
         for symbol, signal in signals.items():
-            if not signal or not all_data.get(symbol):
-                continue
+            if signal:
+                logger.info("%s %s sinyali", symbol, signal, extra={'symbol': symbol})
+        return signals
 
-            data = all_data[symbol]
-            self.position_manager.open_position(
-                symbol=symbol,
-                direction=signal,
-                entry_price=data['close'],
-                atr_value=data['z'],
-                pct_atr=data['pct_z'],
-            )
+    def _signal_for(self, snapshot: SignalSnapshot, symbol: str) -> Optional[str]:
+        """Akış modunda tek sembolün sinyali (_generate_signals'ın sembol başına karşılığı)."""
+        with METRICS.time('signal', symbol):
+            signal = snapshot.signal(symbol)
+        if signal:
+            logger.info("%s %s sinyali", symbol, signal, extra={'symbol': symbol})
+        return signal
+
+    def _persist_snapshot(self, snapshot: SignalSnapshot, signals: Dict[str, Optional[str]]) -> None:
+        if SNAPSHOT_LOG:
+            try:
+                snapshot.persist(worker_path(SNAPSHOT_LOG), signals)
+            except OSError as e:
+                logger.warning("Snapshot kaydedilemedi: %s", e)
+
+    # ─── Emir Yürütme ─────────────────────────────────────────────────────────
+
+    def _execute_trades(self, signals: Dict[str, Optional[str]], snapshot: SignalSnapshot) -> None:
+        """
+        Sinyalleri tüm hesaplara eşzamanlı dağıtır: her hesap kendi pozisyonlarını yönetir
+        ve emirlerini açar (AccountExecutor.execute). Hesaplar birbirini beklemez.
+        """
+        self._for_accounts(AccountExecutor.execute, signals, snapshot, time.perf_counter())
 
     # ─── Ana Döngü ────────────────────────────────────────────────────────────
 
+    def run_cycle(self) -> Dict[str, Optional[str]]:
+        """Tek mum turu: veri + indikatör → sinyal → pozisyon yönetimi → yeni emirler."""
+        # Denetçiler tur boyunca pozisyonlara dokunmaz
+        with ExitStack() as stack:
+            for account in self.accounts:
+                stack.enter_context(account.position_manager.lock)
+            if self.shard is not None:
+                self._rebalance_shard()
+                if not self.symbols:
+                    logger.info("Bu işçide lease'li sembol yok — tur atlandı")
+                    return {}
+            if self.pipelined:
+                return self._run_cycle_pipelined()
+            return self._run_cycle_batch()
+
+    def _rebalance_shard(self) -> None:
+        """Lease'lere göre bu turun sembolleri: devralınanlar kurulur, bırakılanların cache'i silinir."""
+        positioned = {symbol for account in self.accounts for symbol in account.position_manager.active_positions}
+        owned   = self.shard.rebalance(self.universe, keep=positioned)
+        added   = [symbol for symbol in owned if symbol not in self.symbols]
+        removed = [symbol for symbol in self.symbols if symbol not in owned]
+
+        for account in self.accounts:
+            manager = account.position_manager
+            for symbol in [symbol for symbol in manager.active_positions if symbol not in owned]:
+                # Lease yenilenemedi ve başka işçiye geçti: yeni sahip pozisyonu exchange'den kurtarır
+                logger.error("%s: %s lease'i kaybedildi — pozisyon takibi bırakılıyor", account.name, symbol,
+                             extra={'symbol': symbol})
+                del manager.active_positions[symbol]
+
+        self.symbols = owned
+        if removed:
+            self.api.drop_cache(removed)
+        if added:
+            logger.info("Devralınan semboller: %s", added)
+            self._initialize_account(added)
+            self._load_existing_positions(added)
+
+    def _run_cycle_batch(self) -> Dict[str, Optional[str]]:
+        all_data = self._get_market_data_batch()
+        signals  = self._generate_signals(all_data)
+
+        # Her hesapta: 1. mevcut pozisyonları yönet (OCO + TP/SL), 2. yeni pozisyonları aç / tersine çevir
+        self._execute_trades(signals, all_data)
+        # Denetim kaydı emir yolunu bekletmez
+        self._persist_snapshot(all_data, signals)
+        return signals
+
+    def _run_cycle_pipelined(self) -> Dict[str, Optional[str]]:
+        """
+        Akış modu: her sembol kendi kline yanıtı gelir gelmez indikatör → sinyal, sonra
+        her hesabın thread'inde pozisyon yönetimi → emir. OCO kontrolleri tur başında
+        hesabın havuzunda başlar ve kline beklemesiyle örtüşür; bir sembolün OCO sonucu
+        o sembolün emirlerinden önce uygulanır, böylece sembol başına adım sırası toplu
+        turla aynıdır. Kline döngüsü hesapları beklemez.
+        """
+        snapshot = SignalSnapshot.empty(self.symbols, SNAPSHOT_FIELDS)
+        index    = {symbol: j for j, symbol in enumerate(self.symbols)}
+        signals: Dict[str, Optional[str]] = {}
+
+        for account in self.accounts:
+            account.begin_cycle()
+        try:
+            for symbol, df in self.api.iter_ohlcv(self.symbols, self.interval):
+                row = self._indicator_row(symbol, df, pd.Timestamp.utcnow())
+                if row is not None:
+                    snapshot.update_row(index[symbol], row)
+                    if self.timeframes:
+                        snapshot.merge(symbol, self.timeframes.last_row(symbol))
+                signal = signals[symbol] = self._signal_for(snapshot, symbol)
+
+                data, ready = snapshot[symbol], time.perf_counter()
+                for account in self.accounts:
+                    account.submit(symbol, signal, data, ready)
+        finally:
+            for account in self.accounts:
+                account.end_cycle()
+
+        signals = {symbol: signals.get(symbol) for symbol in self.symbols}
+        self._persist_snapshot(snapshot, signals)
+        return signals
+
+    def _persist_cache(self, wait: bool = False) -> None:
+        """
+        Cache'in kapanmış barlarını depoya yazar (sonraki başlangıç diskten ısınır).
+        Arka plan thread'inde; önceki yazım sürüyorsa atlanır (wait=True: bekleyip senkron yazar).
+        """
+        if self.store is None:
+            return
+        if self._persist_thread is not None and self._persist_thread.is_alive():
+            if not wait:
+                return
+            self._persist_thread.join()
+        if wait:
+            self.api.persist_cache(self.store, self.interval)
+            return
+        self._persist_thread = threading.Thread(
+            target=self.api.persist_cache, args=(self.store, self.interval), name='cache-persist', daemon=True
+        )
+        self._persist_thread.start()
+
     def run(self) -> None:
         logger.info(f"Bot başlatıldı | Semboller: {self.symbols} | Aralık: {self.interval}m")
+        self.profiler.install_signal_handler()
+        for account in self.accounts:
+            if account.supervisor is not None:
+                account.supervisor.start()
 
+        cycles = 0
         while True:
             try:
                 self._wait_until_next_candle()
@@ -336,24 +540,36 @@ class TradingBot:
 
                 start_time = time.time()
 
-                all_data = self._get_market_data_batch()
-                signals  = self._generate_signals(all_data)
-
-                # 1. Mevcut pozisyonları yönet (OCO kontrolü + TP/SL güncelleme)
-                self.position_manager.manage_positions(signals, all_data)
-
-                # 2. Yeni pozisyonları aç / ters pozisyonları tersine çevir
-                self._execute_trades(signals, all_data)
+                with self.profiler.cycle():
+                    self.run_cycle()
+                cycles += 1
+                if CACHE_PERSIST_EVERY and cycles % CACHE_PERSIST_EVERY == 0:
+                    self._persist_cache()
 
                 elapsed     = time.time() - start_time
                 server_time = self.api.session.get_server_time()
                 timestamp   = int(server_time['result']['timeSecond'])
                 server_str  = datetime.datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
 
+                METRICS.observe('cycle', elapsed)
+                METRICS.end_cycle(worker_path(METRICS_JSON))
+                dropped = LOG_HANDLER.take_dropped()
+                if dropped:
+                    logger.warning("Log kuyruğu doldu — %d kayıt düşürüldü (%d WARNING ve üstü)",
+                                   dropped, LOG_HANDLER.take_dropped_warnings())
                 logger.info(f"Tur tamamlandı | Süre: {elapsed:.2f}s | Saat: {server_str}")
 
             except KeyboardInterrupt:
                 logger.info("Bot manuel olarak durduruldu")
+                for account in self.accounts:
+                    account.close()
+                if self.shard is not None:
+                    self.shard.stop()
+                if self.market_data is not None:
+                    self.market_data.close()
+                self._persist_cache(wait=True)
+                if self.indicator_pool is not None:
+                    self.indicator_pool.close()
                 break
             except Exception as e:
                 logger.error(f"Beklenmeyen hata: {e}", exc_info=True)
@@ -0,0 +1,417 @@
+"""
+Ortak piyasa verisi: tek bir daemon kline cache'ini ve indikatör hesabını yürütür,
+her mumda kapanmış barları ve indikatör snapshot'ını shared memory'ye yazar;
+strateji süreçleri / alt hesaplar abone olup aynı barı exchange'e gitmeden okur.
+
+    python market_data.py                 # daemon (SYMBOLS, INTERVAL)
+    MARKET_DATA_SUBSCRIBE = True          # config.py: TradingBot veriyi daemon'dan alır
+
+Bildirim: her abone MARKET_DATA_SOCKET_DIR altında bir UNIX datagram soketi açar;
+daemon yayından sonra her sokete (seq, bar_time) yollar. Soket yayından önce
+bağlandığı için uyandırma kaybolmaz; kapanmış abonenin soketi ilk denemede silinir.
+
+Daemon yeniden başlarsa segment silinip yeniden kurulur: eski segmentin nesli
+(başlık[7]) RETIRED'a çekilir, abone bunu görünce aynı adla yeni segmente bağlanır.
+
+Shared memory (MARKET_DATA_SHM) düzeni:
+    başlık     int64 × 8: seq, bar_time (ns), yayın zamanı (ns), meta uzunluğu, n_sym, n_field, max_bars, nesil
+    meta       JSON: {"symbols": [...], "fields": [...]} (META_BYTES'a kadar)
+    fields     float64 (n_field, n_sym)       snapshot alanları
+    flags      int64 (n_field)                alan bool değerli mi (pivot_go_*)
+    valid      int64 (n_sym)                  sembolün verisi var mı
+    times      int64 (n_sym)                  snapshot bar zamanı (ns)
+    lengths    int64 (n_sym)                  kapanmış bar sayısı
+    bar_times  int64 (n_sym, max_bars)
+    ohlcv      float64 (n_sym, max_bars, 5)
+
+Tutarlılık seqlock ile: yazıcı seq'i tek sayıya çeker, yazar, çift sayıya çeker;
+okuyucu okuma öncesi/sonrası seq aynı ve çift değilse tekrar okur. Seq WRITE_STALL'dan
+uzun süre tek kalırsa (daemon yazım ortasında SIGKILL / OOM ile öldü) okuma veri yok döner.
+"""
+import os
+import json
+import glob
+import time
+import socket
+import struct
+import logging
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    SYMBOLS, INTERVAL, MARKET_DATA_SHM, MARKET_DATA_SOCKET_DIR, MARKET_DATA_MAX_BARS, MARKET_DATA_TIMEOUT,
+)
+from exchange import INTERVAL_MS
+from snapshot import SignalSnapshot
+
+logger = logging.getLogger(__name__)
+
+OHLCV_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+HEADER_WORDS = 8
+META_BYTES   = 1 << 16
+NOTIFY       = struct.Struct('qq')  # seq, bar_time
+RETIRED      = -1                   # başlık[7]: segment yenisiyle değiştirildi / kapatıldı
+WRITE_STALL  = 1.0                  # s: seq bundan uzun tek kalırsa yazıcı yazım ortasında ölmüştür
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Segmente kaynak izleyicisine kaydetmeden bağlanır (Python 3.13'teki track=False).
+    Aksi halde abone süreç çıkarken izleyici daemon'un segmentini siler.
+    """
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _retire(shm: shared_memory.SharedMemory) -> None:
+    if shm.size >= HEADER_WORDS * 8:
+        np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=shm.buf)[7] = RETIRED
+
+
+class _Layout:
+    """Başlık + meta'dan dizi görünümleri (yazıcı ve okuyucu aynı düzeni kurar)."""
+
+    def __init__(self, buf, symbols: Sequence[str], fields: Sequence[str], max_bars: int):
+        n_sym, n_field = len(symbols), len(fields)
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=buf)
+        offset = HEADER_WORDS * 8 + META_BYTES
+
+        def take(shape, dtype):
+            nonlocal offset
+            array = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            offset += array.nbytes
+            return array
+
+        self.fields    = take((n_field, n_sym), np.float64)
+        self.flags     = take((n_field,), np.int64)
+        self.valid     = take((n_sym,), np.int64)
+        self.times     = take((n_sym,), np.int64)
+        self.lengths   = take((n_sym,), np.int64)
+        self.bar_times = take((n_sym, max_bars), np.int64)
+        self.ohlcv     = take((n_sym, max_bars, len(OHLCV_FIELDS)), np.float64)
+
+    @staticmethod
+    def size(n_sym: int, n_field: int, max_bars: int) -> int:
+        return HEADER_WORDS * 8 + META_BYTES + 8 * (n_field * n_sym + n_field + 3 * n_sym + n_sym * max_bars * (1 + len(OHLCV_FIELDS)))
+
+
+# ─── Yayıncı (daemon) ─────────────────────────────────────────────────────────
+
+class MarketDataPublisher:
+    def __init__(
+        self,
+        symbols:    Sequence[str],
+        fields:     Sequence[str],
+        name:       str = MARKET_DATA_SHM,
+        socket_dir: str = MARKET_DATA_SOCKET_DIR,
+        max_bars:   int = MARKET_DATA_MAX_BARS,
+    ):
+        self.symbols    = list(symbols)
+        self.fields     = list(fields)
+        self.socket_dir = socket_dir
+        self.max_bars   = max_bars
+        self._pos       = {symbol: j for j, symbol in enumerate(self.symbols)}
+        meta = json.dumps({'symbols': self.symbols, 'fields': self.fields}).encode()
+        if len(meta) > META_BYTES:
+            raise ValueError(f"Meta {len(meta)} bayt, sınır {META_BYTES}")
+
+        try:  # önceki (çökmüş) daemon'dan kalan segment: bağlı aboneler yenisine geçsin
+            stale = _attach_untracked(name)
+            _retire(stale)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=True, size=_Layout.size(len(self.symbols), len(self.fields), max_bars)
+        )
+        self._shm.buf[HEADER_WORDS * 8:HEADER_WORDS * 8 + len(meta)] = meta
+        self.layout = _Layout(self._shm.buf, self.symbols, self.fields, max_bars)
+        self.layout.header[:] = 0
+        self.layout.header[3:7] = [len(meta), len(self.symbols), len(self.fields), max_bars]
+        self.layout.header[7] = time.time_ns()  # nesil: abone yeniden bağlanmayı bununla fark eder
+
+        os.makedirs(socket_dir, exist_ok=True)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        logger.info("Piyasa verisi yayını: %s | %d sembol | %d alan", name, len(self.symbols), len(self.fields))
+
+    def publish(self, frames: Dict[str, Optional[pd.DataFrame]], snapshot: SignalSnapshot) -> int:
+        """Kapanmış barları ve snapshot'ı yazar, aboneleri uyarır. Uyarılan abone sayısını döndürür."""
+        layout = self.layout
+        layout.header[0] += 1  # tek: yazılıyor
+        layout.fields.fill(np.nan)
+        layout.valid[:] = 0
+        layout.times[:] = -1
+        index = np.array([self._pos.get(symbol, -1) for symbol in snapshot.symbols], dtype=np.int64)
+        keep  = (index >= 0) & snapshot.valid
+        cols  = index[keep]
+        for k, name in enumerate(self.fields):
+            values = snapshot.fields.get(name)
+            if values is not None:
+                layout.fields[k, cols] = values[keep]
+        layout.flags[:] = [name in snapshot.flags for name in self.fields]
+        layout.valid[cols] = 1
+        layout.times[cols] = snapshot.times[keep]
+        for symbol, j in self._pos.items():
+            df = frames.get(symbol)
+            if df is None or df.empty:
+                layout.lengths[j] = 0
+                continue
+            df = df.iloc[-self.max_bars:]
+            n  = len(df)
+            layout.ohlcv[j, :n]     = df[OHLCV_FIELDS].to_numpy(dtype=np.float64)
+            layout.bar_times[j, :n] = df.index.as_unit('ns').asi8
+            layout.lengths[j]       = n
+        last_bars = layout.bar_times[np.arange(len(self.symbols)), np.maximum(layout.lengths - 1, 0)]
+        bar_time  = int(last_bars[layout.lengths > 0].max()) if (layout.lengths > 0).any() else -1
+        layout.header[1] = bar_time
+        layout.header[2] = time.time_ns()
+        layout.header[0] += 1  # çift: tutarlı
+        return self._notify(int(layout.header[0]), bar_time)
+
+    def _notify(self, seq: int, bar_time: int) -> int:
+        payload  = NOTIFY.pack(seq, bar_time)
+        notified = 0
+        for path in glob.glob(os.path.join(self.socket_dir, '*.sock')):
+            try:
+                self._sock.sendto(payload, path)
+                notified += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.remove(path)  # kapanmış abone
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                logger.warning("Abone kuyruğu dolu, bildirim atlandı: %s", path)
+        return notified
+
+    def close(self) -> None:
+        self._sock.close()
+        self.layout.header[7] = RETIRED
+        self.layout = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+# ─── Abone ────────────────────────────────────────────────────────────────────
+
+class MarketDataSubscriber:
+    def __init__(
+        self,
+        name:       str = MARKET_DATA_SHM,
+        socket_dir: str = MARKET_DATA_SOCKET_DIR,
+        timeout:    float = MARKET_DATA_TIMEOUT,
+    ):
+        self.name    = name
+        self.timeout = timeout
+        self._shm    = None
+        self._attach(_attach_untracked(name))
+
+        os.makedirs(socket_dir, exist_ok=True)
+        self.socket_path = os.path.join(socket_dir, f"{os.getpid()}-{id(self):x}.sock")
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.socket_path)
+
+    def _attach(self, shm: shared_memory.SharedMemory) -> None:
+        header   = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=shm.buf)
+        meta_len, _, _, max_bars = (int(v) for v in header[3:7])
+        meta     = json.loads(bytes(shm.buf[HEADER_WORDS * 8:HEADER_WORDS * 8 + meta_len]))
+        if self._shm is not None:
+            self.layout = None
+            self._shm.close()
+        self._shm       = shm
+        self.generation = int(header[7])
+        self.symbols    = meta['symbols']
+        self.fields     = meta['fields']
+        self.max_bars   = max_bars
+        self.layout     = _Layout(shm.buf, self.symbols, self.fields, max_bars)
+        self._pos       = {symbol: j for j, symbol in enumerate(self.symbols)}
+
+    @property
+    def retired(self) -> bool:
+        """Bağlı olduğumuz segment daemon tarafından kapatıldı / yenisiyle değiştirildi mi."""
+        return int(self.layout.header[7]) != self.generation
+
+    def reattach(self) -> bool:
+        """Aynı addaki segment farklı nesildeyse ona geçer (daemon yeniden başladı). Geçildiyse True."""
+        try:
+            shm = _attach_untracked(self.name)
+        except FileNotFoundError:
+            return False  # yeni daemon henüz segmenti kurmadı
+        generation = int(np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=shm.buf)[7])
+        if generation in (self.generation, RETIRED, 0):
+            shm.close()
+            return False
+        self._attach(shm)
+        logger.warning("Piyasa verisi segmenti yenilendi (daemon yeniden başladı) — yeniden bağlanıldı")
+        return True
+
+    @property
+    def bar_time(self) -> int:
+        return int(self.layout.header[1])
+
+    @property
+    def published_ns(self) -> int:
+        return int(self.layout.header[2])
+
+    def _consistent(self, read, deadline: Optional[float] = None):
+        """
+        `read()`'i seqlock altında, yazıcıyla çakışmayan bir kopya elde edene kadar tekrarlar.
+        Segment emekliye ayrıldıysa, `deadline` (monotonic) geçtiyse ya da seq WRITE_STALL'dan
+        uzun süre aynı tek değerde kaldıysa (yazım ortasında ölmüş daemon) None.
+        """
+        header  = self.layout.header
+        stalled = None  # (tek seq, bu seq'in bırakılması gereken an)
+        while True:
+            seq = int(header[0])
+            if int(header[7]) != self.generation:
+                return None
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                return None
+            if seq & 1:
+                if stalled is None or stalled[0] != seq:
+                    stalled = (seq, now + WRITE_STALL)
+                elif now >= stalled[1]:
+                    logger.error("Piyasa verisi yazımı yarıda kaldı (seq %d tek) — veri yok", seq)
+                    return None
+                time.sleep(0)
+                continue
+            value = read()
+            if int(header[0]) == seq:
+                return value
+
+    def wait(self, since_ns: int, timeout: Optional[float] = None) -> bool:
+        """`since_ns`'den (unix ns) sonra yapılmış bir yayın olana kadar bildirim bekler; zaman aşımında False."""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            if self.retired:
+                self.reattach()
+            published = self._consistent(lambda: self.published_ns, deadline)
+            if published is not None and published >= since_ns:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Son şans: segment işaretlenmeden değiştirilmiş olabilir
+                return self.reattach() and self.published_ns >= since_ns
+            # Emekli segmentte yeni daemon'un segmenti kurmasını kısa aralıklarla yokla
+            self._sock.settimeout(min(remaining, 1.0) if self.retired else remaining)
+            try:
+                self._sock.recv(NOTIFY.size)
+            except socket.timeout:
+                continue
+
+    def snapshot(self, symbols: Optional[Sequence[str]] = None) -> SignalSnapshot:
+        """Yayındaki snapshot (istenen semboller, sırasıyla); yayında olmayan sembol geçersiz kalır."""
+        symbols = list(symbols) if symbols is not None else list(self.symbols)
+        index   = np.array([self._pos.get(symbol, -1) for symbol in symbols], dtype=np.int64)
+        present = index >= 0
+        cols    = index[present]
+        layout  = self.layout
+
+        def read():
+            return (layout.fields[:, cols].copy(), layout.valid[cols].copy(), layout.times[cols].copy(),
+                    layout.header[2] / 1e9, layout.flags.copy())
+
+        n = len(symbols)
+        consistent = self._consistent(read)
+        if consistent is None:  # segment değişti: veri yok, hiçbir sembol işlem görmez
+            return SignalSnapshot.empty(symbols, self.fields)
+        values, valid, times, created, flags = consistent
+        fields = {name: np.full(n, np.nan) for name in self.fields}
+        for k, name in enumerate(self.fields):
+            fields[name][present] = values[k]
+        valid_all = np.zeros(n, dtype=bool)
+        valid_all[present] = valid.astype(bool)
+        times_all = np.full(n, -1, dtype=np.int64)
+        times_all[present] = times
+        return SignalSnapshot(symbols, fields, valid_all, times_all, created=created,
+                              flags={name for name, flag in zip(self.fields, flags) if flag})
+
+    def frame(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Sembolün kapanmış barları (kopya)."""
+        j = self._pos.get(symbol)
+        if j is None:
+            return None
+        layout = self.layout
+
+        def read():
+            n = int(layout.lengths[j])
+            return layout.bar_times[j, :n].copy(), layout.ohlcv[j, :n].copy()
+
+        consistent = self._consistent(read)
+        if consistent is None:
+            return None
+        times, ohlcv = consistent
+        if not len(times):
+            return None
+        return pd.DataFrame(ohlcv, index=pd.DatetimeIndex(times).tz_localize('UTC').rename('time'), columns=OHLCV_FIELDS)
+
+    def close(self) -> None:
+        self._sock.close()
+        try:
+            os.remove(self.socket_path)
+        except FileNotFoundError:
+            pass
+        self.layout = None
+        self._shm.close()
+
+
+def candle_open_ns(interval: str = INTERVAL, now: Optional[float] = None) -> int:
+    """İçinde bulunulan mumun açılış zamanı (unix ns); bu andan sonraki yayın bu mumun yayınıdır."""
+    step   = INTERVAL_MS[interval]
+    now_ms = int((time.time() if now is None else now) * 1000)
+    return now_ms // step * step * 1_000_000
+
+
+# ─── Daemon ───────────────────────────────────────────────────────────────────
+
+class MarketDataDaemon:
+    """
+    Veri tarafı TradingBot (trading=False: kaldıraç / pozisyon kurtarma / emir yok)
+    ile aynı cache + indikatör yolunu çalıştırır; her mumda sonucu yayınlar.
+    """
+
+    def __init__(self, bot, publisher: Optional[MarketDataPublisher] = None):
+        from main import SNAPSHOT_FIELDS
+        self.bot       = bot
+        self.publisher = publisher or MarketDataPublisher(bot.symbols, SNAPSHOT_FIELDS)
+
+    def publish_cycle(self) -> Tuple[SignalSnapshot, int]:
+        all_data, now = self.bot._fetch_market_data()
+        snapshot = self.bot._snapshot_from(all_data, now)
+        notified = self.publisher.publish(self.bot._closed_frames(all_data, now), snapshot)
+        return snapshot, notified
+
+    def run(self) -> None:
+        logger.info("Piyasa verisi daemon'u başladı | Semboller: %d | Aralık: %sm", len(self.bot.symbols), self.bot.interval)
+        try:
+            while True:
+                try:
+                    self.bot._wait_until_next_candle()
+                    start = time.perf_counter()
+                    snapshot, notified = self.publish_cycle()
+                    logger.info("Yayın | %d sembol | %d abone | %.2fs",
+                                int(snapshot.valid.sum()), notified, time.perf_counter() - start)
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    logger.error("Yayın hatası: %s", e, exc_info=True)
+                    time.sleep(60)
+        except KeyboardInterrupt:
+            logger.info("Piyasa verisi daemon'u durduruldu")
+        finally:
+            self.publisher.close()
+
+
+if __name__ == "__main__":
+    from main import TradingBot
+    MarketDataDaemon(TradingBot(testnet=False, symbols=SYMBOLS, trading=False, metrics_port=0)).run()
@@ -0,0 +1,284 @@
+"""
+Sıcak yol ölçümleri: aşama × sembol gecikme histogramları, endpoint başına API
+çağrı/hata sayaçları; Prometheus text HTTP endpoint'i ve dönen JSON dosyası.
+
+    with METRICS.time('kline_fetch', symbol):
+        ...
+    METRICS.observe('wake_jitter', 0.012)
+    session = InstrumentedSession(session)   # tüm API çağrılarını sayar ve zamanlar
+    start_http_server(9108)                  # GET /metrics
+    METRICS.end_cycle()                      # tur özetini kaydeder, JSON dosyasını yazar
+
+Gözlem başına maliyet: bir bisect + kilitli sayaç artışı (~1-2 µs).
+"""
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import METRICS_JSON, METRICS_RECENT_CYCLES
+
+logger = logging.getLogger(__name__)
+
+# Aşamalar (TradingBot.run sırasıyla)
+STAGES = (
+    'wake_jitter', 'kline_fetch', 'kline_parse', 'indicators', 'signal',
+    'oco_monitor', 'order_place', 'fill_confirm', 'bracket_place', 'cycle',
+)
+
+# 100µs'den ~28 dakikaya katlanarak büyüyen kova sınırları (saniye)
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(0.0001 * 2 ** k for k in range(25))
+
+
+class Histogram:
+    """Sabit kovalı histogram (Prometheus semantiği: le ≤ sınır). Thread-safe değil; Metrics kilitler."""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count', 'max')
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # son kova: +Inf
+        self.sum    = 0.0
+        self.count  = 0
+        self.max    = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum   += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Kova sınırından yaklaşık quantile (üst sınır; +Inf kovasında gözlenen max)."""
+        if not self.count:
+            return float('nan')
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count, 'sum': self.sum, 'max': self.max,
+            'p50': self.quantile(0.50), 'p99': self.quantile(0.99),
+        }
+
+
+class Metrics:
+    """Histogram ve sayaç kaydı. Anahtarlar: (aşama, sembol) ve endpoint."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, recent_cycles: int = METRICS_RECENT_CYCLES):
+        self.buckets = buckets
+        self.started = time.time()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._calls:  Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._cycle:  Dict[str, float] = {}
+        self._recent: deque = deque(maxlen=recent_cycles)
+        self._lock = threading.Lock()
+
+    # ─── Kayıt ────────────────────────────────────────────────────────────────
+
+    def observe(self, stage: str, seconds: float, symbol: Optional[str] = None) -> None:
+        key = (stage, symbol or '')
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.buckets)
+            hist.observe(seconds)
+            self._cycle[stage] = self._cycle.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def time(self, stage: str, symbol: Optional[str] = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, symbol)
+
+    def count_call(self, endpoint: str, error: bool = False) -> None:
+        with self._lock:
+            self._calls[endpoint] = self._calls.get(endpoint, 0) + 1
+            if error:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._calls.clear()
+            self._errors.clear()
+            self._cycle.clear()
+            self._recent.clear()
+
+    # ─── Okuma ────────────────────────────────────────────────────────────────
+
+    def histogram(self, stage: str, symbol: Optional[str] = None) -> Optional[Histogram]:
+        return self._histograms.get((stage, symbol or ''))
+
+    def stage_summary(self, stage: str) -> Histogram:
+        """Bir aşamanın tüm semboller üzerinden birleşik histogramı."""
+        merged = Histogram(self.buckets)
+        with self._lock:
+            for (name, _), hist in self._histograms.items():
+                if name != stage:
+                    continue
+                merged.counts = [a + b for a, b in zip(merged.counts, hist.counts)]
+                merged.sum   += hist.sum
+                merged.count += hist.count
+                merged.max    = max(merged.max, hist.max)
+        return merged
+
+    def api_counts(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {endpoint: {'calls': n, 'errors': self._errors.get(endpoint, 0)}
+                    for endpoint, n in sorted(self._calls.items())}
+
+    def end_cycle(self, json_path: Optional[str] = METRICS_JSON) -> Dict[str, float]:
+        """Turun aşama toplamlarını son turlar listesine ekler; json_path verilmişse dosyayı yazar."""
+        with self._lock:
+            cycle, self._cycle = self._cycle, {}
+            self._recent.append({'time': time.time(), 'stages': cycle})
+        if json_path:
+            try:
+                self.write_json(json_path)
+            except OSError as e:
+                logger.warning("Metrik dosyası yazılamadı: %s", e)
+        return cycle
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages: Dict[str, Dict[str, Dict]] = {}
+            for (stage, symbol), hist in sorted(self._histograms.items()):
+                stages.setdefault(stage, {})[symbol or '_all'] = hist.to_dict()
+            recent = list(self._recent)
+        return {
+            'updated': time.time(), 'uptime': time.time() - self.started,
+            'stages': stages, 'api': self.api_counts(), 'recent_cycles': recent,
+        }
+
+    def write_json(self, path: str) -> None:
+        """Güncel durumu atomik olarak yazar (son METRICS_RECENT_CYCLES tur dahil)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, separators=(',', ':'), default=_json_default)
+        os.replace(tmp, path)
+
+    def render_prometheus(self, prefix: str = 'bot') -> str:
+        """Prometheus text exposition formatı (0.0.4)."""
+        lines: List[str] = [
+            f"# HELP {prefix}_stage_seconds Aşama süreleri (saniye)",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for (stage, symbol), hist in sorted(self._histograms.items()):
+                labels = f'stage="{stage}"' + (f',symbol="{symbol}"' if symbol else '')
+                cumulative = 0
+                for bound, n in zip(hist.bounds, hist.counts):
+                    cumulative += n
+                    lines.append(f'{prefix}_stage_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f'{prefix}_stage_seconds_sum{{{labels}}} {hist.sum:.9g}')
+                lines.append(f'{prefix}_stage_seconds_count{{{labels}}} {hist.count}')
+            for name, values, help_text in (('api_calls_total', self._calls, 'API çağrıları'),
+                                            ('api_errors_total', self._errors, 'API hataları')):
+                lines.append(f"# HELP {prefix}_{name} {help_text} (endpoint başına)")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for endpoint, n in sorted(values.items()):
+                    lines.append(f'{prefix}_{name}{{endpoint="{endpoint}"}} {n}')
+        return '\n'.join(lines) + '\n'
+
+
+def _json_default(value):
+    return None
+
+
+# Süreç genelinde paylaşılan kayıt
+METRICS = Metrics()
+
+
+# ─── API Oturumu Sarmalayıcı ──────────────────────────────────────────────────
+
+class InstrumentedSession:
+    """
+    pybit HTTP (ya da MockBybitSession) sarmalayıcısı: her metot çağrısını endpoint
+    adıyla sayar ve `api` aşaması altında zamanlar. retCode != 0 ya da istisna hata sayılır.
+    """
+
+    def __init__(self, session: Any, metrics: Optional[Metrics] = None):
+        self._session = session
+        self._metrics = metrics or METRICS
+        self._wrapped: Dict[str, Any] = {}
+
+    @property
+    def wrapped_session(self) -> Any:
+        return self._session
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._session, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+        wrapper = self._wrapped.get(name)
+        if wrapper is None:
+            metrics = self._metrics
+
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    response = attr(*args, **kwargs)
+                except Exception:
+                    metrics.count_call(name, error=True)
+                    raise
+                finally:
+                    metrics.observe(f"api.{name}", time.perf_counter() - start)
+                error = isinstance(response, dict) and response.get('retCode', 0) != 0
+                metrics.count_call(name, error=error)
+                return response
+
+            self._wrapped[name] = wrapper
+        return wrapper
+
+
+# ─── HTTP Endpoint ────────────────────────────────────────────────────────────
+
+def start_http_server(port: int, host: str = '127.0.0.1', metrics: Optional[Metrics] = None) -> ThreadingHTTPServer:
+    """GET /metrics (Prometheus text) ve /metrics.json sunan daemon thread başlatır."""
+    registry = metrics or METRICS
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/metrics.json'):
+                body = json.dumps(registry.snapshot(), default=_json_default).encode()
+                content_type = 'application/json'
+            elif self.path.startswith('/metrics'):
+                body = registry.render_prometheus().encode()
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # istek logları bot logunu kirletmesin
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+    thread.start()
+    logger.info("Metrik endpoint'i: http://%s:%d/metrics", host, server.server_address[1])
+    return server
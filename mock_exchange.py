@@ -0,0 +1,278 @@
+import time
+import zlib
+import math
+import threading
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+
+from exchange import INTERVAL_MS
+
+
+class MockBybitSession:
+    """
+    pybit HTTP oturumunun yerel taklidi (test / benchmark için, ağ yok).
+    Kline verisi sembol + zaman damgasından deterministik üretilir; aynı bar
+    her istekte aynı değeri döndürür. Yapay gecikme ve rate limit eklenebilir.
+
+    Emir/pozisyon uç noktaları da vardır: market emri anında dolar (pozisyona
+    `fill_delay` saniye sonra yansır), limit ve stop emirleri açık bekler.
+    `protected_at[symbol]`: pozisyonun TP ve SL bacaklarıyla tamamen korunduğu an
+    (time.perf_counter), uçtan uca gecikme ölçümü için.
+    """
+
+    def __init__(
+        self,
+        latency:    float = 0.0,
+        rate_limit: Optional[float] = None,
+        listing_ms: int = 1_577_836_800_000,  # 2020-01-01 UTC
+        now_ms:     Optional[int] = None,
+        fill_delay: float = 0.0,
+        symbols:    Optional[List[str]] = None,
+        qty_step:   str = '0.001',
+    ):
+        self.latency    = latency
+        self.rate_limit = rate_limit
+        self.listing_ms = listing_ms
+        self.now_ms     = now_ms
+        self.fill_delay = fill_delay
+        self.symbols    = list(symbols or [])  # get_instruments_info'nun listelediği semboller
+        self.qty_step   = qty_step
+        self.calls: Dict[str, int] = defaultdict(int)
+        self._recent    = deque()
+        self._lock      = threading.Lock()
+        # Hesap durumu
+        self.positions: Dict[str, Dict] = {}     # symbol → {'side', 'size', 'avgPrice', 'visible_at'}
+        self.orders: Dict[str, Dict] = {}        # orderId → emir
+        self.leverage: Dict[str, str] = {}
+        self.protected_at: Dict[str, float] = {}
+        self._order_seq = 0
+
+    # ─── Ortak ────────────────────────────────────────────────────────────────
+
+    def _now_ms(self) -> int:
+        return self.now_ms if self.now_ms is not None else int(time.time() * 1000)
+
+    def _enter(self, endpoint: str) -> Optional[Dict]:
+        """Çağrıyı sayar, gecikmeyi uygular; limit aşıldıysa Bybit hata cevabı döndürür."""
+        with self._lock:
+            self.calls[endpoint] += 1
+            if self.rate_limit:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] > 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    return {'retCode': 10006, 'retMsg': 'Too many visits!', 'result': {}}
+                self._recent.append(now)
+        if self.latency:
+            time.sleep(self.latency)
+        return None
+
+    @staticmethod
+    def _price(symbol: str, ts: int, step: int) -> List[str]:
+        k    = ts // step
+        seed = zlib.crc32(symbol.encode()) % 1000
+        base = 1 + seed
+        mid  = base * (1 + 0.05 * math.sin(k / 97.0 + seed) + 0.01 * math.sin(k / 7.3))
+        prev = base * (1 + 0.05 * math.sin((k - 1) / 97.0 + seed) + 0.01 * math.sin((k - 1) / 7.3))
+        wick = base * 0.002 * (1 + math.sin(k * 1.7 + seed) ** 2)
+        high = max(mid, prev) + wick
+        low  = min(mid, prev) - wick
+        return [str(ts), f"{prev:.6f}", f"{high:.6f}", f"{low:.6f}", f"{mid:.6f}", "100", f"{100 * mid:.2f}"]
+
+    # ─── Piyasa Verisi ────────────────────────────────────────────────────────
+
+    def get_server_time(self, **kwargs) -> Dict:
+        self._enter('get_server_time')
+        now = self._now_ms()
+        return {'retCode': 0, 'retMsg': 'OK', 'result': {'timeSecond': str(now // 1000), 'timeNano': str(now * 1_000_000)}}
+
+    def get_kline(
+        self,
+        category: str = 'linear',
+        symbol:   str = 'BTCUSDT',
+        interval: str = '15',
+        limit:    int = 200,
+        start:    Optional[int] = None,
+        end:      Optional[int] = None,
+        **kwargs,
+    ) -> Dict:
+        error = self._enter('get_kline')
+        if error:
+            return error
+
+        step  = INTERVAL_MS[str(interval)]
+        limit = min(int(limit), 1000)
+        last  = (self._now_ms() // step) * step  # şu an oluşan (kapanmamış) bar
+        if end is not None:
+            last = min(last, (int(end) // step) * step)
+        first = max(self.listing_ms, last - (limit - 1) * step)
+        if start is not None:
+            first = max(first, -(-int(start) // step) * step)
+
+        rows = [self._price(symbol, ts, step) for ts in range(last, first - 1, -step)]
+        return {'retCode': 0, 'retMsg': 'OK', 'result': {'symbol': symbol, 'category': category, 'list': rows}}
+
+    def get_instruments_info(self, category: str = 'linear', symbol: Optional[str] = None, **kwargs) -> Dict:
+        error = self._enter('get_instruments_info')
+        if error:
+            return error
+        rows = [
+            {'symbol': sym, 'lotSizeFilter': {'qtyStep': self.qty_step, 'minOrderQty': self.qty_step},
+             'priceFilter': {'tickSize': '0.01'}}
+            for sym in ([symbol] if symbol else self.symbols)
+        ]
+        return self._ok({'category': category, 'list': rows, 'nextPageCursor': ''})
+
+    # ─── Hesap & Emirler ──────────────────────────────────────────────────────
+
+    @staticmethod
+    def _ok(result: Optional[Dict] = None) -> Dict:
+        return {'retCode': 0, 'retMsg': 'OK', 'result': result if result is not None else {}}
+
+    def _last_price(self, symbol: str) -> float:
+        step = INTERVAL_MS['15']
+        return float(self._price(symbol, (self._now_ms() // step) * step, step)[4])
+
+    def set_leverage(self, category: str = 'linear', symbol: str = '', buyLeverage: str = '', **kwargs) -> Dict:
+        error = self._enter('set_leverage')
+        if error:
+            return error
+        with self._lock:
+            if self.leverage.get(symbol) == buyLeverage:
+                raise Exception("leverage not modified (ErrCode: 110043)")  # pybit retCode != 0'da istisna atar
+            self.leverage[symbol] = buyLeverage
+        return self._ok()
+
+    def place_order(
+        self,
+        category:     str = 'linear',
+        symbol:       str = '',
+        side:         str = 'Buy',
+        orderType:    str = 'Market',
+        qty:          str = '0',
+        price:        Optional[str] = None,
+        triggerPrice: Optional[str] = None,
+        reduceOnly:   bool = False,
+        **kwargs,
+    ) -> Dict:
+        error = self._enter('place_order')
+        if error:
+            return error
+        if float(qty) <= 0:
+            return {'retCode': 10001, 'retMsg': 'Qty invalid', 'result': {}}
+        with self._lock:
+            self._order_seq += 1
+            order_id = f"mock-{self._order_seq}"
+            order = {
+                'orderId': order_id, 'symbol': symbol, 'side': side, 'orderType': orderType,
+                'qty': str(qty), 'price': price or '0', 'triggerPrice': triggerPrice or '',
+                'reduceOnly': bool(reduceOnly), 'orderStatus': 'New',
+            }
+            if orderType == 'Market' and not triggerPrice:
+                order['orderStatus'] = 'Filled'
+                self._fill(symbol, side, float(qty), self._last_price(symbol), bool(reduceOnly))
+            elif triggerPrice:
+                order['orderStatus'] = 'Untriggered'
+            self.orders[order_id] = order
+            if reduceOnly:
+                self._check_protected(symbol)
+        return self._ok({'orderId': order_id, 'orderLinkId': ''})
+
+    def _fill(self, symbol: str, side: str, qty: float, price: float, reduce_only: bool) -> None:
+        position = self.positions.get(symbol)
+        if position is None or position['size'] == 0:
+            if reduce_only:
+                return
+            self.positions[symbol] = {'side': side, 'size': qty, 'avgPrice': price,
+                                      'visible_at': time.monotonic() + self.fill_delay}
+            self.protected_at.pop(symbol, None)
+            return
+        if position['side'] == side:
+            total = position['size'] + qty
+            position['avgPrice'] = (position['avgPrice'] * position['size'] + price * qty) / total
+            position['size'] = total
+        else:
+            position['size'] = max(0.0, round(position['size'] - qty, 10))
+            if position['size'] == 0:
+                del self.positions[symbol]
+                self.protected_at.pop(symbol, None)
+
+    def _check_protected(self, symbol: str) -> None:
+        """Açık TP (limit) ve SL (stop) bacakları pozisyon miktarını ayrı ayrı karşılıyorsa korunmuş say."""
+        position = self.positions.get(symbol)
+        if position is None or symbol in self.protected_at:
+            return
+        tp = sl = 0.0
+        for order in self.orders.values():
+            if order['symbol'] != symbol or order['orderStatus'] not in ('New', 'Untriggered'):
+                continue
+            if order['triggerPrice']:
+                sl += float(order['qty'])
+            elif order['orderType'] == 'Limit':
+                tp += float(order['qty'])
+        tolerance = position['size'] * 1e-6
+        if tp >= position['size'] - tolerance and sl >= position['size'] - tolerance:
+            self.protected_at[symbol] = time.perf_counter()
+
+    def fill_order(self, order_id: str) -> None:
+        """Açık bir TP/SL emrinin tetiklenip dolmasını simüle eder (test için)."""
+        with self._lock:
+            order = self.orders[order_id]
+            order['orderStatus'] = 'Filled'
+            price = float(order['price'] or order['triggerPrice'] or self._last_price(order['symbol']))
+            self._fill(order['symbol'], order['side'], float(order['qty']), price, order['reduceOnly'])
+
+    def cancel_order(self, category: str = 'linear', symbol: str = '', orderId: str = '', **kwargs) -> Dict:
+        error = self._enter('cancel_order')
+        if error:
+            return error
+        with self._lock:
+            order = self.orders.get(orderId)
+            if order is None or order['orderStatus'] not in ('New', 'Untriggered'):
+                raise Exception("order not exists or too late to cancel (ErrCode: 110001)")
+            order['orderStatus'] = 'Cancelled'
+            self.protected_at.pop(symbol, None)
+        return self._ok({'orderId': orderId, 'orderLinkId': ''})
+
+    def get_positions(self, category: str = 'linear', symbol: Optional[str] = None, **kwargs) -> Dict:
+        error = self._enter('get_positions')
+        if error:
+            return error
+        now = time.monotonic()
+        with self._lock:
+            rows = [
+                {'symbol': sym, 'side': p['side'], 'size': str(p['size']), 'avgPrice': str(p['avgPrice'])}
+                for sym, p in self.positions.items()
+                if (symbol is None or sym == symbol) and p['visible_at'] <= now
+            ]
+        return self._ok({'category': category, 'list': rows})
+
+    def _order_rows(self, symbol: Optional[str], order_id: Optional[str], open_orders: bool) -> List[Dict]:
+        with self._lock:
+            return [
+                dict(order) for order in self.orders.values()
+                if (symbol is None or order['symbol'] == symbol)
+                and (order_id is None or order['orderId'] == order_id)
+                and (order['orderStatus'] in ('New', 'Untriggered')) == open_orders
+            ]
+
+    def get_open_orders(self, category: str = 'linear', symbol: Optional[str] = None,
+                        orderId: Optional[str] = None, **kwargs) -> Dict:
+        error = self._enter('get_open_orders')
+        if error:
+            return error
+        return self._ok({'category': category, 'list': self._order_rows(symbol, orderId, True)})
+
+    def get_order_history(self, category: str = 'linear', symbol: Optional[str] = None,
+                          orderId: Optional[str] = None, **kwargs) -> Dict:
+        error = self._enter('get_order_history')
+        if error:
+            return error
+        return self._ok({'category': category, 'list': self._order_rows(symbol, orderId, False)})
+
+    def reset_account(self) -> None:
+        """Pozisyon ve emirleri siler (senaryolar arası)."""
+        with self._lock:
+            self.positions.clear()
+            self.orders.clear()
+            self.protected_at.clear()
@@ -0,0 +1,134 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from config import RISK_PER_TRADE_USDT, LEVERAGE
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+# ─── Girdi ────────────────────────────────────────────────────────────────────
+
+def trade_r_multiples(trades: Union[pd.DataFrame, Sequence[float]], risk: Optional[float] = None) -> np.ndarray:
+    """
+    Trade PnL'lerini R katına (PnL / trade başına risk) çevirir.
+    `trades` portfolio_backtest trade listesi ya da PnL dizisi olabilir.
+    """
+    pnl = trades['pnl'].to_numpy(dtype=np.float64) if isinstance(trades, pd.DataFrame) \
+        else np.asarray(trades, dtype=np.float64)
+    pnl = pnl[np.isfinite(pnl)]
+    if pnl.size == 0:
+        raise ValueError("Monte Carlo için trade yok")
+    return pnl / (risk or RISK_PER_TRADE_USDT)
+
+
+def margin_per_trade(trades: pd.DataFrame, leverage: float = LEVERAGE) -> float:
+    """Trade listesindeki medyan pozisyon büyüklüğünün gerektirdiği marj (USDT)."""
+    if not isinstance(trades, pd.DataFrame) or not {'quantity', 'entry_price'} <= set(trades.columns):
+        return 0.0
+    notional = (trades['quantity'].astype(float) * trades['entry_price'].astype(float)).median()
+    return float(notional / leverage) if np.isfinite(notional) else 0.0
+
+
+# ─── Simülasyon ───────────────────────────────────────────────────────────────
+
+def _sample_indices(rng: np.random.Generator, n_source: int, n_paths: int, n_trades: int, block: int) -> np.ndarray:
+    if block <= 1:
+        return rng.integers(0, n_source, size=(n_paths, n_trades))
+    # Dairesel blok bootstrap: ardışık trade serilerinin korelasyonunu korur
+    n_blocks = -(-n_trades // block)
+    starts   = rng.integers(0, n_source, size=(n_paths, n_blocks, 1))
+    idx      = (starts + np.arange(block)) % n_source
+    return idx.reshape(n_paths, n_blocks * block)[:, :n_trades]
+
+
+def _simulate_chunk(args) -> Dict[str, np.ndarray]:
+    """Bir path grubunu simüle eder: maks DD, ruin, son equity ve band noktaları."""
+    r, n_paths, n_trades, block, risk, initial, ruin_equity, band_steps, seed = args
+    rng = np.random.default_rng(seed)
+
+    pnl    = r[_sample_indices(rng, r.size, n_paths, n_trades, block)] * risk
+    equity = np.cumsum(pnl, axis=1)
+    equity += initial
+
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peak, initial, out=peak)
+    max_dd = ((peak - equity) / peak).max(axis=1)
+
+    return {
+        'max_drawdown': max_dd,
+        'ruined':       (equity <= ruin_equity).any(axis=1),
+        'final_equity': equity[:, -1].copy(),
+        'bands':        equity[:, band_steps].astype(np.float32),
+    }
+
+
+def run_monte_carlo(
+    trades:         Union[pd.DataFrame, Sequence[float]],
+    n_paths:        int = 100_000,
+    n_trades:       Optional[int] = None,
+    initial_equity: float = 1000.0,
+    risk:           Optional[float] = None,
+    block_size:     int = 1,
+    ruin_fraction:  float = 0.5,
+    chunk_size:     int = 20_000,
+    processes:      int = 0,
+    band_points:    int = 100,
+    seed:           Optional[int] = None,
+) -> Dict:
+    """
+    Trade sırasını yeniden örnekleyerek drawdown ve risk of ruin dağılımı çıkarır.
+
+    block_size=1 → klasik bootstrap, >1 → dairesel blok bootstrap.
+    Ruin: equity, başlangıcın `ruin_fraction` oranına ya da tek pozisyonun marjına
+    (LEVERAGE ile) inerse. Path'ler `chunk_size`'lık gruplarla hesaplanır;
+    processes > 0 ise gruplar süreçlere dağıtılır.
+    """
+    risk     = risk or RISK_PER_TRADE_USDT
+    r        = trade_r_multiples(trades, risk=risk)
+    n_trades = n_trades or r.size
+
+    ruin_equity = max(initial_equity * ruin_fraction, margin_per_trade(trades))
+    band_steps  = np.unique(np.linspace(0, n_trades - 1, min(band_points, n_trades)).astype(np.int64))
+
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs  = [(r, size, n_trades, block_size, risk, initial_equity, ruin_equity, band_steps, s)
+             for size, s in zip(sizes, seeds)]
+
+    if processes and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            parts = list(executor.map(_simulate_chunk, jobs))
+    else:
+        parts = [_simulate_chunk(job) for job in jobs]
+
+    max_dd = np.concatenate([p['max_drawdown'] for p in parts])
+    ruined = np.concatenate([p['ruined'] for p in parts])
+    final  = np.concatenate([p['final_equity'] for p in parts])
+    bands  = np.concatenate([p['bands'] for p in parts])
+
+    result = {
+        'n_paths':          n_paths,
+        'n_trades':         n_trades,
+        'ruin_equity':      ruin_equity,
+        'risk_of_ruin':     float(ruined.mean()),
+        'max_drawdown':     max_dd,
+        'drawdown_pct':     {p: float(np.percentile(max_dd, p)) for p in PERCENTILES},
+        'final_equity_pct': {p: float(np.percentile(final, p)) for p in PERCENTILES},
+        'equity_bands':     pd.DataFrame(np.percentile(bands, PERCENTILES, axis=0).T,
+                                         index=pd.Index(band_steps + 1, name='trade'),
+                                         columns=[f"p{p}" for p in PERCENTILES]),
+    }
+    logger.info(
+        "Monte Carlo | Path: %d | Trade: %d | Ruin: %.2f%% | DD p50: %.1f%% | DD p95: %.1f%% | DD p99: %.1f%%",
+        n_paths, n_trades, result['risk_of_ruin'] * 100, result['drawdown_pct'][50] * 100,
+        result['drawdown_pct'][95] * 100, result['drawdown_pct'][99] * 100,
+    )
+    return result
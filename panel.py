@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence
+
+
+class Panel:
+    """
+    (zaman × sembol) hizalanmış 2-D NumPy dizileri.
+    Satırlar ortak bar saati (tüm sembollerin birleşik index'i), sütunlar semboller.
+    Eksik barlar float dizilerde NaN, bool dizilerde False olarak kalır.
+    """
+
+    def __init__(self, index: pd.DatetimeIndex, symbols: Sequence[str], arrays: Dict[str, np.ndarray]):
+        self.index   = index
+        self.symbols = list(symbols)
+        self.arrays  = arrays
+        self._pos    = {sym: j for j, sym in enumerate(self.symbols)}
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.arrays[column]
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.arrays
+
+    @property
+    def shape(self):
+        return len(self.index), len(self.symbols)
+
+    def column_of(self, symbol: str) -> int:
+        return self._pos[symbol]
+
+    def per_symbol(self, values: Dict[str, float], default: float = np.nan) -> np.ndarray:
+        """Sembol bazlı sabitleri (risk, kaldıraç, eşik) sütun sırasına göre 1-D diziye çevirir."""
+        return np.array([values.get(sym, default) for sym in self.symbols], dtype=np.float64)
+
+    def to_frame(self, column: str) -> pd.DataFrame:
+        return pd.DataFrame(self.arrays[column], index=self.index, columns=self.symbols)
+
+
+def align_frames(
+    frames:  Dict[str, Optional[pd.DataFrame]],
+    columns: Sequence[str],
+    dtype:   type = np.float64,
+) -> Panel:
+    """
+    Sembol DataFrame'lerini birleşik zaman ekseninde (time × symbol) dizilere dizer.
+    Bool sütunlar bool, diğerleri `dtype` olarak tutulur; object sütunlar sayıya çevrilir.
+    """
+    frames  = {sym: df for sym, df in frames.items() if df is not None and not df.empty}
+    symbols: List[str] = list(frames)
+    if not symbols:
+        return Panel(pd.DatetimeIndex([]), [], {col: np.empty((0, 0), dtype=dtype) for col in columns})
+
+    # Birleşik bar saati: tüm index'lerin sıralı birleşimi
+    stamps = np.unique(np.concatenate([df.index.as_unit('ns').asi8 for df in frames.values()]))
+    index  = pd.DatetimeIndex(stamps).tz_localize(frames[symbols[0]].index.tz)
+
+    rows = {sym: np.searchsorted(stamps, df.index.as_unit('ns').asi8) for sym, df in frames.items()}
+
+    arrays = {}
+    for col in columns:
+        is_bool = all(df[col].dtype == bool for df in frames.values())
+        if is_bool:
+            out = np.zeros((len(index), len(symbols)), dtype=bool)
+        else:
+            out = np.full((len(index), len(symbols)), np.nan, dtype=dtype)
+
+        for j, sym in enumerate(symbols):
+            values = frames[sym][col]
+            if values.dtype == object:
+                values = pd.to_numeric(values, errors='coerce')
+            out[rows[sym], j] = values.to_numpy(dtype=out.dtype, na_value=False if is_bool else np.nan)
+        arrays[col] = out
+
+    return Panel(index, symbols, arrays)
@@ -0,0 +1,235 @@
+"""
+Canlı (kesik pencere) ve backtest (tam geçmiş) sinyal yolu karşılaştırıcısı.
+
+Canlı bot her mumda son ~1000 barı `calculate_indicators`'tan geçirip sadece
+son satıra bakar; backtest tüm geçmişi tek seferde hesaplar. İki fark kaynağı:
+  - warmup : EWM ATR ve zigzag durumu pencere başından başlar
+  - lookahead: zigzag pivotu onaylandığı barda geçmiş satıra yazar, tam geçmişte
+               hesaplanan satırlar henüz onaylanmamış pivotları "görür"
+
+Canlı yol varsayılan olarak vektörel yeniden oynatılır: kontrol edilen her bar için
+kesik pencere bir panel sütunu olur (window × pozisyon) ve calculate_indicators_panel
+tüm pencereleri tek çağrıda hesaplar. `--frame` her bar için calculate_indicators
+çağırır (botun kendisiyle birebir, yavaş; panelin doğrulaması için).
+
+Örnek:
+    python parity.py --symbol BTCUSDT --start 2024-01-01 --end 2025-01-01
+    python parity.py --symbol BTCUSDT --start 2024-01-01 --step 4 --frame
+"""
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from indicators import calculate_indicators, calculate_indicators_panel
+from panel import Panel
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_COLUMNS = ['pivot_go_breakout_2x', 'pivot_go_breakdown_2x']
+LIVE_WINDOW = 1000  # exchange cache boyutu
+PANEL_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+WARMUP_CANDIDATES = (100, 200, 300, 400, 500, 600, 700, 800, 900, 1000)
+
+
+# ─── Yollar ───────────────────────────────────────────────────────────────────
+
+def batch_signals(df: pd.DataFrame, symbol: str, columns: Sequence[str] = SIGNAL_COLUMNS) -> np.ndarray:
+    """Backtest yolu: tüm geçmiş tek seferde. Döndürür: (n_bar × n_kolon) bool."""
+    out = calculate_indicators(df.copy(), symbol)
+    return out[list(columns)].to_numpy(dtype=bool)
+
+
+def _replay_chunk(args) -> np.ndarray:
+    """Her pozisyon için ayrı calculate_indicators (botun frame modu, birebir)."""
+    df, symbol, window, positions, columns = args
+    out = np.zeros((len(positions), len(columns)), dtype=bool)
+    for k, t in enumerate(positions):
+        last = calculate_indicators(df.iloc[t - window + 1:t + 1].copy(), symbol)
+        out[k] = [bool(last[col].iloc[-1]) for col in columns]
+    return out
+
+
+def _replay_panel_chunk(args) -> np.ndarray:
+    """Pozisyonların kesik pencereleri (window × pozisyon) tek panelde; her sütunun son satırı."""
+    df, symbol, window, positions, columns = args
+    starts = np.asarray(positions) - window + 1
+    arrays = {
+        field: np.ascontiguousarray(sliding_window_view(df[field].to_numpy(dtype=np.float64), window)[starts].T)
+        for field in PANEL_FIELDS if field in df.columns
+    }
+    panel = calculate_indicators_panel(Panel(pd.RangeIndex(window), [symbol] * len(starts), arrays))
+    return np.column_stack([panel[col][-1].astype(bool) for col in columns])
+
+
+def live_signals(
+    df:        pd.DataFrame,
+    symbol:    str,
+    positions: np.ndarray,
+    window:    int = LIVE_WINDOW,
+    columns:   Sequence[str] = SIGNAL_COLUMNS,
+    processes: int = 0,
+    chunk:     int = 256,
+    frame:     bool = False,
+) -> np.ndarray:
+    """
+    Canlı yol: her `t` için df[t-window+1 : t+1] penceresi, son satır (TradingBot ile aynı).
+    Varsayılan: pencereler panel sütunları olarak toplu; frame=True: her bar için calculate_indicators.
+    Döndürür: (len(positions) × n_kolon) bool.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    if positions.size and positions.min() < window - 1:
+        raise ValueError(f"Pencere ({window}) için yetersiz geçmiş: ilk pozisyon {positions.min()}")
+
+    jobs = [(df, symbol, window, positions[i:i + chunk], list(columns))
+            for i in range(0, positions.size, chunk)]
+    replay = _replay_chunk if frame else _replay_panel_chunk
+    if processes and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            parts = list(executor.map(replay, jobs))
+    else:
+        parts = [replay(job) for job in jobs]
+    return np.concatenate(parts) if parts else np.zeros((0, len(columns)), dtype=bool)
+
+
+def diff_signals(
+    index:     pd.DatetimeIndex,
+    positions: np.ndarray,
+    live:      np.ndarray,
+    batch:     np.ndarray,
+    columns:   Sequence[str] = SIGNAL_COLUMNS,
+) -> pd.DataFrame:
+    """Canlı ve batch dizileri arasındaki tüm farkları (bar, kolon) listesi olarak döndürür."""
+    rows, cols = np.nonzero(live != batch[positions])
+    return pd.DataFrame({
+        'time':   index[positions[rows]],
+        'column': np.asarray(columns)[cols],
+        'live':   live[rows, cols],
+        'batch':  batch[positions[rows], cols],
+    })
+
+
+# ─── Warmup Analizi ───────────────────────────────────────────────────────────
+
+def find_min_warmup(
+    df:         pd.DataFrame,
+    symbol:     str,
+    positions:  np.ndarray,
+    reference:  np.ndarray,
+    candidates: Sequence[int] = WARMUP_CANDIDATES,
+    processes:  int = 0,
+    frame:      bool = False,
+) -> Dict:
+    """
+    Aday pencere uzunluklarını referans (uzun pencere) canlı sonuca göre dener.
+    Döndürür: her aday için fark sayısı ve kendisi + tüm büyük adaylar sıfır fark
+    veren en küçük pencere (`min_window`, yoksa None).
+    """
+    mismatches = {}
+    for window in sorted(candidates):
+        live = live_signals(df, symbol, positions, window=window, processes=processes, frame=frame)
+        mismatches[window] = int((live != reference).any(axis=1).sum())
+        logger.info("%s warmup %d bar → %d farklı bar", symbol, window, mismatches[window])
+
+    min_window = None
+    for window in sorted(candidates, reverse=True):
+        if mismatches[window]:
+            break
+        min_window = window
+    return {'mismatches': mismatches, 'min_window': min_window}
+
+
+def check_parity(
+    df:         pd.DataFrame,
+    symbol:     str,
+    window:     int = LIVE_WINDOW,
+    step:       int = 1,
+    reference:  Optional[int] = None,
+    candidates: Optional[Sequence[int]] = None,
+    processes:  int = 0,
+    frame:      bool = False,
+) -> Dict:
+    """
+    Canlı ve batch sinyallerini her `step` barda karşılaştırır.
+
+    reference verilirse (ör. 3000) farklar sınıflanır: uzun pencere de batch'ten
+    farklıysa 'lookahead', değilse 'warmup'. candidates verilirse minimum warmup
+    penceresi referansa göre aranır.
+    """
+    longest   = max([window, reference or 0] + list(candidates or []))
+    positions = np.arange(longest - 1, len(df), step, dtype=np.int64)
+    if positions.size == 0:
+        raise ValueError(f"{symbol}: {longest} bardan az veri")
+
+    batch = batch_signals(df, symbol)
+    live  = live_signals(df, symbol, positions, window=window, processes=processes, frame=frame)
+    diffs = diff_signals(df.index, positions, live, batch)
+
+    report = {
+        'symbol':      symbol,
+        'window':      window,
+        'checked':     int(positions.size),
+        'mismatches':  diffs,
+        'signals':     {'live': int(live.sum()), 'batch': int(batch[positions].sum())},
+    }
+
+    ref = None
+    if reference:
+        ref = live_signals(df, symbol, positions, window=reference, processes=processes, frame=frame)
+        lookahead = (ref != batch[positions])
+        rows = np.searchsorted(positions, df.index.get_indexer(diffs['time']))
+        cols = np.array([SIGNAL_COLUMNS.index(c) for c in diffs['column']], dtype=np.int64)
+        diffs['cause'] = np.where(lookahead[rows, cols], 'lookahead', 'warmup') if len(diffs) else []
+
+    if candidates:
+        if ref is None:
+            ref = live_signals(df, symbol, positions, window=longest, processes=processes, frame=frame)
+        report['warmup'] = find_min_warmup(df, symbol, positions, ref, candidates, processes, frame)
+
+    logger.info(
+        "%s parity | Kontrol edilen bar: %d | Farklı: %d | Canlı sinyal: %d | Batch sinyal: %d",
+        symbol, positions.size, len(diffs), report['signals']['live'], report['signals']['batch'],
+    )
+    return report
+
+
+def main(argv=None) -> Dict:
+    parser = argparse.ArgumentParser(description="Canlı / backtest sinyal parity kontrolü")
+    parser.add_argument('--symbol', required=True)
+    parser.add_argument('--interval', default='15')
+    parser.add_argument('--start', default=None)
+    parser.add_argument('--end', default=None)
+    parser.add_argument('--store', default=None, help="ParquetStore kökü (varsayılan: config.DATA_STORE_DIR)")
+    parser.add_argument('--window', type=int, default=LIVE_WINDOW)
+    parser.add_argument('--step', type=int, default=1, help="Her N barda bir kontrol et")
+    parser.add_argument('--reference', type=int, default=None, help="Fark sınıflaması için uzun pencere")
+    parser.add_argument('--warmup', action='store_true', help="Minimum warmup penceresini ara")
+    parser.add_argument('--processes', type=int, default=0)
+    parser.add_argument('--frame', action='store_true', help="Her bar için calculate_indicators (yavaş, birebir bot yolu)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    from data_store import ParquetStore
+    store = ParquetStore(args.store) if args.store else ParquetStore()
+    df = store.read(args.symbol, args.interval, args.start, args.end)
+    if df is None or df.empty:
+        raise SystemExit(f"{args.symbol} için depoda veri yok")
+
+    report = check_parity(
+        df, args.symbol, window=args.window, step=args.step, reference=args.reference,
+        candidates=WARMUP_CANDIDATES if args.warmup else None, processes=args.processes, frame=args.frame,
+    )
+    if len(report['mismatches']):
+        print(report['mismatches'].to_string(index=False))
+    if 'warmup' in report:
+        print(f"Minimum warmup penceresi: {report['warmup']['min_window']}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
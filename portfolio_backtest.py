@@ -0,0 +1,285 @@
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    SYMBOL_SETTINGS, RISK_PER_TRADE_USDT, DEFAULT_LEVERAGE,
+    ROUND_NUMBERS, TP_ROUND_NUMBERS, TP1, TP2, SL,
+)
+from entry_strategies import entry_masks
+from indicators import calculate_indicators
+from panel import Panel, align_frames
+
+logger = logging.getLogger(__name__)
+
+TAKER_FEE = 0.00055  # Bybit linear taker ücreti
+
+PANEL_COLUMNS = ['high', 'low', 'close', 'z', 'pivot_go_breakout_2x', 'pivot_go_breakdown_2x']
+
+# Kapanış sebepleri (trade listesinde string'e çevrilir)
+EXIT_REASONS = np.array(['TP2', 'SL', 'REVERSE_SIGNAL', 'END'])
+_EXIT_TP2, _EXIT_SL, _EXIT_REVERSE, _EXIT_END = range(4)
+
+
+# ─── Veri Hazırlama ───────────────────────────────────────────────────────────
+
+def prepare_frames(frames: Dict[str, pd.DataFrame], cache=None) -> Dict[str, pd.DataFrame]:
+    """
+    Her sembol için canlı botla aynı `calculate_indicators` çıktısını üretir.
+    `cache` (result_cache.ResultCache) verilirse sembol bazında diskten okunur.
+    """
+    if cache is not None:
+        from result_cache import cached_calculate_indicators
+
+    prepared = {}
+    for symbol, df in frames.items():
+        if df is None or df.empty:
+            continue
+        if cache is not None:
+            prepared[symbol] = cached_calculate_indicators(df, symbol, cache)
+        else:
+            prepared[symbol] = calculate_indicators(df.copy(), symbol)
+    return prepared
+
+
+def _entry_masks(panel: Panel):
+    """entry_strategies kurallarının (time × symbol) karşılığı: önce LONG, sonra SHORT."""
+    # Backtest'te üst zaman dilimi sütunları yok: HTF teyidi uygulanmaz
+    return entry_masks(panel.symbols, panel, htf_confirm=False)
+
+
+def _round_to(values: np.ndarray, decimals: np.ndarray) -> np.ndarray:
+    scale = 10.0 ** decimals
+    return np.round(values * scale) / scale
+
+
+# ─── Portföy Backtest ─────────────────────────────────────────────────────────
+
+def run_portfolio_backtest(
+    frames:            Dict[str, pd.DataFrame],
+    initial_equity:    float = 1000.0,
+    fee_rate:          float = TAKER_FEE,
+    symbol_settings:   Optional[Dict[str, Dict]] = None,
+    record_symbol_pnl: bool = True,
+    compute_indicators: bool = True,
+) -> Dict:
+    """
+    Tüm sembolleri ortak bar saatinde ilerleten portföy backtest'i.
+
+    Canlı botun kuralları (time × symbol) dizilerle uygulanır:
+      - Sinyal mum kapanışında, giriş kapanış fiyatından
+      - Miktar: risk / (SL * z), yarıya bölünebilir birime yuvarlanır
+      - TP1 yarı miktar, TP2 kalan yarı, SL tüm kalan miktar
+      - Aynı yön sinyali → TP/SL güncellenir, ters sinyal → kapat + yeni aç
+      - Aynı bar içinde hem SL hem TP görülürse SL önce kabul edilir
+
+    Marj ortak özsermayeden kullanılır; serbest marj yetmezse giriş reddedilir.
+    Döndürür: equity/marj/drawdown serileri, trade listesi ve korele drawdown metrikleri.
+    """
+    settings = symbol_settings if symbol_settings is not None else SYMBOL_SETTINGS
+    if compute_indicators:
+        frames = prepare_frames(frames)
+
+    panel = align_frames(frames, PANEL_COLUMNS)
+    n_bars, n_sym = panel.shape
+    if n_sym == 0:
+        raise ValueError("Backtest için veri yok")
+
+    close, high, low, z = panel['close'], panel['high'], panel['low'], panel['z']
+    go_long, go_short   = _entry_masks(panel)
+
+    risk      = panel.per_symbol({s: settings.get(s, {}).get('risk', RISK_PER_TRADE_USDT) for s in panel.symbols})
+    leverage  = panel.per_symbol({s: settings.get(s, {}).get('leverage', DEFAULT_LEVERAGE) for s in panel.symbols})
+    qty_prec  = panel.per_symbol({s: ROUND_NUMBERS.get(s, 3) for s in panel.symbols})
+    tp_prec   = panel.per_symbol({s: TP_ROUND_NUMBERS.get(s, 3) for s in panel.symbols})
+    lot_step  = 2 * 10.0 ** (-qty_prec)  # yarıya tam bölünebilmesi için 2x min_unit
+
+    # Pozisyon durumu (sembol başına tek pozisyon, hedge modunda da bot tek yön tutar)
+    direction  = np.zeros(n_sym, dtype=np.int8)
+    qty_full   = np.zeros(n_sym)
+    qty_left   = np.zeros(n_sym)
+    entry      = np.zeros(n_sym)
+    tp1        = np.zeros(n_sym)
+    tp2        = np.zeros(n_sym)
+    sl         = np.zeros(n_sym)
+    tp1_done   = np.zeros(n_sym, dtype=bool)
+    entry_bar  = np.zeros(n_sym, dtype=np.int64)
+    trade_pnl  = np.zeros(n_sym)
+    sym_realized = np.zeros(n_sym)
+    last_close = np.full(n_sym, np.nan)
+
+    cash     = float(initial_equity)
+    rejected = 0
+
+    equity_curve = np.empty(n_bars)
+    margin_curve = np.empty(n_bars)
+    open_count   = np.empty(n_bars, dtype=np.int32)
+    underwater   = np.empty(n_bars, dtype=np.int32)
+    symbol_pnl   = np.empty((n_bars, n_sym)) if record_symbol_pnl else None
+
+    trades = {k: [] for k in ('sym', 'dir', 'entry_bar', 'exit_bar', 'entry', 'exit', 'qty', 'pnl', 'reason')}
+
+    def _realize(mask: np.ndarray, price: np.ndarray, q: np.ndarray) -> None:
+        nonlocal cash
+        pnl = direction[mask] * (price[mask] - entry[mask]) * q[mask] - fee_rate * price[mask] * q[mask]
+        cash += pnl.sum()
+        trade_pnl[mask]    += pnl
+        sym_realized[mask] += pnl
+        qty_left[mask]     -= q[mask]
+
+    def _close(mask: np.ndarray, price: np.ndarray, reason: int, bar: int) -> None:
+        if not mask.any():
+            return
+        _realize(mask, price, qty_left.copy())
+        idx = np.flatnonzero(mask)
+        trades['sym'].append(idx)
+        trades['dir'].append(direction[idx].copy())
+        trades['entry_bar'].append(entry_bar[idx].copy())
+        trades['exit_bar'].append(np.full(idx.size, bar))
+        trades['entry'].append(entry[idx].copy())
+        trades['exit'].append(price[idx].copy())
+        trades['qty'].append(qty_full[idx].copy())
+        trades['pnl'].append(trade_pnl[idx].copy())
+        trades['reason'].append(np.full(idx.size, reason))
+        direction[mask] = 0
+        qty_left[mask]  = 0.0
+        tp1_done[mask]  = False
+        trade_pnl[mask] = 0.0
+
+    def _set_levels(mask: np.ndarray, price: np.ndarray, atr: np.ndarray) -> None:
+        d = direction[mask]
+        tp1[mask] = _round_to(price[mask] + d * TP1 * atr[mask], tp_prec[mask])
+        tp2[mask] = _round_to(price[mask] + d * TP2 * atr[mask], tp_prec[mask])
+        sl[mask]  = _round_to(price[mask] - d * SL * atr[mask], tp_prec[mask])
+
+    for t in range(n_bars):
+        c, h, l, zt = close[t], high[t], low[t], z[t]
+        valid      = ~np.isnan(c)
+        last_close = np.where(valid, c, last_close)
+
+        # ── 1. Açık pozisyonların TP/SL kontrolü (bar içi high/low) ──
+        live  = (direction != 0) & valid
+        longs = live & (direction == 1)
+        shorts = live & (direction == -1)
+
+        sl_hit  = (longs & (l <= sl)) | (shorts & (h >= sl))
+        tp1_hit = ~sl_hit & ~tp1_done & ((longs & (h >= tp1)) | (shorts & (l <= tp1)))
+        tp2_hit = ~sl_hit & ((longs & (h >= tp2)) | (shorts & (l <= tp2)))
+
+        if tp1_hit.any():
+            _realize(tp1_hit, tp1, np.where(tp1_hit, qty_full * 0.5, 0.0))
+            tp1_done |= tp1_hit
+        _close(tp2_hit, tp2, _EXIT_TP2, t)
+        _close(sl_hit, sl, _EXIT_SL, t)
+
+        # ── 2. Mum kapanışı sinyalleri ──
+        signal = np.where(go_long[t], 1, np.where(go_short[t], -1, 0)).astype(np.int8)
+        signal[~valid] = 0
+
+        same = (direction != 0) & (signal == direction)
+        if same.any():
+            _set_levels(same, c, zt)
+
+        reverse = (direction != 0) & (signal != 0) & (signal != direction)
+        _close(reverse, c, _EXIT_REVERSE, t)
+
+        want = (signal != 0) & (direction == 0) & (zt > 0)
+        if want.any():
+            raw   = np.where(want, risk / (SL * np.where(want, zt, 1.0)), 0.0)
+            qty   = np.round((raw // lot_step) * lot_step, 8)
+            want &= qty > 0
+
+            unrealized  = np.nansum(direction * (last_close - entry) * qty_left)
+            margin_used = np.sum(qty_left * entry / leverage)
+            free_margin = cash + unrealized - margin_used
+
+            required = np.where(want, qty * c / leverage, 0.0)
+            accepted = want & (np.cumsum(required) <= free_margin)
+            rejected += int((want & ~accepted).sum())
+
+            if accepted.any():
+                direction[accepted] = signal[accepted]
+                qty_full[accepted]  = qty[accepted]
+                qty_left[accepted]  = qty[accepted]
+                entry[accepted]     = c[accepted]
+                entry_bar[accepted] = t
+                tp1_done[accepted]  = False
+                _set_levels(accepted, c, zt)
+
+                entry_fee = fee_rate * c[accepted] * qty[accepted]
+                cash -= entry_fee.sum()
+                trade_pnl[accepted]    = -entry_fee
+                sym_realized[accepted] -= entry_fee
+
+        # ── 3. Portföy durumu ──
+        open_pnl = np.where(direction != 0, direction * (last_close - entry) * qty_left, 0.0)
+        equity_curve[t] = cash + np.nansum(open_pnl)
+        margin_curve[t] = np.sum(qty_left * entry / leverage)
+        open_count[t]   = np.count_nonzero(direction)
+        underwater[t]   = np.count_nonzero(open_pnl < 0)
+        if symbol_pnl is not None:
+            symbol_pnl[t] = sym_realized + np.nan_to_num(open_pnl)
+
+    # Test sonunda açık kalan pozisyonlar son fiyattan kapatılır
+    _close(direction != 0, last_close, _EXIT_END, n_bars - 1)
+
+    return _summarize(panel, initial_equity, equity_curve, margin_curve, open_count,
+                      underwater, symbol_pnl, trades, rejected)
+
+
+def _summarize(panel, initial_equity, equity_curve, margin_curve, open_count,
+               underwater, symbol_pnl, trades, rejected) -> Dict:
+    index  = panel.index
+    equity = pd.Series(equity_curve, index=index, name='equity')
+    peak   = equity.cummax()
+    drawdown = (equity - peak) / peak
+
+    trough = int(np.argmin(drawdown.to_numpy())) if len(drawdown) else 0
+    peak_i = int(np.argmax(equity_curve[:trough + 1])) if len(drawdown) else 0
+
+    if trades['sym']:
+        cols = {k: np.concatenate(v) for k, v in trades.items()}
+        trade_df = pd.DataFrame({
+            'symbol':      np.array(panel.symbols)[cols['sym']],
+            'direction':   np.where(cols['dir'] == 1, 'LONG', 'SHORT'),
+            'entry_time':  index[cols['entry_bar']],
+            'exit_time':   index[cols['exit_bar']],
+            'entry_price': cols['entry'],
+            'exit_price':  cols['exit'],
+            'quantity':    cols['qty'],
+            'pnl':         cols['pnl'],
+            'reason':      EXIT_REASONS[cols['reason']],
+        }).sort_values('exit_time', kind='stable').reset_index(drop=True)
+    else:
+        trade_df = pd.DataFrame(columns=['symbol', 'direction', 'entry_time', 'exit_time',
+                                         'entry_price', 'exit_price', 'quantity', 'pnl', 'reason'])
+
+    result = {
+        'equity':               equity,
+        'margin_used':          pd.Series(margin_curve, index=index, name='margin_used'),
+        'drawdown':             drawdown.rename('drawdown'),
+        'max_drawdown':         float(drawdown.min()) if len(drawdown) else 0.0,
+        'open_positions':       pd.Series(open_count, index=index, name='open_positions'),
+        'underwater_positions': pd.Series(underwater, index=index, name='underwater_positions'),
+        'trades':               trade_df,
+        'rejected_entries':     rejected,
+        'final_equity':         float(equity_curve[-1]) if len(equity_curve) else initial_equity,
+    }
+
+    if symbol_pnl is not None:
+        sym_df = pd.DataFrame(symbol_pnl, index=index, columns=panel.symbols)
+        result['symbol_pnl'] = sym_df
+        # Maks. drawdown penceresinde (zirve → dip) her sembolün katkısı
+        result['drawdown_contribution'] = (sym_df.iloc[trough] - sym_df.iloc[peak_i]).sort_values()
+        # Sembol PnL değişimlerinin korelasyonu (aynı anda kaybetme eğilimi)
+        result['pnl_correlation'] = sym_df.diff().corr()
+
+    logger.info(
+        "Portföy backtest tamamlandı | Bar: %d | Sembol: %d | Trade: %d | "
+        "Son equity: %.2f | Maks DD: %.2f%% | Reddedilen giriş: %d",
+        len(index), len(panel.symbols), len(trade_df), result['final_equity'],
+        result['max_drawdown'] * 100, rejected,
+    )
+    return result
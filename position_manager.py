@@ -1,18 +1,41 @@
-from typing import Dict, Optional, Any
-from pybit.unified_trading import HTTP
+from typing import TYPE_CHECKING, Dict, Optional, Any
 from exit_strategies import ExitStrategy
 import logging
-from config import LEVERAGE, RISK_PER_TRADE_USDT, ROUND_NUMBERS, DEFAULT_LEVERAGE, SYMBOL_SETTINGS, SL
+from metrics import METRICS
+from config import (
+    LEVERAGE, RISK_PER_TRADE_USDT, ROUND_NUMBERS, DEFAULT_LEVERAGE, SYMBOL_SETTINGS, SL,
+    ORDER_FILL_WAIT, ORDER_FILL_POLL,
+)
 import time
+import threading
+
+if TYPE_CHECKING:
+    from pybit.unified_trading import HTTP
 
 logger = logging.getLogger(__name__)
 
 
 class PositionManager:
-    def __init__(self, client: HTTP):
+    def __init__(
+        self,
+        client:          'HTTP',
+        fill_wait:       float = ORDER_FILL_WAIT,
+        fill_poll:       float = ORDER_FILL_POLL,
+        symbol_settings: Optional[Dict[str, Dict]] = None,
+        risk_scale:      float = 1.0,
+    ):
         self.client = client
+        self.fill_wait = fill_wait  # market emrinden sonra ilk pozisyon sorgusuna kadar bekleme
+        self.fill_poll = fill_poll  # pozisyon doğrulama sorgu aralığı
         self.exit_strategy = ExitStrategy(client)
         self.active_positions: Dict[str, Dict] = {}
+        # Pozisyon büyüklüğü: hesabın risk ayarları (accounts.py; None: SYMBOL_SETTINGS) × risk_scale
+        self.symbol_settings = symbol_settings if symbol_settings is not None else SYMBOL_SETTINGS
+        self.risk_scale = risk_scale
+        # Mum turu ve mumlar arası denetçi (supervisor.py) active_positions'ı bu kilitle paylaşır
+        self.lock = threading.RLock()
+        # Sharding (sharding.ShardWorker): sadece lease'i geçerli sembollerde emir verilir; None: hepsi
+        self.ownership = None
         self.logger = logging.getLogger(__name__)
 
     # ─── Ana Giriş Noktası ────────────────────────────────────────────────────
@@ -30,21 +53,23 @@ class PositionManager:
         Senaryo 2a → Aynı yön: TP/SL güncelle
         Senaryo 2b → Ters yön: kapat + yeni aç
         """
+        if not self.owns(symbol):
+            return None
         try:
             if symbol in self.active_positions:
                 existing_direction = self.active_positions[symbol]['direction']
 
                 if existing_direction == direction:
-                    logger.info(f"{symbol} zaten {direction} pozisyonda — TP/SL güncelleniyor")
+                    logger.info("%s zaten %s pozisyonda — TP/SL güncelleniyor", symbol, direction)
                     return self._update_tp_sl_only(symbol, direction, entry_price, atr_value, pct_atr)
                 else:
-                    logger.info(f"{symbol} ters sinyal ({existing_direction} → {direction}) — pozisyon kapatılıp yeni açılıyor")
+                    logger.info("%s ters sinyal (%s → %s) — pozisyon kapatılıp yeni açılıyor", symbol, existing_direction, direction)
                     self.close_position(symbol, "REVERSE_SIGNAL")
 
             return self._open_new_position(symbol, direction, entry_price, atr_value, pct_atr)
 
         except Exception as e:
-            logger.error(f"{symbol} open_position hatası: {e}")
+            logger.error("%s open_position hatası: %s", symbol, e)
             return None
 
     # ─── Yeni Pozisyon ────────────────────────────────────────────────────────
@@ -59,42 +84,51 @@ class PositionManager:
     ) -> Optional[Dict]:
         quantity = self._calculate_position_size(symbol, atr_value, entry_price)
 
-        order = self.client.place_order(
-            category="linear",
-            symbol=symbol,
-            side="Buy" if direction == "LONG" else "Sell",
-            orderType="Market",
-            qty=quantity,
-            reduceOnly=False,
-        )
+        start = time.perf_counter()
+        with METRICS.time('order_place', symbol):
+            order = self.client.place_order(
+                category="linear",
+                symbol=symbol,
+                side="Buy" if direction == "LONG" else "Sell",
+                orderType="Market",
+                qty=quantity,
+                reduceOnly=False,
+            )
 
         if order['retCode'] != 0:
-            logger.error(f"{symbol} market emri hatası: {order['retMsg']}")
+            logger.error("%s market emri hatası: %s", symbol, order['retMsg'],
+                         extra={'symbol': symbol, 'stage': 'order_place', 'ret_code': order['retCode']})
             return None
 
-        logger.info(f"{symbol} {direction} pozisyon açıldı | Miktar: {quantity} | Entry: {entry_price}")
+        logger.info(
+            "%s %s pozisyon açıldı | Miktar: %s | Entry: %s", symbol, direction, quantity, entry_price,
+            extra={'symbol': symbol, 'stage': 'order_place', 'order_id': order['result']['orderId'],
+                   'latency': time.perf_counter() - start},
+        )
 
-        time.sleep(1)
-        if not self._verify_position_opened(symbol, direction, float(quantity)):
-            logger.warning(f"{symbol} pozisyon doğrulanamadı — TP/SL ayarlanamayacak")
+        with METRICS.time('fill_confirm', symbol):
+            time.sleep(self.fill_wait)
+            verified = self._verify_position_opened(symbol, direction, float(quantity))
+        if not verified:
+            logger.warning("%s pozisyon doğrulanamadı — TP/SL ayarlanamayacak", symbol)
             return None
 
         tp1_price, tp2_price, sl_price = self.exit_strategy.calculate_levels(
             entry_price, atr_value, direction, symbol
         )
-        logger.info(f"{symbol} TP1: {tp1_price} | TP2: {tp2_price} | SL: {sl_price}")
 
-        tp_sl_result = self.exit_strategy.set_limit_tp_sl(
-            symbol=symbol,
-            direction=direction,
-            tp1_price=tp1_price,
-            tp2_price=tp2_price,
-            sl_price=sl_price,
-            quantity=quantity,
-        )
+        with METRICS.time('bracket_place', symbol):
+            tp_sl_result = self.exit_strategy.set_limit_tp_sl(
+                symbol=symbol,
+                direction=direction,
+                tp1_price=tp1_price,
+                tp2_price=tp2_price,
+                sl_price=sl_price,
+                quantity=quantity,
+            )
 
         if not tp_sl_result.get('success'):
-            logger.warning(f"{symbol} TP/SL ayarlanamadı — pozisyon kapatılıyor")
+            logger.warning("%s TP/SL ayarlanamadı — pozisyon kapatılıyor", symbol)
             self._emergency_close(symbol, direction, float(quantity))
             return None
 
@@ -111,7 +145,11 @@ class PositionManager:
             'oco_pair':      tp_sl_result['oco_pair'],
         }
         self.active_positions[symbol] = position
-        logger.info(f"{symbol} pozisyon kaydedildi | TP1: {tp1_price} | TP2: {tp2_price} | SL: {sl_price}")
+        logger.info(
+            "%s pozisyon kaydedildi | TP1: %s | TP2: %s | SL: %s", symbol, tp1_price, tp2_price, sl_price,
+            extra={'symbol': symbol, 'stage': 'protected', 'order_id': position['order_id'],
+                   'latency': time.perf_counter() - start},
+        )
         return position
 
     # ─── TP/SL Güncelleme ─────────────────────────────────────────────────────
@@ -135,7 +173,7 @@ class PositionManager:
 
             # Mevcut emirleri iptal et
             if oco_pair:
-                logger.info(f"{symbol} eski TP/SL emirleri iptal ediliyor...")
+                logger.info("%s eski TP/SL emirleri iptal ediliyor...", symbol)
                 if not tp1_done:
                     self.exit_strategy.cancel_order(symbol, oco_pair.get('tp1_order_id'))
                     self.exit_strategy.cancel_order(symbol, oco_pair.get('sl1_order_id'))
@@ -145,7 +183,7 @@ class PositionManager:
             tp1_price, tp2_price, sl_price = self.exit_strategy.calculate_levels(
                 entry_price, atr_value, direction, symbol
             )
-            logger.info(f"{symbol} yeni TP1: {tp1_price} | TP2: {tp2_price} | SL: {sl_price}")
+            logger.info("%s yeni TP1: %s | TP2: %s | SL: %s", symbol, tp1_price, tp2_price, sl_price)
 
             # TP1 tetiklenmişse sadece yarı miktar kaldı
             if tp1_done:
@@ -170,7 +208,7 @@ class PositionManager:
                 )
 
             if not tp_sl_result.get('success'):
-                logger.error(f"{symbol} TP/SL güncellenemedi")
+                logger.error("%s TP/SL güncellenemedi", symbol)
                 return None
 
             position.update({
@@ -181,11 +219,11 @@ class PositionManager:
                 'current_pct_atr': pct_atr,
                 'oco_pair':        tp_sl_result['oco_pair'],
             })
-            logger.info(f"{symbol} TP/SL güncellendi")
+            logger.info("%s TP/SL güncellendi", symbol)
             return position
 
         except Exception as e:
-            logger.error(f"{symbol} TP/SL güncelleme hatası: {e}")
+            logger.error("%s TP/SL güncelleme hatası: %s", symbol, e)
             return None
 
     # ─── Pozisyon Kapatma ─────────────────────────────────────────────────────
@@ -194,7 +232,7 @@ class PositionManager:
         """Pozisyonu market emriyle kapatır, tüm OCO emirlerini iptal eder."""
         try:
             if symbol not in self.active_positions:
-                logger.warning(f"{symbol} kapatılacak pozisyon bulunamadı")
+                logger.warning("%s kapatılacak pozisyon bulunamadı", symbol)
                 return False
 
             position = self.active_positions[symbol]
@@ -210,7 +248,7 @@ class PositionManager:
                     self.exit_strategy.cancel_order(symbol, oco_pair.get('tp2_order_id'))
                     self.exit_strategy.cancel_order(symbol, oco_pair.get('sl2_order_id'))
                 except Exception as e:
-                    logger.warning(f"{symbol} TP/SL iptal hatası (zaten tetiklenmiş olabilir): {e}")
+                    logger.warning("%s TP/SL iptal hatası (zaten tetiklenmiş olabilir): %s", symbol, e)
 
             # TP1 tetiklendiyse kalan miktar yarı
             close_qty = position['quantity']
@@ -228,15 +266,15 @@ class PositionManager:
             )
 
             if order['retCode'] == 0:
-                logger.info(f"{symbol} pozisyon kapatıldı | Sebep: {reason}")
+                logger.info("%s pozisyon kapatıldı | Sebep: %s", symbol, reason)
                 del self.active_positions[symbol]
                 return True
             else:
-                logger.error(f"{symbol} pozisyon kapatma hatası: {order['retMsg']}")
+                logger.error("%s pozisyon kapatma hatası: %s", symbol, order['retMsg'])
                 return False
 
         except Exception as e:
-            logger.error(f"{symbol} pozisyon kapatma hatası: {e}")
+            logger.error("%s pozisyon kapatma hatası: %s", symbol, e)
             return False
 
     # ─── Pozisyon Yönetim Döngüsü ─────────────────────────────────────────────
@@ -256,68 +294,70 @@ class PositionManager:
         self.monitor_oco_orders()
 
         # 2-3. Sinyal bazlı kontroller
-        for symbol, position in list(self.active_positions.items()):
-            current_signal    = signals.get(symbol)
-            current_data      = all_data.get(symbol)
-            current_direction = position['direction']
-
-            if not current_signal:
-                continue
+        for symbol in list(self.active_positions):
+            self.manage_position(symbol, signals.get(symbol), all_data.get(symbol))
+
+    def manage_position(self, symbol: str, current_signal: Optional[str], current_data: Optional[Dict]) -> None:
+        """Tek sembol için manage_positions'ın 2-3. adımları (OCO kontrolü sonrası)."""
+        position = self.active_positions.get(symbol)
+        if position is None or not current_signal or not self.owns(symbol):
+            return
+        current_direction = position['direction']
+
+        # Ters sinyal — sadece logla, kapatma main loop'ta open_position içinde olacak
+        if current_signal != current_direction:
+            logger.info("%s ters sinyal (%s → %s)", symbol, current_direction, current_signal)
+            return
+
+        # Aynı yön sinyali → TP/SL güncelle
+        if current_data:
+            logger.info("%s aynı yönde sinyal — TP/SL güncelleniyor", symbol)
+            oco_pair = position.get('oco_pair', {})
+            tp1_done = oco_pair.get('tp1_triggered', False)
 
-            # Ters sinyal — sadece logla, kapatma main loop'ta open_position içinde olacak
-            if current_signal != current_direction:
-                logger.info(f"{symbol} ters sinyal ({current_direction} → {current_signal})")
-                continue
+            new_tp1, new_tp2, new_sl = self.exit_strategy.calculate_levels(
+                current_data['close'], current_data['z'], current_direction, symbol
+            )
 
-            # Aynı yön sinyali → TP/SL güncelle
-            if current_data:
-                logger.info(f"{symbol} aynı yönde sinyal — TP/SL güncelleniyor")
-                oco_pair = position.get('oco_pair', {})
-                tp1_done = oco_pair.get('tp1_triggered', False)
+            # Mevcut emirleri iptal et
+            if oco_pair:
+                if not tp1_done:
+                    self.exit_strategy.cancel_order(symbol, oco_pair.get('tp1_order_id'))
+                    self.exit_strategy.cancel_order(symbol, oco_pair.get('sl1_order_id'))
+                self.exit_strategy.cancel_order(symbol, oco_pair.get('tp2_order_id'))
+                self.exit_strategy.cancel_order(symbol, oco_pair.get('sl2_order_id'))
 
-                new_tp1, new_tp2, new_sl = self.exit_strategy.calculate_levels(
-                    current_data['close'], current_data['z'], current_direction, symbol
+            # TP1 tetiklenmişse sadece yarı miktar için emir gönder
+            if tp1_done:
+                half_qty = str(round(float(position['quantity']) / 2, 8)).rstrip('0').rstrip('.')
+                tp_sl_result = self.exit_strategy.set_limit_tp_sl(
+                    symbol=symbol,
+                    direction=current_direction,
+                    tp1_price=new_tp1,
+                    tp2_price=new_tp2,
+                    sl_price=new_sl,
+                    quantity=half_qty,
+                    half_only=True,
+                )
+            else:
+                tp_sl_result = self.exit_strategy.set_limit_tp_sl(
+                    symbol=symbol,
+                    direction=current_direction,
+                    tp1_price=new_tp1,
+                    tp2_price=new_tp2,
+                    sl_price=new_sl,
+                    quantity=position['quantity'],
                 )
 
-                # Mevcut emirleri iptal et
-                if oco_pair:
-                    if not tp1_done:
-                        self.exit_strategy.cancel_order(symbol, oco_pair.get('tp1_order_id'))
-                        self.exit_strategy.cancel_order(symbol, oco_pair.get('sl1_order_id'))
-                    self.exit_strategy.cancel_order(symbol, oco_pair.get('tp2_order_id'))
-                    self.exit_strategy.cancel_order(symbol, oco_pair.get('sl2_order_id'))
-
-                # TP1 tetiklenmişse sadece yarı miktar için emir gönder
-                if tp1_done:
-                    half_qty = str(round(float(position['quantity']) / 2, 8)).rstrip('0').rstrip('.')
-                    tp_sl_result = self.exit_strategy.set_limit_tp_sl(
-                        symbol=symbol,
-                        direction=current_direction,
-                        tp1_price=new_tp1,
-                        tp2_price=new_tp2,
-                        sl_price=new_sl,
-                        quantity=half_qty,
-                        half_only=True,
-                    )
-                else:
-                    tp_sl_result = self.exit_strategy.set_limit_tp_sl(
-                        symbol=symbol,
-                        direction=current_direction,
-                        tp1_price=new_tp1,
-                        tp2_price=new_tp2,
-                        sl_price=new_sl,
-                        quantity=position['quantity'],
-                    )
-
-                if tp_sl_result.get('success'):
-                    position.update({
-                        'entry_price':  current_data['close'],
-                        'take_profit1': new_tp1,
-                        'take_profit2': new_tp2,
-                        'stop_loss':    new_sl,
-                        'oco_pair':     tp_sl_result['oco_pair'],
-                    })
-                    logger.info(f"{symbol} TP/SL güncellendi | TP1: {new_tp1} | TP2: {new_tp2} | SL: {new_sl}")
+            if tp_sl_result.get('success'):
+                position.update({
+                    'entry_price':  current_data['close'],
+                    'take_profit1': new_tp1,
+                    'take_profit2': new_tp2,
+                    'stop_loss':    new_sl,
+                    'oco_pair':     tp_sl_result['oco_pair'],
+                })
+                logger.info("%s TP/SL güncellendi | TP1: %s | TP2: %s | SL: %s", symbol, new_tp1, new_tp2, new_sl)
 
     # ─── OCO Takibi ───────────────────────────────────────────────────────────
 
@@ -326,30 +366,43 @@ class PositionManager:
         Tüm aktif pozisyonların OCO emirlerini kontrol eder.
         TP1 kısmi tetiklenme durumunu yönetir.
         """
-        logger.debug(f"monitor_oco_orders çalışıyor — Pozisyon sayısı: {len(self.active_positions)}")
+        logger.debug("monitor_oco_orders çalışıyor — Pozisyon sayısı: %s", len(self.active_positions))
+
+        for symbol, oco_pair in self.pending_oco_pairs().items():
+            self.apply_oco_result(symbol, self.check_oco(symbol, oco_pair))
 
-        for symbol, position in list(self.active_positions.items()):
+    def pending_oco_pairs(self) -> Dict[str, Dict]:
+        """Kontrol edilecek (aktif) OCO grupları: {symbol: oco_pair}."""
+        pairs = {}
+        for symbol, position in self.active_positions.items():
             if 'oco_pair' not in position:
-                logger.debug(f"{symbol} — oco_pair yok, atlandı")
+                logger.debug("%s — oco_pair yok, atlandı", symbol)
                 continue
-
-            oco_pair = position['oco_pair']
-
-            if not oco_pair.get('active'):
-                logger.debug(f"{symbol} — oco_pair aktif değil, atlandı")
+            if not position['oco_pair'].get('active'):
+                logger.debug("%s — oco_pair aktif değil, atlandı", symbol)
                 continue
+            pairs[symbol] = position['oco_pair']
+        return pairs
 
+    def check_oco(self, symbol: str, oco_pair: Dict) -> Dict:
+        """
+        Tek OCO grubunun borsa durumunu sorgular (sadece ağ + oco_pair güncellemesi).
+        Farklı semboller için thread'lerden paralel çağrılabilir; sonuç apply_oco_result ile işlenir.
+        """
+        with METRICS.time('oco_monitor', symbol):
             result = self.exit_strategy.check_and_cancel_oco(oco_pair)
-            logger.debug(f"{symbol} — OCO sonuç: {result}")
+        logger.debug("%s — OCO sonuç: %s", symbol, result)
+        return result
 
-            if result.get('triggered') == 'TP1':
-                # Yarı pozisyon kapandı, devam ediyor
-                # tp1_triggered=True zaten check_and_cancel_oco içinde set edildi
-                logger.info(f"{symbol} TP1 tetiklendi — yarı pozisyon kapandı, TP2/SL2 devam ediyor")
+    def apply_oco_result(self, symbol: str, result: Dict) -> None:
+        if result.get('triggered') == 'TP1':
+            # Yarı pozisyon kapandı, devam ediyor
+            # tp1_triggered=True zaten check_and_cancel_oco içinde set edildi
+            logger.info("%s TP1 tetiklendi — yarı pozisyon kapandı, TP2/SL2 devam ediyor", symbol)
 
-            elif result.get('triggered') in ['TP2', 'SL1', 'SL2']:
-                logger.info(f"{symbol} {result['triggered']} tetiklendi — pozisyon tamamen kapandı")
-                del self.active_positions[symbol]
+        elif result.get('triggered') in ['TP2', 'SL1', 'SL2']:
+            logger.info("%s %s tetiklendi — pozisyon tamamen kapandı", symbol, result['triggered'])
+            self.active_positions.pop(symbol, None)
 
     # ─── Yardımcılar ──────────────────────────────────────────────────────────
 
@@ -360,8 +413,8 @@ class PositionManager:
         entry_price:   float,
         sl_multiplier: int = SL,
     ) -> str:
-        symbol_config = SYMBOL_SETTINGS.get(symbol, {})
-        risk_amount   = symbol_config.get('risk', RISK_PER_TRADE_USDT)
+        symbol_config = self.symbol_settings.get(symbol, {})
+        risk_amount   = symbol_config.get('risk', RISK_PER_TRADE_USDT) * self.risk_scale
         leverage      = symbol_config.get('leverage', DEFAULT_LEVERAGE)
         precision     = ROUND_NUMBERS[symbol]
     
@@ -373,9 +426,8 @@ class PositionManager:
         quantity     = round(raw_quantity, precision)
     
         self.logger.info(
-            f"{symbol} pozisyon hesaplandı | "
-            f"Risk: ${risk_amount} | Leverage: {leverage}x | "
-            f"Entry: ${entry_price:.2f} | Quantity: {quantity}"
+            "%s pozisyon hesaplandı | Risk: $%s | Leverage: %sx | Entry: $%.2f | Quantity: %s",
+            symbol, risk_amount, leverage, entry_price, quantity,
         )
         return str(quantity)
 
@@ -386,9 +438,9 @@ class PositionManager:
         expected_qty: float,
         timeout:      float = 5.0,
     ) -> bool:
-        """Pozisyonun exchange'e yansımasını bekler. Maks 5 saniye, 0.5s aralıklarla."""
+        """Pozisyonun exchange'e yansımasını bekler. Maks 5 saniye, fill_poll (0.5s) aralıklarla."""
         expected_side = 'Buy' if direction == 'LONG' else 'Sell'
-        attempts      = int(timeout / 0.5)
+        attempts      = max(1, int(timeout / self.fill_poll))
 
         for attempt in range(attempts):
             positions = self.client.get_positions(category='linear', symbol=symbol)
@@ -398,11 +450,11 @@ class PositionManager:
                     pos_side = pos.get('side', '')
                     if pos_size > 0 and pos_side == expected_side:
                         if abs(pos_size - expected_qty) < expected_qty * 0.05:
-                            logger.info(f"{symbol} pozisyon doğrulandı (deneme {attempt + 1}/{attempts})")
+                            logger.info("%s pozisyon doğrulandı (deneme %s/%s)", symbol, attempt + 1, attempts)
                             return True
-            time.sleep(0.5)
+            time.sleep(self.fill_poll)
 
-        logger.error(f"{symbol} pozisyon {timeout}s içinde doğrulanamadı")
+        logger.error("%s pozisyon %ss içinde doğrulanamadı", symbol, timeout)
         return False
 
     def _emergency_close(self, symbol: str, direction: str, quantity: float) -> None:
@@ -416,10 +468,16 @@ class PositionManager:
             qty=str(quantity),
             reduceOnly=True,
         )
-        logger.warning(f"{symbol} acil kapatma yapıldı")
+        logger.warning("%s acil kapatma yapıldı", symbol)
 
     # ─── Sorgular ─────────────────────────────────────────────────────────────
 
+    def owns(self, symbol: str) -> bool:
+        if self.ownership is None or self.ownership.owns(symbol):
+            return True
+        logger.warning("%s lease'i bu işçide değil — işlem atlandı", symbol, extra={'symbol': symbol})
+        return False
+
     def get_active_position(self, symbol: str) -> Optional[Dict]:
         return self.active_positions.get(symbol)
 
@@ -0,0 +1,291 @@
+"""
+Canlı bot için isteğe bağlı profilleme: yeniden başlatmadan, sinyal ya da kontrol
+dosyasıyla tetiklenir; sonraki N turu cProfile veya istatistiksel örnekleyiciyle
+kaydeder, turlar arası tracemalloc farklarını (cache / calculate_indicators kaynaklı
+frame kopyası büyümesi) yazar.
+
+    kill -USR1 <pid>                          # PROFILE_CYCLES tur, cProfile
+    echo "5 sample" > logs/profile.request    # 5 tur, örnekleyici
+    echo "2 both" > logs/profile.request      # cProfile + örnekleyici
+
+Çıktılar PROFILE_DIR/<zaman damgası>/ altında:
+    cycle1.prof        pstats dump'ı (snakeviz, `python -m pstats`), tüm thread'ler birleşik
+    cycle1.txt         kümülatif süreye göre ilk PROFILE_TOP fonksiyon
+    cycle1.stacks      örnekleyici: katlanmış yığınlar, kök: thread adı (flamegraph.pl / speedscope)
+    cycle1.mem.txt     önceki tura göre tracemalloc farkı (satır bazında)
+
+Thread'ler: örnekleyici tüm thread'leri örnekler. cProfile Python 3.12+'da
+(sys.monitoring) tüm thread'leri zaten görür; daha eskilerde sadece çağıran thread'i
+profiller, bu yüzden turda ThreadPoolExecutor işleri (hesap yürütücüleri, OCO,
+başlangıç) kendi thread'lerinde ayrı cProfile ile ölçülüp birleştirilir
+(ThreadProfiles). Executor dışı thread'ler (supervisor, lease) sadece örnekleyicide.
+
+Kapalıyken tur başına maliyet: bir bayrak kontrolü + kontrol dosyasını açma denemesi (~10 µs).
+"""
+import os
+import sys
+import time
+import pstats
+import signal
+import logging
+import cProfile
+import datetime
+import threading
+import tracemalloc
+from collections import Counter
+from concurrent.futures import thread as futures_thread
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from config import (
+    PROFILE_DIR, PROFILE_REQUEST_FILE, PROFILE_CYCLES, PROFILE_SAMPLE_INTERVAL, PROFILE_TOP,
+)
+
+logger = logging.getLogger(__name__)
+
+MODES = ('cprofile', 'sample', 'both')
+
+
+class StackSampler:
+    """
+    Thread yığınlarını sabit aralıkla örnekler; katlanmış yığın sayaçları tutar.
+    `thread_id` verilmezse kendisi hariç tüm thread'ler (yığının kökü thread adı).
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval  = interval
+        self.stacks: Counter = Counter()
+        self._stop     = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.stacks.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                frames = {self.thread_id: frames[self.thread_id]} if self.thread_id in frames else {}
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                names.append(thread_names.get(ident, str(ident)))
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def write(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ThreadProfiles:
+    """
+    Python < 3.12: profil turunda ThreadPoolExecutor işlerini çalıştıran her thread'e
+    ayrı cProfile. İş, kendi thread'inde enable/disable ile sarılır (profil dışarıdan
+    durdurulamaz; threading.setprofile ile başlatılan profil thread yaşadıkça sürerdi).
+    3.12+'da ana cProfile zaten tüm thread'leri gördüğü için hiçbir şey yapmaz.
+    """
+
+    def __init__(self):
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self._lock     = threading.Lock()
+        self._original = None
+
+    @staticmethod
+    def needed() -> bool:
+        return sys.version_info < (3, 12)
+
+    def start(self) -> None:
+        if not self.needed() or self._original is not None:
+            return
+        self.profiles.clear()
+        original, profiles, lock = futures_thread._WorkItem.run, self.profiles, self._lock
+
+        def run(item):
+            name = threading.current_thread().name
+            with lock:
+                profile = profiles.setdefault(name, cProfile.Profile())
+            profile.enable()
+            try:
+                return original(item)
+            finally:
+                profile.disable()
+
+        self._original = original
+        futures_thread._WorkItem.run = run
+
+    def stop(self) -> None:
+        if self._original is not None:
+            futures_thread._WorkItem.run = self._original
+            self._original = None
+
+
+class Profiler:
+    """
+    TradingBot.run içinde her tur `with profiler.cycle():` ile sarılır. İstek gelince
+    (request() / sinyal / kontrol dosyası) sonraki `cycles` turu profiller.
+    """
+
+    def __init__(
+        self,
+        output_dir:   str = PROFILE_DIR,
+        request_file: Optional[str] = PROFILE_REQUEST_FILE,
+        cycles:       int = PROFILE_CYCLES,
+        top:          int = PROFILE_TOP,
+    ):
+        self.output_dir   = output_dir
+        self.request_file = request_file
+        self.cycles       = cycles
+        self.top          = top
+        self._pending: Optional[tuple] = None  # (tur sayısı, mod); sinyal işleyicisi sadece bunu yazar
+        self._remaining   = 0
+        self._mode        = 'cprofile'
+        self._session_dir = ''
+        self._cycle_no    = 0
+        self._mem_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._own_tracemalloc = False
+
+    @property
+    def active(self) -> bool:
+        return self._remaining > 0
+
+    # ─── Tetikleme ────────────────────────────────────────────────────────────
+
+    def request(self, cycles: Optional[int] = None, mode: str = 'cprofile') -> None:
+        if mode not in MODES:
+            raise ValueError(f"Bilinmeyen profil modu: {mode} (geçerli: {MODES})")
+        self._pending = (cycles or self.cycles, mode)
+
+    def install_signal_handler(self, signum: int = getattr(signal, 'SIGUSR1', 0)) -> bool:
+        """Sinyal gelince profil isteği bırakır. Sadece ana thread'den; platform desteklemiyorsa False."""
+        if not signum:
+            return False
+        try:
+            signal.signal(signum, lambda *_: self.request())
+        except (ValueError, OSError) as e:
+            logger.warning("Profil sinyali kurulamadı: %s", e)
+            return False
+        return True
+
+    def _poll_request_file(self) -> None:
+        """Kontrol dosyası varsa okur ve siler. İçerik: '[tur sayısı] [mod]' (ikisi de isteğe bağlı)."""
+        if not self.request_file:
+            return
+        try:
+            with open(self.request_file, encoding='utf-8') as f:
+                parts = f.read().split()
+            os.remove(self.request_file)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning("Profil kontrol dosyası okunamadı: %s", e)
+            return
+        cycles = int(parts[0]) if parts and parts[0].isdigit() else None
+        mode = next((p for p in parts if p in MODES), 'cprofile')
+        self.request(cycles, mode)
+
+    # ─── Tur Sarmalayıcı ──────────────────────────────────────────────────────
+
+    @contextmanager
+    def cycle(self):
+        if not self._remaining:
+            self._poll_request_file()
+            if self._pending is None:
+                yield
+                return
+            self._start_session(*self._pending)
+            self._pending = None
+
+        self._cycle_no += 1
+        profile = cProfile.Profile() if self._mode in ('cprofile', 'both') else None
+        threads = ThreadProfiles() if profile is not None else None
+        sampler = StackSampler() if self._mode in ('sample', 'both') else None
+        if sampler is not None:
+            sampler.start()
+        if profile is not None:
+            threads.start()
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                threads.stop()
+            if sampler is not None:
+                sampler.stop()
+            self._write_cycle(profile, sampler, threads)
+            self._remaining -= 1
+            if not self._remaining:
+                self._end_session()
+
+    def _start_session(self, cycles: int, mode: str) -> None:
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        self._session_dir = os.path.join(self.output_dir, stamp)
+        os.makedirs(self._session_dir, exist_ok=True)
+        self._remaining, self._mode, self._cycle_no = cycles, mode, 0
+        self._own_tracemalloc = not tracemalloc.is_tracing()
+        if self._own_tracemalloc:
+            tracemalloc.start()
+        self._mem_snapshot = _memory_snapshot()
+        logger.info("Profilleme başladı: %d tur, mod=%s → %s", cycles, mode, self._session_dir)
+
+    def _end_session(self) -> None:
+        self._mem_snapshot = None
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+        logger.info("Profilleme bitti → %s", self._session_dir)
+
+    def _write_cycle(self, profile: Optional[cProfile.Profile], sampler: Optional[StackSampler],
+                     threads: Optional[ThreadProfiles] = None) -> None:
+        base = os.path.join(self._session_dir, f"cycle{self._cycle_no}")
+        try:
+            if profile is not None:
+                worker_profiles = dict(threads.profiles) if threads is not None else {}
+                with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+                    if worker_profiles:
+                        f.write(f"# thread'ler: {threading.current_thread().name}, {', '.join(sorted(worker_profiles))}\n")
+                    stats = pstats.Stats(profile, stream=f)
+                    for worker_profile in worker_profiles.values():
+                        stats.add(worker_profile)
+                    stats.dump_stats(f"{base}.prof")
+                    stats.sort_stats('cumulative').print_stats(self.top)
+            if sampler is not None:
+                sampler.write(f"{base}.stacks")
+            self._write_memory_diff(f"{base}.mem.txt")
+        except OSError as e:
+            logger.warning("Profil çıktısı yazılamadı: %s", e)
+
+    def _write_memory_diff(self, path: str) -> None:
+        snapshot = _memory_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        stats = snapshot.compare_to(self._mem_snapshot, 'lineno')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# {time.strftime('%Y-%m-%d %H:%M:%S')} | izlenen: {current / 1e6:.1f} MB | tepe: {peak / 1e6:.1f} MB\n")
+            f.write(f"# net fark: {sum(s.size_diff for s in stats) / 1e6:+.2f} MB\n")
+            for stat in stats[:self.top]:
+                f.write(f"{stat}\n")
+        self._mem_snapshot = snapshot
+
+
+def _memory_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ))
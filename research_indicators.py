@@ -0,0 +1,254 @@
+"""
+indicator_update.py'deki eski indikatör ve sinyal kütüphanesinin vektörel portu
+(strateji araştırması için): Bollinger, ADX, mum gücü, DC/BB sinyalleri.
+
+Satır bazlı `df.apply`, Python EMA döngüsü ve O(n·window) sinyal temizleme yerine
+NumPy dizi işlemleri ve kernels.sma_seeded_ema kullanılır. Çıktılar eski kodla
+aynıdır (tests/test_research_indicators.py eski kodun kendisiyle karşılaştırır).
+"""
+import numpy as np
+import pandas as pd
+
+from config import atr_ranges
+from indicators import atr_zigzag_two_columns
+import kernels
+
+CANDLE_CLASSES = ['strong_bullish', 'medium_bullish', 'weak_bullish',
+                  'strong_bearish', 'medium_bearish', 'weak_bearish']
+
+# add_research_signals'ın dışarıdan beklediği sütunlar (bu modül hesaplamaz)
+RESEARCH_INPUT_COLUMNS = [
+    'atr', 'pct_atr', 'trend_13_50', 'trend_50_200', 'dc_upper_50', 'dc_lower_50',
+    'dc_position_ratio_20', 'dc_position_ratio_50', 'rsi', 'nw', 'nw_upper', 'nw_lower',
+    'sma_20', 'sma_50', 'sma_200', 'sma_800',
+]
+
+
+def _shift(values, periods=1, fill=np.nan):
+    out = np.empty_like(values)
+    out[:periods] = fill
+    out[periods:] = values[:-periods] if periods else values
+    return out
+
+
+# --- Bollinger Bands ---
+def calculate_bollinger_bands(price_data, window=20, std_multiplier=2, price_col='close'):
+    price = price_data[price_col]
+    sma = price.rolling(window=window).mean()
+    std = price.rolling(window=window).std()
+    upper_band = sma + std_multiplier * std
+    lower_band = sma - std_multiplier * std
+    return pd.DataFrame({'bb_middle': sma, 'bb_upper': upper_band, 'bb_lower': lower_band})
+
+
+# --- ADX ---
+def add_adx(df, period=14):
+    """ADX (+DI/-DI, DX): EMA'lar ilk `period` barın ortalamasıyla tohumlanır."""
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+
+    prev_close = _shift(close)
+    tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+    up_move = high - _shift(high)
+    down_move = _shift(low) - low
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+
+    tr_ema = kernels.sma_seeded_ema(tr, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = (kernels.sma_seeded_ema(plus_dm, period) / tr_ema) * 100
+        minus_di = (kernels.sma_seeded_ema(minus_dm, period) / tr_ema) * 100
+        dx = (np.abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
+
+    df['tr'] = tr
+    df['+di'] = plus_di
+    df['-di'] = minus_di
+    df['dx'] = dx
+    df['adx'] = kernels.sma_seeded_ema(dx, period)
+    return df
+
+
+# --- Candle Analysis ---
+def candle_color(df):
+    """'green' / 'red' (kategorik; satır başına string yerine int8 kod)."""
+    bullish = (df['close'] > df['open']).to_numpy()
+    return pd.Series(pd.Categorical.from_codes(bullish.astype(np.int8), ['red', 'green']), index=df.index)
+
+
+def classify_strength(df):
+    """Gövde/ATR oranına göre mum sınıfı (CANDLE_CLASSES, kategorik); `candle_strength` sütunu gerekir."""
+    bearish = (df['close'] <= df['open']).to_numpy()
+    strength = df['candle_strength'].to_numpy(dtype=np.float64)
+    level = np.select([strength > 1.1, strength > 0.7], [0, 1], default=2)
+    codes = (level + 3 * bearish).astype(np.int8)
+    return pd.Series(pd.Categorical.from_codes(codes, CANDLE_CLASSES), index=df.index)
+
+
+def add_candle_analysis(df):
+    df['candle'] = candle_color(df)
+    df['candle_body'] = abs(df['close'] - df['open'])
+    df['candle_strength'] = df['candle_body'] / df['atr']
+    df['candle_class'] = classify_strength(df)
+    return df
+
+
+# --- Signals ---
+def bb_touch_signal(df, touch_count=1, trend_filter=False, trend_col='trend_50_200', trend_direction='uptrend'):
+    """
+    Bollinger Band üst/alt temasına göre sinyal üretir: önceki `touch_count` barın hepsi temas.
+
+    Returns:
+        signal_long, signal_short: pd.Series
+    """
+    df['bb_touch_upper'] = df['high'] >= df['bb_upper']
+    df['bb_touch_lower'] = df['low'] <= df['bb_lower']
+
+    def _all_previous(touch):
+        touched = np.cumsum(np.r_[0, touch.to_numpy(dtype=np.int64)])
+        bars = np.arange(len(touch))
+        counts = touched[bars] - touched[np.maximum(bars - touch_count, 0)]
+        return (bars >= touch_count) & (counts >= touch_count)
+
+    signal_long = _all_previous(df['bb_touch_upper'])
+    signal_short = _all_previous(df['bb_touch_lower'])
+
+    if trend_filter:
+        signal_long &= (df[trend_col] == trend_direction).to_numpy()
+        signal_short &= (df[trend_col] != trend_direction).to_numpy()
+
+    return pd.Series(signal_long, index=df.index), pd.Series(signal_short, index=df.index)
+
+
+def dc_breakout_signal(df, dc_upper='dc_upper_50', dc_lower='dc_lower_50',
+                       trend_filter=False, trend_col='trend_50_200', trend_direction='uptrend'):
+    """
+    Donchian Channel breakout sinyali.
+
+    Returns:
+        signal_long, signal_short: pd.Series
+    """
+    signal_long = df['high'] > df[dc_upper].shift(1)
+    signal_short = df['low'] < df[dc_lower].shift(1)
+
+    if trend_filter:
+        signal_long &= df[trend_col] == trend_direction
+        signal_short &= df[trend_col] != trend_direction
+
+    return pd.Series(signal_long, index=df.index), pd.Series(signal_short, index=df.index)
+
+
+def clean_signals(signal_series, window=10):
+    """Son `window` bar içinde sinyal varsa yeni sinyali engeller (kümülatif toplamla, O(n))."""
+    signal = signal_series.to_numpy(dtype=bool)
+    seen = np.cumsum(np.r_[0, signal.astype(np.int64)])
+    bars = np.arange(signal.size)
+    recent = seen[bars] - seen[np.maximum(bars - window, 0)]
+    return pd.Series(signal & (recent == 0), index=signal_series.index, name=signal_series.name)
+
+
+def _labels(n, masks, default):
+    """Sıralı (mask, etiket) çiftlerinden object etiket dizisi; sonraki mask öncekini ezer."""
+    out = np.full(n, default, dtype=object)
+    for mask, label in masks:
+        out[mask] = label
+    return out
+
+
+def _in_atr_range(df, symbol):
+    low_atr, high_atr = atr_ranges[symbol]
+    pct_atr = df['pct_atr'].to_numpy(dtype=np.float64)
+    return (low_atr < pct_atr) & (pct_atr < high_atr)
+
+
+def add_research_signals(df, symbol):
+    """
+    Eski script'in sinyal bloğu: DC50 kırılımı, BB 3 temas, pivot up/down, atr_steps, dc_order.
+    RESEARCH_INPUT_COLUMNS'taki sütunlar hazır olmalı; Bollinger, mum ve ADX yoksa hesaplanır.
+    """
+    missing = [col for col in RESEARCH_INPUT_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Araştırma sinyalleri için eksik sütunlar: {missing}")
+
+    if 'bb_middle' not in df.columns:
+        df[['bb_middle', 'bb_upper', 'bb_lower']] = calculate_bollinger_bands(df)
+    if 'candle_class' not in df.columns:
+        df = add_candle_analysis(df)
+    if 'adx' not in df.columns:
+        df = add_adx(df)
+    if 'low_pivot_confirmed' not in df.columns:
+        df = atr_zigzag_two_columns(df, atr_col="atr", close_col="close")
+    if 'low_pivot_confirmed_2x' not in df.columns:
+        df = atr_zigzag_two_columns(df, atr_col="atr", close_col="close", atr_mult=2, suffix="_2x")
+
+    # DC 50 breakout
+    long_dc50, short_dc50 = dc_breakout_signal(df, 'dc_upper_50', 'dc_lower_50', trend_filter=True)
+    df['dc_breakout_50'] = long_dc50
+    df['dc_breakdown_50'] = short_dc50
+    df['dc_breakout_clean_50'] = clean_signals(long_dc50)
+    df['dc_breakdown_clean_50'] = clean_signals(short_dc50)
+
+    # BB3 touch
+    long3, short3 = bb_touch_signal(df, touch_count=3, trend_filter=True)
+    df['bb_3_touch_long'] = long3
+    df['bb_3_touch_short'] = short3
+    df['bb_3_touch_long_clean'] = clean_signals(long3)
+    df['bb_3_touch_short_clean'] = clean_signals(short3)
+
+    in_range = _in_atr_range(df, symbol)
+    close = df['close'].to_numpy(dtype=np.float64)
+    atr = df['atr'].to_numpy(dtype=np.float64)
+    uptrend = (df['trend_13_50'] == 'uptrend').to_numpy()
+    downtrend = (df['trend_13_50'] == 'downtrend').to_numpy()
+    low_confirmed = df['low_pivot_confirmed'].to_numpy() != 0
+    high_confirmed = df['high_pivot_confirmed'].to_numpy() != 0
+
+    # Pivot Up-Down
+    pivot_up = low_confirmed & uptrend & in_range
+    pivot_down = high_confirmed & downtrend & in_range
+    df['pivot_up'] = pivot_up
+    df['pivot_down'] = pivot_down
+    df['entry_atr_steps_l'] = np.where(pivot_up, (close - df['low_pivot_filled'].to_numpy()) / atr, np.nan)
+    df['entry_atr_steps_s'] = np.where(pivot_down, (df['high_pivot_filled'].to_numpy() - close) / atr, np.nan)
+
+    ratio_50 = df['dc_position_ratio_50'].to_numpy(dtype=np.float64)
+    atr_steps_long = pivot_up & (ratio_50 > 60) & (close < df['nw_upper'].to_numpy())
+    atr_steps_short = pivot_down & (ratio_50 < 40) & (close > df['nw_lower'].to_numpy())
+    df['atr_steps'] = _labels(len(df), [(atr_steps_long, 'long'), (atr_steps_short, 'short')], np.nan)
+
+    smas = [df[col].to_numpy(dtype=np.float64) for col in ('sma_20', 'sma_50', 'sma_200', 'sma_800')]
+    above_all = np.logical_and.reduce([close > sma for sma in smas])
+    below_all = np.logical_and.reduce([close < sma for sma in smas])
+    # Eski kod gibi: koşulu sağlamayan satırlar False değil NaN
+    df['pivot_up_up'] = _labels(len(df), [(low_confirmed & above_all & in_range, True)], np.nan)
+    df['pivot_down_down'] = _labels(len(df), [(high_confirmed & below_all & in_range, True)], np.nan)
+
+    ratio_20 = df['dc_position_ratio_20'].to_numpy(dtype=np.float64)
+    rsi = df['rsi'].to_numpy(dtype=np.float64)
+    nw = df['nw'].to_numpy(dtype=np.float64)
+    adx = df['adx'].to_numpy(dtype=np.float64)
+    bb_middle = df['bb_middle'].to_numpy(dtype=np.float64)
+    candle_class = df['candle_class']
+    adx_ok = (adx > 25) & (adx < 60)
+
+    dc_long = df['dc_breakout_clean_50'].to_numpy() & (ratio_20 > 60) & (rsi > 50) & (close > nw) & \
+        (close < df['nw_upper'].to_numpy()) & (close > bb_middle) & adx_ok & \
+        candle_class.isin(['weak_bearish', 'weak_bullish', 'medium_bullish', 'strong_bullish']).to_numpy() & in_range
+    dc_short = df['dc_breakdown_clean_50'].to_numpy() & (ratio_20 < 40) & (rsi < 50) & (close < nw) & \
+        (close > df['nw_lower'].to_numpy()) & (close < bb_middle) & adx_ok & \
+        candle_class.isin(['weak_bullish', 'weak_bearish', 'medium_bearish', 'strong_bearish']).to_numpy() & in_range
+    df['dc_order'] = _labels(len(df), [(dc_long, 'long'), (dc_short, 'short')], None)
+
+    # 2x ATR için
+    df['pivot_up_2x'] = (df['low_pivot_confirmed_2x'].to_numpy() != 0) & uptrend & in_range
+    df['pivot_down_2x'] = (df['high_pivot_confirmed_2x'].to_numpy() != 0) & downtrend & in_range
+    return df
+
+
+def calculate_research_indicators(df, symbol):
+    """Bollinger + mum analizi + ADX + eski sinyal bloğu (giriş sütunları hazır olmalı)."""
+    df[['bb_middle', 'bb_upper', 'bb_lower']] = calculate_bollinger_bands(df)
+    df = add_candle_analysis(df)
+    df = add_adx(df)
+    return add_research_signals(df, symbol)
@@ -0,0 +1,210 @@
+import os
+import json
+import pickle
+import hashlib
+import inspect
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+import config
+from config import RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+# Anahtara giren config değerleri — biri değişirse eski sonuçlar kullanılmaz
+CONFIG_KEYS = ['Z_RANGES', 'atr_ranges', 'Z_INDICATOR_PARAMS', 'TP1', 'TP2', 'SL',
+               'SYMBOL_SETTINGS', 'RISK_PER_TRADE_USDT', 'DEFAULT_LEVERAGE',
+               'ROUND_NUMBERS', 'TP_ROUND_NUMBERS', 'BREAKOUT_LOOKBACK']
+
+
+# ─── Parmak İzleri ────────────────────────────────────────────────────────────
+
+def frame_fingerprint(df: Optional[pd.DataFrame]) -> str:
+    """Veri diliminin içerik hash'i: aralık + uzunluk + tüm satırların değerleri."""
+    if df is None or df.empty:
+        return 'empty'
+    h = hashlib.sha256()
+    h.update(f"{df.index[0]}|{df.index[-1]}|{len(df)}|{','.join(map(str, df.columns))}".encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def config_fingerprint(keys: Iterable[str] = CONFIG_KEYS) -> str:
+    values = {k: getattr(config, k, None) for k in keys}
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def code_version(*funcs: Any) -> str:
+    """Fonksiyonların (ve tanımlandıkları modüllerin) ya da modüllerin kaynak kodundan sürüm hash'i."""
+    h = hashlib.sha256()
+    for func in funcs:
+        module = inspect.getmodule(func)
+        try:
+            h.update(inspect.getsource(module if module is not None else func).encode())
+        except (OSError, TypeError):
+            h.update(getattr(func, '__qualname__', repr(func)).encode())
+    return h.hexdigest()
+
+
+def indicator_code_version() -> str:
+    """İndikatör çıktısını belirleyen kod: indicators.py + çağırdığı çekirdekler (kernels.py)."""
+    import indicators
+    import kernels
+
+    return code_version(indicators, kernels)
+
+
+def make_key(*parts: Any) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(json.dumps(part, sort_keys=True, default=str).encode())
+        h.update(b'\x00')
+    return h.hexdigest()
+
+
+# ─── Disk Cache ───────────────────────────────────────────────────────────────
+
+class ResultCache:
+    """
+    İçerik adresli, boyut sınırlı disk cache'i.
+    Her sonuç `<dizin>/<key[:2]>/<key>.pkl` dosyasında durur; okuma dosyanın
+    mtime'ını tazeler, boyut aşılınca en eski erişilenler silinir (LRU).
+    """
+
+    def __init__(self, directory: str = RESULT_CACHE_DIR, max_bytes: int = RESULT_CACHE_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits      = 0
+        self.misses    = 0
+        self._lock     = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pkl")
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)  # LRU: son erişim
+            self.hits += 1
+            return True, value
+        except FileNotFoundError:
+            self.misses += 1
+            return False, None
+        except Exception as e:
+            logger.warning("Bozuk cache kaydı siliniyor (%s): %s", key, e)
+            self._remove(path)
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)  # yarım yazılmış kayıt okunmasın
+        self._evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        hit, value = self.get(key)
+        if hit:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+    def size_bytes(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, st.st_mtime, st.st_size))
+        return entries
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = self._entries()
+            total   = sum(size for _, _, size in entries)
+            if total <= self.max_bytes:
+                return
+            for path, _, size in sorted(entries, key=lambda e: e[1]):
+                self._remove(path)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            logger.info("Result cache LRU temizliği | Kalan: %.1f MB", total / 1024 / 1024)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+_default_cache: Optional[ResultCache] = None
+
+
+def get_default_cache() -> ResultCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+# ─── Memoize Edilmiş Çağrılar ─────────────────────────────────────────────────
+
+def cached_calculate_indicators(df: pd.DataFrame, symbol: str, cache: Optional[ResultCache] = None) -> pd.DataFrame:
+    """`calculate_indicators` sonucunu veri + config + kod sürümüne göre cache'ler."""
+    from indicators import calculate_indicators
+
+    cache = cache or get_default_cache()
+    key = make_key('calculate_indicators', symbol, frame_fingerprint(df),
+                   config_fingerprint(), indicator_code_version())
+    return cache.get_or_compute(key, lambda: calculate_indicators(df.copy(), symbol))
+
+
+def cached_portfolio_backtest(
+    frames: Dict[str, pd.DataFrame],
+    cache:  Optional[ResultCache] = None,
+    **kwargs,
+) -> Dict:
+    """
+    Portföy backtest'ini cache'ler. İndikatörler sembol bazında ayrı cache'lendiği
+    için sembol kümesi kısmen örtüşen koşular da hesaplanmış frame'leri yeniden kullanır.
+    """
+    import panel
+    import entry_strategies
+    import portfolio_backtest
+
+    cache = cache or get_default_cache()
+    fingerprints = {sym: frame_fingerprint(df) for sym, df in sorted(frames.items())}
+    key = make_key('run_portfolio_backtest', fingerprints, kwargs,
+                   config_fingerprint(), indicator_code_version(),
+                   code_version(portfolio_backtest.run_portfolio_backtest, panel.align_frames,
+                                entry_strategies.check_long_entry))
+
+    def _compute():
+        prepared = portfolio_backtest.prepare_frames(frames, cache=cache)
+        return portfolio_backtest.run_portfolio_backtest(prepared, compute_indicators=False, **kwargs)
+
+    return cache.get_or_compute(key, _compute)
@@ -0,0 +1,268 @@
+"""
+Yatay sembol dağıtımı: birden çok bot süreci (aynı ya da farklı makinelerde, ortak
+SHARD_DIR) SYMBOLS'ü tutarlı hash halkasıyla paylaşır. Her süreç bir işçidir.
+
+    SHARD_DIR = "/srv/bot/shards"     # config.py, tüm işçilerde aynı
+    python main.py                    # kimlik: SHARD_WORKER_ID ya da <host>-<pid>
+
+SHARD_DIR içeriği:
+    workers/<id>     işçi kalp atışı (mtime); SHARD_LEASE_TTL içinde güncellenmeyen işçi ölü sayılır
+    leases.json      sembol → {"worker": id, "expires": unix zamanı}
+    ratelimit        aynı API anahtarını paylaşan işçilerin ortak token bucket'ı
+    .lock            leases.json okuma-değiştirme-yazma bu dosya üzerinde flock ile sıralanır
+
+Süreç başına dosyalar (LOG_FILE, METRICS_JSON, SNAPSHOT_LOG) sharding açıkken işçi
+kimliğiyle ayrılır (`worker_path`): 'logs/metrics.json' → 'logs/metrics.<id>.json'.
+
+Çifte sahiplik yok: lease sadece boşsa, süresi dolmuşsa ya da zaten bizimse alınır;
+işçi sadece geçerli lease'ini tuttuğu sembollerde emir verir (PositionManager.ownership).
+Lease'ler arka plan thread'inde SHARD_RENEW_INTERVAL'de yenilenir ve bitişinden
+SHARD_RENEW_INTERVAL önce geçersiz sayılır; yenilenemeyen (donmuş süreç, disk hatası)
+lease'in sembolü bu işçide emir almaz, süresi dolunca başka işçiye geçer.
+Farklı makinelerde saatler senkron (NTP) ve SHARD_DIR flock destekleyen ortak bir
+dosya sistemi olmalı.
+
+Yeniden dağıtım: yaşayan işçi kümesi değişince halka yeniden hesaplanır. Sembol
+bırakma sadece mum turu başında ve pozisyon yokken yapılır (açık pozisyon kapanana
+kadar mevcut işçide kalır); ölü işçinin sembolleri lease süresi dolunca arka planda
+alınır, sonraki mum turunda exchange'den kurtarılır (pozisyon + TP/SL) ve işlenir.
+"""
+import os
+import json
+import time
+import fcntl
+import bisect
+import socket
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set
+
+from config import SHARD_DIR, SHARD_WORKER_ID, SHARD_LEASE_TTL, SHARD_RENEW_INTERVAL, SHARD_VNODES
+
+logger = logging.getLogger(__name__)
+
+# Bu sürecin işçi kimliği (ShardWorker ve süreç başına dosya adları aynı kimliği kullanır)
+WORKER_ID = SHARD_WORKER_ID or f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _hash(key: str) -> int:
+    # Süreçler arası kararlı olmalı (hash() her süreçte farklı tohumlanır)
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+def worker_path(path: Optional[str], worker_id: str = WORKER_ID, sharded: bool = bool(SHARD_DIR)) -> Optional[str]:
+    """Sharding açıksa 'logs/metrics.json' → 'logs/metrics.<id>.json' (işçiler aynı dosyaya yazmasın)."""
+    if not path or not sharded:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker_id}{ext}"
+
+
+@contextmanager
+def _locked(path: str):
+    with open(path, 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class HashRing:
+    """Tutarlı hash halkası; işçi başına `vnodes` sanal düğüm. Bir işçi çıkınca sadece onun sembolleri taşınır."""
+
+    def __init__(self, workers: Iterable[str], vnodes: int = SHARD_VNODES):
+        points = sorted((_hash(f"{worker}#{i}"), worker) for worker in set(workers) for i in range(vnodes))
+        self._keys    = [point for point, _ in points]
+        self._workers = [worker for _, worker in points]
+
+    def owner(self, symbol: str) -> Optional[str]:
+        if not self._keys:
+            return None
+        return self._workers[bisect.bisect(self._keys, _hash(symbol)) % len(self._keys)]
+
+
+class SharedRateLimiter:
+    """exchange.RateLimiter'ın süreçler arası karşılığı: token bucket durumu flock'lu bir dosyada."""
+
+    def __init__(self, path: str, rate: float, burst: Optional[int] = None):
+        self.path     = path
+        self.rate     = float(rate)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Token alır; bekleme süresini (saniye) döndürür."""
+        waited = 0.0
+        while True:
+            with _locked(self.path) as f:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or '{}')
+                except ValueError:
+                    state = {}
+                now   = time.time()
+                level = min(self.capacity, state.get('tokens', self.capacity) + (now - state.get('updated', now)) * self.rate)
+                delay = 0.0 if level >= tokens else (tokens - level) / self.rate
+                if not delay:
+                    level -= tokens
+                f.truncate(0)  # 'a+': yazım her zaman dosya sonuna, kesince başa
+                f.write(json.dumps({'tokens': level, 'updated': now}))
+                f.flush()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+
+class ShardWorker:
+    def __init__(
+        self,
+        directory:      str = SHARD_DIR,
+        worker_id:      Optional[str] = WORKER_ID,
+        lease_ttl:      float = SHARD_LEASE_TTL,
+        renew_interval: float = SHARD_RENEW_INTERVAL,
+        vnodes:         int = SHARD_VNODES,
+    ):
+        if renew_interval * 2 >= lease_ttl:
+            raise ValueError(f"SHARD_RENEW_INTERVAL ({renew_interval}) lease süresinin ({lease_ttl}) yarısından kısa olmalı")
+        self.directory      = directory
+        self.worker_id      = worker_id or WORKER_ID
+        self.lease_ttl      = lease_ttl
+        self.renew_interval = renew_interval
+        self.vnodes         = vnodes
+        self._held: Dict[str, float] = {}   # symbol → lease bitişi (unix)
+        self._universe: List[str] = []
+        self._state_lock    = threading.Lock()
+        self._stop          = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(os.path.join(directory, 'workers'), exist_ok=True)
+
+    # ─── Sahiplik ─────────────────────────────────────────────────────────────
+
+    def owns(self, symbol: str) -> bool:
+        """Lease bizde ve yenileme payı kadar daha geçerli mi."""
+        expires = self._held.get(symbol)
+        return expires is not None and time.time() < expires - self.renew_interval
+
+    def owned(self) -> List[str]:
+        return [symbol for symbol in self._universe if self.owns(symbol)]
+
+    def live_workers(self) -> List[str]:
+        directory = os.path.join(self.directory, 'workers')
+        cutoff    = time.time() - self.lease_ttl
+        workers   = {self.worker_id}
+        for name in os.listdir(directory):
+            try:
+                if os.path.getmtime(os.path.join(directory, name)) >= cutoff:
+                    workers.add(name)
+            except FileNotFoundError:
+                continue  # bu arada durdu
+        return sorted(workers)
+
+    def assigned(self) -> Set[str]:
+        """Halkaya göre bu işçiye düşen semboller."""
+        ring = HashRing(self.live_workers(), self.vnodes)
+        return {symbol for symbol in self._universe if ring.owner(symbol) == self.worker_id}
+
+    # ─── Lease Tablosu ────────────────────────────────────────────────────────
+
+    @contextmanager
+    def _leases(self):
+        """leases.json'u kilit altında okur; blok içinde değiştirilen tablo geri yazılır."""
+        path = os.path.join(self.directory, 'leases.json')
+        with _locked(os.path.join(self.directory, '.lock')):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    table = json.load(f)
+            except (FileNotFoundError, ValueError):
+                table = {}
+            yield table
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(table, f)
+            os.replace(tmp, path)
+
+    def _sync(self, acquire: Iterable[str] = (), release: Iterable[str] = ()) -> None:
+        """Tutulan lease'leri yeniler, verilenleri almayı dener / bırakır (tek kilitli tur)."""
+        acquire, release = set(acquire), set(release)
+        with self._state_lock, self._leases() as table:
+            now     = time.time()
+            expires = now + self.lease_ttl
+            for symbol in release:
+                if table.get(symbol, {}).get('worker') == self.worker_id:
+                    del table[symbol]
+                self._held.pop(symbol, None)
+            for symbol in list(self._held):
+                lease = table.get(symbol)
+                if lease is None or lease['worker'] == self.worker_id:
+                    table[symbol] = {'worker': self.worker_id, 'expires': expires}
+                    self._held[symbol] = expires
+                else:
+                    logger.error("%s lease'i kaybedildi (%s aldı)", symbol, lease['worker'], extra={'symbol': symbol})
+                    del self._held[symbol]
+            for symbol in acquire - set(self._held) - release:
+                lease = table.get(symbol)
+                if lease is not None and lease['worker'] != self.worker_id and lease['expires'] > now:
+                    continue  # başka işçide — süresi dolana kadar bekle
+                table[symbol] = {'worker': self.worker_id, 'expires': expires}
+                self._held[symbol] = expires
+
+    def _heartbeat(self) -> None:
+        path = os.path.join(self.directory, 'workers', self.worker_id)
+        with open(path, 'a', encoding='utf-8'):
+            pass
+        os.utime(path)
+
+    # ─── Mum Turu ─────────────────────────────────────────────────────────────
+
+    def rebalance(self, universe: Iterable[str], keep: Iterable[str] = ()) -> List[str]:
+        """
+        Mum turu başında (PositionManager.lock tutulurken) çağrılır: halkaya göre bize
+        düşmeyen sembolleri bırakır (`keep`: açık pozisyonlular hariç), düşenleri almayı
+        dener. Bu turda işlenecek sembolleri `universe` sırasıyla döndürür.
+        """
+        self._universe = list(universe)
+        self._heartbeat()
+        assigned = self.assigned()
+        keep     = set(keep)
+        release  = [symbol for symbol in self._held if symbol not in assigned and symbol not in keep]
+        self._sync(acquire=assigned, release=release)
+        if release:
+            logger.info("Yeniden dağıtım: %d sembol bırakıldı: %s", len(release), release)
+        return self.owned()
+
+    # ─── Arka Plan Yenileme ───────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='shard-lease', daemon=True)
+        self._thread.start()
+        logger.info("Shard işçisi başladı | Kimlik: %s | Dizin: %s", self.worker_id, self.directory)
+
+    def stop(self) -> None:
+        """Thread'i durdurur, tüm lease'leri bırakır (halefler TTL beklemez)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._sync(release=list(self._held))
+        try:
+            os.remove(os.path.join(self.directory, 'workers', self.worker_id))
+        except FileNotFoundError:
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.renew_interval):
+            try:
+                self._heartbeat()
+                # Ölü işçinin sembolleri: lease süresi dolunca burada alınır, sonraki turda işlenir
+                self._sync(acquire=self.assigned())
+            except Exception as e:
+                logger.error("Lease yenileme hatası: %s", e, exc_info=True)
@@ -0,0 +1,247 @@
+"""
+Küçük, bildirimsel sinyal dili ve derleyicisi.
+
+Koşullar, geriye bakışlar, temizleme penceresi (dedup) ve trend filtreleri ifade
+ağacı olarak yazılır; derleyici tüm sinyallerdeki ortak alt ifadeleri birleştirir
+(aynı sütun, shift, pencere sayımı bir kez hesaplanır) ve sinyalleri tek geçişte
+NumPy dizileri üzerinde değerlendirir. Onlarca varyantlık taramalar ucuz kalır.
+
+    high, dc_upper = col('high'), col('dc_upper_50')
+    program = compile_signals([
+        Signal('dc_breakout_50', high > dc_upper.shift(1), trend=trend('trend_50_200', 'uptrend')),
+        Signal('dc_breakout_clean_50', high > dc_upper.shift(1), trend=trend('trend_50_200', 'uptrend'), clean=10),
+    ])
+    out = program.evaluate(df)          # {isim: np.ndarray}
+    df = program.apply(df)              # sütun olarak ekler
+
+Girdi DataFrame, panel.Panel (time × symbol) ya da {sütun: dizi} olabilir; zaman ekseni 0.
+"""
+import operator
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+_BINARY = {
+    'gt': operator.gt, 'ge': operator.ge, 'lt': operator.lt, 'le': operator.le,
+    'eq': operator.eq, 'ne': operator.ne,
+    'and': operator.and_, 'or': operator.or_,
+    'add': operator.add, 'sub': operator.sub, 'mul': operator.mul, 'truediv': operator.truediv,
+}
+
+
+class Expr:
+    """İfade ağacı düğümü. `key` yapısal kimliktir: aynı key → aynı hesap (bir kez yapılır)."""
+
+    __hash__ = None  # == operatörü ifade üretir
+
+    def __init__(self, op: str, args: tuple):
+        self.op = op
+        self.args = args
+        self.key = (op,) + tuple(a.key if isinstance(a, Expr) else a for a in args)
+
+    def __repr__(self) -> str:
+        return f"Expr{self.key}"
+
+    def _bin(self, op, other, reverse=False):
+        other = other if isinstance(other, Expr) else Expr('const', (other,))
+        return Expr(op, (other, self) if reverse else (self, other))
+
+    __gt__ = lambda self, o: self._bin('gt', o)
+    __ge__ = lambda self, o: self._bin('ge', o)
+    __lt__ = lambda self, o: self._bin('lt', o)
+    __le__ = lambda self, o: self._bin('le', o)
+    __eq__ = lambda self, o: self._bin('eq', o)
+    __ne__ = lambda self, o: self._bin('ne', o)
+    __and__ = lambda self, o: self._bin('and', o)
+    __or__ = lambda self, o: self._bin('or', o)
+    __add__ = lambda self, o: self._bin('add', o)
+    __sub__ = lambda self, o: self._bin('sub', o)
+    __mul__ = lambda self, o: self._bin('mul', o)
+    __truediv__ = lambda self, o: self._bin('truediv', o)
+    __radd__ = lambda self, o: self._bin('add', o, reverse=True)
+    __rsub__ = lambda self, o: self._bin('sub', o, reverse=True)
+    __rmul__ = lambda self, o: self._bin('mul', o, reverse=True)
+
+    def __invert__(self):
+        return Expr('not', (self,))
+
+    def shift(self, periods: int = 1) -> 'Expr':
+        """`periods` bar önceki değer (eksik geçmiş: float'ta NaN, bool'da False)."""
+        return Expr('shift', (self, int(periods)))
+
+    def abs(self) -> 'Expr':
+        return Expr('abs', (self,))
+
+
+# ─── Dil ──────────────────────────────────────────────────────────────────────
+
+def col(name: str) -> Expr:
+    return Expr('col', (name,))
+
+
+def const(value) -> Expr:
+    return Expr('const', (value,))
+
+
+def count(expr: Expr, window: int, lag: int = 0) -> Expr:
+    """[t-lag-window+1, t-lag] aralığındaki True sayısı; pencere eksikse NaN (karşılaştırmalar False)."""
+    return Expr('count', (expr, int(window), int(lag)))
+
+
+def all_of(expr: Expr, window: int, lag: int = 1) -> Expr:
+    """Önceki `window` barın (varsayılan: bu bar hariç) hepsinde koşul doğru."""
+    return count(expr, window, lag) >= window
+
+
+def none_of(expr: Expr, window: int, lag: int = 1) -> Expr:
+    """Önceki `window` barın hiçbirinde koşul doğru değil."""
+    return count(expr, window, lag) == 0
+
+
+def trend(column: str, direction: str, negate: bool = False) -> Expr:
+    """Trend filtresi: column == direction (negate=True → !=)."""
+    return (col(column) != direction) if negate else (col(column) == direction)
+
+
+class Signal:
+    """
+    İsimli sinyal: when [& trend] [& son `clean` barda aynı sinyal yok].
+    clean, signals.clean_signals ile aynı anlamdadır (ilk `clean` bar sinyal üretmez).
+    """
+
+    def __init__(self, name: str, when: Expr, trend: Optional[Expr] = None, clean: Optional[int] = None):
+        self.name = name
+        self.when = when
+        self.trend = trend
+        self.clean = clean
+
+    @property
+    def expr(self) -> Expr:
+        cond = self.when if self.trend is None else (self.when & self.trend)
+        return cond if not self.clean else (cond & none_of(cond, self.clean))
+
+    def __repr__(self) -> str:
+        return f"Signal({self.name}, clean={self.clean})"
+
+
+# ─── Derleyici ────────────────────────────────────────────────────────────────
+
+def _as_arrays(data):
+    if isinstance(data, pd.DataFrame):
+        return data
+    if hasattr(data, 'arrays'):  # panel.Panel
+        return data.arrays
+    return data
+
+
+def _to_numpy(values) -> np.ndarray:
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=object) if values.dtype == object or pd.api.types.is_string_dtype(values) \
+            else values.to_numpy()
+    return np.asarray(values)
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    if periods == 0:
+        return values
+    fill = False if values.dtype == bool else np.nan
+    out = np.empty(values.shape, dtype=values.dtype if values.dtype == bool else np.result_type(values, np.float64))
+    if periods > 0:
+        out[:periods] = fill
+        out[periods:] = values[:-periods]
+    else:
+        out[periods:] = fill
+        out[:periods] = values[-periods:]
+    return out
+
+
+class SignalProgram:
+    """Derlenmiş sinyal kümesi: tekil düğümler bağımlılık sırasında, her biri bir kez."""
+
+    def __init__(self, signals: Sequence[Signal]):
+        names = [s.name for s in signals]
+        if len(set(names)) != len(names):
+            raise ValueError("Sinyal isimleri benzersiz olmalı")
+        self.signals = list(signals)
+        self._nodes: List[Expr] = []
+        self._slot: Dict[tuple, int] = {}
+        self._outputs = {s.name: self._visit(s.expr) for s in self.signals}
+        self.columns = sorted({n.args[0] for n in self._nodes if n.op == 'col'})
+
+    def _visit(self, expr: Expr) -> int:
+        if expr.key in self._slot:
+            return self._slot[expr.key]
+        for arg in expr.args:
+            if isinstance(arg, Expr):
+                self._visit(arg)
+        if expr.op == 'count':  # pencere sayımları aynı kümülatif toplamı paylaşır
+            self._visit(Expr('cumsum', (expr.args[0],)))
+        self._slot[expr.key] = len(self._nodes)
+        self._nodes.append(expr)
+        return self._slot[expr.key]
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self._nodes)
+
+    def evaluate(self, data) -> Dict[str, np.ndarray]:
+        """Tüm sinyalleri tek geçişte hesaplar. Döndürür: {sinyal adı: bool dizi}."""
+        source = _as_arrays(data)
+        missing = [c for c in self.columns if c not in source]
+        if missing:
+            raise KeyError(f"Sinyaller için eksik sütunlar: {missing}")
+
+        buffers: List[np.ndarray] = [None] * len(self._nodes)
+
+        def arg(a):
+            return buffers[self._slot[a.key]] if isinstance(a, Expr) else a
+
+        for i, node in enumerate(self._nodes):
+            op, args = node.op, node.args
+            if op == 'col':
+                value = _to_numpy(source[args[0]])
+            elif op == 'const':
+                value = args[0]
+            elif op in _BINARY:
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    value = _BINARY[op](arg(args[0]), arg(args[1]))
+            elif op == 'not':
+                value = ~arg(args[0])
+            elif op == 'abs':
+                value = np.abs(arg(args[0]))
+            elif op == 'shift':
+                value = _shift(arg(args[0]), args[1])
+            elif op == 'cumsum':
+                values = np.asarray(arg(args[0]), dtype=bool)
+                value = np.zeros((values.shape[0] + 1,) + values.shape[1:], dtype=np.int64)
+                np.cumsum(values, axis=0, out=value[1:])
+            elif op == 'count':
+                cum = buffers[self._slot[('cumsum', args[0].key)]]
+                window, lag = args[1], args[2]
+                n = cum.shape[0] - 1
+                value = np.full((n,) + cum.shape[1:], np.nan)
+                first = lag + window - 1  # pencerenin tamamlandığı ilk bar
+                if n > first:
+                    value[first:] = cum[first - lag + 1:n - lag + 1] - cum[:n - first]
+            else:
+                raise ValueError(f"Bilinmeyen düğüm: {op}")
+            buffers[i] = value
+
+        out = {}
+        for name, slot in self._outputs.items():
+            value = buffers[slot]
+            out[name] = value if isinstance(value, np.ndarray) and value.dtype == bool \
+                else np.asarray(value, dtype=bool)
+        return out
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Sinyalleri DataFrame'e bool sütun olarak ekler."""
+        results = self.evaluate(df)
+        for name, values in results.items():
+            df[name] = values
+        return df
+
+
+def compile_signals(signals: Iterable[Signal]) -> SignalProgram:
+    return SignalProgram(list(signals))
@@ -1,6 +1,37 @@
 import pandas as pd
 import numpy as np
 
+from signal_compiler import Signal, col, all_of, trend, compile_signals
+
+
+def bb_touch_specs(touch_count=1, trend_filter=False, trend_col='trend_50_200', trend_direction='uptrend',
+                   clean=None, suffix=''):
+    """bb_touch_signal'ın sinyal dili karşılığı: önceki `touch_count` barın hepsi banda temas."""
+    touch_upper = col('high') >= col('bb_upper')
+    touch_lower = col('low') <= col('bb_lower')
+    return [
+        Signal(f'signal_long{suffix}', all_of(touch_upper, touch_count),
+               trend=trend(trend_col, trend_direction) if trend_filter else None, clean=clean),
+        Signal(f'signal_short{suffix}', all_of(touch_lower, touch_count),
+               trend=trend(trend_col, trend_direction, negate=True) if trend_filter else None, clean=clean),
+    ]
+
+
+def dc_breakout_specs(dc_upper='dc_upper_50', dc_lower='dc_lower_50', trend_filter=False,
+                      trend_col='trend_50_200', trend_direction='uptrend', clean=None, suffix=''):
+    """dc_breakout_signal'ın sinyal dili karşılığı: önceki barın kanal seviyesini kırma."""
+    return [
+        Signal(f'signal_long{suffix}', col('high') > col(dc_upper).shift(1),
+               trend=trend(trend_col, trend_direction) if trend_filter else None, clean=clean),
+        Signal(f'signal_short{suffix}', col('low') < col(dc_lower).shift(1),
+               trend=trend(trend_col, trend_direction, negate=True) if trend_filter else None, clean=clean),
+    ]
+
+
+def _renamed(specs, names):
+    return [Signal(name, s.when, trend=s.trend, clean=s.clean) for s, name in zip(specs, names)]
+
+
 def bb_touch_signal(df, touch_count=1, trend_filter=False, trend_col='trend_50_200', trend_direction='uptrend'):
     """
     Bollinger Band üst/alt temasına göre sinyal üretir.
@@ -11,17 +42,8 @@ def bb_touch_signal(df, touch_count=1, trend_filter=False, trend_col='trend_50_2
     df['bb_touch_upper'] = df['high'] >= df['bb_upper']
     df['bb_touch_lower'] = df['low'] <= df['bb_lower']
 
-    touch_upper = sum([df['bb_touch_upper'].shift(i + 1) for i in range(touch_count)])
-    touch_lower = sum([df['bb_touch_lower'].shift(i + 1) for i in range(touch_count)])
-
-    signal_long = touch_upper >= touch_count
-    signal_short = touch_lower >= touch_count
-
-    if trend_filter:
-        signal_long &= df[trend_col] == trend_direction
-        signal_short &= df[trend_col] != trend_direction
-
-    return pd.Series(signal_long, index=df.index), pd.Series(signal_short, index=df.index)
+    out = compile_signals(bb_touch_specs(touch_count, trend_filter, trend_col, trend_direction)).evaluate(df)
+    return pd.Series(out['signal_long'], index=df.index), pd.Series(out['signal_short'], index=df.index)
 
 
 def dc_breakout_signal(df, dc_upper='dc_upper_50', dc_lower='dc_lower_50',
@@ -32,17 +54,8 @@ def dc_breakout_signal(df, dc_upper='dc_upper_50', dc_lower='dc_lower_50',
     Returns:
         signal_long, signal_short: pd.Series
     """
-    breakout_upper = df['high'] > df[dc_upper].shift(1)
-    breakout_lower = df['low'] < df[dc_lower].shift(1)
-
-    signal_long = breakout_upper
-    signal_short = breakout_lower
-
-    if trend_filter:
-        signal_long &= df[trend_col] == trend_direction
-        signal_short &= df[trend_col] != trend_direction
-
-    return pd.Series(signal_long, index=df.index), pd.Series(signal_short, index=df.index)
+    out = compile_signals(dc_breakout_specs(dc_upper, dc_lower, trend_filter, trend_col, trend_direction)).evaluate(df)
+    return pd.Series(out['signal_long'], index=df.index), pd.Series(out['signal_short'], index=df.index)
 
 
 def clean_signals(signal_series, window=10):
@@ -52,23 +65,25 @@ def clean_signals(signal_series, window=10):
     return signal_series & (signal_series.shift(1).rolling(window=window).sum() == 0)
 
 
+# generate_signals'ın tüm sütunları tek program: ortak shift/temas/pencere hesapları bir kez yapılır
+STRATEGY_SIGNALS = [
+    # DC 50 breakout
+    *_renamed(dc_breakout_specs('dc_upper_50', 'dc_lower_50', trend_filter=True),
+              ['dc_breakout_50', 'dc_breakdown_50']),
+    *_renamed(dc_breakout_specs('dc_upper_50', 'dc_lower_50', trend_filter=True, clean=10),
+              ['dc_breakout_clean_50', 'dc_breakdown_clean_50']),
+    # BB3 touch
+    Signal('bb_touch_upper', col('high') >= col('bb_upper')),
+    Signal('bb_touch_lower', col('low') <= col('bb_lower')),
+    *_renamed(bb_touch_specs(touch_count=3, trend_filter=True), ['bb_3_touch_long', 'bb_3_touch_short']),
+    *_renamed(bb_touch_specs(touch_count=3, trend_filter=True, clean=10),
+              ['bb_3_touch_long_clean', 'bb_3_touch_short_clean']),
+]
+STRATEGY_PROGRAM = compile_signals(STRATEGY_SIGNALS)
+
+
 def generate_signals(df):
     """
     Tüm strateji sinyallerini DataFrame'e ekler.
     """
-
-    # DC 50 breakout
-    long_dc50, short_dc50 = dc_breakout_signal(df, 'dc_upper_50', 'dc_lower_50', trend_filter=True)
-    df['dc_breakout_50'] = long_dc50
-    df['dc_breakdown_50'] = short_dc50
-    df['dc_breakout_clean_50'] = clean_signals(long_dc50)
-    df['dc_breakdown_clean_50'] = clean_signals(short_dc50)
-
-    # BB3 touch
-    long3, short3 = bb_touch_signal(df, touch_count=3, trend_filter=True)
-    df['bb_3_touch_long'] = long3
-    df['bb_3_touch_short'] = short3
-    df['bb_3_touch_long_clean'] = clean_signals(long3)
-    df['bb_3_touch_short_clean'] = clean_signals(short3)
-
-    return df
+    return STRATEGY_PROGRAM.apply(df)
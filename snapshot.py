@@ -0,0 +1,208 @@
+"""
+Tur başına sinyal girdisi: sembol başına bir satır, sadece gereken alanlar.
+
+~40 sütunluk indikatör frame'inin son satırını `iloc[-1].to_dict()` ile kutulamak
+yerine her alan için tek bir float64 dizi tutulur (struct-of-arrays). Giriş
+kuralları entry_strategies.entry_masks ile tüm semboller üzerinde vektörel
+değerlendirilir; snapshot denetim için JSONL olarak kaydedilebilir.
+
+    snapshot = SignalSnapshot.from_frames(frames, SNAPSHOT_FIELDS)
+    signals  = snapshot.signals()          # {symbol: 'LONG' | 'SHORT' | None}
+    snapshot.persist('logs/snapshots.jsonl')
+
+Mapping gibi de davranır: snapshot.get(symbol) → {alan: değer} (veri yoksa None);
+pozisyon yönetimi ve emir açma mevcut dict arayüzüyle çalışmaya devam eder.
+
+Bool sütunlar (pivot_go_*) da float64 dizide 0/1 tutulur; `flags` bu alanları
+işaretler ve kayıtta true/false olarak geri çevrilir. Satır dict'lerinde 'bar_time'
+(ns) verilirse sembolün bar zamanı olarak yazılır.
+"""
+import os
+import json
+import time
+from typing import Dict, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from entry_strategies import entry_masks
+
+
+class SignalSnapshot(Mapping):
+    """(sembol,) boyutlu alan dizileri + geçerlilik maskesi + bar zamanı."""
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        fields:  Dict[str, np.ndarray],
+        valid:   np.ndarray,
+        times:   Optional[np.ndarray] = None,
+        created: Optional[float] = None,
+        flags:   Optional[set] = None,
+    ):
+        self.symbols = list(symbols)
+        self.fields  = fields
+        self.valid   = valid
+        self.times   = times if times is not None else np.full(len(self.symbols), -1, dtype=np.int64)
+        self.created = time.time() if created is None else created
+        self.flags   = set(flags) if flags is not None else set()  # bool değerli alanlar
+        self._pos    = {symbol: j for j, symbol in enumerate(self.symbols)}
+
+    # ─── Kurucular ────────────────────────────────────────────────────────────
+
+    @classmethod
+    def empty(cls, symbols: Sequence[str], fields: Sequence[str]) -> 'SignalSnapshot':
+        n = len(symbols)
+        return cls(symbols, {name: np.full(n, np.nan) for name in fields}, np.zeros(n, dtype=bool))
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, Optional[pd.DataFrame]], fields: Sequence[str]) -> 'SignalSnapshot':
+        """Her frame'in son satırından sadece `fields` sütunlarını okur (satır Series'i kurulmaz)."""
+        snapshot = cls.empty(list(frames), fields)
+        for j, (symbol, df) in enumerate(frames.items()):
+            if df is None or df.empty:
+                continue
+            for name in fields:
+                column = df[name].to_numpy()
+                if column.dtype == bool:
+                    snapshot.flags.add(name)
+                snapshot.fields[name][j] = column[-1]
+            snapshot.times[j] = df.index[-1].value
+            snapshot.valid[j] = True
+        return snapshot
+
+    @classmethod
+    def from_rows(cls, rows: Dict[str, Optional[Dict]], fields: Sequence[str]) -> 'SignalSnapshot':
+        """Son satır dict'lerinden (işçi havuzu, graph modu); eksik alan NaN kalır."""
+        snapshot = cls.empty(list(rows), fields)
+        for j, row in enumerate(rows.values()):
+            if row is not None:
+                snapshot.update_row(j, row)
+        return snapshot
+
+    @classmethod
+    def from_panel(cls, panel, fields: Sequence[str], symbols: Optional[Sequence[str]] = None) -> 'SignalSnapshot':
+        """Panel'de her sembolün son geçerli (close'u olan) barı; satır dict'i kurulmaz."""
+        symbols = list(symbols) if symbols is not None else list(panel.symbols)
+        snapshot = cls.empty(symbols, fields)
+        if not panel.symbols or not len(panel.index):
+            return snapshot
+        cols = np.array([panel.column_of(s) if s in panel.symbols else -1 for s in symbols])
+        present = cols >= 0
+        valid = ~np.isnan(panel['close'][:, cols[present]])
+        last = valid.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+        has_bar = valid.any(axis=0)
+        rows, columns = last[has_bar], cols[present][has_bar]
+        target = np.flatnonzero(present)[has_bar]
+        for name in fields:
+            values = panel[name]
+            if values.dtype == bool:
+                snapshot.flags.add(name)
+            snapshot.fields[name][target] = values[rows, columns]
+        snapshot.times[target] = panel.index.as_unit('ns').asi8[rows]
+        snapshot.valid[target] = True
+        return snapshot
+
+    def update_row(self, j: int, row: Dict) -> None:
+        """`row` içindeki snapshot alanlarını (ve varsa 'bar_time') j. sembole yazar, sembolü geçerli işaretler."""
+        for name, values in self.fields.items():
+            value = row.get(name)
+            if value is not None:
+                if isinstance(value, (bool, np.bool_)):
+                    self.flags.add(name)
+                values[j] = value
+        bar_time = row.get('bar_time')
+        if bar_time is not None:
+            self.times[j] = bar_time
+        self.valid[j] = True
+
+    def absorb(self, other: 'SignalSnapshot') -> None:
+        """`other`'ın geçerli sembollerini (alanlar, bar zamanı, bayraklar) bu snapshot'a kopyalar."""
+        pairs = [(self._pos[s], k) for k, s in enumerate(other.symbols) if other.valid[k] and s in self._pos]
+        if not pairs:
+            return
+        target, source = map(np.array, zip(*pairs))
+        for name, values in self.fields.items():
+            if name in other.fields:
+                values[target] = other.fields[name][source]
+        self.times[target] = other.times[source]
+        self.valid[target] = True
+        self.flags |= other.flags
+
+    def merge(self, symbol: str, values: Dict) -> None:
+        """Ek kaynaklardan (üst zaman dilimleri) gelen değerleri sadece mevcut alanlara yazar."""
+        j = self._pos.get(symbol)
+        if j is None or not self.valid[j]:
+            return
+        for name, value in values.items():
+            if name in self.fields and value is not None:
+                if isinstance(value, (bool, np.bool_)):
+                    self.flags.add(name)
+                self.fields[name][j] = value
+
+    # ─── Sinyaller ────────────────────────────────────────────────────────────
+
+    def masks(self):
+        """(go_long, go_short) bool dizileri; verisi olmayan semboller False."""
+        go_long, go_short = entry_masks(self.symbols, self.fields)
+        return go_long & self.valid, go_short & self.valid
+
+    def signals(self) -> Dict[str, Optional[str]]:
+        go_long, go_short = self.masks()
+        direction = np.where(go_long, 'LONG', np.where(go_short, 'SHORT', None))
+        return dict(zip(self.symbols, direction.tolist()))
+
+    def signal(self, symbol: str) -> Optional[str]:
+        """Tek sembolün sinyali (akış modunda satır yazılır yazılmaz); signals()[symbol] ile aynı."""
+        j = self._pos[symbol]
+        if not self.valid[j]:
+            return None
+        go_long, go_short = entry_masks([symbol], {name: values[j:j + 1] for name, values in self.fields.items()})
+        return 'LONG' if go_long[0] else 'SHORT' if go_short[0] else None
+
+    # ─── Mapping (sembol → alan dict'i) ──────────────────────────────────────
+
+    def __getitem__(self, symbol: str) -> Optional[Dict]:
+        j = self._pos[symbol]
+        if not self.valid[j]:
+            return None
+        return {name: values[j].item() for name, values in self.fields.items()}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    # ─── Denetim Kaydı ────────────────────────────────────────────────────────
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.fields, index=pd.Index(self.symbols, name='symbol'))
+        df.insert(0, 'bar_time', pd.to_datetime(np.where(self.valid, self.times, np.iinfo(np.int64).min), utc=True))
+        df.insert(1, 'valid', self.valid)
+        return df
+
+    def to_record(self, signals: Optional[Dict[str, Optional[str]]] = None) -> Dict:
+        """JSON'a yazılabilir tek kayıt (NaN → null)."""
+        signals = signals if signals is not None else self.signals()
+        rows = {}
+        for j, symbol in enumerate(self.symbols):
+            if not self.valid[j]:
+                rows[symbol] = None
+                continue
+            row = {}
+            for name, values in self.fields.items():
+                value = values[j]
+                row[name] = None if np.isnan(value) else bool(value) if name in self.flags else value.item()
+            row['bar_time'] = int(self.times[j])
+            row['signal'] = signals.get(symbol)
+            rows[symbol] = row
+        return {'created': self.created, 'symbols': rows}
+
+    def persist(self, path: str, signals: Optional[Dict[str, Optional[str]]] = None) -> None:
+        """Snapshot'ı JSONL dosyasına bir satır olarak ekler."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.to_record(signals), separators=(',', ':')) + '\n')
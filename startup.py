@@ -0,0 +1,95 @@
+"""
+Paralel başlangıç: birbirinden bağımsız başlangıç işleri (kaldıraç, enstrüman
+bilgisi, cache ısıtma, pozisyon/emir kurtarma, çekirdek derleme) aynı anda
+çalıştırılır; iş başına süre raporlanır. Mum kapanışına yakın bir çökme-yeniden
+başlatmada ilk turun kaçmaması için.
+
+    report = run_startup({'leverage': bot._initialize_account, 'cache': ...})
+    # {'leverage': 0.41, 'cache': 1.92, ..., 'total': 1.95}
+
+Kaldıraç durumu LEVERAGE_STATE_FILE'da tutulur: exchange'in onayladığı (ayarlandı /
+"leverage not modified") değer config ile aynıysa sonraki başlangıçta çağrı atlanır.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from config import LEVERAGE_STATE_FILE
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+def run_startup(tasks: Dict[str, Callable[[], None]], parallel: bool = True) -> Dict[str, float]:
+    """
+    İşleri çalıştırır (parallel=False: sırayla, karşılaştırma için). Bir işin hatası
+    diğerlerini durdurmaz; loglanır. Döndürür: {iş: saniye, 'total': saniye}.
+    """
+    report: Dict[str, float] = {}
+    start = time.perf_counter()
+
+    def timed(name: str, task: Callable[[], None]) -> None:
+        task_start = time.perf_counter()
+        try:
+            task()
+        except Exception as e:
+            logger.error("Başlangıç işi hatası (%s): %s", name, e, exc_info=True)
+        finally:
+            report[name] = time.perf_counter() - task_start
+            METRICS.observe(f"startup.{name}", report[name])
+
+    if parallel:
+        with ThreadPoolExecutor(max_workers=len(tasks) or 1, thread_name_prefix='startup') as executor:
+            for future in [executor.submit(timed, name, task) for name, task in tasks.items()]:
+                future.result()
+    else:
+        for name, task in tasks.items():
+            timed(name, task)
+
+    report['total'] = time.perf_counter() - start
+    METRICS.observe('startup', report['total'])
+    logger.info("Başlangıç tamamlandı | %s",
+                " | ".join(f"{name}: {seconds:.2f}s" for name, seconds in report.items()))
+    return report
+
+
+class LeverageState:
+    """Sembol → exchange'de doğrulanmış kaldıraç. Thread-safe; dosyaya atomik yazılır."""
+
+    def __init__(self, path: Optional[str] = LEVERAGE_STATE_FILE):
+        self.path   = path
+        self._lock  = threading.Lock()
+        self.values: Dict[str, str] = self._load()
+
+    def _load(self) -> Dict[str, str]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return {symbol: str(value) for symbol, value in json.load(f).items()}
+        except (OSError, ValueError) as e:
+            logger.warning("Kaldıraç durumu okunamadı: %s", e)
+            return {}
+
+    def matches(self, symbol: str, leverage) -> bool:
+        return self.values.get(symbol) == str(leverage)
+
+    def confirm(self, symbol: str, leverage) -> None:
+        with self._lock:
+            self.values[symbol] = str(leverage)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.values, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
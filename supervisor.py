@@ -0,0 +1,238 @@
+"""
+Mumlar arası denetçi: ana döngü mum kapanışını beklerken kısa aralıklarla ucuz bir
+uzlaştırma turu çalıştırır (arka plan thread'i).
+
+Her tur:
+    1. Toplu snapshot: tek get_positions + sayfalı tek get_open_orders (settleCoin=USDT)
+    2. TP/SL dolumları: açık emir snapshot'ında olmayan bacaklar için OCO kontrolü
+       (check_and_cancel_oco, sadece geçmiş sorgusu) → PositionManager'a uygulanır
+    3. Sahipsiz emir temizliği: pozisyonu olmayan sembollerde kalan reduce-only emirler
+    4. Pozisyon kayması: exchange ile active_positions arasındaki fark loglanır;
+       exchange'de art arda DRIFT_GRACE_TICKS tur görünmeyen pozisyon hafızadan düşer
+
+API bütçesi: tur başına en fazla SUPERVISOR_MAX_CALLS çağrı; bir işin en kötü durum
+maliyeti kalan bütçeyi aşıyorsa sonraki tura bırakılır. Durum paylaşımı
+PositionManager.lock ile: mum turu kilidi tutarken denetçi turu atlanır, mum
+kapanışından hemen önce (SUPERVISOR_QUIET_SECONDS) hiç çalışmaz.
+"""
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import (
+    INTERVAL, SUPERVISOR_INTERVAL, SUPERVISOR_MAX_CALLS, SUPERVISOR_QUIET_SECONDS, SUPERVISOR_CANCEL_ORPHANS,
+)
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+DRIFT_GRACE_TICKS = 2
+OPEN_STATUSES     = ('New', 'PartiallyFilled', 'Untriggered')
+# Bir OCO kontrolünün en kötü durum maliyeti: eksik bacak başına bir geçmiş sorgusu + en fazla 3 iptal
+OCO_CANCEL_CALLS  = 3
+
+
+class Supervisor:
+    def __init__(
+        self,
+        position_manager,
+        interval:      float = SUPERVISOR_INTERVAL,
+        max_calls:     int = SUPERVISOR_MAX_CALLS,
+        quiet_seconds: float = SUPERVISOR_QUIET_SECONDS,
+        candle_interval: str = INTERVAL,
+        cancel_orphans: bool = SUPERVISOR_CANCEL_ORPHANS,
+    ):
+        self.position_manager = position_manager
+        self.client           = position_manager.client
+        self.interval         = interval
+        self.max_calls        = max_calls
+        self.quiet_seconds    = quiet_seconds
+        self.candle_seconds   = int(candle_interval) * 60
+        self.cancel_orphans   = cancel_orphans
+        self.ticks            = 0
+        self._missing: Dict[str, int] = {}   # symbol → exchange'de görünmediği ardışık tur
+        self._untracked: Set[str] = set()    # takip edilmeyen exchange pozisyonları (son tur)
+        self._cursor          = 0            # bütçe yetmeyince sonraki tur kaldığı yerden
+        self._stop            = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ─── Yaşam Döngüsü ────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='supervisor', daemon=True)
+        self._thread.start()
+        logger.info("Denetçi başladı | Aralık: %ss | Tur bütçesi: %d çağrı", self.interval, self.max_calls)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self._near_candle_close():
+                continue
+            # Mum turu çalışıyorsa bekleme — bu turu atla
+            if not self.position_manager.lock.acquire(blocking=False):
+                continue
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error("Denetçi turu hatası: %s", e, exc_info=True)
+            finally:
+                self.position_manager.lock.release()
+
+    def _near_candle_close(self) -> bool:
+        remaining = self.candle_seconds - time.time() % self.candle_seconds
+        return remaining < self.quiet_seconds + self.interval / 2
+
+    def _owns(self, symbol: str) -> bool:
+        """Sharding açıksa sadece lease'i bu işçide olan semboller (sharding.py)."""
+        ownership = self.position_manager.ownership
+        return ownership is None or ownership.owns(symbol)
+
+    # ─── Tur ──────────────────────────────────────────────────────────────────
+
+    def tick(self) -> Dict[str, int]:
+        """Tek uzlaştırma turu (çağıran PositionManager.lock'u tutmalı). Döndürür: iş sayaçları."""
+        self.ticks += 1
+        with METRICS.time('supervisor'):
+            budget = self.max_calls
+            positions, used = self._position_snapshot()
+            budget -= used
+            if positions is None:
+                return {'calls': used}
+            open_orders, used = self._open_orders_snapshot(budget)
+            budget -= used
+            if open_orders is None:
+                return {'calls': self.max_calls - budget}
+
+            statuses = {order['orderId']: order['orderStatus'] for order in open_orders}
+            checked, budget = self._check_fills(statuses, budget)
+            cancelled, budget = self._cancel_orphans(positions, open_orders, budget)
+            drift = self._check_drift(positions)
+        return {'calls': self.max_calls - budget, 'checked': checked, 'cancelled': cancelled, 'drift': drift}
+
+    def _position_snapshot(self) -> Tuple[Optional[Dict[str, Dict]], int]:
+        response = self.client.get_positions(category='linear', settleCoin='USDT')
+        if response['retCode'] != 0:
+            logger.warning("Denetçi pozisyon snapshot'ı alınamadı: %s", response['retMsg'])
+            return None, 1
+        return {p['symbol']: p for p in response['result']['list'] if float(p.get('size', 0)) > 0}, 1
+
+    def _open_orders_snapshot(self, budget: int) -> Tuple[Optional[List[Dict]], int]:
+        """Tüm açık emirler (sayfalı). Bütçe sayfaları bitirmeye yetmezse None — eksik snapshot'la iş yapılmaz."""
+        orders: List[Dict] = []
+        cursor, used = None, 0
+        while True:
+            if used >= budget:
+                return None, used
+            params = {'category': 'linear', 'settleCoin': 'USDT', 'limit': 50}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get_open_orders(**params)
+            used += 1
+            if response['retCode'] != 0:
+                logger.warning("Denetçi emir snapshot'ı alınamadı: %s", response['retMsg'])
+                return None, used
+            orders += response['result']['list']
+            cursor = response['result'].get('nextPageCursor')
+            if not cursor:
+                return orders, used
+
+    def _check_fills(self, statuses: Dict[str, str], budget: int) -> Tuple[int, int]:
+        """Bacaklarından biri açık emirlerde olmayan OCO grupları için tetiklenme kontrolü."""
+        manager = self.position_manager
+        pairs   = list(manager.pending_oco_pairs().items())
+        if not pairs:
+            return 0, budget
+        start    = self._cursor % len(pairs)
+        checked  = 0
+        deferred = None
+        # Snapshot'lardan (pozisyon + en az bir emir sayfası) sonra bir turda kalabilecek en fazla bütçe
+        ceiling  = self.max_calls - 2
+        for offset in range(len(pairs)):
+            symbol, pair = pairs[(start + offset) % len(pairs)]
+            if not self._owns(symbol):
+                continue
+            keys    = ('tp2_order_id', 'sl2_order_id') if pair.get('tp1_triggered') else \
+                      ('tp1_order_id', 'tp2_order_id', 'sl1_order_id', 'sl2_order_id')
+            legs    = [pair.get(key) for key in keys]
+            missing = [leg for leg in legs if leg and leg not in statuses]
+            if not missing:
+                continue
+            cost = len(missing) + OCO_CANCEL_CALLS
+            if cost > ceiling:
+                # Hiçbir tura sığmaz: mum turunun OCO kontrolüne bırakılır, sıradakiler beklemez
+                logger.debug("%s OCO kontrolü denetçi bütçesini aşıyor (%d > %d) — mum turuna bırakıldı",
+                             symbol, cost, ceiling, extra={'symbol': symbol, 'stage': 'supervisor'})
+                continue
+            if cost > budget:
+                if deferred is None:
+                    deferred = start + offset  # sonraki tur buradan
+                continue  # daha ucuz işler bu turda sığabilir
+            result = manager.exit_strategy.check_and_cancel_oco(pair, statuses)
+            manager.apply_oco_result(symbol, result)
+            budget -= cost
+            checked += 1
+        if deferred is not None:
+            self._cursor = deferred
+        return checked, budget
+
+    def _cancel_orphans(self, positions: Dict[str, Dict], open_orders: List[Dict], budget: int) -> Tuple[int, int]:
+        """Pozisyonu olmayan ve bot tarafından takip edilmeyen sembollerdeki reduce-only emirleri iptal eder."""
+        if not self.cancel_orphans:
+            return 0, budget
+        tracked: Set[str] = set(self.position_manager.active_positions)
+        cancelled = 0
+        for order in open_orders:
+            symbol = order['symbol']
+            if not order.get('reduceOnly') or symbol in positions or symbol in tracked:
+                continue
+            if not self._owns(symbol):
+                continue  # başka shard işçisinin sembolü
+            if order.get('orderStatus') not in OPEN_STATUSES:
+                continue
+            if budget <= 0:
+                break
+            logger.warning("%s sahipsiz emir iptal ediliyor (pozisyon yok): %s", symbol, order['orderId'],
+                           extra={'symbol': symbol, 'stage': 'supervisor', 'order_id': order['orderId']})
+            self.position_manager.exit_strategy.cancel_order(symbol, order['orderId'])
+            budget -= 1
+            cancelled += 1
+        return cancelled, budget
+
+    def _check_drift(self, positions: Dict[str, Dict]) -> int:
+        """Exchange ↔ hafıza farkları. API çağrısı yok."""
+        active = self.position_manager.active_positions
+        drift  = 0
+        for symbol, position in list(active.items()):
+            if symbol in positions:
+                self._missing.pop(symbol, None)
+                exchange_qty = float(positions[symbol]['size'])
+                expected_qty = float(position['quantity'])
+                if position.get('oco_pair', {}).get('tp1_triggered'):
+                    expected_qty /= 2
+                if abs(exchange_qty - expected_qty) > expected_qty * 0.05:
+                    drift += 1
+                    logger.warning("%s pozisyon miktarı farklı | Hafıza: %s | Exchange: %s",
+                                   symbol, expected_qty, exchange_qty, extra={'symbol': symbol, 'stage': 'supervisor'})
+                continue
+            self._missing[symbol] = self._missing.get(symbol, 0) + 1
+            drift += 1
+            if self._missing[symbol] >= DRIFT_GRACE_TICKS:
+                logger.warning("%s exchange'de pozisyon yok (%d tur) — hafızadan siliniyor",
+                               symbol, self._missing[symbol], extra={'symbol': symbol, 'stage': 'supervisor'})
+                del active[symbol]
+                self._missing.pop(symbol)
+        untracked = {symbol for symbol in positions if symbol not in active and self._owns(symbol)}
+        for symbol in untracked - self._untracked:  # her yeni fark bir kez loglanır
+            logger.warning("%s exchange'de açık pozisyon var ama bot takip etmiyor", symbol,
+                           extra={'symbol': symbol, 'stage': 'supervisor'})
+        self._untracked = untracked
+        return drift + len(untracked)
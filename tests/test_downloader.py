@@ -0,0 +1,127 @@
+"""downloader.KlineDownloader: checkpoint'ten devam, pencere hatası ve hata anında flush (MockBybitSession)."""
+import json
+
+import pandas as pd
+import pytest
+
+from data_store import ParquetStore
+from downloader import KlineDownloader, plan_windows
+from exchange import BybitFuturesAPI, RateLimiter
+from mock_exchange import MockBybitSession
+
+INTERVAL = '15'
+START    = pd.Timestamp('2024-01-01', tz='UTC')
+END      = pd.Timestamp('2024-01-11', tz='UTC')   # 960 bar = 5 pencere (200'lük sayfa)
+NOW_MS   = int(pd.Timestamp('2024-03-01', tz='UTC').timestamp() * 1000)
+WINDOWS  = plan_windows(int(START.timestamp() * 1000), int(END.timestamp() * 1000), INTERVAL)
+EXPECTED_BARS = 960
+
+
+class FlakySession(MockBybitSession):
+    """`failures[start_ms]` kez hata döndürür (None: her seferinde), sonra normal cevap verir."""
+
+    def __init__(self, failures=None, **kwargs):
+        super().__init__(now_ms=NOW_MS, **kwargs)
+        self.failures  = dict(failures or {})
+        self.requested = []
+
+    def get_kline(self, **kwargs):
+        start = kwargs.get('start')
+        self.requested.append(start)
+        remaining = self.failures.get(start, 0)
+        if remaining is None or remaining > 0:
+            if remaining:
+                self.failures[start] = remaining - 1
+            return {'retCode': 10016, 'retMsg': 'Server error', 'result': {}}
+        return super().get_kline(**kwargs)
+
+
+def make_downloader(tmp_path, session, **kwargs):
+    api   = BybitFuturesAPI(session=session, rate_limiter=RateLimiter(1e6))
+    store = ParquetStore(str(tmp_path / 'store'))
+    kwargs.setdefault('workers', 1)
+    return KlineDownloader(api, store, str(tmp_path / 'checkpoints'), **kwargs), store
+
+
+def checkpoint(tmp_path, symbol='BTCUSDT'):
+    with open(tmp_path / 'checkpoints' / f"{symbol}_{INTERVAL}.json") as f:
+        return set(json.load(f)['done'])
+
+
+def test_plan_covers_range():
+    assert len(WINDOWS) == 5
+    assert WINDOWS[0][0] == int(START.timestamp() * 1000)
+
+
+def test_full_download_is_complete(tmp_path):
+    downloader, store = make_downloader(tmp_path, FlakySession())
+    report = downloader.download('BTCUSDT', START, END, INTERVAL)
+
+    assert report['bars'] == EXPECTED_BARS
+    assert report['stored_bars'] == EXPECTED_BARS
+    assert report['gaps'] == []
+    assert checkpoint(tmp_path) == {w[0] for w in WINDOWS}
+
+
+def test_resume_from_checkpoint_fetches_only_remaining(tmp_path):
+    failing = WINDOWS[3][0]
+    session = FlakySession({failing: None})
+    downloader, store = make_downloader(tmp_path, session, max_retries=1)
+    with pytest.raises(RuntimeError):
+        downloader.download('BTCUSDT', START, END, INTERVAL)
+    assert failing not in checkpoint(tmp_path)
+
+    done = checkpoint(tmp_path)
+    session = FlakySession()
+    downloader, store = make_downloader(tmp_path, session)
+    report = downloader.download('BTCUSDT', START, END, INTERVAL)
+
+    assert sorted(session.requested) == sorted(w[0] for w in WINDOWS if w[0] not in done)
+    assert report['fetched'] == len(WINDOWS) - len(done)
+    assert report['stored_bars'] == EXPECTED_BARS
+    assert report['gaps'] == []
+    assert checkpoint(tmp_path) == {w[0] for w in WINDOWS}
+
+
+def test_transient_window_failure_is_retried(tmp_path):
+    failing = WINDOWS[2][0]
+    session = FlakySession({failing: 2})
+    downloader, store = make_downloader(tmp_path, session, max_retries=3)
+    report = downloader.download('BTCUSDT', START, END, INTERVAL)
+
+    assert session.requested.count(failing) == 3
+    assert report['stored_bars'] == EXPECTED_BARS
+    assert report['gaps'] == []
+
+
+def test_persistent_window_failure_leaves_gap_and_no_checkpoint(tmp_path):
+    failing = WINDOWS[-1][0]
+    session = FlakySession({failing: None})
+    downloader, store = make_downloader(tmp_path, session, max_retries=2)
+    with pytest.raises(RuntimeError):
+        downloader.download('BTCUSDT', START, END, INTERVAL)
+
+    assert session.requested.count(failing) == 2
+    stored = store.read('BTCUSDT', INTERVAL, START, END)
+    assert checkpoint(tmp_path) == {w[0] for w in WINDOWS[:-1]}
+    assert len(stored) == EXPECTED_BARS - 160  # son pencere: 960 - 4 × 200
+    assert stored.index.max() < pd.Timestamp(failing, unit='ms', tz='UTC')
+
+
+def test_completed_windows_flushed_on_error(tmp_path):
+    """flush_every hiç dolmasa da hata anında tamamlanan pencereler depoya ve checkpoint'e yazılır."""
+    failing = WINDOWS[2][0]
+    session = FlakySession({failing: None})
+    downloader, store = make_downloader(tmp_path, session, max_retries=1, flush_every=100)
+    with pytest.raises(RuntimeError):
+        downloader.download('BTCUSDT', START, END, INTERVAL)
+
+    done   = checkpoint(tmp_path)
+    stored = store.read('BTCUSDT', INTERVAL, START, END)
+    assert {WINDOWS[0][0], WINDOWS[1][0]} <= done
+    assert failing not in done
+    # Checkpoint'teki her pencerenin barları depoda
+    for start_ms, end_ms in WINDOWS:
+        window = stored[(stored.index >= pd.Timestamp(start_ms, unit='ms', tz='UTC'))
+                        & (stored.index <= pd.Timestamp(end_ms, unit='ms', tz='UTC'))]
+        assert (len(window) == 200) == (start_ms in done)
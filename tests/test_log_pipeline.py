@@ -0,0 +1,57 @@
+"""log_pipeline.BoundedQueueHandler: kuyruk doluyken sadece WARNING altı kayıtlar düşer."""
+import logging
+import queue
+
+import pytest
+
+from log_pipeline import BoundedQueueHandler
+
+
+@pytest.fixture
+def capture():
+    """Dinleyicisiz (boşalmayan) kuyruk: limit 10, WARNING ve üstü için +2 yer."""
+    handler = BoundedQueueHandler(queue.Queue(maxsize=12), limit=10)
+    log = logging.getLogger('tests.log_pipeline')
+    log.propagate = False
+    log.setLevel(logging.DEBUG)
+    log.addHandler(handler)
+    yield log, handler
+    log.removeHandler(handler)
+
+
+def _levels(handler):
+    return [record.levelname for record in list(handler.queue.queue)]
+
+
+def test_info_flood_does_not_evict_errors(capture):
+    log, handler = capture
+    for i in range(50):
+        log.info("info %d", i)
+    log.error("emir reddedildi")
+    log.warning("pozisyon kayması")
+
+    assert _levels(handler) == ['INFO'] * 10 + ['ERROR', 'WARNING']
+    assert handler.take_dropped() == 40
+    assert handler.take_dropped_warnings() == 0
+
+
+def test_warnings_dropped_only_when_reserve_is_full(capture):
+    log, handler = capture
+    for i in range(10):
+        log.info("info %d", i)
+    for i in range(3):
+        log.critical("kritik %d", i)
+
+    assert _levels(handler).count('CRITICAL') == 2
+    assert handler.take_dropped() == 1
+    assert handler.take_dropped_warnings() == 1
+    assert handler.take_dropped() == 0
+
+
+def test_unbounded_queue_never_drops():
+    handler = BoundedQueueHandler(queue.Queue())
+    record = logging.LogRecord('x', logging.DEBUG, __file__, 1, "debug", (), None)
+    for _ in range(1000):
+        handler.enqueue(record)
+    assert handler.queue.qsize() == 1000
+    assert handler.dropped == 0
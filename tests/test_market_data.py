@@ -0,0 +1,50 @@
+"""market_data: yazım ortasında ölen daemon (seq tek kalır) aboneyi kilitlememeli."""
+import os
+import time
+
+import numpy as np
+import pytest
+
+import market_data
+from market_data import MarketDataPublisher, MarketDataSubscriber
+from snapshot import SignalSnapshot
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT']
+FIELDS  = ['close', 'atr']
+
+
+@pytest.fixture
+def segment(tmp_path, monkeypatch):
+    monkeypatch.setattr(market_data, 'WRITE_STALL', 0.2)
+    name       = f"test-md-{os.getpid()}"
+    socket_dir = str(tmp_path / 'sock')
+    publisher  = MarketDataPublisher(SYMBOLS, FIELDS, name=name, socket_dir=socket_dir, max_bars=10)
+    snapshot   = SignalSnapshot(SYMBOLS, {'close': np.array([1.0, 2.0]), 'atr': np.array([0.1, 0.2])},
+                                np.ones(2, dtype=bool), np.zeros(2, dtype=np.int64))
+    publisher.publish({}, snapshot)
+    subscriber = MarketDataSubscriber(name=name, socket_dir=socket_dir, timeout=1.0)
+    yield publisher, subscriber
+    subscriber.close()
+    publisher.close()
+
+
+def test_published_snapshot_is_read(segment):
+    _, subscriber = segment
+    assert subscriber.wait(0)
+    assert subscriber.snapshot().valid.tolist() == [True, True]
+
+
+def test_writer_killed_mid_publish_does_not_hang(segment):
+    publisher, subscriber = segment
+    publisher.layout.header[0] += 1  # yazım başladı, daemon öldü: seq tek, segment emekli değil
+
+    start = time.monotonic()
+    assert not subscriber.wait(0, timeout=1.0)
+    assert time.monotonic() - start < 2.0
+
+    start = time.monotonic()
+    snapshot = subscriber.snapshot()
+    assert time.monotonic() - start < 1.0
+    assert not snapshot.valid.any()
+
+    assert subscriber.frame('BTCUSDT') is None
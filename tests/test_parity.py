@@ -0,0 +1,24 @@
+"""parity.live_signals: vektörel panel yeniden oynatma, bar başına calculate_indicators ile birebir."""
+import numpy as np
+import pytest
+
+import parity
+from benchmarks.common import synthetic_ohlcv
+
+
+@pytest.mark.parametrize('symbol, seed', [('BTCUSDT', 3), ('ETHUSDT', 11)])
+def test_panel_replay_matches_frame_replay(symbol, seed):
+    df = synthetic_ohlcv(1400, seed=seed, price=30000.0)
+    positions = np.arange(parity.LIVE_WINDOW - 1, len(df))
+
+    panel = parity.live_signals(df, symbol, positions, chunk=128)
+    frame = parity.live_signals(df, symbol, positions, frame=True)
+
+    assert panel.shape == (positions.size, len(parity.SIGNAL_COLUMNS))
+    assert np.array_equal(panel, frame)
+
+
+def test_short_history_rejected():
+    df = synthetic_ohlcv(500, seed=1)
+    with pytest.raises(ValueError):
+        parity.live_signals(df, 'BTCUSDT', np.arange(100, 500))
@@ -0,0 +1,73 @@
+"""
+research_indicators vektörel portu vs indicator_update.py'nin kendisi: tüm ortak
+sütunlar birebir aynı olmalı (NaN yalnızca NaN'a eşit, doldurma / maskeleme yok).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import research_indicators as ri
+from benchmarks.research_indicators import SYMBOL, load_legacy_pipeline, research_inputs
+
+BARS = 4000
+
+
+@pytest.fixture(scope='module')
+def frames():
+    base = research_inputs(BARS)
+    legacy = load_legacy_pipeline()(base.copy(), SYMBOL)
+    ported = ri.calculate_research_indicators(base.copy(), SYMBOL)
+    return legacy, ported
+
+
+def _values(series: pd.Series) -> list:
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def test_ported_columns_cover_legacy_outputs(frames):
+    legacy, ported = frames
+    produced = ['bb_middle', 'bb_upper', 'bb_lower', 'candle', 'candle_body', 'candle_strength', 'candle_class',
+                'tr', '+di', '-di', 'dx', 'adx', 'dc_breakout_50', 'dc_breakdown_50', 'dc_breakout_clean_50',
+                'dc_breakdown_clean_50', 'bb_touch_upper', 'bb_touch_lower', 'bb_3_touch_long', 'bb_3_touch_short',
+                'bb_3_touch_long_clean', 'bb_3_touch_short_clean', 'pivot_up', 'pivot_down', 'entry_atr_steps_l',
+                'entry_atr_steps_s', 'atr_steps', 'pivot_up_up', 'pivot_down_down', 'dc_order',
+                'pivot_up_2x', 'pivot_down_2x']
+    assert set(produced) <= set(legacy.columns)
+    assert set(produced) <= set(ported.columns)
+
+
+@pytest.mark.parametrize('column', [
+    'bb_middle', 'bb_upper', 'bb_lower', 'candle_body', 'candle_strength', 'tr', '+di', '-di', 'dx', 'adx',
+    'entry_atr_steps_l', 'entry_atr_steps_s',
+])
+def test_numeric_columns_identical(frames, column):
+    legacy, ported = frames
+    assert np.array_equal(legacy[column].to_numpy(dtype=float), ported[column].to_numpy(dtype=float), equal_nan=True)
+
+
+@pytest.mark.parametrize('column', [
+    'candle', 'candle_class', 'dc_breakout_50', 'dc_breakdown_50', 'dc_breakout_clean_50', 'dc_breakdown_clean_50',
+    'bb_touch_upper', 'bb_touch_lower', 'bb_3_touch_long', 'bb_3_touch_short', 'bb_3_touch_long_clean',
+    'bb_3_touch_short_clean', 'pivot_up', 'pivot_down', 'atr_steps', 'pivot_up_up', 'pivot_down_down',
+    'dc_order', 'pivot_up_2x', 'pivot_down_2x',
+])
+def test_label_columns_identical(frames, column):
+    legacy, ported = frames
+    assert _values(legacy[column]) == _values(ported[column])
+
+
+def test_pivot_up_up_keeps_legacy_nan(frames):
+    """Eski kod sütunu sadece koşulu sağlayan satırlarda True yapar; kalanlar NaN (False değil)."""
+    legacy, ported = frames
+    for column in ('pivot_up_up', 'pivot_down_down'):
+        assert ported[column].isna().sum() == legacy[column].isna().sum() > 0
+        assert not (ported[column] == False).any()  # noqa: E712
+
+
+def test_fixture_exercises_signals(frames):
+    """Karşılaştırma anlamlı olsun: sinyaller gerçekten tetikleniyor."""
+    _, ported = frames
+    assert ported['dc_order'].notna().any()
+    assert ported['bb_3_touch_long_clean'].any()
+    assert ported['pivot_up_up'].notna().any() or ported['pivot_down_down'].notna().any()
+    assert ported['atr_steps'].notna().any()
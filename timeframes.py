@@ -0,0 +1,292 @@
+"""
+Taban interval cache'inden (15m) artımlı türetilen üst zaman dilimleri (1h, 4h, ...).
+
+Her kapanan 15m bar, oluşmakta olan üst barı yerinde günceller; üst bar
+tamamlandığında ATR (Wilder EWM), zigzag pivotları ve yapı kodları tek adımda
+ilerletilir. Ek get_kline çağrısı ya da pencerenin yeniden hesaplanması yoktur.
+
+    timeframes = TimeframeCache(['60', '240'])
+    api = BybitFuturesAPI(timeframes=timeframes)   # update_cache her mumda besler
+    timeframes.last_row('BTCUSDT')   # {'htf60_close': ..., 'htf240_high_structure_2x': ...}
+
+Değerler o an bilinen (causal) değerlerdir: aynı anda kesilmiş pencere üzerinde
+batch hesabın (resample + calculate_atr + zigzag + add_structure) son satırıyla
+aynıdır — benchmarks/timeframes.py doğrular.
+"""
+import time
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import kernels
+from config import HTF_MAX_BARS, HTF_ZIGZAG_ATR_MULT
+from exchange import INTERVAL_MS, OHLCV_COLUMNS
+from indicators import (
+    PIVOT_HIGH, PIVOT_LOW, STRUCTURE_HH, STRUCTURE_LH, STRUCTURE_HL, STRUCTURE_LL,
+)
+
+
+class _PivotSide:
+    """Bir yönün (high/low) son pivotu ve yapı kodu; add_structure ile aynı kurallar."""
+
+    def __init__(self, up_code: int, down_code: int, default: int):
+        self.up_code   = up_code
+        self.down_code = down_code
+        self.index     = -1
+        self.price     = np.nan
+        self.atr       = np.nan
+        self.confirmed = 0
+        self.structure = default
+
+    def add(self, index: int, price: float, atr: float, confirmed: bool) -> None:
+        if index != self.index:  # aynı bara tekrar yazılan pivot seviyeyi değiştirmez
+            if price > self.price:
+                self.structure = self.up_code
+            elif price < self.price:
+                self.structure = self.down_code
+        self.index, self.price, self.atr = index, price, atr
+        if confirmed:
+            self.confirmed = 1
+
+
+class IncrementalIndicators:
+    """
+    Kapanan her bar için ATR, zigzag (kernels._zigzag_kernel ile aynı durum makinesi),
+    pivot seviyeleri ve yapı kodlarını O(1) ilerletir.
+    """
+
+    def __init__(self, atr_window: int = 14, atr_mult: float = HTF_ZIGZAG_ATR_MULT):
+        self.alpha    = kernels.pandas_alpha(1 / atr_window)
+        self.atr_mult = atr_mult
+        self.suffix   = f"_{atr_mult:g}x"
+        self.n        = 0
+        self.close    = np.nan
+        self.atr      = np.nan
+        # Zigzag durumu
+        self.direction      = 0
+        self.last_pivot     = np.nan
+        self.last_pivot_idx = 0
+        self.last_pivot_atr = np.nan
+        self.sides = {
+            PIVOT_HIGH: _PivotSide(STRUCTURE_HH, STRUCTURE_LH, STRUCTURE_HH),
+            PIVOT_LOW:  _PivotSide(STRUCTURE_HL, STRUCTURE_LL, STRUCTURE_LL),
+        }
+        self.last_confirmed_at = -1
+        self.last_bars_ago     = np.nan
+
+    def _emit(self, confirmed_at: int, kind: int) -> None:
+        self.sides[kind].add(self.last_pivot_idx, self.last_pivot, self.last_pivot_atr, confirmed_at >= 0)
+        if confirmed_at >= 0:
+            self.last_confirmed_at = confirmed_at
+            self.last_bars_ago     = confirmed_at - self.last_pivot_idx
+
+    def step(self, high: float, low: float, close: float) -> None:
+        """Yeni kapanmış bar."""
+        i, prev_close = self.n, self.close
+        if prev_close != prev_close:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        self.atr   = kernels.ewm_step(self.atr, true_range, self.alpha)
+        self.close = close
+        self.n    += 1
+
+        if i == 0:
+            self.last_pivot, self.last_pivot_idx, self.last_pivot_atr = close, 0, self.atr
+            return
+
+        band = self.atr * self.atr_mult
+        if self.direction == 0:
+            if close >= self.last_pivot + band:
+                self.direction = 1
+                self._emit(-1, PIVOT_HIGH)
+            elif close <= self.last_pivot - band:
+                self.direction = -1
+                self._emit(-1, PIVOT_LOW)
+        elif self.direction == 1:
+            if close <= self.last_pivot - band:
+                self._emit(i, PIVOT_HIGH)
+                self.direction = -1
+                self.last_pivot, self.last_pivot_idx, self.last_pivot_atr = close, i, self.atr
+            elif close > self.last_pivot:
+                self.last_pivot, self.last_pivot_idx, self.last_pivot_atr = close, i, self.atr
+        else:
+            if close >= self.last_pivot + band:
+                self._emit(i, PIVOT_LOW)
+                self.direction = 1
+                self.last_pivot, self.last_pivot_idx, self.last_pivot_atr = close, i, self.atr
+            elif close < self.last_pivot:
+                self.last_pivot, self.last_pivot_idx, self.last_pivot_atr = close, i, self.atr
+
+    def row(self) -> Dict[str, float]:
+        """Son kapanmış barın indikatör değerleri (calculate_indicators sütun adlarıyla)."""
+        high, low, sfx = self.sides[PIVOT_HIGH], self.sides[PIVOT_LOW], self.suffix
+        bars_ago = self.last_bars_ago + (self.n - 1 - self.last_confirmed_at)
+        return {
+            'atr':                                self.atr,
+            'pct_atr':                            self.atr / self.close * 100,
+            f'high_pivot_filled{sfx}':            high.price,
+            f'low_pivot_filled{sfx}':             low.price,
+            f'high_pivot_atr_filled{sfx}':        high.atr,
+            f'low_pivot_atr_filled{sfx}':         low.atr,
+            f'high_pivot_confirmed_filled{sfx}':  high.confirmed,
+            f'low_pivot_confirmed_filled{sfx}':   low.confirmed,
+            f'pivot_bars_ago_filled{sfx}':        bars_ago,
+            f'high_structure{sfx}':               high.structure,
+            f'low_structure{sfx}':                low.structure,
+        }
+
+
+class TimeframeView:
+    """
+    Bir sembolün tek bir üst zaman dilimi: kapanmış barlar (son `max_bars`),
+    oluşmakta olan bar ve artımlı indikatörler.
+    """
+
+    def __init__(
+        self,
+        interval:      str,
+        base_interval: str = '15',
+        max_bars:      int = HTF_MAX_BARS,
+        atr_window:    int = 14,
+        atr_mult:      float = HTF_ZIGZAG_ATR_MULT,
+    ):
+        if interval not in INTERVAL_MS or base_interval not in INTERVAL_MS:
+            raise ValueError(f"Bilinmeyen interval: {interval} / {base_interval}")
+        self.interval      = interval
+        self.base_interval = base_interval
+        self.interval_ms   = INTERVAL_MS[interval]
+        self.base_ms       = INTERVAL_MS[base_interval]
+        if self.interval_ms <= self.base_ms or self.interval_ms % self.base_ms:
+            raise ValueError(f"{interval} taban interval'in ({base_interval}) katı olmalı")
+        self.indicators = IncrementalIndicators(atr_window, atr_mult)
+        self.bars: deque = deque(maxlen=max_bars)   # (time_ms, open, high, low, close, volume)
+        self.rows: deque = deque(maxlen=max_bars)   # bar kapanışındaki indikatör değerleri
+        self.forming: Optional[List[float]] = None  # [bucket_ms, open, high, low, close, volume]
+        self.last_base_ms = -1
+
+    def add_base_bar(self, time_ms: int, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """Kapanmış bir taban barı oluşan üst bara katar; bucket'ın son barıysa üst barı kapatır."""
+        if time_ms <= self.last_base_ms:
+            return
+        self.last_base_ms = time_ms
+        bucket = time_ms - time_ms % self.interval_ms
+        if self.forming is not None and self.forming[0] != bucket:
+            self._close_forming()  # eksik taban barı: önceki bucket yeni bucket'la kapanır
+        if self.forming is None:
+            if time_ms != bucket and not self.bars:
+                return  # cache ortadan başlıyor: ilk yarım bucket atlanır
+            self.forming = [bucket, open_, high, low, close, volume]
+        else:
+            forming = self.forming
+            forming[2] = max(forming[2], high)
+            forming[3] = min(forming[3], low)
+            forming[4] = close
+            forming[5] += volume
+        if time_ms + self.base_ms == bucket + self.interval_ms:
+            self._close_forming()
+
+    def _close_forming(self) -> None:
+        bucket, open_, high, low, close, volume = self.forming
+        self.forming = None
+        self.indicators.step(high, low, close)
+        self.bars.append((bucket, open_, high, low, close, volume))
+        self.rows.append(self.indicators.row())
+
+    def update(self, base_df: pd.DataFrame, now_ms: Optional[int] = None) -> int:
+        """Taban cache'indeki yeni kapanmış barları işler. Kapanan üst bar sayısını döndürür."""
+        if base_df is None or base_df.empty:
+            return 0
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        times  = base_df.index.as_unit('ms').asi8
+        start  = int(np.searchsorted(times, self.last_base_ms, side='right'))
+        stop   = int(np.searchsorted(times, now_ms - self.base_ms, side='right'))  # kapanmamış barı atla
+        if start >= stop:
+            return 0
+        closed_before = self.indicators.n
+        columns = [base_df[column].to_numpy()[start:stop].tolist() for column in OHLCV_COLUMNS]
+        for time_ms, open_, high, low, close, volume in zip(times[start:stop].tolist(), *columns):
+            self.add_base_bar(time_ms, open_, high, low, close, volume)
+        return self.indicators.n - closed_before
+
+    def frame(self) -> pd.DataFrame:
+        """Kapanmış üst barlar + her barın kapanışındaki indikatör değerleri."""
+        bars = pd.DataFrame(list(self.bars), columns=['time'] + OHLCV_COLUMNS)
+        index = pd.to_datetime(bars.pop('time'), unit='ms', utc=True)
+        df = pd.concat([bars, pd.DataFrame(list(self.rows))], axis=1)
+        df.index = pd.DatetimeIndex(index, name='time')
+        return df
+
+    def forming_bar(self) -> Optional[Dict[str, float]]:
+        """Oluşmakta olan (henüz kapanmamış) üst bar; yoksa None."""
+        if self.forming is None:
+            return None
+        return dict(zip(['time'] + OHLCV_COLUMNS, self.forming))
+
+    def last_row(self) -> Optional[Dict[str, float]]:
+        """Son kapanmış üst barın OHLCV + indikatör değerleri; henüz kapanan bar yoksa None."""
+        if not self.bars:
+            return None
+        return {**dict(zip(['time'] + OHLCV_COLUMNS, self.bars[-1])), **self.rows[-1]}
+
+
+class TimeframeCache:
+    """
+    Sembol başına üst zaman dilimi görünümleri. BybitFuturesAPI cache'i güncelledikçe
+    `update` çağrılır; semboller farklı thread'lerden güncellenebilir.
+    """
+
+    def __init__(
+        self,
+        intervals: Iterable[str],
+        max_bars:  int = HTF_MAX_BARS,
+        atr_mult:  float = HTF_ZIGZAG_ATR_MULT,
+    ):
+        self.intervals = list(intervals)
+        self.max_bars  = max_bars
+        self.atr_mult  = atr_mult
+        self._views: Dict[str, Dict[str, TimeframeView]] = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.intervals)
+
+    def _symbol_views(self, symbol: str, base_interval: str) -> Dict[str, TimeframeView]:
+        with self._lock:
+            views = self._views.get(symbol)
+            if views is None:
+                views = self._views[symbol] = {
+                    interval: TimeframeView(interval, base_interval, self.max_bars, atr_mult=self.atr_mult)
+                    for interval in self.intervals
+                }
+        for view in views.values():
+            if view.base_interval != base_interval:
+                raise ValueError(f"{symbol} görünümleri {view.base_interval} tabanlı, {base_interval} verildi")
+        return views
+
+    def update(self, symbol: str, base_df: pd.DataFrame, base_interval: str, now_ms: Optional[int] = None) -> None:
+        for view in self._symbol_views(symbol, base_interval).values():
+            view.update(base_df, now_ms)
+
+    def drop(self, symbol: str) -> None:
+        """Sembolün görünümlerini siler (takip bırakıldı; geri gelirse baştan kurulur)."""
+        with self._lock:
+            self._views.pop(symbol, None)
+
+    def view(self, symbol: str, interval: str) -> TimeframeView:
+        try:
+            return self._views[symbol][interval]
+        except KeyError:
+            raise KeyError(f"{symbol} için {interval} görünümü yok") from None
+
+    def last_row(self, symbol: str) -> Dict[str, float]:
+        """Tüm üst zaman dilimlerinin son değerleri, `htf{interval}_` önekiyle (canlı satıra eklenir)."""
+        out: Dict[str, float] = {}
+        for interval, view in self._views.get(symbol, {}).items():
+            row = view.last_row()
+            if row is not None:
+                out.update({f"htf{interval}_{key}": value for key, value in row.items()})
+        return out